@@ -24,6 +24,27 @@ class FileManager:
         self.default_save_dir = os.path.join(os.path.expanduser("~"), "Documents", "Strojarski proračuni")
         os.makedirs(self.default_save_dir, exist_ok=True)
     
+    @staticmethod
+    def calculation_locations():
+        """
+        Lokacije na poslužitelju na kojima se spremaju i traže proračuni
+        """
+        return {
+            "Mapa proračuna": os.path.join(os.getcwd(), "saved_calculations"),
+            "Moji dokumenti": os.path.join(os.path.expanduser("~"), "Documents"),
+            "Strojarski proračuni": os.path.join(os.path.expanduser("~"), "Documents", "Strojarski proračuni")
+        }
+    
+    @staticmethod
+    def list_calculations(location_path):
+        """
+        Vraća .calc datoteke na lokaciji, sortirane po datumu izmjene (najnovije prvo)
+        """
+        if not os.path.isdir(location_path):
+            return []
+        files = [f for f in os.listdir(location_path) if f.endswith('.calc')]
+        return sorted(files, key=lambda f: os.path.getmtime(os.path.join(location_path, f)), reverse=True)
+    
     def _get_save_file_path(self, default_name="proračun.calc"):
         """
         Streamlit implementacija za odabir putanje za spremanje
@@ -41,11 +62,7 @@ class FileManager:
             filename += '.calc'
         
         # Predložimo nekoliko uobičajenih lokacija
-        save_locations = {
-            "Mapa proračuna": os.path.join(os.getcwd(), "saved_calculations"),
-            "Moji dokumenti": os.path.join(os.path.expanduser("~"), "Documents"),
-            "Strojarski proračuni": self.default_save_dir
-        }
+        save_locations = self.calculation_locations()
         
         selected_location = st.sidebar.selectbox(
             "Lokacija:", 
@@ -95,11 +112,7 @@ class FileManager:
         st.sidebar.markdown("### Otvori proračun")
         
         # Definiramo lokacije za pretraživanje
-        open_locations = {
-            "Mapa proračuna": os.path.join(os.getcwd(), "saved_calculations"),
-            "Moji dokumenti": os.path.join(os.path.expanduser("~"), "Documents"),
-            "Strojarski proračuni": self.default_save_dir
-        }
+        open_locations = self.calculation_locations()
         
         selected_location = st.sidebar.selectbox(
             "Lokacija:", 
@@ -112,14 +125,11 @@ class FileManager:
         
         try:
             if os.path.exists(location_path):
-                # Filtriramo samo .calc datoteke
-                files = [f for f in os.listdir(location_path) if f.endswith('.calc')]
+                # Samo .calc datoteke, najnovije prvo
+                files = self.list_calculations(location_path)
                 
                 if not files:
                     st.sidebar.info(f"Nema dostupnih proračuna u {selected_location}")
-                    
-                # Sortiramo po datumu izmjene (najnovije prvo)
-                files = sorted(files, key=lambda f: os.path.getmtime(os.path.join(location_path, f)), reverse=True)
                 
                 # Prikazujemo popis datoteka
                 selected_file = st.sidebar.selectbox(
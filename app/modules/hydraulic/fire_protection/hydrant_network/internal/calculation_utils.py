@@ -7,6 +7,7 @@ from ..common.constants import (
     LOCAL_RESISTANCE_COEFFICIENTS
 )
 from ..common.pipe_data import PIPE_DATA
+from utils.hydraulics import reynolds_number, colebrook_friction_factor, darcy_weisbach_head_loss
 
 def calculate_pipe_diameter(flow_l_s, velocity_m_s):
     """Izračunava potreban promjer cijevi u mm za zadani protok i brzinu."""
@@ -42,8 +43,8 @@ def check_velocity_optimality(velocity):
         return "neprihvatljivo"
 
 def calculate_friction_factor(inner_diameter_m, roughness_m, reynolds):
-    """Izračunava faktor trenja koristeći Swamee-Jain aproksimaciju za Colebrook-White formulu."""
-    return 0.25 / (math.log10(roughness_m / (3.7 * inner_diameter_m) + 5.74 / reynolds**0.9))**2
+    """Izračunava faktor trenja prema Colebrook-White formuli (zajednička hidraulička jezgra)."""
+    return colebrook_friction_factor(reynolds, roughness_m / inner_diameter_m)
 
 def calculate_linear_losses(length, diameter_dn, velocity, material="Pocinčani čelik"):
     """Izračunava linijske gubitke tlaka u cijevima."""
@@ -54,13 +55,13 @@ def calculate_linear_losses(length, diameter_dn, velocity, material="Pocinčani
     roughness = PIPE_DATA.roughness.get(material, 0.15) / 1000  # mm -> m
     
     # Izračunaj Reynolds broj
-    reynolds = (WATER_DENSITY * velocity * inner_diameter_m) / WATER_VISCOSITY
+    reynolds = reynolds_number(WATER_DENSITY, velocity, inner_diameter_m, WATER_VISCOSITY)
     
     # Izračunaj faktor trenja
     friction_factor = calculate_friction_factor(inner_diameter_m, roughness, reynolds)
     
     # Izračunaj gubitak tlaka po Darcy-Weisbach formuli
-    loss_m = friction_factor * (length / inner_diameter_m) * (velocity**2 / (2 * GRAVITY))
+    loss_m = darcy_weisbach_head_loss(friction_factor, length, inner_diameter_m, velocity, GRAVITY)
     
     # Pretvori gubitak iz m vodenog stupca u bar
     loss_bar = loss_m * M_WATER_TO_BAR
@@ -5,6 +5,7 @@ Ispravke svih kritičnih formula i dodavanje EN 13384-2 specifičnih funkcija.
 
 import math
 from .constants import RHO_L0, GRAVITY, WATER_VAPOR_COEFFICIENTS, VALIDATION_LIMITS, OPTIMAL_CO2_RANGES
+from utils.hydraulics import colebrook_friction_factor, darcy_weisbach_pressure_drop
 
 def calculate_air_density(temperature, altitude):
     """
@@ -316,13 +317,8 @@ def calculate_friction_coefficient(roughness, diameter, reynolds_number=None):
     relative_roughness = roughness / diameter
     
     if reynolds_number and reynolds_number > 4000:
-        # Turbulentno strujanje - Colebrook formula (pojednostavljena)
-        if relative_roughness > 0.05:
-            # Vrlo hrapava površina
-            f = 0.25 / (math.log10(relative_roughness/3.7) ** 2)
-        else:
-            # Normalna hrapavost
-            f = 0.0054 + 0.396 * (relative_roughness ** 0.3)
+        # Turbulentno strujanje - Colebrook-White formula (zajednička hidraulička jezgra)
+        f = colebrook_friction_factor(reynolds_number, relative_roughness)
     else:
         # Standardna formula za dimnjake (EN 13384-2)
         f = 0.0054 + 0.15 * (relative_roughness ** 0.33)
@@ -345,7 +341,9 @@ def calculate_pressure_drop_friction(friction_coefficient, chimney_height, flue_
     Returns:
         float: Pad tlaka zbog trenja [Pa]
     """
-    return (friction_coefficient * chimney_height * flue_gas_density * flue_gas_velocity**2) / (2 * diameter) * safety_number
+    return darcy_weisbach_pressure_drop(
+        friction_coefficient, chimney_height, diameter, flue_gas_density, flue_gas_velocity
+    ) * safety_number
 
 def calculate_pressure_drop_resistance(resistance_coefficient, flue_gas_density, flue_gas_velocity, safety_number):
     """
@@ -0,0 +1,244 @@
+"""
+Batched calculation of all floor heating loops.
+
+Packs the parameters of every loop in the building into NumPy arrays and computes
+KH, heat flux, flow, pipe length, floor surface temperature and pressure drop for all
+loops in one pass. FloorHeatingCalculatorCore.calculate_single_loop remains the scalar
+reference: the batch reproduces its results (including the interpolated KH lookup),
+and loops whose parameters cannot be packed as numbers are delegated to it.
+"""
+
+import math
+import numpy as np
+from modules.thermal.heating.floor_heating.constants import *
+from modules.thermal.heating.floor_heating.kh_interpolation import interpolate_kh_values
+from utils.hydraulics import reynolds_number, colebrook_friction_factor, darcy_weisbach_pressure_drop
+
+# Fixed local loss coefficients (same as calculate_pressure_drop)
+K_INLET = 0.5
+K_OUTLET = 1.0
+K_BENDS = 0.2
+PIPE_ROUGHNESS = 0.0015
+
+# Loop and manifold parameters packed into arrays
+LOOP_FIELDS = ("area", "pipe_spacing", "r_lambda", "room_temperature", "manifold_distance")
+PARAM_FIELDS = ("flow_temperature", "delta_t", "screed_thickness")
+
+# Result keys in the order returned by calculate_single_loop
+RESULT_KEYS = (
+    "kh_value", "mean_heating_excess_temp", "heat_flux", "heat_load", "pipe_length",
+    "recommended_loops", "length_per_loop", "area_per_loop", "flow_rate_kg_h",
+    "flow_rate_l_min", "floor_surface_temp", "max_floor_temp", "pressure_drop",
+    "water_velocity", "return_temperature", "flow_temperature"
+)
+
+
+def mean_heating_excess_temperature(flow_temperature, return_temperature, room_temperature):
+    """Log-mean heating excess temperature, arithmetic difference where the logarithm is undefined."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (flow_temperature - room_temperature) / (return_temperature - room_temperature)
+        log_defined = (return_temperature != room_temperature) & (ratio > 0) & (ratio != 1)
+        return np.where(
+            log_defined,
+            (flow_temperature - return_temperature) / np.log(np.where(log_defined, ratio, 2.0)),
+            flow_temperature - room_temperature,
+        )
+
+
+def _inner_diameter(pipe_diameter):
+    """Inner pipe diameter in metres, resolved the same way as calculate_pressure_drop."""
+    try:
+        if pipe_diameter in PIPE_DATA:
+            return PIPE_DATA[pipe_diameter]["inner_diameter"] / 1000.0
+        parts = pipe_diameter.replace(',', '.').split('x')
+        return (float(parts[0]) - 2 * float(parts[1])) / 1000.0
+    except Exception:
+        return 0.012
+
+
+def _max_pipe_length(pipe_diameter):
+    """Maximum loop length for a pipe diameter, resolved the same way as calculate_single_loop."""
+    if pipe_diameter in PIPE_DATA:
+        return PIPE_DATA[pipe_diameter]["max_length"]
+    return PIPE_DIAMETERS.get(pipe_diameter, 100)
+
+
+def circuit_length(area, pipe_spacing, manifold_distance, circuits):
+    """Length of one circuit of a loop split into circuits: its share of the coil plus both leads (m)."""
+    return area / (pipe_spacing / 100) / circuits + 2 * manifold_distance
+
+
+def circuit_split_basis(loop, pipe_diameter):
+    """Loop inputs a circuit split depends on."""
+    return [loop.get("area"), loop.get("pipe_spacing"), loop.get("manifold_distance"), pipe_diameter]
+
+
+def store_circuits(loop, circuits, pipe_diameter):
+    """Stores an advisory circuit split together with the inputs it was computed for."""
+    loop["circuits"] = int(circuits)
+    loop["circuits_basis"] = circuit_split_basis(loop, pipe_diameter)
+
+
+def loop_circuits(loop, pipe_diameter):
+    """Stored circuit split of a loop, or 1 if it was computed for different inputs."""
+    if loop.get("circuits_basis") != circuit_split_basis(loop, pipe_diameter):
+        return 1
+    return max(int(loop.get("circuits") or 1), 1)
+
+
+class BatchLoopCalculator:
+    """Vectorized calculation of many floor heating loops."""
+
+    def __init__(self, core_calculator):
+        """Initialize with the scalar core used as reference and fallback."""
+        self.core_calculator = core_calculator
+
+    @staticmethod
+    def is_complete(loop):
+        """Checks whether the loop has the inputs required for calculation."""
+        return (
+            loop.get("area") is not None and loop["area"] > 0
+            and loop.get("manifold_distance") is not None
+            and loop.get("pipe_spacing") is not None
+        )
+
+    @staticmethod
+    def pack(entries):
+        """
+        Packs (loop, params) pairs into arrays.
+
+        Returns a dict of float arrays (one element per packed entry), the list of pipe
+        diameters, the indices of packed entries and the indices that must be calculated
+        by the scalar path.
+        """
+        packed_indices = []
+        fallback_indices = []
+        columns = {field: [] for field in LOOP_FIELDS + PARAM_FIELDS}
+        pipe_diameters = []
+
+        for index, (loop, params) in enumerate(entries):
+            try:
+                values = [float(loop[field]) for field in LOOP_FIELDS]
+                values += [float(params[field]) for field in PARAM_FIELDS]
+                pipe_diameter = params["pipe_diameter"]
+            except (KeyError, TypeError, ValueError):
+                fallback_indices.append(index)
+                continue
+            # Zero spacing and non-finite inputs are left to the scalar error handling
+            if not all(math.isfinite(v) for v in values) or values[1] == 0 or not isinstance(pipe_diameter, str):
+                fallback_indices.append(index)
+                continue
+
+            for field, value in zip(LOOP_FIELDS + PARAM_FIELDS, values):
+                columns[field].append(value)
+            pipe_diameters.append(pipe_diameter)
+            packed_indices.append(index)
+
+        arrays = {field: np.array(column, dtype=float) for field, column in columns.items()}
+        return arrays, pipe_diameters, packed_indices, fallback_indices
+
+    @staticmethod
+    def pressure_drops(flow_rate_kg_h, inner_diameter, pipe_length, water_temperature, pipe_spacing):
+        """Vectorized equivalent of FloorHeatingCalculatorCore.calculate_pressure_drop."""
+        water_density = 1000.1 - 0.0864 * water_temperature
+        water_viscosity = (1.777 - 0.0264 * water_temperature) * 1e-3
+
+        flow_rate_m3s = flow_rate_kg_h / 3600 / water_density
+        pipe_cross_section = math.pi * (inner_diameter ** 2) / 4
+        with np.errstate(divide="ignore", invalid="ignore"):
+            water_velocity = np.where(pipe_cross_section > 0, flow_rate_m3s / pipe_cross_section, 0.0)
+
+        reynolds = reynolds_number(water_density, water_velocity, inner_diameter, water_viscosity)
+        friction_factor = colebrook_friction_factor(reynolds, PIPE_ROUGHNESS / inner_diameter)
+        pressure_drop_linear = darcy_weisbach_pressure_drop(
+            friction_factor, pipe_length, inner_diameter, water_density, water_velocity
+        )
+        dynamic_pressure = water_density * water_velocity ** 2 / 2
+        num_bends = np.trunc(pipe_length / (2 * pipe_spacing / 100))
+        pressure_drop_local = (K_INLET + K_OUTLET + num_bends * K_BENDS) * dynamic_pressure
+
+        # Negligible flow gives zero pressure drop (velocity is still reported)
+        negligible = (flow_rate_kg_h < 1) | (water_velocity < 0.001)
+        pressure_drop_total = np.where(negligible, 0.0, (pressure_drop_linear + pressure_drop_local) / 1000)
+
+        return {
+            "pressure_drop_total": pressure_drop_total,
+            "pressure_drop_linear": np.where(negligible, 0.0, pressure_drop_linear / 1000),
+            "pressure_drop_local": np.where(negligible, 0.0, pressure_drop_local / 1000),
+            "water_velocity": water_velocity,
+            "reynolds": np.where(negligible, 0.0, reynolds),
+            "friction_factor": np.where(negligible, 0.0, friction_factor),
+            "num_bends": np.where(negligible, 0, num_bends).astype(int),
+        }
+
+    def compute(self, arrays, pipe_diameters):
+        """Computes all result quantities for packed loops; returns a dict of arrays keyed as RESULT_KEYS."""
+        area = arrays["area"]
+        pipe_spacing = arrays["pipe_spacing"]
+        room_temperature = arrays["room_temperature"]
+        flow_temperature = arrays["flow_temperature"]
+        delta_t = arrays["delta_t"]
+
+        return_temperature = flow_temperature - delta_t
+        kh_value = interpolate_kh_values(pipe_diameters, arrays["r_lambda"], pipe_spacing, arrays["screed_thickness"])
+
+        mean_heating_excess_temp = mean_heating_excess_temperature(flow_temperature, return_temperature, room_temperature)
+
+        heat_flux = kh_value * mean_heating_excess_temp
+        heat_load = area * heat_flux
+        pipe_length = area / (pipe_spacing / 100) + 2 * arrays["manifold_distance"]
+
+        max_pipe_length = np.array([_max_pipe_length(d) for d in pipe_diameters], dtype=float)
+        too_long = pipe_length > max_pipe_length
+        recommended_loops = np.where(too_long, np.ceil(pipe_length / max_pipe_length), 1).astype(int)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            flow_rate_kg_h = np.where(delta_t > 0, (heat_load * 3600) / (SPECIFIC_HEAT_WATER * delta_t), 0.0)
+
+        inner_diameter = np.array([_inner_diameter(d) for d in pipe_diameters], dtype=float)
+        pressure = self.pressure_drops(
+            flow_rate_kg_h, inner_diameter, pipe_length, (flow_temperature + return_temperature) / 2, pipe_spacing
+        )
+
+        return {
+            "kh_value": kh_value,
+            "mean_heating_excess_temp": mean_heating_excess_temp,
+            "heat_flux": heat_flux,
+            "heat_load": heat_load,
+            "pipe_length": pipe_length,
+            "recommended_loops": recommended_loops,
+            "length_per_loop": pipe_length / recommended_loops,
+            "area_per_loop": area / recommended_loops,
+            "flow_rate_kg_h": flow_rate_kg_h,
+            "flow_rate_l_min": flow_rate_kg_h / 60,
+            "floor_surface_temp": room_temperature + heat_flux / ALPHA_I,
+            "max_floor_temp": np.array([MAX_FLOOR_TEMP.get(t, 29) for t in room_temperature.tolist()]),
+            "pressure_drop": pressure["pressure_drop_total"],
+            "water_velocity": pressure["water_velocity"],
+            "return_temperature": return_temperature,
+            "flow_temperature": flow_temperature,
+        }
+
+    def calculate(self, entries):
+        """
+        Calculates a list of (loop, params) pairs.
+
+        Returns a list of result dicts in the same order and with the same keys as
+        calculate_single_loop; incomplete loops get an empty dict.
+        """
+        results = [{} for _ in entries]
+        complete = [i for i, (loop, _) in enumerate(entries) if self.is_complete(loop)]
+        arrays, pipe_diameters, packed, fallback = self.pack([entries[i] for i in complete])
+
+        if packed:
+            computed = self.compute(arrays, pipe_diameters)
+            columns = {key: computed[key].tolist() for key in RESULT_KEYS}
+            for row, index in enumerate(packed):
+                results[complete[index]] = {key: columns[key][row] for key in RESULT_KEYS}
+
+        # Loops with non-numeric inputs go through the scalar reference (it reports the error)
+        for index in fallback:
+            loop, params = entries[complete[index]]
+            results[complete[index]] = self.core_calculator.calculate_single_loop(loop, params)
+
+        return results
@@ -80,8 +80,8 @@ PIPE_DIAMETERS = {key: data['max_length'] for key, data in PIPE_DATA.items()}
 # Dostupni razmaci cijevi (cm)
 PIPE_SPACINGS = [10, 15, 20, 25, 30]
 
-# Dostupne temperature polaza (°C)
-FLOW_TEMPERATURES = [35, 40, 45, 50, 55]
+# Dostupne temperature polaza (°C), u koracima od 1 °C radi niskotemperaturnih izvora (dizalice topline)
+FLOW_TEMPERATURES = list(range(25, 56))
 
 # Dostupne vrijednosti za ΔT (°C)
 DELTA_T_VALUES = list(range(5, 11))  # 5, 6, 7, 8, 9, 10
@@ -132,6 +132,32 @@ CONNECTION_PIPE_DATA = {
     }
 }
 
+# Zadani promjer spojnih cijevi novog razdjelnika (ključ CONNECTION_PIPE_DATA)
+DEFAULT_CONNECTION_PIPE_DIAMETER = '20×2,3'
+
+# Hrapavost spojnih cijevi PE-RT/Al/PE-RT (m)
+CONNECTION_PIPE_ROUGHNESS = 0.000007
+
+# Zbroj koeficijenata lokalnih otpora spojnog voda (koljena, kuglasti ventili, priključci)
+CONNECTION_PIPE_ZETA = 4.0
+
+# Ventili za predpodešavanje na razdjelniku: kv vrijednost (m³/h) za pojedino predpodešenje
+# (zadnje predpodešenje je potpuno otvoren ventil)
+MANIFOLD_VALVE_PRESETTINGS = {
+    1: 0.15,
+    2: 0.30,
+    3: 0.50,
+    4: 0.75,
+    5: 1.00,
+    6: 1.30,
+}
+
+# Korak na koji se zaokružuje predpodešenje ventila
+MANIFOLD_VALVE_PRESETTING_STEP = 0.5
+
+# Najveća udaljenost prostorije od razdjelnika (m) pri automatskoj raspodjeli krugova
+MAX_MANIFOLD_DISTANCE = 15.0
+
 # Definicije razdjelnika
 MANIFOLD_TYPES = {
     '2-kruga': {
@@ -9,6 +9,14 @@ from modules.thermal.heating.floor_heating.kh_values import KH_VALUES
 from modules.thermal.heating.floor_heating.utils import *
 from modules.thermal.heating.floor_heating.flow_adjuster import FlowAdjuster
 from modules.thermal.heating.floor_heating.floor_heating_calculator_core import FloorHeatingCalculatorCore
+from modules.thermal.heating.floor_heating.batch_calculator import BatchLoopCalculator, store_circuits
+from modules.thermal.heating.floor_heating.hydraulic_balancing import balance_building
+from modules.thermal.heating.floor_heating.supply_temperature import solve_supply_temperatures
+from modules.thermal.heating.floor_heating.spacing_optimizer import optimize_spacing
+from modules.thermal.heating.floor_heating.manifold_assignment import assign_circuits
+from modules.thermal.heating.floor_heating.heat_loss_sync import (
+    HEAT_LOSS_RESULTS_KEY, HEAT_LOSS_REVISION_KEY, linked_loops
+)
 from modules.thermal.heating.floor_heating.floor_heating_ui import FloorHeatingUI, apply_custom_styles
 from modules.thermal.heating.floor_heating.floor_heating_data import FloorHeatingDataManager
 
@@ -22,6 +30,7 @@ class FloorHeatingCalc(BaseCalculation):
         
         # Initialize core calculator
         self.core_calculator = FloorHeatingCalculatorCore()
+        self.batch_calculator = BatchLoopCalculator(self.core_calculator)
         
         # Initialize UI and data managers
         self.data_manager = FloorHeatingDataManager(self)
@@ -80,6 +89,11 @@ class FloorHeatingCalc(BaseCalculation):
         # Migracija podataka iz stare u novu strukturu ako je potrebno
         self.data_manager.migrate_data_if_needed(data)
         
+        # Povezane prostorije prate promjene proračuna toplinskih gubitaka
+        revision = st.session_state.get(HEAT_LOSS_REVISION_KEY)
+        if revision is not None and revision != data.get("heat_loss_revision") and linked_loops(data):
+            self.sync_heat_loss(data)
+        
         # Kreiraj tabove
         tab_building, tab_loops, tab_results = st.tabs(["Zgrada i razdjelnici", "Petlje podnog grijanja", "Rezultati"])
         
@@ -111,25 +125,173 @@ class FloorHeatingCalc(BaseCalculation):
             data["meta"]["modified"] = datetime.now().isoformat()
     
     def calculate_all_loops(self, data):
-        """Izračunava sve petlje u zgradi."""
-        # Proći kroz sve etaže, razdjelnike i petlje
+        """Izračunava sve petlje u zgradi u jednom vektoriziranom prolazu."""
+        # Skupi sve petlje s potrebnim podacima i parametrima njihove etaže i razdjelnika
+        entries = []
         for floor in data["building"]["floors"]:
             for manifold in floor["manifolds"]:
                 for loop in manifold["loops"]:
-                    # Izračunaj petlju samo ako ima sve potrebne podatke
-                    has_area = "area" in loop and loop["area"] is not None and loop["area"] > 0
-                    has_manifold_distance = "manifold_distance" in loop and loop["manifold_distance"] is not None
-                    has_pipe_spacing = "pipe_spacing" in loop and loop["pipe_spacing"] is not None
-                    
-                    if has_area and has_manifold_distance and has_pipe_spacing:
-                        # Kreiraj prilagođene parametre za ovu petlju
+                    if BatchLoopCalculator.is_complete(loop):
                         custom_params = {
                             "screed_thickness": floor.get("screed_thickness", 45),
                             "flow_temperature": manifold.get("flow_temperature", 35),
                             "delta_t": manifold.get("delta_t", 5),
                             "pipe_diameter": manifold.get("pipe_diameter", "16x2,0")
                         }
-                        self._calculate_single_loop(loop, custom_params)
+                        entries.append((loop, custom_params))
+        
+        # Izračunaj sve petlje odjednom (pojedinačni izračun ostaje referentni put)
+        for (loop, _), results in zip(entries, self.batch_calculator.calculate(entries)):
+            self.data_manager.store_loop_results(loop, results)
+    
+    def balance_hydraulics(self, data):
+        """Hidraulički uravnotežuje sve razdjelnike zgrade i određuje radnu točku pumpe."""
+        return balance_building(data)
+    
+    def solve_supply_temperatures(self, data):
+        """Određuje najnižu temperaturu polaza po razdjelniku i za zgradu te pripadne razmake cijevi."""
+        return solve_supply_temperatures(data)
+    
+    def _apply_supply_temperatures(self, solution, data):
+        """Primjenjuje preporučene temperature polaza i razmake cijevi te ponovno izračunava petlje."""
+        index = self.data_manager.index(data)
+        for manifold_solution in solution["manifolds"]:
+            if manifold_solution["supply_temperature"] is None:
+                continue
+            floor_id, manifold_id = manifold_solution["floor_id"], manifold_solution["manifold_id"]
+            manifold = index.manifold(floor_id, manifold_id)
+            if manifold is None:
+                continue
+            
+            manifold["flow_temperature"] = manifold_solution["supply_temperature"]
+            st.session_state.pop(f"flow_temperature_{floor_id}_{manifold_id}", None)
+            
+            for loop_solution in manifold_solution["loops"]:
+                loop = index.loop(floor_id, manifold_id, loop_solution["loop_id"])
+                # Petlja ograničena temperaturom poda dobiva razmak za najveći dopušteni toplinski tok
+                if loop is not None and loop_solution["solved"]:
+                    loop["pipe_spacing"] = loop_solution["pipe_spacing"]
+                    st.session_state.pop(f"spacing_{loop['id']}", None)
+        
+        self.calculate_all_loops(data)
+        self.mark_as_changed()
+    
+    def optimize_spacing(self, data, vary_covering=False):
+        """Određuje razmak cijevi (i po želji podnu oblogu) te podjelu na krugove za svaku prostoriju."""
+        return optimize_spacing(data, vary_covering=vary_covering)
+    
+    def _apply_spacing_optimization(self, rooms, data):
+        """Primjenjuje optimirane razmake cijevi i podne obloge te ponovno izračunava petlje."""
+        index = self.data_manager.index(data)
+        for room in rooms:
+            loop = index.loop(room["floor_id"], room["manifold_id"], room["loop_id"])
+            if loop is None or room["status"] != "ok":
+                continue
+            
+            loop["pipe_spacing"] = room["pipe_spacing"]
+            st.session_state.pop(f"spacing_{loop['id']}", None)
+            if room["floor_covering_name"] is not None and room["r_lambda"] != loop.get("r_lambda"):
+                loop["r_lambda"] = room["r_lambda"]
+                loop["floor_covering_name"] = room["floor_covering_name"]
+                st.session_state.pop(f"covering_{loop['id']}", None)
+            # Podjela na krugove je preporuka - pamti se uz petlju (i ulazne podatke za koje vrijedi),
+            # petlja se ne dijeli
+            manifold = index.manifold(room["floor_id"], room["manifold_id"])
+            store_circuits(loop, room["circuits"], manifold.get("pipe_diameter"))
+        
+        self.calculate_all_loops(data)
+        self.mark_as_changed()
+    
+    def assign_circuits(self, data):
+        """Raspoređuje krugove na razdjelnike prema broju priključaka i udaljenosti."""
+        return assign_circuits(data)
+    
+    def _apply_circuit_assignment(self, assignment, data):
+        """Primjenjuje raspodjelu krugova na razdjelnike te ponovno izračunava petlje."""
+        # ID-evi petlji ostaju jedinstveni u cijeloj zgradi (ključevi widgeta ovise samo o ID-u petlje)
+        index = self.data_manager.index(data)
+        used_loop_ids = set()
+        
+        for floor_assignment in assignment["floors"]:
+            floor = index.floor(floor_assignment["floor_id"])
+            if floor is None:
+                continue
+            
+            originals = {manifold["id"]: manifold for manifold in floor.get("manifolds", [])}
+            loops = {(manifold_id, loop["id"]): loop
+                     for manifold_id, manifold in originals.items() for loop in manifold.get("loops", [])}
+            
+            manifolds = []
+            for manifold_assignment in floor_assignment["manifolds"]:
+                site = originals[manifold_assignment["site_manifold_id"]]
+                if manifold_assignment["manifold_id"] is not None:
+                    manifold = site
+                else:
+                    # Novi razdjelnik na istom mjestu preuzima parametre postojećeg
+                    manifold = {key: value for key, value in site.items() if key not in ("rooms", "loops")}
+                    manifold["id"] = index.new_manifold_id(floor["id"])
+                    manifold["name"] = f"Razdjelnik {manifold['id']}"
+                
+                manifold["loops"] = []
+                manifold["rooms"] = []
+                for position, loop_assignment in enumerate(manifold_assignment["loops"], start=1):
+                    loop = loops[(loop_assignment["source_manifold_id"], loop_assignment["loop_id"])]
+                    if loop["id"] in used_loop_ids:
+                        loop["id"] = index.new_loop_id()
+                    used_loop_ids.add(loop["id"])
+                    loop["manifold_distance"] = round(loop_assignment["distance"], 2)
+                    manifold["loops"].append(loop)
+                    manifold["rooms"].append({"id": loop["id"], "name": loop.get("room_name", ""), "position": position})
+                manifold["type"] = manifold_assignment["type"]
+                manifold["num_circuits"] = max(2, manifold_assignment["ports"])
+                manifolds.append(manifold)
+            
+            floor["manifolds"] = sorted(manifolds, key=lambda manifold: manifold["id"])
+            
+            # Razdjelnici i petlje su preraspoređeni pa se widgeti ponovno inicijaliziraju iz podataka
+            manifold_ids = set(originals) | {manifold["id"] for manifold in manifolds}
+            loop_ids = {loop_id for _, loop_id in loops} | {loop["id"] for loop in loops.values()}
+            for manifold_id in manifold_ids:
+                for prefix in ("manifold_name", "flow_temperature", "delta_t", "pipe_diameter", "num_circuits",
+                               "supply_pipe_diameter", "supply_pipe_length", "return_pipe_length",
+                               "position_x", "position_y"):
+                    st.session_state.pop(f"{prefix}_{floor['id']}_{manifold_id}", None)
+                for loop_id in loop_ids:
+                    st.session_state.pop(f"room_name_{floor['id']}_{manifold_id}_{loop_id}", None)
+            for loop_id in loop_ids:
+                for prefix in ("move_down", "move_up", "room_temp", "area", "covering", "spacing", "manifold",
+                               "flow_adjustment", "position_x", "position_y"):
+                    st.session_state.pop(f"{prefix}_{loop_id}", None)
+        
+        index.invalidate()
+        self.calculate_all_loops(data)
+        self.mark_as_changed()
+    
+    def sync_heat_loss(self, data):
+        """Preuzima prostorije iz proračuna toplinskih gubitaka i ponovno izračunava samo promijenjene petlje."""
+        report = self.data_manager.sync_heat_loss(data, st.session_state.get(HEAT_LOSS_RESULTS_KEY))
+        data["heat_loss_revision"] = st.session_state.get(HEAT_LOSS_REVISION_KEY)
+        
+        changed = report["added"] + report["updated"]
+        entries = [(loop, self.data_manager.get_custom_params_for_loop(loop, floor, manifold))
+                   for floor, manifold, loop in changed if BatchLoopCalculator.is_complete(loop)]
+        for (loop, _), results in zip(entries, self.batch_calculator.calculate(entries)):
+            self.data_manager.store_loop_results(loop, results)
+        
+        # Widgeti promijenjenih petlji ponovno se inicijaliziraju iz podataka
+        for floor, manifold, loop in changed:
+            st.session_state.pop(f"room_name_{floor['id']}_{manifold['id']}_{loop['id']}", None)
+            for prefix in ("room_temp", "area"):
+                st.session_state.pop(f"{prefix}_{loop['id']}", None)
+            st.session_state.pop(f"num_circuits_{floor['id']}_{manifold['id']}", None)
+        
+        st.session_state.floor_heating_heat_loss_sync = {
+            "added": len(report["added"]),
+            "updated": len(report["updated"]),
+            "unchanged": report["unchanged"],
+            "missing": [loop.get("room_name", "") for _, _, loop in report["missing"]],
+        }
+        return report
     
     def _calculate_single_loop(self, loop, custom_params=None):
         """Izračunava pojedinu petlju."""
@@ -158,7 +320,7 @@ class FloorHeatingCalc(BaseCalculation):
             )
             
             # Spremi rezultate
-            loop["results"] = results
+            self.data_manager.store_loop_results(loop, results)
             
         except Exception as e:
             st.error(f"Greška pri izračunu petlje: {str(e)}")
@@ -189,24 +351,22 @@ class FloorHeatingCalc(BaseCalculation):
         value = st.session_state[param_key]
         
         # Pronađi etažu
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                floor[param_name] = value
-                
-                # Posebna obrada za debljinu estriha - ažuriraj sve petlje na ovoj etaži
-                if param_name == "screed_thickness":
-                    for manifold in floor.get("manifolds", []):
-                        # Ažuriraj sve petlje u razdjelniku
-                        for loop in manifold.get("loops", []):
-                            # Izračunaj petlju s novom debljinom estriha (modified common_params)
-                            custom_params = data["common_params"].copy()
-                            custom_params["screed_thickness"] = value
-                            custom_params["flow_temperature"] = manifold.get("flow_temperature", 35)
-                            custom_params["delta_t"] = manifold.get("delta_t", 5)
-                            custom_params["pipe_diameter"] = manifold.get("pipe_diameter", "16x2,0")
-                            self._calculate_single_loop(loop, custom_params)
-                
-                break
+        floor = self.data_manager.index(data).floor(floor_id)
+        if floor is not None:
+            floor[param_name] = value
+            
+            # Posebna obrada za debljinu estriha - ažuriraj sve petlje na ovoj etaži
+            if param_name == "screed_thickness":
+                for manifold in floor.get("manifolds", []):
+                    # Ažuriraj sve petlje u razdjelniku
+                    for loop in manifold.get("loops", []):
+                        # Izračunaj petlju s novom debljinom estriha (modified common_params)
+                        custom_params = data["common_params"].copy()
+                        custom_params["screed_thickness"] = value
+                        custom_params["flow_temperature"] = manifold.get("flow_temperature", 35)
+                        custom_params["delta_t"] = manifold.get("delta_t", 5)
+                        custom_params["pipe_diameter"] = manifold.get("pipe_diameter", "16x2,0")
+                        self._calculate_single_loop(loop, custom_params)
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -229,27 +389,24 @@ class FloorHeatingCalc(BaseCalculation):
         value = st.session_state[param_key]
         
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        manifold[param_name] = value
-                        
-                        # Posebna obrada za parametre koji utječu na proračun petlji
-                        recalculate_params = ["flow_temperature", "delta_t", "pipe_diameter"]
-                        if param_name in recalculate_params:
-                            # Ažuriraj sve petlje u razdjelniku
-                            for loop in manifold.get("loops", []):
-                                # Izračunaj petlju s novim parametrom
-                                custom_params = data["common_params"].copy()
-                                custom_params["screed_thickness"] = floor.get("screed_thickness", 45)
-                                custom_params["flow_temperature"] = manifold.get("flow_temperature", 35)
-                                custom_params["delta_t"] = manifold.get("delta_t", 5)
-                                custom_params["pipe_diameter"] = manifold.get("pipe_diameter", "16x2,0")
-                                self._calculate_single_loop(loop, custom_params)
-                        
-                        break
-                break
+        index = self.data_manager.index(data)
+        manifold = index.manifold(floor_id, manifold_id)
+        if manifold is not None:
+            floor = index.floor(floor_id)
+            manifold[param_name] = value
+            
+            # Posebna obrada za parametre koji utječu na proračun petlji
+            recalculate_params = ["flow_temperature", "delta_t", "pipe_diameter"]
+            if param_name in recalculate_params:
+                # Ažuriraj sve petlje u razdjelniku
+                for loop in manifold.get("loops", []):
+                    # Izračunaj petlju s novim parametrom
+                    custom_params = data["common_params"].copy()
+                    custom_params["screed_thickness"] = floor.get("screed_thickness", 45)
+                    custom_params["flow_temperature"] = manifold.get("flow_temperature", 35)
+                    custom_params["delta_t"] = manifold.get("delta_t", 5)
+                    custom_params["pipe_diameter"] = manifold.get("pipe_diameter", "16x2,0")
+                    self._calculate_single_loop(loop, custom_params)
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -264,19 +421,12 @@ class FloorHeatingCalc(BaseCalculation):
         num_circuits = st.session_state[param_key]
         
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        # Spremi stari i novi broj krugova
-                        old_num = manifold.get("num_circuits", 4)
-                        manifold["num_circuits"] = num_circuits
-                        
-                        # Automatizirano sinkroniziranje broja prostorija s brojem krugova razdjelnika
-                        self.data_manager.sync_rooms_with_circuits(floor_id, manifold_id, data)
-                        
-                        break
-                break
+        manifold = self.data_manager.index(data).manifold(floor_id, manifold_id)
+        if manifold is not None:
+            manifold["num_circuits"] = num_circuits
+            
+            # Automatizirano sinkroniziranje broja prostorija s brojem krugova razdjelnika
+            self.data_manager.sync_rooms_with_circuits(floor_id, manifold_id, data)
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -299,43 +449,36 @@ class FloorHeatingCalc(BaseCalculation):
         value = st.session_state[param_key]
         
         # Pronađi prostoriju i odgovarajuću petlju
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        # Ažuriraj ime prostorije
-                        for room in manifold.get("rooms", []):
-                            if room.get("id") == room_id:
-                                room[param_name] = value
-                                break
-                        
-                        # Ažuriraj i odgovarajuću petlju
-                        for loop in manifold.get("loops", []):
-                            if loop.get("id") == room_id:
-                                loop["room_name"] = value
-                                
-                                # Automatski postavi preporučenu temperaturu
-                                default_temp = get_room_temperature_for_name(value)
-                                loop["room_temperature"] = default_temp
-                                
-                                # Izračunaj petlju s novim imenom prostorije ako je potpuna
-                                has_area = "area" in loop and loop["area"] is not None and loop["area"] > 0
-                                has_manifold_distance = "manifold_distance" in loop and loop["manifold_distance"] is not None
-                                has_pipe_spacing = "pipe_spacing" in loop and loop["pipe_spacing"] is not None
-                                
-                                if has_area and has_manifold_distance and has_pipe_spacing:
-                                    # Izračunaj petlju
-                                    custom_params = data["common_params"].copy()
-                                    custom_params["screed_thickness"] = floor.get("screed_thickness", 45)
-                                    custom_params["flow_temperature"] = manifold.get("flow_temperature", 35)
-                                    custom_params["delta_t"] = manifold.get("delta_t", 5)
-                                    custom_params["pipe_diameter"] = manifold.get("pipe_diameter", "16x2,0")
-                                    self._calculate_single_loop(loop, custom_params)
-                                
-                                break
-                        
-                        break
-                break
+        index = self.data_manager.index(data)
+        room = index.room(floor_id, manifold_id, room_id)
+        if room is not None:
+            # Ažuriraj ime prostorije
+            room[param_name] = value
+            
+            # Ažuriraj i odgovarajuću petlju
+            loop = index.loop(floor_id, manifold_id, room_id)
+            if loop is not None:
+                loop["room_name"] = value
+                
+                # Automatski postavi preporučenu temperaturu
+                default_temp = get_room_temperature_for_name(value)
+                loop["room_temperature"] = default_temp
+                
+                # Izračunaj petlju s novim imenom prostorije ako je potpuna
+                has_area = "area" in loop and loop["area"] is not None and loop["area"] > 0
+                has_manifold_distance = "manifold_distance" in loop and loop["manifold_distance"] is not None
+                has_pipe_spacing = "pipe_spacing" in loop and loop["pipe_spacing"] is not None
+                
+                if has_area and has_manifold_distance and has_pipe_spacing:
+                    # Izračunaj petlju
+                    floor = index.floor(floor_id)
+                    manifold = index.manifold(floor_id, manifold_id)
+                    custom_params = data["common_params"].copy()
+                    custom_params["screed_thickness"] = floor.get("screed_thickness", 45)
+                    custom_params["flow_temperature"] = manifold.get("flow_temperature", 35)
+                    custom_params["delta_t"] = manifold.get("delta_t", 5)
+                    custom_params["pipe_diameter"] = manifold.get("pipe_diameter", "16x2,0")
+                    self._calculate_single_loop(loop, custom_params)
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -370,20 +513,20 @@ class FloorHeatingCalc(BaseCalculation):
     def _auto_calculate_loop_if_possible_with_manifold(self, loop_id, data, floor, manifold):
         """Automatski izračunava petlju ako su svi potrebni parametri uneseni (za petlje iz razdjelnika)."""
         # Pronađi petlju u razdjelniku
-        for loop in manifold.get("loops", []):
-            if loop.get("id") == loop_id:
-                # Provjeri jesu li svi parametri uneseni
-                has_area = "area" in loop and loop["area"] is not None and loop["area"] > 0
-                has_manifold_distance = "manifold_distance" in loop and loop["manifold_distance"] is not None
-                has_pipe_spacing = "pipe_spacing" in loop and loop["pipe_spacing"] is not None
-                
-                # Ako su svi potrebni parametri uneseni, izračunaj petlju
-                if has_area and has_manifold_distance and has_pipe_spacing:
-                    # Kreiraj prilagođene parametre za ovu petlju
-                    custom_params = self.data_manager.get_custom_params_for_loop(loop, floor, manifold)
-                    self._calculate_single_loop(loop, custom_params)
-                
-                break
+        loop = self.data_manager.index(data).loop(floor.get("id"), manifold.get("id"), loop_id)
+        if loop is None:
+            return
+        
+        # Provjeri jesu li svi parametri uneseni
+        has_area = "area" in loop and loop["area"] is not None and loop["area"] > 0
+        has_manifold_distance = "manifold_distance" in loop and loop["manifold_distance"] is not None
+        has_pipe_spacing = "pipe_spacing" in loop and loop["pipe_spacing"] is not None
+        
+        # Ako su svi potrebni parametri uneseni, izračunaj petlju
+        if has_area and has_manifold_distance and has_pipe_spacing:
+            # Kreiraj prilagođene parametre za ovu petlju
+            custom_params = self.data_manager.get_custom_params_for_loop(loop, floor, manifold)
+            self._calculate_single_loop(loop, custom_params)
     
     def _on_loop_param_change_with_manifold(self, loop_id, param_name, data, floor, manifold):
         """Handler za promjenu parametra petlje za petlje iz razdjelnika."""
@@ -405,13 +548,12 @@ class FloorHeatingCalc(BaseCalculation):
             value = st.session_state[param_key]
         
         # Ažuriraj podatke petlje
-        for loop in manifold.get("loops", []):
-            if loop.get("id") == loop_id:
-                loop[param_name] = value
-                
-                # Automatski izračunaj ako su svi potrebni parametri uneseni
-                self._auto_calculate_loop_if_possible_with_manifold(loop_id, data, floor, manifold)
-                break
+        loop = self.data_manager.index(data).loop(floor.get("id"), manifold.get("id"), loop_id)
+        if loop is not None:
+            loop[param_name] = value
+            
+            # Automatski izračunaj ako su svi potrebni parametri uneseni
+            self._auto_calculate_loop_if_possible_with_manifold(loop_id, data, floor, manifold)
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -441,14 +583,13 @@ class FloorHeatingCalc(BaseCalculation):
         covering_name = FLOOR_COVERINGS[covering_index]["name"]
         
         # Ažuriraj podatke petlje
-        for loop in manifold.get("loops", []):
-            if loop.get("id") == loop_id:
-                loop["r_lambda"] = r_lambda
-                loop["floor_covering_name"] = covering_name
-                
-                # Izračunaj petlju
-                self._auto_calculate_loop_if_possible_with_manifold(loop_id, data, floor, manifold)
-                break
+        loop = self.data_manager.index(data).loop(floor.get("id"), manifold.get("id"), loop_id)
+        if loop is not None:
+            loop["r_lambda"] = r_lambda
+            loop["floor_covering_name"] = covering_name
+            
+            # Izračunaj petlju
+            self._auto_calculate_loop_if_possible_with_manifold(loop_id, data, floor, manifold)
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -461,25 +602,56 @@ class FloorHeatingCalc(BaseCalculation):
     def _on_flow_adjustment_with_manifold(self, loop_id, adjustment, data, floor, manifold):
         """Handler za podešavanje protoka za petlje iz razdjelnika."""
         # Pronađi petlju
+        loop = self.data_manager.index(data).loop(floor.get("id"), manifold.get("id"), loop_id)
+        if loop is not None:
+            # Kreiraj prilagođene parametre za ovu petlju
+            custom_params = self.data_manager.get_custom_params_for_loop(loop, floor, manifold)
+            
+            # Podešavanje protoka
+            adjusted_results = FlowAdjuster.adjust_flow_by_percentage(
+                loop, custom_params, adjustment
+            )
+            
+            # Spremi podešene rezultate
+            if adjusted_results:
+                loop["adjusted_results"] = adjusted_results
+                # Zapamti postotak podešavanja
+                st.session_state.floor_heating_flow_adjustments[loop_id] = adjustment
+            else:
+                st.warning("Nije moguće podesiti protok za zadani postotak.")
+        
+        # Označi da ima promjena
+        self.mark_as_changed()
+    
+    def _on_manifold_flow_adjustment(self, floor, manifold, data):
+        """Handler za podešavanje protoka svih petlji razdjelnika odjednom."""
+        adjustment = st.session_state[f"manifold_flow_adjustment_{floor['id']}_{manifold['id']}"]
+        custom_params = self.data_manager.get_custom_params_for_loop(None, floor, manifold)
+        
+        # Sve petlje razdjelnika podešavaju se u jednom pozivu
+        adjusted = FlowAdjuster.adjust_manifold(manifold, custom_params, percentage=adjustment)
         for loop in manifold.get("loops", []):
-            if loop.get("id") == loop_id:
-                # Kreiraj prilagođene parametre za ovu petlju
-                custom_params = self.data_manager.get_custom_params_for_loop(loop, floor, manifold)
-                
-                # Podešavanje protoka
-                adjusted_results = FlowAdjuster.adjust_flow_by_percentage(
-                    loop, custom_params, adjustment
-                )
-                
-                # Spremi podešene rezultate
-                if adjusted_results:
-                    loop["adjusted_results"] = adjusted_results
-                    # Zapamti postotak podešavanja
-                    st.session_state.floor_heating_flow_adjustments[loop_id] = adjustment
-                else:
-                    st.warning("Nije moguće podesiti protok za zadani postotak.")
-                
-                break
+            loop_id = loop.get("id")
+            if loop_id not in adjusted:
+                continue
+            loop["adjusted_results"] = adjusted[loop_id]
+            st.session_state.floor_heating_flow_adjustments[loop_id] = adjustment
+            st.session_state.pop(f"flow_adjustment_{loop_id}", None)
+        
+        if len(adjusted) < len(manifold.get("loops", [])):
+            st.warning("Protok nije podešen za petlje bez izračunatih rezultata.")
+        
+        # Označi da ima promjena
+        self.mark_as_changed()
+    
+    def _on_position_change(self, item, key_suffix, data):
+        """Handler za promjenu tlocrtnog položaja razdjelnika ili petlje."""
+        x = st.session_state.get(f"position_x_{key_suffix}")
+        y = st.session_state.get(f"position_y_{key_suffix}")
+        if x is None or y is None:
+            item.pop("position", None)
+        else:
+            item["position"] = [x, y]
         
         # Označi da ima promjena
         self.mark_as_changed()
@@ -501,59 +673,51 @@ class FloorHeatingCalc(BaseCalculation):
         if not selected_room_type:
             return
         
-        # Traži etažu i razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        # Ažuriraj prostoriju
-                        for room in manifold.get("rooms", []):
-                            if room.get("id") == room_id:
-                                # Postavi naziv prostorije
-                                room["name"] = selected_room_type
-                                
-                                # Također ažuriraj odgovarajuću petlju
-                                for loop in manifold.get("loops", []):
-                                    if loop.get("id") == room_id:
-                                        # Postavi naziv prostorije
-                                        loop["room_name"] = selected_room_type
-                                        
-                                        # Postavi preporučenu temperaturu prema tipu prostorije
-                                        recommended_temp = self.data_manager.get_room_temperature_for_name(selected_room_type)
-                                        loop["room_temperature"] = recommended_temp
-                                        
-                                        # Postavi preporučeni razmak cijevi prema temperaturi
-                                        if recommended_temp >= 24:  # Za kupaonicu i slične (viša temperatura)
-                                            recommended_spacing = 10
-                                        elif recommended_temp >= 22:  # Za dnevni boravak i sl.
-                                            recommended_spacing = 15
-                                        else:  # Za ostale prostorije
-                                            recommended_spacing = 20
-                                        loop["pipe_spacing"] = recommended_spacing
-                                        
-                                        # Postavi preporučenu podnu oblogu
-                                        # Kupaonica obično ima keramičke pločice, dnevni boravak drvo, ostalo prema namjeni
-                                        if "Kupao" in selected_room_type:
-                                            # Keramičke pločice (prva opcija)
-                                            loop["r_lambda"] = 0.00
-                                            loop["floor_covering_name"] = "Keramička obloga"
-                                        elif "Dnevni" in selected_room_type or "Spava" in selected_room_type:
-                                            # Drvena podloga (zadnja opcija)
-                                            loop["r_lambda"] = 0.15
-                                            loop["floor_covering_name"] = "Drvena obloga"
-                                        else:
-                                            # Plastična obloga (druga opcija)
-                                            loop["r_lambda"] = 0.05
-                                            loop["floor_covering_name"] = "Plastična obloga (tanka)"
-                                        
-                                        # Automatski izračunaj petlju ako su svi potrebni parametri uneseni
-                                        self._auto_calculate_loop_if_possible_with_manifold(room_id, data, floor, manifold)
-                                        break
-                                
-                                break
-                        
-                        break
-                break
+        # Pronađi prostoriju i odgovarajuću petlju
+        index = self.data_manager.index(data)
+        floor = index.floor(floor_id)
+        manifold = index.manifold(floor_id, manifold_id)
+        room = index.room(floor_id, manifold_id, room_id)
+        if room is not None:
+            # Postavi naziv prostorije
+            room["name"] = selected_room_type
+            
+            # Također ažuriraj odgovarajuću petlju
+            loop = index.loop(floor_id, manifold_id, room_id)
+            if loop is not None:
+                # Postavi naziv prostorije
+                loop["room_name"] = selected_room_type
+
+                # Postavi preporučenu temperaturu prema tipu prostorije
+                recommended_temp = self.data_manager.get_room_temperature_for_name(selected_room_type)
+                loop["room_temperature"] = recommended_temp
+
+                # Postavi preporučeni razmak cijevi prema temperaturi
+                if recommended_temp >= 24:  # Za kupaonicu i slične (viša temperatura)
+                    recommended_spacing = 10
+                elif recommended_temp >= 22:  # Za dnevni boravak i sl.
+                    recommended_spacing = 15
+                else:  # Za ostale prostorije
+                    recommended_spacing = 20
+                loop["pipe_spacing"] = recommended_spacing
+
+                # Postavi preporučenu podnu oblogu
+                # Kupaonica obično ima keramičke pločice, dnevni boravak drvo, ostalo prema namjeni
+                if "Kupao" in selected_room_type:
+                    # Keramičke pločice (prva opcija)
+                    loop["r_lambda"] = 0.00
+                    loop["floor_covering_name"] = "Keramička obloga"
+                elif "Dnevni" in selected_room_type or "Spava" in selected_room_type:
+                    # Drvena podloga (zadnja opcija)
+                    loop["r_lambda"] = 0.15
+                    loop["floor_covering_name"] = "Drvena obloga"
+                else:
+                    # Plastična obloga (druga opcija)
+                    loop["r_lambda"] = 0.05
+                    loop["floor_covering_name"] = "Plastična obloga (tanka)"
+
+                # Automatski izračunaj petlju ako su svi potrebni parametri uneseni
+                self._auto_calculate_loop_if_possible_with_manifold(room_id, data, floor, manifold)
         
         # Označi da ima promjena
         self.mark_as_changed()
\ No newline at end of file
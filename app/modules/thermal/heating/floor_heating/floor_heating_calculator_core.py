@@ -1,7 +1,8 @@
 import streamlit as st
 import math
 from modules.thermal.heating.floor_heating.constants import *
-from modules.thermal.heating.floor_heating.kh_values import KH_VALUES
+from modules.thermal.heating.floor_heating.kh_interpolation import interpolate_kh
+from utils.hydraulics import reynolds_number, colebrook_friction_factor, darcy_weisbach_pressure_drop
 from modules.thermal.heating.floor_heating.utils import *
 
 class FloorHeatingCalculatorCore:
@@ -12,39 +13,11 @@ class FloorHeatingCalculatorCore:
         pass
     
     def get_kh_value(self, pipe_diameter, r_lambda, pipe_spacing, screed_thickness):
-        """Retrieves KH value from tables."""
+        """Retrieves KH value from tables, interpolated between table points."""
         try:
-            # KH values are organized by pipe diameter, r_lambda, spacing and screed thickness
-            
-            # Check if exact value exists
-            if (pipe_diameter in KH_VALUES and 
-                r_lambda in KH_VALUES[pipe_diameter] and 
-                pipe_spacing in KH_VALUES[pipe_diameter][r_lambda] and 
-                screed_thickness in KH_VALUES[pipe_diameter][r_lambda][pipe_spacing]):
-                
-                return KH_VALUES[pipe_diameter][r_lambda][pipe_spacing][screed_thickness]
-            
-            # If exact value doesn't exist, find closest
-            
-            # Find closest pipe diameter
-            if pipe_diameter not in KH_VALUES:
-                available_diameters = list(KH_VALUES.keys())
-                pipe_diameter = available_diameters[0]  # Fallback to first available
-            
-            # Find closest r_lambda
-            available_r_lambdas = list(KH_VALUES[pipe_diameter].keys())
-            nearest_r_lambda = min(available_r_lambdas, key=lambda x: abs(x - r_lambda))
-            
-            # Find closest pipe spacing
-            available_spacings = list(KH_VALUES[pipe_diameter][nearest_r_lambda].keys())
-            nearest_spacing = min(available_spacings, key=lambda x: abs(x - pipe_spacing))
-            
-            # Find closest screed thickness
-            available_thicknesses = list(KH_VALUES[pipe_diameter][nearest_r_lambda][nearest_spacing].keys())
-            nearest_thickness = min(available_thicknesses, key=lambda x: abs(x - screed_thickness))
-            
-            # Get KH value
-            return KH_VALUES[pipe_diameter][nearest_r_lambda][nearest_spacing][nearest_thickness]
+            # Exact table points return the table value, values in between are interpolated
+            # trilinearly and values outside the table use the nearest edge of the table
+            return interpolate_kh(pipe_diameter, r_lambda, pipe_spacing, screed_thickness)
             
         except Exception as e:
             st.error(f"Problem retrieving KH value: {str(e)}")
@@ -95,32 +68,15 @@ class FloorHeatingCalculatorCore:
                 }
             
             # Calculate Reynolds number
-            reynolds = (water_density * water_velocity * inner_diameter) / water_viscosity if water_viscosity > 0 else 0
+            reynolds = reynolds_number(water_density, water_velocity, inner_diameter, water_viscosity)
             
-            # Calculate friction factor (Colebrook-White equation)
-            # Use iterative method
-            friction_factor = 0.02  # Initial guess
-            
-            if reynolds > 0:
-                for _ in range(20):
-                    try:
-                        # Colebrook-White equation for friction factor
-                        cw_term = -2 * math.log10(
-                            (pipe_roughness / (3.7 * inner_diameter)) + 
-                            (2.51 / (reynolds * math.sqrt(friction_factor)))
-                        )
-                        new_factor = 1 / (cw_term ** 2)
-                        
-                        # Check convergence
-                        if abs(friction_factor - new_factor) < 1e-6:
-                            break
-                            
-                        friction_factor = new_factor
-                    except (ValueError, ZeroDivisionError):
-                        break
+            # Calculate friction factor (Colebrook-White equation, explicit approximation)
+            friction_factor = colebrook_friction_factor(reynolds, pipe_roughness / inner_diameter)
             
             # Calculate linear pressure drop (Darcy-Weisbach equation)
-            pressure_drop_linear = friction_factor * (pipe_length / inner_diameter) * (water_density * water_velocity ** 2) / 2
+            pressure_drop_linear = darcy_weisbach_pressure_drop(
+                friction_factor, pipe_length, inner_diameter, water_density, water_velocity
+            )
             
             # Estimate local losses
             k_inlet = 0.5  # Loss coefficient for loop inlet
@@ -2,6 +2,8 @@ import streamlit as st
 from datetime import datetime
 from modules.thermal.heating.floor_heating.constants import *
 from modules.thermal.heating.floor_heating.utils import *
+from modules.thermal.heating.floor_heating.floor_heating_index import FloorHeatingIndex
+from modules.thermal.heating.floor_heating.heat_loss_sync import source_rooms, apply_room, linked_loops
 
 
 class FloorHeatingDataManager:
@@ -10,6 +12,13 @@ class FloorHeatingDataManager:
     def __init__(self, calculation_handler):
         """Inicijalizacija upravitelja podataka s handlerom za kalkulacije."""
         self.calculation_handler = calculation_handler
+        self._index = None
+    
+    def index(self, data):
+        """Vraća indeks po ID-u za strukturu podataka (novi indeks ako su podaci zamijenjeni)."""
+        if self._index is None or self._index.data is not data:
+            self._index = FloorHeatingIndex(data)
+        return self._index
     
     def initialize_data_structure(self):
         """Inicijalizira strukturu podataka za proračun podnog grijanja."""
@@ -36,7 +45,7 @@ class FloorHeatingDataManager:
                                 "pipe_diameter": "16×2,0",
                                 "supply_pipe_length": 5.0,
                                 "return_pipe_length": 5.0,
-                                "supply_pipe_diameter": "20×2,0",
+                                "supply_pipe_diameter": DEFAULT_CONNECTION_PIPE_DIAMETER,
                                 "num_circuits": 2,  # Promijenjeno s 4 na 2 kruga
                                 "rooms": [
                                     {
@@ -120,7 +129,7 @@ class FloorHeatingDataManager:
                     "pipe_diameter": data["common_params"].get("pipe_diameter", "16×2,0"),
                     "supply_pipe_length": 5.0,
                     "return_pipe_length": 5.0,
-                    "supply_pipe_diameter": "20×2,0",
+                    "supply_pipe_diameter": DEFAULT_CONNECTION_PIPE_DIAMETER,
                     "num_circuits": 4,
                     "rooms": [],
                     "loops": []
@@ -150,8 +159,15 @@ class FloorHeatingDataManager:
                 # Zadrži stare podatke za kompatibilnost
                 # data["loops"] = []
             
+            self.index(data).invalidate()
             st.success("Migracija podataka uspješno završena!")
-            
+
+        # Raniji zadani promjer spojnih cijevi ("20×2,0") nije postojao među spojnim cijevima
+        for floor in data.get("building", {}).get("floors", []):
+            for manifold in floor.get("manifolds", []):
+                if manifold.get("supply_pipe_diameter") == "20×2,0":
+                    manifold["supply_pipe_diameter"] = DEFAULT_CONNECTION_PIPE_DIAMETER
+
         # Ažuriraj common_params prema prvom razdjelniku za kompatibilnost sa starim kodom
         if "building" in data and data["building"]["floors"]:
             first_floor = data["building"]["floors"][0]
@@ -164,12 +180,10 @@ class FloorHeatingDataManager:
     
     def add_floor(self, data):
         """Dodaje novu etažu u zgradu."""
-        floors = data["building"]["floors"]
+        index = self.index(data)
         
         # Generiraj novi ID
-        new_id = 1
-        if floors:
-            new_id = max(floor.get("id", 0) for floor in floors) + 1
+        new_id = index.new_floor_id()
         
         # Kreiraj novu etažu
         new_floor = {
@@ -184,7 +198,7 @@ class FloorHeatingDataManager:
                 "pipe_diameter": "16×2,0",
                 "supply_pipe_length": 5.0,
                 "return_pipe_length": 5.0,
-                "supply_pipe_diameter": "20×2,3",
+                "supply_pipe_diameter": DEFAULT_CONNECTION_PIPE_DIAMETER,
                 "num_circuits": 2,  # Defaultno 2 kruga
                 "rooms": [],
                 "loops": []
@@ -192,7 +206,7 @@ class FloorHeatingDataManager:
         }
         
         # Dodaj etažu u podatke
-        floors.append(new_floor)
+        index.add_floor(new_floor)
         
         # Označi da ima promjena
         self.calculation_handler.mark_as_changed()
@@ -206,51 +220,40 @@ class FloorHeatingDataManager:
     
     def delete_floor(self, floor_id, data):
         """Briše etažu po ID-u."""
-        floors = data["building"]["floors"]
-        
-        # Pronađi indeks etaže
-        floor_index = None
-        for i, floor in enumerate(floors):
-            if floor.get("id") == floor_id:
-                floor_index = i
-                break
+        if not self.index(data).remove_floor(floor_id):
+            return False
         
-        # Ukloni etažu ako je pronađena
-        if floor_index is not None:
-            floors.pop(floor_index)
-            self.calculation_handler.mark_as_changed()
-            return True
-        
-        return False
+        self.calculation_handler.mark_as_changed()
+        return True
     
-    def add_manifold(self, floor, data):
-        """Dodaje novi razdjelnik na etažu."""
-        manifolds = floor.get("manifolds", [])
-        if "manifolds" not in floor:
-            floor["manifolds"] = manifolds
-        
-        # Generiraj novi ID
-        new_id = 1
-        if manifolds:
-            new_id = max(manifold.get("id", 0) for manifold in manifolds) + 1
-        
-        # Kreiraj novi razdjelnik
-        new_manifold = {
-            "id": new_id,
-            "name": f"Razdjelnik {new_id}",
+    def new_manifold(self, manifold_id):
+        """Vraća novi razdjelnik sa zadanim parametrima (bez prostorija)."""
+        return {
+            "id": manifold_id,
+            "name": f"Razdjelnik {manifold_id}",
             "flow_temperature": 35,
             "ΔT": 5,
             "pipe_diameter": "16×2,0",
             "supply_pipe_length": 5.0,
             "return_pipe_length": 5.0,
-            "supply_pipe_diameter": "20×2,0",
+            "supply_pipe_diameter": DEFAULT_CONNECTION_PIPE_DIAMETER,
             "num_circuits": 2,  # Promijenjeno s 4 na 2 kruga
             "rooms": [],
             "loops": []
         }
+    
+    def add_manifold(self, floor, data):
+        """Dodaje novi razdjelnik na etažu."""
+        index = self.index(data)
+        
+        # Generiraj novi ID
+        new_id = index.new_manifold_id(floor.get("id"))
+        
+        # Kreiraj novi razdjelnik
+        new_manifold = self.new_manifold(new_id)
         
         # Dodaj razdjelnik na etažu
-        manifolds.append(new_manifold)
+        index.add_manifold(floor.get("id"), new_manifold)
         
         # Označi da ima promjena
         self.calculation_handler.mark_as_changed()
@@ -264,273 +267,205 @@ class FloorHeatingDataManager:
     
     def delete_manifold(self, floor_id, manifold_id, data):
         """Briše razdjelnik po ID-u."""
-        # Pronađi etažu
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                # Pronađi indeks razdjelnika
-                manifold_index = None
-                for i, manifold in enumerate(floor.get("manifolds", [])):
-                    if manifold.get("id") == manifold_id:
-                        manifold_index = i
-                        break
-                
-                # Ukloni razdjelnik ako je pronađen
-                if manifold_index is not None:
-                    floor["manifolds"].pop(manifold_index)
-                    self.calculation_handler.mark_as_changed()
-                    return True
-                
-                break
+        if not self.index(data).remove_manifold(floor_id, manifold_id):
+            return False
         
-        return False
+        self.calculation_handler.mark_as_changed()
+        return True
     
     def add_room_to_manifold(self, floor_id, manifold_id, data):
         """Dodaje novu prostoriju na razdjelnik."""
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        rooms = manifold.get("rooms", [])
-                        if "rooms" not in manifold:
-                            manifold["rooms"] = rooms
-                        
-                        # Provjeri ograničenje broja prostorija
-                        num_circuits = manifold.get("num_circuits", 4)
-                        if len(rooms) >= num_circuits:
-                            st.warning(f"Nije moguće dodati više prostorija. Razdjelnik ima {num_circuits} krugova.")
-                            return None
-                        
-                        # Generiraj novi ID
-                        new_id = 1
-                        if rooms:
-                            new_id = max(room.get("id", 0) for room in rooms) + 1
-                        
-                        # Odredi poziciju nove prostorije (dodaj na kraj)
-                        new_position = 1
-                        if rooms:
-                            new_position = max(room.get("position", 0) for room in rooms) + 1
-                        
-                        # Dohvati prvu prostoriju s popisa (po defaultu "Blagovaonica")
-                        first_room_type = "Blagovaonica"
-                        if len(ROOM_TYPES) > 0 and 22 in ROOM_TYPES and len(ROOM_TYPES[22]) > 0:
-                            # Ako postoje definirani tipovi prostorija, pronađi "Blagovaonicu" ili uzmi drugu po redu
-                            if "Blagovaonica" in ROOM_TYPES[22]:
-                                first_room_type = "Blagovaonica"
-                            elif len(ROOM_TYPES[22]) > 1:
-                                first_room_type = ROOM_TYPES[22][1]  # Uzmi drugu prostoriju s popisa
-                            else:
-                                first_room_type = ROOM_TYPES[22][0]  # Ako nema druge, uzmi prvu
-                        
-                        # Kreiraj novu prostoriju
-                        new_room = {
-                            "id": new_id,
-                            "name": first_room_type,  # Uvijek prva prostorija s popisa
-                            "position": new_position
-                        }
-                        
-                        # Dodaj prostoriju na razdjelnik
-                        rooms.append(new_room)
-                        
-                        # Dodaj i odgovarajuću petlju
-                        loops = manifold.get("loops", [])
-                        if "loops" not in manifold:
-                            manifold["loops"] = loops
-                        
-                        # Dohvat preporučene temperature prema tipu prostorije
-                        room_temp = get_room_temperature_for_name(first_room_type)
-                        
-                        # Odabir preporučenog razmaka cijevi prema tipu prostorije
-                        pipe_spacing = 15  # Default
-                        if room_temp >= 24:  # Za kupaonicu i slične (viša temperatura)
-                            pipe_spacing = 10
-                        elif room_temp >= 22:  # Za dnevni boravak i sl.
-                            pipe_spacing = 15
-                        else:  # Za ostale prostorije
-                            pipe_spacing = 20
+        index = self.index(data)
+        manifold = index.manifold(floor_id, manifold_id)
+        if manifold is None:
+            return None
+        
+        rooms = manifold.setdefault("rooms", [])
+        
+        # Provjeri ograničenje broja prostorija
+        num_circuits = manifold.get("num_circuits", 4)
+        if len(rooms) >= num_circuits:
+            st.warning(f"Nije moguće dodati više prostorija. Razdjelnik ima {num_circuits} krugova.")
+            return None
+        
+        # Generiraj novi ID (jedinstven u zgradi)
+        new_id = index.new_loop_id()
+        
+        # Odredi poziciju nove prostorije (dodaj na kraj)
+        new_position = 1
+        if rooms:
+            new_position = max(room.get("position", 0) for room in rooms) + 1
+        
+        # Dohvati prvu prostoriju s popisa (po defaultu "Blagovaonica")
+        first_room_type = "Blagovaonica"
+        if len(ROOM_TYPES) > 0 and 22 in ROOM_TYPES and len(ROOM_TYPES[22]) > 0:
+            # Ako postoje definirani tipovi prostorija, pronađi "Blagovaonicu" ili uzmi drugu po redu
+            if "Blagovaonica" in ROOM_TYPES[22]:
+                first_room_type = "Blagovaonica"
+            elif len(ROOM_TYPES[22]) > 1:
+                first_room_type = ROOM_TYPES[22][1]  # Uzmi drugu prostoriju s popisa
+            else:
+                first_room_type = ROOM_TYPES[22][0]  # Ako nema druge, uzmi prvu
+        
+        # Kreiraj novu prostoriju
+        new_room = {
+            "id": new_id,
+            "name": first_room_type,  # Uvijek prva prostorija s popisa
+            "position": new_position
+        }
+        
+        # Dohvat preporučene temperature prema tipu prostorije
+        room_temp = get_room_temperature_for_name(first_room_type)
+        
+        # Odabir preporučenog razmaka cijevi prema tipu prostorije
+        pipe_spacing = 15  # Default
+        if room_temp >= 24:  # Za kupaonicu i slične (viša temperatura)
+            pipe_spacing = 10
+        elif room_temp >= 22:  # Za dnevni boravak i sl.
+            pipe_spacing = 15
+        else:  # Za ostale prostorije
+            pipe_spacing = 20
 
-                        # Odabir preporučene podne obloge prema tipu prostorije
-                        r_lambda = 0.00  # Default - keramička obloga
-                        floor_covering_name = "Keramička obloga"
-                        
-                        if "Kupao" in first_room_type:
-                            # Keramičke pločice (prva opcija)
-                            r_lambda = 0.00
-                            floor_covering_name = "Keramička obloga"
-                        elif "Dnevni" in first_room_type or "Spava" in first_room_type:
-                            # Drvena podloga (zadnja opcija)
-                            r_lambda = 0.15
-                            floor_covering_name = "Drvena obloga"
-                        else:
-                            # Plastična obloga (druga opcija)
-                            r_lambda = 0.05
-                            floor_covering_name = "Plastična obloga (tanka)"
-                        
-                        # Kreiraj novu petlju
-                        new_loop = {
-                            "id": new_id,
-                            "room_name": new_room["name"],
-                            "room_temperature": room_temp,
-                            "r_lambda": r_lambda,
-                            "floor_covering_name": floor_covering_name,
-                            "pipe_spacing": pipe_spacing,
-                            "area": None,
-                            "manifold_distance": None,
-                            "results": {}
-                        }
-                        
-                        # Dodaj petlju u razdjelnik
-                        loops.append(new_loop)
-                        
-                        # Označi da ima promjena
-                        self.calculation_handler.mark_as_changed()
-                        
-                        return new_room, new_loop
-                        
-                        break
-                break
+        # Odabir preporučene podne obloge prema tipu prostorije
+        r_lambda = 0.00  # Default - keramička obloga
+        floor_covering_name = "Keramička obloga"
         
-        return None
+        if "Kupao" in first_room_type:
+            # Keramičke pločice (prva opcija)
+            r_lambda = 0.00
+            floor_covering_name = "Keramička obloga"
+        elif "Dnevni" in first_room_type or "Spava" in first_room_type:
+            # Drvena podloga (zadnja opcija)
+            r_lambda = 0.15
+            floor_covering_name = "Drvena obloga"
+        else:
+            # Plastična obloga (druga opcija)
+            r_lambda = 0.05
+            floor_covering_name = "Plastična obloga (tanka)"
+        
+        # Kreiraj novu petlju
+        new_loop = {
+            "id": new_id,
+            "room_name": new_room["name"],
+            "room_temperature": room_temp,
+            "r_lambda": r_lambda,
+            "floor_covering_name": floor_covering_name,
+            "pipe_spacing": pipe_spacing,
+            "area": None,
+            "manifold_distance": None,
+            "results": {}
+        }
+        
+        # Dodaj prostoriju i petlju na razdjelnik
+        index.add_room(floor_id, manifold_id, new_room, new_loop)
+        
+        # Označi da ima promjena
+        self.calculation_handler.mark_as_changed()
+        
+        return new_room, new_loop
     
     def update_room_numbers(self, floor_id, manifold_id, data):
         """Ažurira brojeve prostorija prema stvarnoj poziciji na listi."""
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        rooms = manifold.get("rooms", [])
-                        
-                        # Sortiraj prostorije prema poziciji
-                        sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
-                        
-                        # Ažuriraj brojeve prostorija prema njihovoj stvarnoj poziciji
-                        for i, room in enumerate(sorted_rooms):
-                            # Označava broj prostorije kao poziciju + 1 (da počnu od 1, a ne od 0)
-                            room_position = i + 1
-                            room["position"] = room_position
-                        
-                        # Označi da ima promjena
-                        self.calculation_handler.mark_as_changed()
-                        return True
-                        
-                break
+        manifold = self.index(data).manifold(floor_id, manifold_id)
+        if manifold is None:
+            return False
         
-        return False
+        rooms = manifold.get("rooms", [])
+        
+        # Sortiraj prostorije prema poziciji
+        sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
+        
+        # Ažuriraj brojeve prostorija prema njihovoj stvarnoj poziciji
+        for i, room in enumerate(sorted_rooms):
+            # Označava broj prostorije kao poziciju + 1 (da počnu od 1, a ne od 0)
+            room_position = i + 1
+            room["position"] = room_position
+        
+        # Označi da ima promjena
+        self.calculation_handler.mark_as_changed()
+        return True
     
     def delete_room_from_manifold(self, floor_id, manifold_id, room_id, data):
-        """Briše prostoriju s razdjelnika."""
-        # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        # Pronađi indeks prostorije
-                        room_index = None
-                        for i, room in enumerate(manifold.get("rooms", [])):
-                            if room.get("id") == room_id:
-                                room_index = i
-                                break
-                        
-                        # Ukloni prostoriju ako je pronađena
-                        if room_index is not None:
-                            manifold["rooms"].pop(room_index)
-                            
-                            # Pronađi i ukloni odgovarajuću petlju
-                            loop_index = None
-                            for i, loop in enumerate(manifold.get("loops", [])):
-                                if loop.get("id") == room_id:
-                                    loop_index = i
-                                    break
-                            
-                            if loop_index is not None:
-                                manifold["loops"].pop(loop_index)
-                            
-                            # Označi da ima promjena
-                            self.calculation_handler.mark_as_changed()
-                            return True
-                        
-                        break
-                break
+        """Briše prostoriju i odgovarajuću petlju s razdjelnika."""
+        if not self.index(data).remove_room(floor_id, manifold_id, room_id):
+            return False
         
-        return False
+        # Označi da ima promjena
+        self.calculation_handler.mark_as_changed()
+        return True
     
     def move_room_up(self, floor_id, manifold_id, room_id, data):
         """Pomiče prostoriju jedno mjesto gore (prema manjem indeksu)."""
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        rooms = manifold.get("rooms", [])
-                        
-                        # Sortiraj prostorije prema poziciji
-                        sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
-                        
-                        # Pronađi prostoriju i njezin prethodnik
-                        current_room = None
-                        prev_room = None
-                        for i, room in enumerate(sorted_rooms):
-                            if room.get("id") == room_id:
-                                if i > 0:  # Nije prva prostorija
-                                    current_room = room
-                                    prev_room = sorted_rooms[i-1]
-                                break
-                        
-                        # Zamijeni pozicije ako su pronađene obje prostorije
-                        if current_room and prev_room:
-                            current_pos = current_room.get("position", 0)
-                            prev_pos = prev_room.get("position", 0)
-                            
-                            current_room["position"] = prev_pos
-                            prev_room["position"] = current_pos
-                            
-                            # Označi da ima promjena
-                            self.calculation_handler.mark_as_changed()
-                            return True
-                        
-                        break
+        manifold = self.index(data).manifold(floor_id, manifold_id)
+        if manifold is None:
+            return False
+        
+        rooms = manifold.get("rooms", [])
+        
+        # Sortiraj prostorije prema poziciji
+        sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
+        
+        # Pronađi prostoriju i njezin prethodnik
+        current_room = None
+        prev_room = None
+        for i, room in enumerate(sorted_rooms):
+            if room.get("id") == room_id:
+                if i > 0:  # Nije prva prostorija
+                    current_room = room
+                    prev_room = sorted_rooms[i-1]
                 break
         
+        # Zamijeni pozicije ako su pronađene obje prostorije
+        if current_room and prev_room:
+            current_pos = current_room.get("position", 0)
+            prev_pos = prev_room.get("position", 0)
+            
+            current_room["position"] = prev_pos
+            prev_room["position"] = current_pos
+            
+            # Označi da ima promjena
+            self.calculation_handler.mark_as_changed()
+            return True
+        
         return False
     
     def move_room_down(self, floor_id, manifold_id, room_id, data):
         """Pomiče prostoriju jedno mjesto dolje (prema većem indeksu)."""
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        rooms = manifold.get("rooms", [])
-                        
-                        # Sortiraj prostorije prema poziciji
-                        sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
-                        
-                        # Pronađi prostoriju i njezin sljedbenik
-                        current_room = None
-                        next_room = None
-                        for i, room in enumerate(sorted_rooms):
-                            if room.get("id") == room_id:
-                                if i < len(sorted_rooms) - 1:  # Nije zadnja prostorija
-                                    current_room = room
-                                    next_room = sorted_rooms[i+1]
-                                break
-                        
-                        # Zamijeni pozicije ako su pronađene obje prostorije
-                        if current_room and next_room:
-                            current_pos = current_room.get("position", 0)
-                            next_pos = next_room.get("position", 0)
-                            
-                            current_room["position"] = next_pos
-                            next_room["position"] = current_pos
-                            
-                            # Označi da ima promjena
-                            self.calculation_handler.mark_as_changed()
-                            return True
-                        
-                        break
+        manifold = self.index(data).manifold(floor_id, manifold_id)
+        if manifold is None:
+            return False
+        
+        rooms = manifold.get("rooms", [])
+        
+        # Sortiraj prostorije prema poziciji
+        sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
+        
+        # Pronađi prostoriju i njezin sljedbenik
+        current_room = None
+        next_room = None
+        for i, room in enumerate(sorted_rooms):
+            if room.get("id") == room_id:
+                if i < len(sorted_rooms) - 1:  # Nije zadnja prostorija
+                    current_room = room
+                    next_room = sorted_rooms[i+1]
                 break
         
+        # Zamijeni pozicije ako su pronađene obje prostorije
+        if current_room and next_room:
+            current_pos = current_room.get("position", 0)
+            next_pos = next_room.get("position", 0)
+            
+            current_room["position"] = next_pos
+            next_room["position"] = current_pos
+            
+            # Označi da ima promjena
+            self.calculation_handler.mark_as_changed()
+            return True
+        
         return False
         
     def get_custom_params_for_loop(self, loop, floor, manifold):
@@ -543,7 +478,20 @@ class FloorHeatingDataManager:
             "delta_t": delta_t_value,  # Dodano za kompatibilnost - ista vrijednost ali drugačiji ključ
             "pipe_diameter": manifold.get("pipe_diameter", "16×2,0")
         }
-        
+
+    def store_loop_results(self, loop, results):
+        """
+        Sprema nove rezultate petlje.
+
+        Podešeni rezultati izračunati su iz prethodnih rezultata, pa se uz promijenjene rezultate
+        brišu zajedno s podešavanjem protoka petlje (balansiranje i pumpa inače koriste zastarjele podatke).
+        """
+        if loop.get("results") != results:
+            loop["adjusted_results"] = {}
+            st.session_state.get("floor_heating_flow_adjustments", {}).pop(loop.get("id"), None)
+            st.session_state.pop(f"flow_adjustment_{loop.get('id')}", None)
+        loop["results"] = results
+
     def get_room_temperature_for_name(self, room_name):
         """Dohvaća preporučenu temperaturu za prostoriju prema imenu."""
         return get_room_temperature_for_name(room_name)
@@ -551,29 +499,138 @@ class FloorHeatingDataManager:
     def sync_rooms_with_circuits(self, floor_id, manifold_id, data):
         """Sinkronizira broj prostorija s brojem krugova razdjelnika."""
         # Pronađi razdjelnik
-        for floor in data["building"]["floors"]:
-            if floor.get("id") == floor_id:
-                for manifold in floor.get("manifolds", []):
-                    if manifold.get("id") == manifold_id:
-                        num_circuits = manifold.get("num_circuits", 4)
-                        rooms = manifold.get("rooms", [])
-                        
-                        # Ako ima previše prostorija, ukloni višak s kraja
-                        if len(rooms) > num_circuits:
-                            # Sortiramo prema poziciji prije uklanjanja
-                            sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
-                            rooms_to_remove = sorted_rooms[num_circuits:]
-                            
-                            for room in rooms_to_remove:
-                                self.delete_room_from_manifold(floor_id, manifold_id, room.get("id"), data)
-                            
-                            # Nakon brisanja prostorija, potrebno je ažurirati brojeve preostalih prostorija
-                            self.update_room_numbers(floor_id, manifold_id, data)
-                        
-                        # Ako ima premalo prostorija, dodaj nove do broja krugova
-                        while len(rooms) < num_circuits:
-                            self.add_room_to_manifold(floor_id, manifold_id, data)
-                        
-                        return True
-        
-        return False
\ No newline at end of file
+        manifold = self.index(data).manifold(floor_id, manifold_id)
+        if manifold is None:
+            return False
+        
+        num_circuits = manifold.get("num_circuits", 4)
+        rooms = manifold.setdefault("rooms", [])
+        
+        # Ako ima previše prostorija, ukloni višak s kraja
+        if len(rooms) > num_circuits:
+            # Sortiramo prema poziciji prije uklanjanja
+            sorted_rooms = sorted(rooms, key=lambda x: x.get("position", 0))
+            rooms_to_remove = sorted_rooms[num_circuits:]
+            
+            for room in rooms_to_remove:
+                self.delete_room_from_manifold(floor_id, manifold_id, room.get("id"), data)
+            
+            # Nakon brisanja prostorija, potrebno je ažurirati brojeve preostalih prostorija
+            self.update_room_numbers(floor_id, manifold_id, data)
+        
+        # Ako ima premalo prostorija, dodaj nove do broja krugova
+        while len(rooms) < num_circuits:
+            self.add_room_to_manifold(floor_id, manifold_id, data)
+        
+        return True
+    
+    def sync_heat_loss(self, data, rezultati):
+        """
+        Preuzima grijane prostorije i njihove toplinske gubitke iz proračuna toplinskih gubitaka.
+        
+        Povezane petlje se ažuriraju samo ako se izvorna prostorija promijenila. Prostorija
+        bez povezane petlje povezuje se s nepovezanom petljom istog naziva na etaži istog
+        naziva, a inače se dodaje na razdjelnik te etaže sa slobodnim priključkom (po
+        potrebi se dodaju etaža i razdjelnik).
+        
+        Args:
+            data: Struktura podataka podnog grijanja
+            rezultati: Rezultati proračuna toplinskih gubitaka
+            
+        Returns:
+            Rječnik s listama dodanih, ažuriranih i nepronađenih (etaža, razdjelnik, petlja)
+            te brojem nepromijenjenih petlji
+        """
+        index = self.index(data)
+        linked = linked_loops(data)
+        report = {"added": [], "updated": [], "unchanged": 0, "missing": []}
+        
+        rooms = source_rooms(rezultati)
+        for room in rooms:
+            key = (room["floor_key"], room["room_id"])
+            is_new = False
+            if key not in linked:
+                floor = self._heat_loss_floor(room, index, data)
+                existing = self._unlinked_loop(floor, room["name"])
+                is_new = existing is None
+                linked[key] = existing or self._add_heat_loss_room(floor, index)
+
+            floor, manifold, loop = linked[key]
+            if not apply_room(loop, room):
+                report["unchanged"] += 1
+                continue
+            
+            # Naziv prostorije na razdjelniku prati naziv petlje
+            manifold_room = index.room(floor["id"], manifold["id"], loop["id"])
+            if manifold_room is not None:
+                manifold_room["name"] = room["name"]
+            report["added" if is_new else "updated"].append((floor, manifold, loop))
+        
+        source_keys = {(room["floor_key"], room["room_id"]) for room in rooms}
+        report["missing"] = [item for key, item in linked.items() if key not in source_keys]
+        
+        if report["added"] or report["updated"]:
+            self.calculation_handler.mark_as_changed()
+        return report
+    
+    def _heat_loss_floor(self, room, index, data):
+        """Pronalazi (ili dodaje) etažu povezanu s etažom proračuna toplinskih gubitaka."""
+        floors = data["building"]["floors"]
+        for floor in floors:
+            if floor.get("heat_loss_floor") == room["floor_key"]:
+                return floor
+        
+        # Postojeća nepovezana etaža istog naziva preuzima vezu
+        for floor in floors:
+            if floor.get("heat_loss_floor") is None and floor.get("name") == room["floor_name"]:
+                floor["heat_loss_floor"] = room["floor_key"]
+                return floor
+        
+        floor_id = index.new_floor_id()
+        floor = {
+            "id": floor_id,
+            "name": room["floor_name"] or f"Etaža {floor_id}",
+            "screed_thickness": 45,
+            "heat_loss_floor": room["floor_key"],
+            "manifolds": []
+        }
+        index.add_floor(floor)
+        return floor
+    
+    def _unlinked_loop(self, floor, room_name):
+        """Vraća (etaža, razdjelnik, petlja) za prvu nepovezanu petlju zadanog naziva na etaži ili None."""
+        for manifold in floor.get("manifolds", []):
+            for loop in manifold.get("loops", []):
+                if loop.get("heat_loss_room_id") is None and loop.get("room_name") == room_name:
+                    return floor, manifold, loop
+        return None
+    
+    def _add_heat_loss_room(self, floor, index):
+        """Dodaje prostoriju i petlju na prvi razdjelnik etaže sa slobodnim priključkom."""
+        max_ports = max(manifold_type["max_loops"] for manifold_type in MANIFOLD_TYPES.values())
+        manifold = next((m for m in floor["manifolds"] if len(m.get("rooms", [])) < max_ports), None)
+        if manifold is None:
+            manifold = self.new_manifold(index.new_manifold_id(floor["id"]))
+            index.add_manifold(floor["id"], manifold)
+        
+        new_id = index.new_loop_id()
+        rooms = manifold.setdefault("rooms", [])
+        new_room = {
+            "id": new_id,
+            "name": "",
+            "position": max((room.get("position", 0) for room in rooms), default=0) + 1
+        }
+        new_loop = {
+            "id": new_id,
+            "room_name": "",
+            "room_temperature": 20,
+            "r_lambda": 0.00,
+            "floor_covering_name": "Keramička obloga",
+            "pipe_spacing": 15,
+            "area": None,
+            "manifold_distance": None,
+            "results": {}
+        }
+        index.add_room(floor["id"], manifold["id"], new_room, new_loop)
+        manifold["num_circuits"] = max(manifold.get("num_circuits", 2), len(rooms))
+        return floor, manifold, new_loop
@@ -0,0 +1,182 @@
+"""
+Indeksirani pristup podacima podnog grijanja.
+
+Podaci ostaju u postojećoj strukturi rječnika i lista (zgrada → etaže → razdjelnici →
+prostorije i petlje), a indeks uz njih drži rječnike po ID-u za dohvat u konstantnom
+vremenu te brojače za dodjelu novih ID-eva. Operacije koje dodaju ili brišu elemente
+ažuriraju indeks izravno. Kod koji mijenja strukturu mimo indeksa (dodaje, briše ili
+mijenja ID etaža, razdjelnika, prostorija i petlji) mora pozvati invalidate(), nakon
+čega se indeks ponovno gradi pri sljedećem dohvatu. Dohvat se ne provjerava prema
+podacima, pa i element koji ne postoji ostaje nepronađen do sljedeće promjene strukture.
+
+ID-evi etaža jedinstveni su u zgradi, razdjelnika na etaži, a prostorija i petlji
+(prostorija i njezina petlja dijele ID) u cijeloj zgradi, jer ključevi widgeta
+kartica petlji ovise samo o ID-u petlje.
+"""
+
+
+def _remove_item(items, item):
+    """Uklanja element iz liste po identitetu (ne po jednakosti rječnika)."""
+    for i, candidate in enumerate(items):
+        if candidate is item:
+            del items[i]
+            return
+
+
+class FloorHeatingIndex:
+    """Indeks etaža, razdjelnika, prostorija i petlji po ID-u."""
+
+    def __init__(self, data):
+        """
+        Inicijalizacija indeksa za strukturu podataka.
+
+        Args:
+            data: Struktura podataka podnog grijanja (s ključem "building")
+        """
+        self.data = data
+        self._dirty = True
+
+    def invalidate(self):
+        """Poništava indeks nakon promjena strukture koje nisu prošle kroz indeks."""
+        self._dirty = True
+
+    def rebuild(self):
+        """Ponovno gradi indeks iz strukture podataka."""
+        self._floors = {}
+        self._manifolds = {}
+        self._rooms = {}
+        self._loops = {}
+        self._max_manifold_id = {}
+        self._max_floor_id = 0
+        self._max_loop_id = 0
+
+        for floor in self.data.get("building", {}).get("floors", []):
+            self._index_floor(floor)
+        self._dirty = False
+
+    def _ensure(self):
+        """Gradi indeks ako je poništen."""
+        if self._dirty:
+            self.rebuild()
+
+    def _index_floor(self, floor):
+        floor_id = floor.get("id")
+        self._floors[floor_id] = floor
+        self._max_floor_id = max(self._max_floor_id, floor_id or 0)
+        self._max_manifold_id.setdefault(floor_id, 0)
+        for manifold in floor.get("manifolds", []):
+            self._index_manifold(floor_id, manifold)
+
+    def _index_manifold(self, floor_id, manifold):
+        manifold_id = manifold.get("id")
+        self._manifolds[(floor_id, manifold_id)] = manifold
+        self._max_manifold_id[floor_id] = max(self._max_manifold_id.get(floor_id, 0), manifold_id or 0)
+        for room in manifold.get("rooms", []):
+            self._rooms[(floor_id, manifold_id, room.get("id"))] = room
+            self._max_loop_id = max(self._max_loop_id, room.get("id") or 0)
+        for loop in manifold.get("loops", []):
+            self._loops[(floor_id, manifold_id, loop.get("id"))] = loop
+            self._max_loop_id = max(self._max_loop_id, loop.get("id") or 0)
+
+    # === Dohvat ===
+
+    def floor(self, floor_id):
+        """Vraća etažu po ID-u ili None."""
+        self._ensure()
+        return self._floors.get(floor_id)
+
+    def manifold(self, floor_id, manifold_id):
+        """Vraća razdjelnik po ID-u etaže i razdjelnika ili None."""
+        self._ensure()
+        return self._manifolds.get((floor_id, manifold_id))
+
+    def room(self, floor_id, manifold_id, room_id):
+        """Vraća prostoriju po ID-u etaže, razdjelnika i prostorije ili None."""
+        self._ensure()
+        return self._rooms.get((floor_id, manifold_id, room_id))
+
+    def loop(self, floor_id, manifold_id, loop_id):
+        """Vraća petlju po ID-u etaže, razdjelnika i petlje ili None."""
+        self._ensure()
+        return self._loops.get((floor_id, manifold_id, loop_id))
+
+    # === Dodjela ID-eva ===
+
+    def new_floor_id(self):
+        """Dodjeljuje novi ID etaže."""
+        self._ensure()
+        self._max_floor_id += 1
+        return self._max_floor_id
+
+    def new_manifold_id(self, floor_id):
+        """Dodjeljuje novi ID razdjelnika na etaži."""
+        self._ensure()
+        self._max_manifold_id[floor_id] = self._max_manifold_id.get(floor_id, 0) + 1
+        return self._max_manifold_id[floor_id]
+
+    def new_loop_id(self):
+        """Dodjeljuje novi ID prostorije i petlje (jedinstven u zgradi)."""
+        self._ensure()
+        self._max_loop_id += 1
+        return self._max_loop_id
+
+    # === Promjene strukture ===
+
+    def add_floor(self, floor):
+        """Dodaje etažu (s razdjelnicima) u podatke i indeks."""
+        self._ensure()
+        self.data["building"]["floors"].append(floor)
+        self._index_floor(floor)
+
+    def remove_floor(self, floor_id):
+        """Uklanja etažu iz podataka i indeksa. Vraća True ako je etaža pronađena."""
+        floor = self.floor(floor_id)
+        if floor is None:
+            return False
+        _remove_item(self.data["building"]["floors"], floor)
+        for table in (self._manifolds, self._rooms, self._loops):
+            for key in [key for key in table if key[0] == floor_id]:
+                del table[key]
+        del self._floors[floor_id]
+        return True
+
+    def add_manifold(self, floor_id, manifold):
+        """Dodaje razdjelnik na etažu u podacima i indeksu."""
+        floor = self.floor(floor_id)
+        floor.setdefault("manifolds", []).append(manifold)
+        self._index_manifold(floor_id, manifold)
+
+    def remove_manifold(self, floor_id, manifold_id):
+        """Uklanja razdjelnik iz podataka i indeksa. Vraća True ako je razdjelnik pronađen."""
+        manifold = self.manifold(floor_id, manifold_id)
+        if manifold is None:
+            return False
+        _remove_item(self._floors[floor_id]["manifolds"], manifold)
+        for table in (self._rooms, self._loops):
+            for key in [key for key in table if key[:2] == (floor_id, manifold_id)]:
+                del table[key]
+        del self._manifolds[(floor_id, manifold_id)]
+        return True
+
+    def add_room(self, floor_id, manifold_id, room, loop):
+        """Dodaje prostoriju i njezinu petlju na razdjelnik u podacima i indeksu."""
+        manifold = self.manifold(floor_id, manifold_id)
+        manifold.setdefault("rooms", []).append(room)
+        manifold.setdefault("loops", []).append(loop)
+        self._rooms[(floor_id, manifold_id, room["id"])] = room
+        self._loops[(floor_id, manifold_id, loop["id"])] = loop
+        self._max_loop_id = max(self._max_loop_id, room["id"], loop["id"])
+
+    def remove_room(self, floor_id, manifold_id, room_id):
+        """Uklanja prostoriju i njezinu petlju iz podataka i indeksa. Vraća True ako je prostorija pronađena."""
+        room = self.room(floor_id, manifold_id, room_id)
+        if room is None:
+            return False
+        manifold = self._manifolds[(floor_id, manifold_id)]
+        _remove_item(manifold["rooms"], room)
+        del self._rooms[(floor_id, manifold_id, room_id)]
+
+        loop = self._loops.pop((floor_id, manifold_id, room_id), None)
+        if loop is not None:
+            _remove_item(manifold.get("loops", []), loop)
+        return True
@@ -1,6 +1,9 @@
 import streamlit as st
 from modules.thermal.heating.floor_heating.constants import *
 from modules.thermal.heating.floor_heating.utils import *
+from modules.thermal.heating.floor_heating.batch_calculator import loop_circuits
+from modules.thermal.heating.floor_heating.manifold_assignment import MANIFOLD_EQUIVALENT_LENGTH
+from modules.thermal.heating.floor_heating.heat_loss_sync import HEAT_LOSS_RESULTS_KEY, source_rooms, linked_loops
 import json
 
 
@@ -42,6 +45,9 @@ class FloorHeatingUI:
                 self.calculation_handler._add_floor(data)
                 st.rerun()
         
+        # Sekcija za preuzimanje prostorija iz proračuna toplinskih gubitaka
+        self.render_heat_loss_import(data)
+        
         # Sekcija za etaže
         for floor_index, floor in enumerate(data["building"].get("floors", [])):
             with st.expander(f"Etaža {floor_index + 1}: {floor.get('name', 'Etaža')}", expanded=True):
@@ -190,6 +196,9 @@ class FloorHeatingUI:
                             )
                             manifold["return_pipe_length"] = return_pipe_length
                         
+                        # Položaj razdjelnika u tlocrtu (za raspodjelu krugova po udaljenosti)
+                        self.render_position_inputs(manifold, f"{floor['id']}_{manifold['id']}", data, "Položaj razdjelnika")
+                        
                         # Gumb za brisanje razdjelnika
                         if st.button(f"Obriši razdjelnik", key=f"delete_manifold_{floor['id']}_{manifold['id']}"):
                             if len(floor.get("manifolds", [])) > 1:  # Ne dozvoli brisanje posljednjeg razdjelnika
@@ -220,10 +229,14 @@ class FloorHeatingUI:
                             col1, col2 = st.columns([1, 1])  # Omjer pola-pola umjesto 3:2
                             
                             with col1:
+                                # Naziv preuzet iz proračuna toplinskih gubitaka ostaje među opcijama
+                                room_options = all_room_types
+                                if current_room_name and current_room_name not in all_room_types:
+                                    room_options = [current_room_name] + all_room_types
                                 selected_room_type = st.selectbox(
                                     f"Prostorija {room_index + 1}",
-                                    options=all_room_types,
-                                    index=all_room_types.index(current_room_name) if current_room_name in all_room_types else 0,
+                                    options=room_options,
+                                    index=room_options.index(current_room_name) if current_room_name in room_options else 0,
                                     key=f"room_name_{floor['id']}_{manifold['id']}_{room_id}",
                                     on_change=lambda f_id=floor['id'], m_id=manifold['id'], r_id=room_id: 
                                         self.calculation_handler._on_room_type_change(f_id, m_id, r_id, data)
@@ -344,6 +357,14 @@ class FloorHeatingUI:
             pipe_display = PIPE_DATA.get(selected_manifold.get('pipe_diameter', "16x2,0"), {}).get('display', selected_manifold.get('pipe_diameter', "16x2,0"))
             col3.metric("Promjer cijevi", pipe_display)
             col4.metric("Debljina estriha", f"{selected_floor.get('screed_thickness', 45)} mm")
+            
+            # Podešavanje protoka svih petlji razdjelnika odjednom
+            st.slider(
+                "Postotak promjene protoka svih petlji razdjelnika",
+                min_value=-50, max_value=50, value=0, step=5,
+                key=f"manifold_flow_adjustment_{selected_floor['id']}_{selected_manifold['id']}",
+                on_change=lambda: self.calculation_handler._on_manifold_flow_adjustment(selected_floor, selected_manifold, data)
+            )
         
         # Petlje podnog grijanja za odabrani razdjelnik
         st.markdown("---")
@@ -363,19 +384,18 @@ class FloorHeatingUI:
         
         # Sinkroniziraj petlje s prostorijama (1:1 odnos prema ID-u)
         # Ovo osigurava da postoji petlja za svaku prostoriju i da su ispravno povezane
+        loops_by_id = {loop.get("id"): loop for loop in loops}
+        structure_changed = False
         for room in rooms:
             # Pronađi postojeću petlju za ovu prostoriju
-            loop_found = False
-            for loop in loops:
-                if loop.get("id") == room.get("id"):
-                    # Ažuriraj naziv prostorije u petlji ako je potrebno
-                    if loop.get("room_name") != room.get("name"):
-                        loop["room_name"] = room.get("name")
-                    loop_found = True
-                    break
+            loop = loops_by_id.get(room.get("id"))
+            if loop is not None:
+                # Ažuriraj naziv prostorije u petlji ako je potrebno
+                if loop.get("room_name") != room.get("name"):
+                    loop["room_name"] = room.get("name")
             
             # Ako petlja ne postoji, kreiraj novu
-            if not loop_found:
+            else:
                 new_loop = {
                     "id": room.get("id"),
                     "room_name": room.get("name"),
@@ -387,18 +407,21 @@ class FloorHeatingUI:
                     "results": {}
                 }
                 loops.append(new_loop)
+                loops_by_id[new_loop["id"]] = new_loop
+                structure_changed = True
         
         # Dodatna provjera: ukloni petlje koje nemaju odgovarajuću prostoriju
-        valid_room_ids = [room.get("id") for room in rooms]
-        loops[:] = [loop for loop in loops if loop.get("id") in valid_room_ids]
+        valid_room_ids = {room.get("id") for room in rooms}
+        if len(loops) != len(valid_room_ids) or any(loop.get("id") not in valid_room_ids for loop in loops):
+            loops[:] = [loop for loop in loops if loop.get("id") in valid_room_ids]
+            structure_changed = True
+        
+        # Petlje su dodane ili uklonjene mimo indeksa pa se indeks ponovno gradi
+        if structure_changed:
+            self.calculation_handler.data_manager.index(data).invalidate()
         
         # Sortiraj petlje prema redoslijedu prostorija
-        sorted_loops = []
-        for room in rooms:
-            for loop in loops:
-                if loop.get("id") == room.get("id"):
-                    sorted_loops.append(loop)
-                    break
+        sorted_loops = [loops_by_id[room.get("id")] for room in rooms]
         
         # Podijeli petlje u dva dijela - za lijevu i desnu kolonu
         left_loops = sorted_loops[::2]  # Parni indeksi (0, 2, 4...)
@@ -414,6 +437,20 @@ class FloorHeatingUI:
             for loop in right_loops:
                 self.render_loop_card(loop, data, selected_floor, selected_manifold)
     
+    def render_position_inputs(self, item, key_suffix, data, label):
+        """Prikazuje unos tlocrtnog položaja (x, y u metrima) razdjelnika ili petlje."""
+        position = item.get("position") or [None, None]
+        st.caption(f"{label} [m] - neobavezno; bez položaja raspodjela krugova koristi udaljenost razdjelnika")
+        col_x, col_y = st.columns(2)
+        for col, axis, value in ((col_x, "x", position[0]), (col_y, "y", position[1])):
+            with col:
+                st.number_input(
+                    axis,
+                    value=value, placeholder=axis, step=0.5, format="%.1f",
+                    key=f"position_{axis}_{key_suffix}",
+                    on_change=lambda: self.calculation_handler._on_position_change(item, key_suffix, data)
+                )
+    
     def render_loop_card(self, loop, data, floor=None, manifold=None):
         """Prikazuje karticu za pojedinu petlju."""
         loop_id = loop.get("id")
@@ -428,10 +465,23 @@ class FloorHeatingUI:
                 
                 # Uklonjen dio s prikazom naziva prostorije jer je već prikazan u naslovu kartice
                 
+                # Preporučena podjela na krugove iz optimizacije razmaka cijevi
+                circuits = loop_circuits(loop, (manifold or {}).get("pipe_diameter"))
+                if circuits > 1:
+                    st.caption(f"Preporučeni broj krugova: {circuits}")
+                
+                # Potrebna snaga preuzeta iz proračuna toplinskih gubitaka
+                if loop.get("required_load") is not None:
+                    st.caption(f"Toplinski gubici prostorije: {loop['required_load']:.0f} W")
+                
                 # Temperatura prostorije
+                room_temp_value = loop.get("room_temperature")
+                if room_temp_value is None:
+                    room_temp_value = get_room_temperature_for_name(loop.get("room_name", ""))
                 room_temp = st.number_input(
                     "Temperatura prostorije [°C]",
-                    min_value=15, max_value=30, value=get_room_temperature_for_name(loop.get("room_name", "")),
+                    min_value=15.0, max_value=30.0, value=min(max(float(room_temp_value), 15.0), 30.0), step=0.5,
+                    format="%.1f",
                     key=f"room_temp_{loop_id}",
                     on_change=lambda: self.calculation_handler._on_loop_param_change_with_manifold(loop_id, "room_temperature", data, floor, manifold)
                 )
@@ -440,7 +490,7 @@ class FloorHeatingUI:
                 # Površina - bez početne vrijednosti
                 area = st.number_input(
                     "Površina [m²]",
-                    min_value=0.1, max_value=100.0, value=loop.get("area") if loop.get("area") is not None else None, 
+                    min_value=0.1, max_value=1000.0, value=loop.get("area") if loop.get("area") is not None else None, 
                     placeholder="Unesi površinu",
                     key=f"area_{loop_id}",
                     format="%.2f",
@@ -493,6 +543,9 @@ class FloorHeatingUI:
                 if manifold_distance is not None:
                     loop["manifold_distance"] = manifold_distance
                 
+                # Položaj prostorije u tlocrtu (za raspodjelu krugova po udaljenosti)
+                self.render_position_inputs(loop, loop_id, data, "Položaj prostorije")
+                
                 # Dodaj upozorenje ako nedostaje površina ili udaljenost razdjelnika
                 if ("area" not in loop or loop.get("area") is None or 
                     "manifold_distance" not in loop or loop.get("manifold_distance") is None):
@@ -679,7 +732,7 @@ class FloorHeatingUI:
                     
                     # Dodaj volumen vode u polaznom i povratnom vodu razdjelnika
                     try:
-                        supply_pipe_data = PIPE_DATA.get(manifold.get("supply_pipe_diameter", "20x2,0"), {})
+                        supply_pipe_data = CONNECTION_PIPE_DATA.get(manifold.get("supply_pipe_diameter", DEFAULT_CONNECTION_PIPE_DIAMETER), {})
                         supply_pipe_volume_per_meter = supply_pipe_data.get("volume_per_meter", 0.201)  # Litara po metru
                         supply_pipe_length = manifold.get("supply_pipe_length", 5.0)
                         return_pipe_length = manifold.get("return_pipe_length", 5.0)
@@ -745,4 +798,202 @@ class FloorHeatingUI:
         if any(any("adjusted_results" in loop for loop in manifold.get("loops", [])) 
                for floor in data.get("building", {}).get("floors", []) 
                for manifold in floor.get("manifolds", [])):
-            st.info("Napomena: Podešene vrijednosti protoka korištene su u zbroju umjesto originalnih izračunatih vrijednosti gdje su dostupne.")
\ No newline at end of file
+            st.info("Napomena: Podešene vrijednosti protoka korištene su u zbroju umjesto originalnih izračunatih vrijednosti gdje su dostupne.")        
+        # Hidrauličko uravnoteženje razdjelnika i radna točka pumpe
+        self.render_hydraulic_balance(data)
+        
+        # Najniža temperatura polaza
+        self.render_supply_temperature_solver(data)
+        
+        # Optimizacija razmaka cijevi i podjele na krugove
+        self.render_spacing_optimizer(data)
+        
+        # Raspodjela krugova po razdjelnicima
+        self.render_circuit_assignment(data)
+
+    def render_hydraulic_balance(self, data):
+        """Prikazuje hidrauličko uravnoteženje razdjelnika, predpodešenja ventila i radnu točku pumpe."""
+        try:
+            balance = self.calculation_handler.balance_hydraulics(data)
+        except ValueError as e:
+            st.error(f"Hidrauličko uravnoteženje nije moguće: {e}")
+            return
+        if not balance["pump"]["flow_kg_h"]:
+            return
+        
+        st.markdown("### Hidrauličko uravnoteženje")
+        pump = balance["pump"]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Protok pumpe", f"{pump['flow_m3_h']:.3f} m³/h")
+        col2.metric("Visina dobave", f"{pump['head_kpa']:.1f} kPa")
+        col3.metric("Visina dobave (vodeni stupac)", f"{pump['head_m']:.2f} m")
+        
+        for manifold in balance["manifolds"]:
+            if not manifold["loops"]:
+                continue
+            with st.expander(f"Razdjelnik: {manifold['name']}" + (" (mjerodavni)" if manifold["is_index"] else "")):
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Diferencijalni tlak", f"{manifold['differential_pressure']:.1f} kPa")
+                col2.metric("Spojne cijevi", f"{manifold['connection_pressure_drop']:.1f} kPa")
+                col3.metric("Potrebni tlak", f"{manifold['required_pressure']:.1f} kPa")
+                if manifold["balancing_valve_kv"] is not None:
+                    col4.metric("Regulacijski ventil", f"kv {manifold['balancing_valve_kv']:.2f}",
+                                f"{manifold['balancing_valve_pressure_drop']:.1f} kPa", delta_color="off")
+                
+                st.dataframe(pd.DataFrame([{
+                    "Prostorija": loop["room_name"],
+                    "Krugova": loop["circuits"],
+                    "Protok kruga [kg/h]": f"{loop['flow_kg_h']:.1f}",
+                    "Pad tlaka kruga [kPa]": f"{loop['loop_pressure_drop']:.2f}",
+                    "Pad tlaka ventila [kPa]": f"{loop['valve_pressure_drop']:.2f}",
+                    "kv potrebni": f"{loop['kv_required']:.3f}",
+                    "Predpodešenje": f"{loop['presetting']:.1f}",
+                    "Odstupanje protoka [%]": f"{loop['flow_deviation']:+.1f}",
+                    "Mjerodavna petlja": "Da" if loop["is_index"] else "",
+                } for loop in manifold["loops"]]), use_container_width=True)
+
+    def render_supply_temperature_solver(self, data):
+        """Prikazuje najnižu temperaturu polaza po razdjelniku i za zgradu te pripadne razmake cijevi."""
+        solution = self.calculation_handler.solve_supply_temperatures(data)
+        building = solution["building"]
+        if building["supply_temperature"] is None:
+            return
+        
+        st.markdown("### Najniža temperatura polaza")
+        col1, col2 = st.columns(2)
+        col1.metric("Potrebna temperatura polaza zgrade", f"{building['required_supply_temperature']:.1f} °C")
+        col2.metric("Preporučena temperatura polaza zgrade", f"{building['supply_temperature']} °C")
+        if not building["all_feasible"]:
+            st.warning("Neke petlje ne mogu pokriti potrebno opterećenje ni pri najvišoj temperaturi polaza "
+                       "ili bez prekoračenja najveće temperature poda.")
+        
+        for manifold in solution["manifolds"]:
+            if not manifold["loops"]:
+                continue
+            with st.expander(f"Razdjelnik: {manifold['name']} – {manifold['supply_temperature']} °C"):
+                st.dataframe(pd.DataFrame([{
+                    "Prostorija": loop["room_name"],
+                    "Potrebno [W]": f"{loop['required_load']:.0f}",
+                    "Potrebni tok [W/m²]": f"{loop['required_flux']:.1f}",
+                    "Najveći tok [W/m²]": f"{loop['max_flux']:.1f}",
+                    "Min. polaz [°C]": "-" if loop["minimum_supply_temperature"] is None else f"{loop['minimum_supply_temperature']:.1f}",
+                    "Razmak [cm]": f"{loop['current_spacing']} → {loop['pipe_spacing']}",
+                    "Napomena": "Ograničeno temperaturom poda" if loop["surface_limited"] else ("" if loop["feasible"] else "Nije ostvarivo"),
+                } for loop in manifold["loops"]]), use_container_width=True)
+        
+        st.button(
+            "Primijeni temperature polaza i razmake cijevi",
+            key="apply_supply_temperatures",
+            on_click=lambda: self.calculation_handler._apply_supply_temperatures(solution, data)
+        )
+
+    def render_spacing_optimizer(self, data):
+        """Prikazuje optimalne razmake cijevi i podjelu prostorija na krugove uz postojeće temperature polaza."""
+        vary_covering = st.session_state.get("optimize_vary_covering", False)
+        rooms = self.calculation_handler.optimize_spacing(data, vary_covering=vary_covering)
+        if not rooms:
+            return
+        
+        st.markdown("### Optimizacija razmaka cijevi")
+        st.checkbox("Uključi i odabir podne obloge", key="optimize_vary_covering")
+        
+        status_labels = {
+            "ok": "",
+            "insufficient": "Nedovoljan učin",
+            "surface_limit": "Prekoračena temperatura poda",
+            "too_long": "Krug predug",
+        }
+        col1, col2 = st.columns(2)
+        col1.metric("Ukupna duljina cijevi", f"{sum(room['total_length'] for room in rooms):.1f} m")
+        col2.metric("Broj krugova", sum(room["circuits"] for room in rooms))
+        if any(room["status"] != "ok" for room in rooms):
+            st.warning("Za neke prostorije nema rješenja koje zadovoljava opterećenje i temperaturu poda pri zadanoj temperaturi polaza.")
+        
+        st.dataframe(pd.DataFrame([{
+            "Prostorija": room["room_name"],
+            "Razmak [cm]": room["pipe_spacing"],
+            "Podna obloga": room["floor_covering_name"] or f"R_λB = {room['r_lambda']}",
+            "Krugovi": room["circuits"],
+            "Duljina kruga [m]": f"{room['circuit_length']:.1f}",
+            "Pad tlaka [kPa]": f"{room['pressure_drop']:.2f}",
+            "Tok [W/m²]": f"{room['heat_flux']:.1f} / {room['required_flux']:.1f}",
+            "Temp. poda [°C]": f"{room['floor_surface_temp']:.1f}",
+            "Napomena": status_labels[room["status"]],
+        } for room in rooms]), use_container_width=True)
+        
+        st.caption("Podjela na krugove je preporuka: primjenom se razmak cijevi i podna obloga upisuju u petlje, "
+                   "a broj krugova se pamti uz petlju i koristi pri hidrauličkom uravnoteženju. Petlje se ne dijele "
+                   "na nove petlje - prostoriju po potrebi podijelite ručno.")
+        st.button(
+            "Primijeni optimirane razmake cijevi",
+            key="apply_spacing_optimization",
+            on_click=lambda: self.calculation_handler._apply_spacing_optimization(rooms, data)
+        )
+
+    def render_heat_loss_import(self, data):
+        """Prikazuje preuzimanje prostorija i toplinskih gubitaka iz proračuna toplinskih gubitaka."""
+        rezultati = st.session_state.get(HEAT_LOSS_RESULTS_KEY)
+        rooms = source_rooms(rezultati)
+        if not rooms:
+            return
+        
+        st.subheader("Prostorije iz proračuna toplinskih gubitaka")
+        linked = linked_loops(data)
+        st.caption(
+            f"Grijanih prostorija u proračunu toplinskih gubitaka: {len(rooms)}, "
+            f"povezanih petlji: {sum((room['floor_key'], room['room_id']) in linked for room in rooms)}. "
+            "Povezane petlje preuzimaju naziv, površinu, temperaturu i toplinske gubitke prostorije "
+            "i automatski se ažuriraju kad se proračun toplinskih gubitaka promijeni."
+        )
+        
+        st.button(
+            "Preuzmi prostorije i toplinske gubitke",
+            key="sync_heat_loss",
+            on_click=lambda: self.calculation_handler.sync_heat_loss(data)
+        )
+        
+        report = st.session_state.get("floor_heating_heat_loss_sync")
+        if report:
+            st.success(
+                f"Dodano petlji: {report['added']}, ažurirano: {report['updated']}, "
+                f"bez promjene: {report['unchanged']}."
+            )
+            if report["missing"]:
+                st.warning("Prostorije više ne postoje u proračunu toplinskih gubitaka: " + ", ".join(report["missing"]))
+    
+    def render_circuit_assignment(self, data):
+        """Prikazuje predloženu raspodjelu krugova po razdjelnicima."""
+        assignment = self.calculation_handler.assign_circuits(data)
+        if not assignment["floors"]:
+            return
+        
+        st.markdown("### Raspodjela krugova po razdjelnicima")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Broj razdjelnika", assignment["manifold_count"])
+        col2.metric("Trošak prije [m]", f"{assignment['cost_before']:.1f}")
+        col3.metric("Trošak nakon [m]", f"{assignment['cost_after']:.1f}",
+                    f"{assignment['cost_after'] - assignment['cost_before']:.1f}", delta_color="inverse")
+        st.caption(f"Trošak obuhvaća spojne cijevi i priključke krugova te {MANIFOLD_EQUIVALENT_LENGTH:.0f} m po razdjelniku. "
+                   "Udaljenost je pravokutna udaljenost položaja prostorije i razdjelnika ako su oba unesena, "
+                   "inače unesena udaljenost razdjelnika.")
+        if assignment["too_far"]:
+            st.warning(f"{assignment['too_far']} krugova udaljeno je od svih razdjelnika više od {MAX_MANIFOLD_DISTANCE:.0f} m.")
+        
+        for floor in assignment["floors"]:
+            with st.expander(f"Etaža: {floor['floor_name']}"):
+                if floor["closed_manifold_ids"]:
+                    st.caption("Razdjelnici koji više nisu potrebni: " + ", ".join(str(i) for i in floor["closed_manifold_ids"]))
+                st.dataframe(pd.DataFrame([{
+                    "Razdjelnik": manifold["name"] or f"Novi (uz razdjelnik {manifold['site_manifold_id']})",
+                    "Tip": MANIFOLD_TYPES[manifold["type"]]["display"],
+                    "Prostorija": loop["room_name"],
+                    "Krugova": loop["ports"],
+                    "Udaljenost [m]": f"{loop['distance']:.1f}",
+                    "Napomena": "Predaleko" if loop["too_far"] else ("Premješten" if loop["moved"] else ""),
+                } for manifold in floor["manifolds"] for loop in manifold["loops"]]), use_container_width=True)
+        
+        st.button(
+            "Primijeni raspodjelu krugova",
+            key="apply_circuit_assignment",
+            on_click=lambda: self.calculation_handler._apply_circuit_assignment(assignment, data)
+        )
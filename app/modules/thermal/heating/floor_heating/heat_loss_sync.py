@@ -0,0 +1,86 @@
+"""
+Preuzimanje prostorija i toplinskih gubitaka iz proračuna toplinskih gubitaka.
+
+Rezultati proračuna toplinskih gubitaka (HeatLossCalc) nalaze se u session state-u.
+Svaka grijana prostorija postaje prostorija i petlja podnog grijanja s površinom,
+unutarnjom projektnom temperaturom i projektnim toplinskim gubicima kao potrebnom
+snagom petlje ("required_load"). Petlja pamti izvornu prostoriju (ključ etaže i ID
+prostorije) i potpis preuzetih vrijednosti, pa se pri ponovnom preuzimanju mijenjaju
+i ponovno izračunavaju samo petlje čije su se izvorne prostorije promijenile.
+
+Instance tipske etaže s istim preinakama čine jednu etažu rezultata, pa se prostorija
+predloška može pojaviti na više etaža; zato je izvor petlje par (etaža, prostorija).
+"""
+
+# Ključevi pod kojima HeatLossCalc sprema rezultate i reviziju ulaza izračuna
+HEAT_LOSS_RESULTS_KEY = "heat_loss_calculator_model_rezultati"
+HEAT_LOSS_REVISION_KEY = f"{HEAT_LOSS_RESULTS_KEY}_revizija"
+
+
+def source_rooms(rezultati):
+    """
+    Izvlači grijane prostorije iz rezultata proračuna toplinskih gubitaka.
+
+    Args:
+        rezultati: Rezultati izracunaj_toplinske_gubitke_zgrade (ili None)
+
+    Returns:
+        Lista rječnika s ključem i nazivom etaže, ID-em, nazivom, površinom (m²),
+        temperaturom (°C) i toplinskim gubicima (W) prostorije
+    """
+    rooms = []
+    if not rezultati or "error" in rezultati:
+        return rooms
+
+    for etaza in rezultati.get("etaze", []):
+        for prostorija_id, prostorija in etaza.get("prostorije", {}).items():
+            if not prostorija.get("grijana", True):
+                continue
+            rooms.append({
+                "floor_key": str(etaza.get("kljuc")),
+                "floor_name": etaza.get("naziv", ""),
+                "room_id": str(prostorija.get("id", prostorija_id)),
+                "name": prostorija.get("naziv", ""),
+                "area": float(prostorija.get("povrsina") or 0.0),
+                "temperature": float(prostorija.get("temperatura") or 20.0),
+                "load": float((prostorija.get("gubici") or {}).get("ukupno") or 0.0),
+            })
+    return rooms
+
+
+def room_signature(room):
+    """Potpis preuzetih vrijednosti prostorije (lista radi istog oblika nakon spremanja u JSON)."""
+    return [room["name"], round(room["area"], 2), round(room["temperature"], 1), round(room["load"], 1)]
+
+
+def apply_room(loop, room):
+    """
+    Prenosi naziv, površinu, temperaturu i toplinske gubitke prostorije na petlju.
+
+    Returns:
+        True ako se petlja promijenila (potpis prostorije razlikuje se od zadnjeg preuzetog)
+    """
+    loop["heat_loss_floor"] = room["floor_key"]
+    loop["heat_loss_room_id"] = room["room_id"]
+
+    signature = room_signature(room)
+    if loop.get("heat_loss_signature") == signature:
+        return False
+
+    loop["room_name"] = room["name"]
+    loop["area"] = round(room["area"], 2) if room["area"] > 0 else None
+    loop["room_temperature"] = round(room["temperature"], 1)
+    loop["required_load"] = round(room["load"], 1)
+    loop["heat_loss_signature"] = signature
+    return True
+
+
+def linked_loops(data):
+    """Vraća {(ključ etaže, ID prostorije): (etaža, razdjelnik, petlja)} za petlje povezane s prostorijama."""
+    linked = {}
+    for floor in data.get("building", {}).get("floors", []):
+        for manifold in floor.get("manifolds", []):
+            for loop in manifold.get("loops", []):
+                if loop.get("heat_loss_room_id") is not None:
+                    linked[(loop.get("heat_loss_floor"), loop["heat_loss_room_id"])] = (floor, manifold, loop)
+    return linked
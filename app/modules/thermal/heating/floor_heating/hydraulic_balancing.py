@@ -0,0 +1,268 @@
+"""
+Hydraulic balancing of floor heating manifolds.
+
+For every manifold the index loop (the loop that needs the highest pressure with its
+valve fully open) sets the differential pressure across the manifold. The valve of every
+other loop absorbs the difference, which gives its required kv value and presetting.
+The connection pipes (CONNECTION_PIPE_DATA) are added to each manifold, and the most
+demanding manifold sets the pump duty point; the remaining manifolds get the pressure
+their balancing valves must absorb.
+
+A loop that is longer than the maximum pipe length is laid as recommended_loops equal
+circuits (or the advisory "circuits" stored by the spacing optimizer, if larger), each
+with its own valve, an equal share of the pipe length and of the flow, so balancing
+works per circuit.
+
+All loops of all manifolds are packed into flat arrays and every step is a grouped
+NumPy operation, so a whole building is rebalanced in one pass.
+"""
+
+import math
+import numpy as np
+from modules.thermal.heating.floor_heating.constants import *
+from modules.thermal.heating.floor_heating.batch_calculator import (
+    BatchLoopCalculator, circuit_length, loop_circuits, _inner_diameter
+)
+from utils.hydraulics import reynolds_number, colebrook_friction_factor, darcy_weisbach_pressure_drop
+
+# Valve characteristic: presettings and their kv values sorted by kv
+VALVE_SETTINGS = np.array(sorted(MANIFOLD_VALVE_PRESETTINGS), dtype=float)
+VALVE_KV = np.array([MANIFOLD_VALVE_PRESETTINGS[s] for s in sorted(MANIFOLD_VALVE_PRESETTINGS)], dtype=float)
+VALVE_KVS = float(VALVE_KV.max())
+
+# 1 bar = 100 kPa (kv is defined for a pressure drop in bar)
+KPA_PER_BAR = 100.0
+
+
+def water_density(temperature):
+    """Water density (kg/m³), same approximation as the loop pressure drop."""
+    return 1000.1 - 0.0864 * temperature
+
+
+def water_viscosity(temperature):
+    """Dynamic viscosity of water (Pa·s), same approximation as the loop pressure drop."""
+    return (1.777 - 0.0264 * temperature) * 1e-3
+
+
+def valve_pressure_drop(flow_m3_h, kv):
+    """Pressure drop over a valve (kPa) for a flow (m³/h) and kv value (m³/h)."""
+    return (flow_m3_h / kv) ** 2 * KPA_PER_BAR
+
+
+def loop_design_results(loop):
+    """Results used for balancing: adjusted results if the flow was adjusted, otherwise the design results."""
+    return loop.get("adjusted_results") or loop.get("results") or {}
+
+
+def connection_pipe(manifold):
+    """Connection pipe data of a manifold; an unknown diameter raises ValueError."""
+    diameter = manifold.get("supply_pipe_diameter", DEFAULT_CONNECTION_PIPE_DIAMETER)
+    if diameter not in CONNECTION_PIPE_DATA:
+        raise ValueError(
+            f"Nepoznati promjer spojnih cijevi '{diameter}' na razdjelniku {manifold.get('name', manifold.get('id'))}."
+        )
+    return CONNECTION_PIPE_DATA[diameter]
+
+
+def pack_building(data):
+    """
+    Packs all loops with a positive design flow into flat arrays.
+
+    Returns (manifolds, loops) where manifolds is a dict of per-manifold arrays and
+    metadata and loops is a dict of per-loop arrays with the manifold index of each loop.
+    Loop flow and pressure drop are given per circuit, together with the number of circuits.
+    """
+    manifolds = {"floor_id": [], "manifold_id": [], "name": [], "mean_temperature": [],
+                 "connection_length": [], "connection_diameter": []}
+    loops = {"manifold": [], "loop_id": [], "room_name": [], "flow_kg_h": [], "pressure_drop": [], "circuits": [],
+             "circuit_length": [], "inner_diameter": [], "pipe_spacing": []}
+
+    for floor in data.get("building", {}).get("floors", []):
+        for manifold in floor.get("manifolds", []):
+            flow_temperature = manifold.get("flow_temperature", 35)
+            delta_t = manifold.get("delta_t", 5)
+            connection = connection_pipe(manifold)
+            inner_diameter = _inner_diameter(manifold.get("pipe_diameter", "16×2,0"))
+
+            index = len(manifolds["manifold_id"])
+            manifolds["floor_id"].append(floor.get("id"))
+            manifolds["manifold_id"].append(manifold.get("id"))
+            manifolds["name"].append(manifold.get("name", f"Razdjelnik {manifold.get('id')}"))
+            manifolds["mean_temperature"].append(flow_temperature - delta_t / 2)
+            manifolds["connection_length"].append(
+                manifold.get("supply_pipe_length", 5.0) + manifold.get("return_pipe_length", 5.0)
+            )
+            manifolds["connection_diameter"].append(connection["inner_diameter"] / 1000.0)
+
+            for loop in manifold.get("loops", []):
+                results = loop_design_results(loop)
+                flow = results.get("flow_rate_kg_h", 0) or 0
+                if flow <= 0:
+                    continue
+                loops["manifold"].append(index)
+                loops["loop_id"].append(loop.get("id"))
+                loops["room_name"].append(loop.get("room_name", ""))
+                # Split loops: design split or a split stored for the current loop inputs
+                design = loop.get("results") or {}
+                circuits = max(int(design.get("recommended_loops") or 1),
+                               loop_circuits(loop, manifold.get("pipe_diameter")))
+                loops["circuits"].append(circuits)
+                loops["circuit_length"].append(circuit_length(
+                    float(loop.get("area") or 0), float(loop.get("pipe_spacing") or 15),
+                    float(loop.get("manifold_distance") or 0), circuits
+                ))
+                loops["inner_diameter"].append(inner_diameter)
+                loops["pipe_spacing"].append(float(loop.get("pipe_spacing") or 15))
+                loops["flow_kg_h"].append(float(flow) / circuits)
+                loops["pressure_drop"].append(float(results.get("pressure_drop", 0) or 0))
+
+    for key in ("mean_temperature", "connection_length", "connection_diameter"):
+        manifolds[key] = np.array(manifolds[key], dtype=float)
+    loops["manifold"] = np.array(loops["manifold"], dtype=int)
+    loops["circuits"] = np.array(loops["circuits"], dtype=int)
+    for key in ("flow_kg_h", "pressure_drop", "circuit_length", "inner_diameter", "pipe_spacing"):
+        loops[key] = np.array(loops[key], dtype=float)
+
+    # Pressure drop of one circuit of a split loop (the loop results cover the unsplit length)
+    split = loops["circuits"] > 1
+    if split.any():
+        circuit_dp = BatchLoopCalculator.pressure_drops(
+            loops["flow_kg_h"][split], loops["inner_diameter"][split], loops["circuit_length"][split],
+            manifolds["mean_temperature"][loops["manifold"][split]], loops["pipe_spacing"][split]
+        )["pressure_drop_total"]
+        loops["pressure_drop"][split] = circuit_dp
+    return manifolds, loops
+
+
+def valve_presetting(kv_required):
+    """
+    Valve presetting for the required kv values.
+
+    Returns (presetting, kv_set): the presetting is interpolated on the valve
+    characteristic, rounded to MANIFOLD_VALVE_PRESETTING_STEP and limited to the
+    valve range; kv_set is the kv value at that presetting.
+    """
+    continuous = np.interp(kv_required, VALVE_KV, VALVE_SETTINGS)
+    step = MANIFOLD_VALVE_PRESETTING_STEP
+    presetting = np.clip(np.round(continuous / step) * step, VALVE_SETTINGS[0], VALVE_SETTINGS[-1])
+    return presetting, np.interp(presetting, VALVE_SETTINGS, VALVE_KV)
+
+
+def connection_pressure_drop(flow_m3_h, diameter, length, temperature):
+    """Pressure drop (kPa) of the supply and return connection pipes of each manifold."""
+    density = water_density(temperature)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocity = np.where(diameter > 0, flow_m3_h / 3600 / (math.pi * diameter ** 2 / 4), 0.0)
+    reynolds = reynolds_number(density, velocity, diameter, water_viscosity(temperature))
+    friction = colebrook_friction_factor(reynolds, CONNECTION_PIPE_ROUGHNESS / diameter)
+    linear = darcy_weisbach_pressure_drop(friction, length, diameter, density, velocity)
+    local = CONNECTION_PIPE_ZETA * density * velocity ** 2 / 2
+    return (linear + local) / 1000, velocity
+
+
+def balance_building(data):
+    """
+    Balances every manifold in the building and determines the pump duty point.
+
+    Args:
+        data: Floor heating data structure (with calculated loop results)
+
+    Returns:
+        Dict with a "manifolds" list (per manifold totals, index loop, connection pipe
+        pressure drop, balancing valve and per-loop valve presettings; flows and pressure
+        drops of a loop are per circuit) and a "pump" dict with the duty point (flow and head).
+    """
+    manifolds, loops = pack_building(data)
+    n_manifolds = len(manifolds["manifold_id"])
+    owner = loops["manifold"]
+
+    temperature = manifolds["mean_temperature"][owner]
+    density = water_density(temperature)
+    flow_m3_h = loops["flow_kg_h"] / density
+
+    # Index loop: highest pressure demand with the valve fully open
+    demand = loops["pressure_drop"] + valve_pressure_drop(flow_m3_h, VALVE_KVS)
+    manifold_dp = np.zeros(n_manifolds)
+    np.maximum.at(manifold_dp, owner, demand)
+    candidates = np.flatnonzero(demand >= manifold_dp[owner])
+    _, first = np.unique(owner[candidates], return_index=True)
+    is_index = np.zeros(len(owner), dtype=bool)
+    is_index[candidates[first]] = True
+
+    # Valve of every loop absorbs the difference to the manifold differential pressure
+    valve_dp = manifold_dp[owner] - loops["pressure_drop"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kv_required = np.where(valve_dp > 0, flow_m3_h / np.sqrt(valve_dp / KPA_PER_BAR), VALVE_KVS)
+    presetting, kv_set = valve_presetting(kv_required)
+
+    # Flow at the rounded presetting (loop resistance taken as quadratic in flow)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resistance = loops["pressure_drop"] + valve_pressure_drop(flow_m3_h, kv_set)
+        actual_flow = np.where(resistance > 0, loops["flow_kg_h"] * np.sqrt(manifold_dp[owner] / resistance),
+                               loops["flow_kg_h"])
+
+    # Manifold totals and connection pipes
+    manifold_flow_kg_h = np.bincount(owner, weights=loops["flow_kg_h"] * loops["circuits"], minlength=n_manifolds)
+    manifold_flow_m3_h = manifold_flow_kg_h / water_density(manifolds["mean_temperature"])
+    connection_dp, connection_velocity = connection_pressure_drop(
+        manifold_flow_m3_h, manifolds["connection_diameter"], manifolds["connection_length"],
+        manifolds["mean_temperature"]
+    )
+    required_dp = np.where(manifold_flow_kg_h > 0, manifold_dp + connection_dp, 0.0)
+
+    # Pump duty: most demanding manifold sets the head, balancing valves absorb the rest
+    pump_head = float(required_dp.max()) if n_manifolds else 0.0
+    balancing_dp = np.where(manifold_flow_kg_h > 0, pump_head - required_dp, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balancing_kv = np.where(balancing_dp > 0, manifold_flow_m3_h / np.sqrt(balancing_dp / KPA_PER_BAR), np.nan)
+    index_manifold = int(np.argmax(required_dp)) if n_manifolds and pump_head > 0 else None
+
+    # Unpack to plain Python values per manifold
+    loop_rows = {
+        "loop_id": loops["loop_id"], "room_name": loops["room_name"], "circuits": loops["circuits"].tolist(),
+        "flow_kg_h": loops["flow_kg_h"].tolist(), "flow_m3_h": flow_m3_h.tolist(),
+        "loop_pressure_drop": loops["pressure_drop"].tolist(), "valve_pressure_drop": valve_dp.tolist(),
+        "kv_required": kv_required.tolist(), "presetting": presetting.tolist(), "kv_set": kv_set.tolist(),
+        "actual_flow_kg_h": actual_flow.tolist(),
+        "flow_deviation": ((actual_flow / loops["flow_kg_h"] - 1) * 100).tolist(),
+        "is_index": is_index.tolist(),
+    }
+    loops_by_manifold = [[] for _ in range(n_manifolds)]
+    for row, manifold_index in enumerate(owner.tolist()):
+        loops_by_manifold[manifold_index].append({key: values[row] for key, values in loop_rows.items()})
+
+    manifold_results = []
+    for i in range(n_manifolds):
+        index_loops = [loop["loop_id"] for loop in loops_by_manifold[i] if loop["is_index"]]
+        manifold_results.append({
+            "floor_id": manifolds["floor_id"][i],
+            "manifold_id": manifolds["manifold_id"][i],
+            "name": manifolds["name"][i],
+            "flow_kg_h": float(manifold_flow_kg_h[i]),
+            "flow_m3_h": float(manifold_flow_m3_h[i]),
+            "index_loop_id": index_loops[0] if index_loops else None,
+            "differential_pressure": float(manifold_dp[i]),
+            "connection_pressure_drop": float(connection_dp[i]),
+            "connection_velocity": float(connection_velocity[i]),
+            "required_pressure": float(required_dp[i]),
+            "balancing_valve_pressure_drop": float(balancing_dp[i]),
+            "balancing_valve_kv": None if math.isnan(balancing_kv[i]) else float(balancing_kv[i]),
+            "is_index": i == index_manifold,
+            "loops": loops_by_manifold[i],
+        })
+
+    total_flow_kg_h = float(manifold_flow_kg_h.sum())
+    total_flow_m3_h = float(manifold_flow_m3_h.sum())
+    pump_density = total_flow_kg_h / total_flow_m3_h if total_flow_m3_h > 0 else 1000.0
+    return {
+        "manifolds": manifold_results,
+        "pump": {
+            "flow_kg_h": total_flow_kg_h,
+            "flow_m3_h": total_flow_m3_h,
+            "head_kpa": pump_head,
+            "head_m": pump_head * 1000 / (pump_density * GRAVITATIONAL_ACCELERATION),
+            "index_manifold": None if index_manifold is None else (
+                manifolds["floor_id"][index_manifold], manifolds["manifold_id"][index_manifold]
+            ),
+        },
+    }
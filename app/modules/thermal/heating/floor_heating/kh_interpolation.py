@@ -0,0 +1,129 @@
+"""
+Interpolacija KH vrijednosti na kompiliranoj mreži.
+
+Tablice iz kh_values.py se za svaki promjer cijevi jednom pretvaraju u gustu NumPy
+mrežu (r_lambda × razmak cijevi × debljina estriha). Vrijednosti između točaka tablice
+dobivaju se trilinearnom interpolacijom, pa je KH kontinuiran unutar raspona tablice;
+izvan raspona koristi se rubna vrijednost tablice, a u točkama tablice vraća se točna
+tablična vrijednost.
+"""
+
+import numpy as np
+from modules.thermal.heating.floor_heating.kh_values import KH_VALUES
+
+# Kompilirane mreže po promjeru cijevi
+_KH_GRIDS = {}
+
+# Memoizirane pojedinačne vrijednosti
+_KH_CACHE = {}
+
+
+def resolve_pipe_diameter(pipe_diameter):
+    """Vraća ključ tablice za promjer cijevi (prvi dostupni promjer ako ga nema u tablici)."""
+    if pipe_diameter in KH_VALUES:
+        return pipe_diameter
+    return next(iter(KH_VALUES))
+
+
+def compile_kh_grid(pipe_diameter):
+    """
+    Vraća osi i gustu mrežu KH vrijednosti za promjer cijevi.
+
+    Args:
+        pipe_diameter: Promjer cijevi (ključ iz KH_VALUES)
+
+    Returns:
+        Tuple (r_lambde, razmaci, debljine, mreža) gdje je mreža oblika
+        (len(r_lambde), len(razmaci), len(debljine))
+    """
+    pipe_diameter = resolve_pipe_diameter(pipe_diameter)
+    if pipe_diameter not in _KH_GRIDS:
+        table = KH_VALUES[pipe_diameter]
+        r_lambdas = sorted(table)
+        spacings = sorted(table[r_lambdas[0]])
+        thicknesses = sorted(table[r_lambdas[0]][spacings[0]])
+        grid = np.array([[[table[r][s][t] for t in thicknesses] for s in spacings] for r in r_lambdas], dtype=float)
+        grid.setflags(write=False)
+        _KH_GRIDS[pipe_diameter] = (
+            np.array(r_lambdas, dtype=float),
+            np.array(spacings, dtype=float),
+            np.array(thicknesses, dtype=float),
+            grid,
+        )
+    return _KH_GRIDS[pipe_diameter]
+
+
+def _axis_weights(axis, values):
+    """Indeks donje točke intervala i težina gornje točke za svaku vrijednost (ograničeno na raspon osi)."""
+    index = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2)
+    weight = np.clip((values - axis[index]) / (axis[index + 1] - axis[index]), 0.0, 1.0)
+    return index, weight
+
+
+def interpolate_kh_array(pipe_diameter, r_lambda, pipe_spacing, screed_thickness):
+    """
+    Vektorizirana trilinearna interpolacija KH vrijednosti za jedan promjer cijevi.
+
+    Args:
+        pipe_diameter: Promjer cijevi
+        r_lambda: Niz R_lambda vrijednosti podne obloge
+        pipe_spacing: Niz razmaka cijevi (cm)
+        screed_thickness: Niz debljina estriha (mm)
+
+    Returns:
+        NumPy niz KH vrijednosti
+    """
+    r_axis, s_axis, t_axis, grid = compile_kh_grid(pipe_diameter)
+    r_lambda, pipe_spacing, screed_thickness = np.broadcast_arrays(
+        np.asarray(r_lambda, dtype=float),
+        np.asarray(pipe_spacing, dtype=float),
+        np.asarray(screed_thickness, dtype=float),
+    )
+    ri, rw = _axis_weights(r_axis, r_lambda)
+    si, sw = _axis_weights(s_axis, pipe_spacing)
+    ti, tw = _axis_weights(t_axis, screed_thickness)
+
+    kh = np.zeros(r_lambda.shape)
+    for dr, wr in ((0, 1 - rw), (1, rw)):
+        for ds, ws in ((0, 1 - sw), (1, sw)):
+            for dt, wt in ((0, 1 - tw), (1, tw)):
+                kh += wr * ws * wt * grid[ri + dr, si + ds, ti + dt]
+    return kh
+
+
+def interpolate_kh_values(pipe_diameters, r_lambda, pipe_spacing, screed_thickness):
+    """
+    KH vrijednosti za niz petlji s različitim promjerima cijevi.
+
+    Args:
+        pipe_diameters: Lista promjera cijevi (jedan po petlji)
+        r_lambda, pipe_spacing, screed_thickness: NumPy nizovi iste duljine
+
+    Returns:
+        NumPy niz KH vrijednosti
+    """
+    kh = np.empty(len(pipe_diameters))
+    diameters = np.array(pipe_diameters, dtype=object)
+    for pipe_diameter in set(pipe_diameters):
+        mask = diameters == pipe_diameter
+        kh[mask] = interpolate_kh_array(pipe_diameter, r_lambda[mask], pipe_spacing[mask], screed_thickness[mask])
+    return kh
+
+
+def interpolate_kh(pipe_diameter, r_lambda, pipe_spacing, screed_thickness):
+    """
+    Memoizirana KH vrijednost za jednu petlju.
+
+    Args:
+        pipe_diameter: Promjer cijevi
+        r_lambda: R_lambda podne obloge
+        pipe_spacing: Razmak cijevi (cm)
+        screed_thickness: Debljina estriha (mm)
+
+    Returns:
+        KH vrijednost kao float
+    """
+    key = (resolve_pipe_diameter(pipe_diameter), float(r_lambda), float(pipe_spacing), float(screed_thickness))
+    if key not in _KH_CACHE:
+        _KH_CACHE[key] = float(interpolate_kh_array(*key))
+    return _KH_CACHE[key]
@@ -0,0 +1,312 @@
+"""
+Assignment of floor heating circuits to manifolds.
+
+A loop takes one manifold port per circuit: the design split (recommended_loops) or
+the split stored by the spacing optimizer, whichever is larger. Loops are packed into
+manifolds floor by floor: the ports of a manifold are at most the largest port count of
+MANIFOLD_TYPES, a loop may only be connected to a manifold within
+MAX_MANIFOLD_DISTANCE, and the cost to minimise is the supply and return pipe of every
+manifold used plus a fixed cost per manifold plus the leads of every circuit.
+
+The existing manifolds of a floor are the candidate locations. When both a loop and a
+manifold have a "position" ([x, y] in metres, optional inputs in the building and loops
+tabs) the lead length is their rectilinear distance; otherwise all manifolds of the
+floor are taken as one manifold station and the loop keeps its entered
+manifold_distance, which MAX_MANIFOLD_DISTANCE then limits. Additional manifolds are opened at an
+existing location when the ports there run out.
+
+The packing is a first-fit decreasing heuristic (least flexible, widest and farthest
+loops first) followed by local improvement: emptying lightly loaded manifolds, relocating
+single loops and swapping pairs of loops between manifolds.
+"""
+
+import numpy as np
+from modules.thermal.heating.floor_heating.constants import *
+from modules.thermal.heating.floor_heating.batch_calculator import loop_circuits
+
+# Cost of one additional manifold expressed in metres of pipe
+MANIFOLD_EQUIVALENT_LENGTH = 10.0
+
+# Limit of local improvement passes
+IMPROVEMENT_PASSES = 50
+
+# Largest number of ports on one manifold
+MAX_PORTS = max(t["max_loops"] for t in MANIFOLD_TYPES.values())
+
+_EPSILON = 1e-9
+
+
+def manifold_type_for_ports(ports):
+    """Smallest manifold type (key of MANIFOLD_TYPES) with at least the given number of ports."""
+    fitting = [(t["max_loops"], key) for key, t in MANIFOLD_TYPES.items() if t["max_loops"] >= ports]
+    return min(fitting)[1] if fitting else max((t["max_loops"], key) for key, t in MANIFOLD_TYPES.items())[1]
+
+
+def _position(item):
+    """Position [x, y] of a loop or manifold, or (nan, nan) when not set."""
+    position = item.get("position")
+    if not position or len(position) < 2 or position[0] is None or position[1] is None:
+        return (np.nan, np.nan)
+    return (float(position[0]), float(position[1]))
+
+
+def pack_floor(floor):
+    """
+    Packs the loops and manifolds of one floor.
+
+    Returns (sites, loops, distances): per-manifold metadata with the cost of opening a
+    manifold at that location, per-loop metadata with the ports of every loop and the
+    lead length matrix (loops × sites).
+    """
+    sites = {"manifold_id": [], "name": [], "position": [], "opening_cost": []}
+    loops = {"manifold_id": [], "loop_id": [], "room_name": [], "site": [], "position": [], "distance": [],
+             "ports": []}
+
+    for index, manifold in enumerate(floor.get("manifolds", [])):
+        sites["manifold_id"].append(manifold.get("id"))
+        sites["name"].append(manifold.get("name", f"Razdjelnik {manifold.get('id')}"))
+        sites["position"].append(_position(manifold))
+        sites["opening_cost"].append(
+            manifold.get("supply_pipe_length", 5.0) + manifold.get("return_pipe_length", 5.0)
+            + MANIFOLD_EQUIVALENT_LENGTH
+        )
+        for loop in manifold.get("loops", []):
+            loops["manifold_id"].append(manifold.get("id"))
+            loops["loop_id"].append(loop.get("id"))
+            loops["room_name"].append(loop.get("room_name", ""))
+            loops["site"].append(index)
+            loops["position"].append(_position(loop))
+            loops["distance"].append(float(loop.get("manifold_distance") or 0.0))
+            design = loop.get("results") or {}
+            loops["ports"].append(max(int(design.get("recommended_loops") or 1),
+                                      loop_circuits(loop, manifold.get("pipe_diameter"))))
+
+    site_xy = np.array(sites["position"], dtype=float).reshape(-1, 2)
+    loop_xy = np.array(loops["position"], dtype=float).reshape(-1, 2)
+    rectilinear = np.abs(loop_xy[:, None, :] - site_xy[None, :, :]).sum(axis=2)
+    fallback = np.array(loops["distance"], dtype=float)[:, None]
+    distances = np.where(np.isfinite(rectilinear), rectilinear, fallback)
+
+    sites["opening_cost"] = np.array(sites["opening_cost"], dtype=float)
+    loops["site"] = np.array(loops["site"], dtype=int)
+    loops["ports"] = np.array(loops["ports"], dtype=int)
+    return sites, loops, distances
+
+
+def _loop_ports(ports, n_loops):
+    """Ports of every loop, one per loop when not given."""
+    return np.ones(n_loops, dtype=int) if ports is None else np.asarray(ports, dtype=int)
+
+
+def assignment_cost(unit_site, assign, distances, opening_cost, ports=None):
+    """Total cost: opening cost of every used manifold plus supply and return lead of every circuit."""
+    if not len(assign):
+        return 0.0
+    ports = _loop_ports(ports, len(assign))
+    used = np.unique(assign)
+    leads = 2 * (ports * distances[np.arange(len(assign)), np.asarray(unit_site)[assign]]).sum()
+    return float(opening_cost[np.asarray(unit_site)[used]].sum() + leads)
+
+
+def first_fit_decreasing(distances, feasible, opening_cost, capacity, ports=None):
+    """
+    Initial packing: least flexible, widest and farthest loops first, each into the nearest
+    open manifold with enough free ports, otherwise into a new manifold at the cheapest location.
+
+    Returns (unit_site, assign): location of every opened manifold and manifold of every loop.
+    """
+    n_loops = distances.shape[0]
+    ports = _loop_ports(ports, n_loops)
+    options = feasible.sum(axis=1)
+    nearest = np.where(feasible, distances, np.inf).min(axis=1)
+    order = np.lexsort((-nearest, -ports, options))
+
+    unit_site, unit_load = [], []
+    assign = np.full(n_loops, -1, dtype=int)
+    for i in order.tolist():
+        best, best_key = None, None
+        for unit, site in enumerate(unit_site):
+            if unit_load[unit] + ports[i] > capacity or not feasible[i, site]:
+                continue
+            key = (distances[i, site], -unit_load[unit])
+            if best_key is None or key < best_key:
+                best, best_key = unit, key
+        if best is None:
+            # A loop wider than a manifold still gets a manifold of its own
+            site = int(np.argmin(np.where(feasible[i], 2 * ports[i] * distances[i] + opening_cost, np.inf)))
+            unit_site.append(site)
+            unit_load.append(0)
+            best = len(unit_site) - 1
+        assign[i] = best
+        unit_load[best] += int(ports[i])
+    return unit_site, assign
+
+
+def improve(unit_site, assign, distances, feasible, opening_cost, capacity, ports=None):
+    """Local improvement of a packing by emptying manifolds, relocating and swapping loops."""
+    unit_site = np.array(unit_site, dtype=int)
+    assign = assign.copy()
+    rows = np.arange(len(assign))
+    ports = _loop_ports(ports, len(assign))
+    leads = ports[:, None] * distances
+
+    for _ in range(IMPROVEMENT_PASSES):
+        improved = False
+        load = np.bincount(assign, weights=ports, minlength=len(unit_site)).astype(int)
+
+        # Empty the lightest manifolds into the others when that saves its opening cost
+        for unit in np.argsort(load, kind="stable").tolist():
+            members = np.flatnonzero(assign == unit)
+            if not len(members):
+                continue
+            free = capacity - load
+            free[unit] = 0
+            targets, added = {}, 0.0
+            for i in members.tolist():
+                candidates = [u for u in range(len(unit_site)) if free[u] >= ports[i] and load[u] > 0
+                              and feasible[i, unit_site[u]]]
+                if not candidates:
+                    break
+                target = min(candidates, key=lambda u: distances[i, unit_site[u]])
+                targets[i] = target
+                free[target] -= ports[i]
+                added += 2 * (leads[i, unit_site[target]] - leads[i, unit_site[unit]])
+            if len(targets) == len(members) and added - opening_cost[unit_site[unit]] < -_EPSILON:
+                for i, target in targets.items():
+                    assign[i] = target
+                load = np.bincount(assign, weights=ports, minlength=len(unit_site)).astype(int)
+                improved = True
+
+        # Relocate single loops to a nearer manifold with enough free ports
+        current = leads[rows, unit_site[assign]]
+        for i in np.argsort(-current, kind="stable").tolist():
+            site_distance = distances[i, unit_site]
+            open_units = (load > 0) & (load + ports[i] <= capacity) & feasible[i, unit_site]
+            open_units[assign[i]] = False
+            if not open_units.any():
+                continue
+            target = int(np.argmin(np.where(open_units, site_distance, np.inf)))
+            if site_distance[target] < site_distance[assign[i]] - _EPSILON:
+                load[assign[i]] -= ports[i]
+                load[target] += ports[i]
+                assign[i] = target
+                improved = True
+
+        # Swap pairs of loops while the best swap shortens the leads and both manifolds keep enough ports
+        for _ in range(len(assign)):
+            site = unit_site[assign]
+            current = leads[rows, site]
+            crossed = leads[:, site]  # crossed[a, b]: leads of loop a at the manifold of loop b
+            gain = current[:, None] + current[None, :] - crossed - crossed.T
+            fits = load[assign][:, None] - ports[:, None] + ports[None, :] <= capacity  # b in place of a
+            allowed = (feasible[:, site] & feasible[:, site].T & (assign[:, None] != assign[None, :])
+                       & fits & fits.T)
+            gain = np.where(allowed, gain, -np.inf)
+            a, b = np.unravel_index(int(np.argmax(gain)), gain.shape)
+            if not gain[a, b] > _EPSILON:
+                break
+            load[assign[a]] += ports[b] - ports[a]
+            load[assign[b]] += ports[a] - ports[b]
+            assign[a], assign[b] = assign[b], assign[a]
+            improved = True
+
+        if not improved:
+            break
+
+    # Drop manifolds left without circuits
+    used = np.unique(assign)
+    renumber = np.full(len(unit_site), -1, dtype=int)
+    renumber[used] = np.arange(len(used))
+    return unit_site[used].tolist(), renumber[assign]
+
+
+def assign_floor(floor, max_distance=MAX_MANIFOLD_DISTANCE, capacity=MAX_PORTS):
+    """
+    Packs the circuits of one floor into manifolds.
+
+    Args:
+        floor: Floor data with its manifolds and loops
+        max_distance: Largest lead length of a circuit (m)
+        capacity: Largest number of ports on one manifold
+
+    Returns:
+        Dict with the new manifolds (location, type, ports and loops), the manifolds
+        that are no longer needed and the cost before and after the assignment
+    """
+    sites, loops, distances = pack_floor(floor)
+    n_loops = len(loops["loop_id"])
+    if not n_loops:
+        return None
+
+    # Circuits out of reach of every manifold may only go to their nearest location
+    too_far = distances > max_distance + _EPSILON
+    feasible = ~too_far
+    unreachable = ~feasible.any(axis=1)
+    feasible[unreachable] = distances[unreachable] <= distances[unreachable].min(axis=1, keepdims=True) + _EPSILON
+    opening_cost = sites["opening_cost"]
+    ports = loops["ports"]
+    unit_site, assign = first_fit_decreasing(distances, feasible, opening_cost, capacity, ports)
+    unit_site, assign = improve(unit_site, assign, distances, feasible, opening_cost, capacity, ports)
+
+    # Current state as a packing (one manifold per location)
+    current_sites = sorted(set(loops["site"].tolist()))
+    current_unit = np.searchsorted(current_sites, loops["site"])
+    cost_before = assignment_cost(current_sites, current_unit, distances, opening_cost, ports)
+    cost_after = assignment_cost(unit_site, assign, distances, opening_cost, ports)
+
+    # First manifold at a location keeps the existing manifold, further ones are new
+    kept = set()
+    manifolds = []
+    for unit, site in enumerate(unit_site):
+        members = np.flatnonzero(assign == unit).tolist()
+        unit_ports = int(ports[members].sum())
+        manifold_id = sites["manifold_id"][site] if site not in kept else None
+        kept.add(site)
+        manifolds.append({
+            "site_manifold_id": sites["manifold_id"][site],
+            "manifold_id": manifold_id,
+            "name": sites["name"][site] if manifold_id is not None else None,
+            "ports": unit_ports,
+            "type": manifold_type_for_ports(unit_ports),
+            "lead_length": float(2 * (ports[members] * distances[members, site]).sum()),
+            "loops": [{
+                "source_manifold_id": loops["manifold_id"][i],
+                "loop_id": loops["loop_id"][i],
+                "room_name": loops["room_name"][i],
+                "ports": int(ports[i]),
+                "distance": float(distances[i, site]),
+                "moved": loops["site"][i] != site,
+                "too_far": bool(too_far[i, site]),
+            } for i in members],
+        })
+
+    return {
+        "floor_id": floor.get("id"),
+        "floor_name": floor.get("name", ""),
+        "manifolds": manifolds,
+        "closed_manifold_ids": [sites["manifold_id"][s] for s in current_sites if s not in kept],
+        "cost_before": cost_before,
+        "cost_after": cost_after,
+    }
+
+
+def assign_circuits(data, max_distance=MAX_MANIFOLD_DISTANCE):
+    """
+    Packs the circuits of every floor into manifolds.
+
+    Args:
+        data: Floor heating data structure
+        max_distance: Largest lead length of a circuit (m)
+
+    Returns:
+        Dict with a "floors" list (see assign_floor) and building totals
+    """
+    floors = [result for result in (assign_floor(floor, max_distance)
+                                    for floor in data.get("building", {}).get("floors", [])) if result]
+    return {
+        "floors": floors,
+        "manifold_count": sum(len(floor["manifolds"]) for floor in floors),
+        "cost_before": sum(floor["cost_before"] for floor in floors),
+        "cost_after": sum(floor["cost_after"] for floor in floors),
+        "too_far": sum(loop["too_far"] for floor in floors for m in floor["manifolds"] for loop in m["loops"]),
+    }
@@ -0,0 +1,187 @@
+"""
+Pipe spacing and loop split optimizer.
+
+For every room all candidate combinations of pipe spacing (PIPE_SPACINGS), floor
+covering (FLOOR_COVERINGS) and screed thickness (SCREED_THICKNESSES) are evaluated
+together as one flat array. By default only the spacing is free and the room keeps its
+covering and the floor keeps its screed. A candidate is feasible when, at the manifold
+supply temperature, it delivers the required load without exceeding the floor surface
+temperature limit. Among feasible candidates the one with the lowest pipe length plus
+weighted circuit pressure drop is chosen. Each room is split into the fewest circuits
+that keep every circuit (including its leads to the manifold) under the
+PIPE_DATA[...]["max_length"] limit.
+"""
+
+import numpy as np
+from modules.thermal.heating.floor_heating.constants import *
+from modules.thermal.heating.floor_heating.kh_interpolation import interpolate_kh_values
+from modules.thermal.heating.floor_heating.batch_calculator import (
+    BatchLoopCalculator, mean_heating_excess_temperature, circuit_length as split_circuit_length,
+    _inner_diameter, _max_pipe_length
+)
+from modules.thermal.heating.floor_heating.supply_temperature import required_load
+
+# Weight of the circuit pressure drop in the objective (metres of pipe per kPa)
+PRESSURE_DROP_WEIGHT = 1.0
+
+# Largest number of circuits a single room may be split into
+MAX_CIRCUITS_PER_ROOM = 12
+
+
+def pack_rooms(data):
+    """Packs all loops with an area and a required load into per-loop lists and arrays."""
+    rooms = {"floor_id": [], "manifold_id": [], "loop_id": [], "room_name": [], "area": [], "load": [],
+             "room_temperature": [], "r_lambda": [], "screed_thickness": [], "manifold_distance": [],
+             "flow_temperature": [], "delta_t": [], "pipe_diameter": []}
+
+    for floor in data.get("building", {}).get("floors", []):
+        for manifold in floor.get("manifolds", []):
+            for loop in manifold.get("loops", []):
+                load = required_load(loop)
+                area = loop.get("area")
+                if not area or area <= 0 or not load or load <= 0:
+                    continue
+                rooms["floor_id"].append(floor.get("id"))
+                rooms["manifold_id"].append(manifold.get("id"))
+                rooms["loop_id"].append(loop.get("id"))
+                rooms["room_name"].append(loop.get("room_name", ""))
+                rooms["area"].append(float(area))
+                rooms["load"].append(float(load))
+                rooms["room_temperature"].append(float(loop.get("room_temperature", 20)))
+                rooms["r_lambda"].append(float(loop.get("r_lambda", 0.0)))
+                rooms["screed_thickness"].append(float(floor.get("screed_thickness", 45)))
+                rooms["manifold_distance"].append(float(loop.get("manifold_distance") or 0.0))
+                rooms["flow_temperature"].append(float(manifold.get("flow_temperature", 35)))
+                rooms["delta_t"].append(float(manifold.get("delta_t", 5)))
+                rooms["pipe_diameter"].append(manifold.get("pipe_diameter", "16x2,0"))
+
+    for key in ("area", "load", "room_temperature", "r_lambda", "screed_thickness", "manifold_distance",
+                "flow_temperature", "delta_t"):
+        rooms[key] = np.array(rooms[key], dtype=float)
+    return rooms
+
+
+def candidate_grid(rooms, vary_covering=False, vary_screed=False):
+    """
+    Builds the flat candidate grid (room × spacing × covering × screed).
+
+    Returns a dict of flat arrays with the room index and candidate parameters.
+    """
+    n_rooms = len(rooms["area"])
+    spacings = np.array(PIPE_SPACINGS, dtype=float)
+    coverings = np.array([c["r_lambda"] for c in FLOOR_COVERINGS], dtype=float) if vary_covering else None
+    screeds = np.array(SCREED_THICKNESSES, dtype=float) if vary_screed else None
+
+    n_coverings = len(coverings) if vary_covering else 1
+    n_screeds = len(screeds) if vary_screed else 1
+    room, spacing, covering, screed = np.meshgrid(
+        np.arange(n_rooms), np.arange(len(spacings)), np.arange(n_coverings), np.arange(n_screeds), indexing="ij"
+    )
+    room = room.ravel()
+    return {
+        "room": room,
+        "pipe_spacing": spacings[spacing.ravel()],
+        "r_lambda": coverings[covering.ravel()] if vary_covering else rooms["r_lambda"][room],
+        "screed_thickness": screeds[screed.ravel()] if vary_screed else rooms["screed_thickness"][room],
+    }
+
+
+def split_circuits(area, pipe_spacing, manifold_distance, max_length):
+    """Fewest circuits so that each circuit (its share of the coil plus both leads) stays under max_length."""
+    coil_length = area / (pipe_spacing / 100)
+    available = max_length - 2 * manifold_distance
+    with np.errstate(divide="ignore", invalid="ignore"):
+        circuits = np.where(available > 0, np.ceil(coil_length / available), MAX_CIRCUITS_PER_ROOM)
+    return np.clip(circuits, 1, MAX_CIRCUITS_PER_ROOM).astype(int), coil_length
+
+
+def optimize_spacing(data, vary_covering=False, vary_screed=False):
+    """
+    Chooses pipe spacing (and optionally covering and screed) and the circuit split for every room.
+
+    Args:
+        data: Floor heating data structure
+        vary_covering: Also search the floor coverings
+        vary_screed: Also search the screed thicknesses
+
+    Returns:
+        List of per-room dicts with the chosen parameters, circuits and their lengths,
+        pressure drop, heat flux, surface temperature and status
+    """
+    rooms = pack_rooms(data)
+    if not len(rooms["area"]):
+        return []
+
+    grid = candidate_grid(rooms, vary_covering, vary_screed)
+    room = grid["room"]
+    pipe_diameters = [rooms["pipe_diameter"][i] for i in room.tolist()]
+    area = rooms["area"][room]
+    room_temperature = rooms["room_temperature"][room]
+    flow_temperature = rooms["flow_temperature"][room]
+    delta_t = rooms["delta_t"][room]
+    manifold_distance = rooms["manifold_distance"][room]
+
+    # Heat flux of every candidate at the manifold supply temperature
+    kh = interpolate_kh_values(pipe_diameters, grid["r_lambda"], grid["pipe_spacing"], grid["screed_thickness"])
+    heat_flux = kh * mean_heating_excess_temperature(flow_temperature, flow_temperature - delta_t, room_temperature)
+    required_flux = rooms["load"][room] / area
+    max_floor_temp = np.array([MAX_FLOOR_TEMP.get(t, 29) for t in rooms["room_temperature"].tolist()])[room]
+    max_flux = ALPHA_I * (max_floor_temp - room_temperature)
+
+    # Circuit split and per-circuit hydraulics
+    max_length = np.array([_max_pipe_length(d) for d in rooms["pipe_diameter"]], dtype=float)[room]
+    circuits, coil_length = split_circuits(area, grid["pipe_spacing"], manifold_distance, max_length)
+    circuit_length = split_circuit_length(area, grid["pipe_spacing"], manifold_distance, circuits)
+    total_length = coil_length + circuits * 2 * manifold_distance
+    with np.errstate(divide="ignore", invalid="ignore"):
+        circuit_flow = np.where(delta_t > 0, heat_flux * area / circuits * 3600 / (SPECIFIC_HEAT_WATER * delta_t), 0.0)
+    inner_diameter = np.array([_inner_diameter(d) for d in rooms["pipe_diameter"]], dtype=float)[room]
+    pressure_drop = BatchLoopCalculator.pressure_drops(
+        circuit_flow, inner_diameter, circuit_length, flow_temperature - delta_t / 2, grid["pipe_spacing"]
+    )["pressure_drop_total"]
+
+    # Feasible candidates minimise length and pressure drop; otherwise the smallest violation
+    feasible = (heat_flux >= required_flux) & (heat_flux <= max_flux) & (circuit_length <= max_length)
+    violation = (np.maximum(required_flux - heat_flux, 0) + np.maximum(heat_flux - max_flux, 0)
+                 + np.maximum(circuit_length - max_length, 0))
+    cost = np.where(feasible, total_length + PRESSURE_DROP_WEIGHT * pressure_drop, np.inf)
+
+    n_rooms = len(rooms["area"])
+    order = np.lexsort((cost, room))  # grouped by room, best cost first
+    starts = np.searchsorted(room[order], np.arange(n_rooms))
+    best = order[starts]
+    any_feasible = np.zeros(n_rooms, dtype=bool)
+    np.logical_or.at(any_feasible, room, feasible)
+    fallback_order = np.lexsort((violation, room))
+    best = np.where(any_feasible, best, fallback_order[starts])
+
+    coverings = {c["r_lambda"]: c["name"] for c in FLOOR_COVERINGS}
+    results = []
+    for i, candidate in enumerate(best.tolist()):
+        if any_feasible[i]:
+            status = "ok"
+        elif heat_flux[candidate] < required_flux[candidate]:
+            status = "insufficient"
+        elif heat_flux[candidate] > max_flux[candidate]:
+            status = "surface_limit"
+        else:
+            status = "too_long"
+        results.append({
+            "floor_id": rooms["floor_id"][i],
+            "manifold_id": rooms["manifold_id"][i],
+            "loop_id": rooms["loop_id"][i],
+            "room_name": rooms["room_name"][i],
+            "pipe_spacing": int(grid["pipe_spacing"][candidate]),
+            "r_lambda": float(grid["r_lambda"][candidate]),
+            "floor_covering_name": coverings.get(float(grid["r_lambda"][candidate])),
+            "screed_thickness": int(grid["screed_thickness"][candidate]),
+            "circuits": int(circuits[candidate]),
+            "circuit_length": float(circuit_length[candidate]),
+            "total_length": float(total_length[candidate]),
+            "pressure_drop": float(pressure_drop[candidate]),
+            "heat_flux": float(heat_flux[candidate]),
+            "required_flux": float(required_flux[candidate]),
+            "floor_surface_temp": float(rooms["room_temperature"][i] + heat_flux[candidate] / ALPHA_I),
+            "status": status,
+        })
+    return results
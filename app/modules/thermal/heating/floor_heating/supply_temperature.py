@@ -0,0 +1,215 @@
+"""
+Minimum supply temperature of the floor heating system.
+
+For every loop and every available pipe spacing the lowest supply temperature at which
+the loop still delivers its required heat flux is found by bisection on the heat flux
+model of the batch calculator (KH × log-mean excess temperature). All loops and spacings
+are bisected together as one array. The supply temperature of a manifold is the highest
+loop minimum on it, and the building temperature is the highest manifold temperature.
+At the chosen temperature every loop gets the widest spacing that still meets its load.
+
+The required load of a loop is its "required_load" (W) when set, otherwise the heat load
+of its current results. The heat flux is capped by the floor surface temperature limit
+(MAX_FLOOR_TEMP), so loops whose load exceeds that limit are reported as surface limited.
+"""
+
+import math
+import numpy as np
+from modules.thermal.heating.floor_heating.constants import *
+from modules.thermal.heating.floor_heating.kh_interpolation import interpolate_kh_values
+from modules.thermal.heating.floor_heating.batch_calculator import mean_heating_excess_temperature
+
+# Bisection settings
+BISECTION_ITERATIONS = 40
+MIN_RETURN_EXCESS = 1e-3  # Return temperature must stay above room temperature (°C)
+
+# Spacings searched by the solver (cm), densest first
+SOLVER_SPACINGS = np.array(sorted(PIPE_SPACINGS), dtype=float)
+
+
+def required_load(loop):
+    """Required heat load of a loop (W): the set requirement or the current calculated load."""
+    load = loop.get("required_load")
+    if load is None:
+        load = (loop.get("results") or {}).get("heat_load")
+    return load
+
+
+def pack_requirements(data):
+    """
+    Packs all loops with an area and a required load into arrays.
+
+    Returns (manifolds, loops): per-manifold metadata lists and per-loop arrays with
+    the manifold index of each loop.
+    """
+    manifolds = {"floor_id": [], "manifold_id": [], "name": [], "delta_t": []}
+    loops = {"manifold": [], "loop_id": [], "room_name": [], "area": [], "load": [], "room_temperature": [],
+             "r_lambda": [], "screed_thickness": [], "pipe_diameter": [], "pipe_spacing": []}
+
+    for floor in data.get("building", {}).get("floors", []):
+        for manifold in floor.get("manifolds", []):
+            index = len(manifolds["manifold_id"])
+            manifolds["floor_id"].append(floor.get("id"))
+            manifolds["manifold_id"].append(manifold.get("id"))
+            manifolds["name"].append(manifold.get("name", f"Razdjelnik {manifold.get('id')}"))
+            manifolds["delta_t"].append(float(manifold.get("delta_t", 5)))
+
+            for loop in manifold.get("loops", []):
+                load = required_load(loop)
+                area = loop.get("area")
+                if not area or area <= 0 or not load or load <= 0:
+                    continue
+                loops["manifold"].append(index)
+                loops["loop_id"].append(loop.get("id"))
+                loops["room_name"].append(loop.get("room_name", ""))
+                loops["area"].append(float(area))
+                loops["load"].append(float(load))
+                loops["room_temperature"].append(float(loop.get("room_temperature", 20)))
+                loops["r_lambda"].append(float(loop.get("r_lambda", 0.0)))
+                loops["screed_thickness"].append(float(floor.get("screed_thickness", 45)))
+                loops["pipe_diameter"].append(manifold.get("pipe_diameter", "16x2,0"))
+                loops["pipe_spacing"].append(loop.get("pipe_spacing"))
+
+    for key in ("area", "load", "room_temperature", "r_lambda", "screed_thickness"):
+        loops[key] = np.array(loops[key], dtype=float)
+    loops["manifold"] = np.array(loops["manifold"], dtype=int)
+    manifolds["delta_t"] = np.array(manifolds["delta_t"], dtype=float)
+    return manifolds, loops
+
+
+def minimum_supply_temperatures(kh, target_flux, delta_t, room_temperature, upper=None,
+                                iterations=BISECTION_ITERATIONS):
+    """
+    Lowest supply temperature giving the target heat flux, by vectorized bisection.
+
+    Args:
+        kh: KH values (any shape)
+        target_flux: Required heat flux (W/m²), broadcastable to kh
+        delta_t: Supply/return temperature difference (°C), broadcastable to kh
+        room_temperature: Room temperature (°C), broadcastable to kh
+        upper: Highest supply temperature considered (default max(FLOW_TEMPERATURES))
+        iterations: Number of bisection steps
+
+    Returns:
+        Array of supply temperatures (°C); inf where the flux cannot be reached below upper
+    """
+    if upper is None:
+        upper = max(FLOW_TEMPERATURES)
+    kh, target_flux, delta_t, room_temperature = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (kh, target_flux, delta_t, room_temperature))
+    )
+
+    def flux(supply):
+        return kh * mean_heating_excess_temperature(supply, supply - delta_t, room_temperature)
+
+    low = room_temperature + delta_t + MIN_RETURN_EXCESS
+    high = np.maximum(np.full(kh.shape, float(upper)), low)
+    reachable = flux(high) >= target_flux
+
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        enough = flux(middle) >= target_flux
+        high = np.where(enough, middle, high)
+        low = np.where(enough, low, middle)
+
+    return np.where(reachable, high, np.inf)
+
+
+def recommended_supply_temperature(temperature):
+    """Lowest available supply temperature (FLOW_TEMPERATURES) not below the required one."""
+    if not math.isfinite(temperature):
+        return max(FLOW_TEMPERATURES)
+    candidates = [t for t in sorted(FLOW_TEMPERATURES) if t >= temperature - 1e-9]
+    return candidates[0] if candidates else max(FLOW_TEMPERATURES)
+
+
+def solve_supply_temperatures(data):
+    """
+    Finds the minimum supply temperature per manifold and for the building, with the
+    matching pipe spacing of every loop.
+
+    Args:
+        data: Floor heating data structure
+
+    Returns:
+        Dict with a "manifolds" list (required and recommended supply temperature,
+        limiting loop and per-loop spacing choices) and a "building" dict
+    """
+    manifolds, loops = pack_requirements(data)
+    n_manifolds = len(manifolds["manifold_id"])
+    owner = loops["manifold"]
+    n_loops = len(owner)
+
+    # Required flux, capped by the surface temperature limit
+    room_temperature = loops["room_temperature"]
+    required_flux = loops["load"] / loops["area"] if n_loops else np.zeros(0)
+    max_floor_temp = np.array([MAX_FLOOR_TEMP.get(t, 29) for t in room_temperature.tolist()], dtype=float)
+    max_flux = ALPHA_I * (max_floor_temp - room_temperature)
+    target_flux = np.minimum(required_flux, max_flux)
+
+    # KH for every loop and spacing, then one bisection over the whole (loops × spacings) grid
+    kh = np.empty((n_loops, len(SOLVER_SPACINGS)))
+    for column, spacing in enumerate(SOLVER_SPACINGS):
+        kh[:, column] = interpolate_kh_values(
+            loops["pipe_diameter"], loops["r_lambda"], np.full(n_loops, spacing), loops["screed_thickness"]
+        )
+    delta_t = manifolds["delta_t"][owner]
+    minimum = minimum_supply_temperatures(kh, target_flux[:, None], delta_t[:, None], room_temperature[:, None])
+
+    # Loop minimum (densest useful spacing) and manifold maximum
+    loop_minimum = minimum.min(axis=1) if n_loops else np.zeros(0)
+    upper = float(max(FLOW_TEMPERATURES))
+    manifold_required = np.full(n_manifolds, -np.inf)
+    np.maximum.at(manifold_required, owner, np.where(np.isfinite(loop_minimum), loop_minimum, upper))
+    manifold_recommended = [
+        recommended_supply_temperature(t) if np.isfinite(t) else None for t in manifold_required.tolist()
+    ]
+
+    # Widest spacing that meets the load at the recommended manifold temperature
+    supply = np.array([manifold_recommended[i] or upper for i in owner.tolist()], dtype=float)
+    meets = minimum <= supply[:, None] + 1e-9
+    widest = np.where(meets.any(axis=1), len(SOLVER_SPACINGS) - 1 - np.argmax(meets[:, ::-1], axis=1), 0)
+    chosen_spacing = SOLVER_SPACINGS[widest] if n_loops else np.zeros(0)
+    # A loop capped by the surface temperature limit is solved for the capped flux but
+    # still leaves the room under-supplied, so it is not feasible
+    surface_limited = required_flux > max_flux
+    solved = np.isfinite(loop_minimum)
+    feasible = solved & ~surface_limited
+
+    rows = {
+        "loop_id": loops["loop_id"], "room_name": loops["room_name"],
+        "required_load": loops["load"].tolist(), "required_flux": required_flux.tolist(),
+        "max_flux": max_flux.tolist(), "surface_limited": surface_limited.tolist(), "solved": solved.tolist(),
+        "minimum_supply_temperature": [t if math.isfinite(t) else None for t in loop_minimum.tolist()],
+        "current_spacing": loops["pipe_spacing"], "pipe_spacing": [int(s) for s in chosen_spacing.tolist()],
+        "feasible": feasible.tolist(),
+    }
+    loops_by_manifold = [[] for _ in range(n_manifolds)]
+    for row, manifold_index in enumerate(owner.tolist()):
+        loops_by_manifold[manifold_index].append({key: values[row] for key, values in rows.items()})
+
+    manifold_results = []
+    for i in range(n_manifolds):
+        manifold_loops = loops_by_manifold[i]
+        limiting = max(manifold_loops, key=lambda loop: loop["minimum_supply_temperature"] or upper + 1, default=None)
+        manifold_results.append({
+            "floor_id": manifolds["floor_id"][i],
+            "manifold_id": manifolds["manifold_id"][i],
+            "name": manifolds["name"][i],
+            "required_supply_temperature": float(manifold_required[i]) if manifold_loops else None,
+            "supply_temperature": manifold_recommended[i],
+            "limiting_loop_id": limiting["loop_id"] if limiting else None,
+            "loops": manifold_loops,
+        })
+
+    solved = [m for m in manifold_results if m["required_supply_temperature"] is not None]
+    limiting_manifold = max(solved, key=lambda m: m["required_supply_temperature"], default=None)
+    return {
+        "manifolds": manifold_results,
+        "building": {
+            "required_supply_temperature": limiting_manifold["required_supply_temperature"] if limiting_manifold else None,
+            "supply_temperature": limiting_manifold["supply_temperature"] if limiting_manifold else None,
+            "limiting_manifold": (limiting_manifold["floor_id"], limiting_manifold["manifold_id"]) if limiting_manifold else None,
+            "all_feasible": all(loop["feasible"] for m in manifold_results for loop in m["loops"]),
+        },
+    }
@@ -0,0 +1,486 @@
+"""
+Modul koji sadrži testove za proračun podnog grijanja.
+"""
+
+import copy
+import math
+import unittest
+from unittest import mock
+import numpy as np
+
+from utils.hydraulics import colebrook_friction_factor, friction_factor, LAMINAR_REYNOLDS
+from ..constants import CONNECTION_PIPE_DATA, FLOW_TEMPERATURES, MANIFOLD_TYPES
+from ..kh_values import KH_VALUES
+from ..kh_interpolation import interpolate_kh, interpolate_kh_array
+from ..floor_heating_calculator_core import FloorHeatingCalculatorCore
+from ..batch_calculator import BatchLoopCalculator, RESULT_KEYS, loop_circuits, store_circuits
+from ..flow_adjuster import FlowAdjuster
+from ..supply_temperature import minimum_supply_temperatures, solve_supply_temperatures
+from ..manifold_assignment import first_fit_decreasing, assign_floor, MAX_PORTS
+from ..hydraulic_balancing import balance_building, connection_pipe, pack_building
+from ..floor_heating_data import FloorHeatingDataManager
+from ..floor_heating_index import FloorHeatingIndex
+from ..heat_loss_sync import apply_room, source_rooms
+
+
+def izradi_petlju(loop_id, area, pipe_spacing=15, manifold_distance=4.0, r_lambda=0.05, room_temperature=20):
+    """Izrađuje petlju s ulaznim podacima potrebnim za izračun."""
+    return {
+        "id": loop_id,
+        "room_name": f"Soba {loop_id}",
+        "room_temperature": room_temperature,
+        "r_lambda": r_lambda,
+        "pipe_spacing": pipe_spacing,
+        "area": area,
+        "manifold_distance": manifold_distance,
+        "results": {},
+    }
+
+
+def izradi_parametre(flow_temperature=35, delta_t=5, pipe_diameter="16×2,0", screed_thickness=45):
+    """Izrađuje parametre razdjelnika za izračun petlje."""
+    return {
+        "flow_temperature": flow_temperature,
+        "delta_t": delta_t,
+        "ΔT": delta_t,
+        "pipe_diameter": pipe_diameter,
+        "screed_thickness": screed_thickness,
+    }
+
+
+def izradi_zgradu(petlje, flow_temperature=35, delta_t=5):
+    """Izrađuje zgradu s jednom etažom i jednim razdjelnikom te izračunava zadane petlje."""
+    data = FloorHeatingDataManager(mock.Mock()).initialize_data_structure()
+    manifold = data["building"]["floors"][0]["manifolds"][0]
+    manifold.update({"flow_temperature": flow_temperature, "delta_t": delta_t, "num_circuits": len(petlje)})
+    manifold["rooms"] = [{"id": loop["id"], "name": loop["room_name"], "position": i + 1}
+                         for i, loop in enumerate(petlje)]
+    manifold["loops"] = petlje
+
+    core = FloorHeatingCalculatorCore()
+    params = izradi_parametre(flow_temperature, delta_t, manifold["pipe_diameter"])
+    for loop in petlje:
+        loop["results"] = core.calculate_single_loop(loop, params)
+    return data
+
+
+def rezultati_toplinskih_gubitaka(prostorije, kljuc="e1", naziv="Prizemlje"):
+    """Izrađuje rezultate proračuna toplinskih gubitaka s jednom etažom."""
+    return {"etaze": [{
+        "kljuc": kljuc,
+        "naziv": naziv,
+        "prostorije": {
+            p["id"]: {"id": p["id"], "naziv": p["naziv"], "povrsina": p["povrsina"], "temperatura": p["temperatura"],
+                      "grijana": p.get("grijana", True), "gubici": {"ukupno": p["gubici"]}}
+            for p in prostorije
+        },
+    }]}
+
+
+class TestSkupniIzracun(unittest.TestCase):
+    """Testovi skupnog izračuna svih petlji."""
+
+    def test_jednako_skalarnom_izracunu(self):
+        """Test da skupni izračun daje iste rezultate kao skalarni izračun petlje."""
+        core = FloorHeatingCalculatorCore()
+        entries = [
+            (izradi_petlju(1, 12.0), izradi_parametre()),
+            (izradi_petlju(2, 35.0, pipe_spacing=10, manifold_distance=12.0), izradi_parametre(pipe_diameter="14×2,0")),
+            (izradi_petlju(3, 8.5, pipe_spacing=20, r_lambda=0.07, room_temperature=24), izradi_parametre(40, 7)),
+            (izradi_petlju(4, 20.0, pipe_spacing=25, r_lambda=0.15), izradi_parametre(screed_thickness=62)),
+            (izradi_petlju(5, 60.0, pipe_spacing=10, manifold_distance=20.0), izradi_parametre(45, 10, "20×2,0")),
+        ]
+        batch = BatchLoopCalculator(core).calculate(entries)
+        self.assertGreater(batch[4]["recommended_loops"], 1)
+        for (loop, params), rezultat in zip(entries, batch):
+            skalarni = core.calculate_single_loop(loop, params)
+            for key in RESULT_KEYS:
+                self.assertAlmostEqual(rezultat[key], skalarni[key], places=9, msg=key)
+
+    def test_nepotpuna_petlja(self):
+        """Test da petlja bez površine ili udaljenosti razdjelnika nema rezultata."""
+        batch = BatchLoopCalculator(FloorHeatingCalculatorCore()).calculate([
+            (izradi_petlju(1, None), izradi_parametre()),
+            (izradi_petlju(2, 10.0, manifold_distance=None), izradi_parametre()),
+        ])
+        self.assertEqual(batch, [{}, {}])
+
+
+class TestKhInterpolacija(unittest.TestCase):
+    """Testovi interpolacije KH vrijednosti na kompiliranoj mreži."""
+
+    def test_kh_u_tockama_tablice(self):
+        """Test da interpolacija u točkama tablice vraća tabličnu vrijednost."""
+        for pipe_diameter, table in KH_VALUES.items():
+            for r_lambda, spacings in table.items():
+                for spacing, thicknesses in spacings.items():
+                    for thickness, value in thicknesses.items():
+                        self.assertAlmostEqual(interpolate_kh(pipe_diameter, r_lambda, spacing, thickness), value, places=12)
+                        self.assertAlmostEqual(
+                            float(interpolate_kh_array(pipe_diameter, r_lambda, spacing, thickness)), value, places=12
+                        )
+
+    def test_kh_izmedu_tocaka_tablice(self):
+        """Test da se KH između točaka tablice interpolira linearno i da se izvan tablice uzima rub."""
+        table = KH_VALUES["16×2,0"]
+        r_lambda = np.array([0.0, 0.025, 0.07, 0.15, 0.3])
+        spacing = np.array([10.0, 12.5, 17.0, 30.0, 35.0])
+        thickness = np.array([25.0, 47.5, 52.0, 85.0, 100.0])
+        vektorski = interpolate_kh_array("16×2,0", r_lambda, spacing, thickness)
+        for i in range(len(r_lambda)):
+            self.assertAlmostEqual(vektorski[i], interpolate_kh("16×2,0", r_lambda[i], spacing[i], thickness[i]), places=12)
+
+        # Polovište između dvije točke tablice po jednoj osi
+        self.assertAlmostEqual(interpolate_kh("16×2,0", 0.025, 15, 45), (table[0.0][15][45] + table[0.05][15][45]) / 2,
+                               places=12)
+        self.assertAlmostEqual(interpolate_kh("16×2,0", 0.05, 12.5, 45), (table[0.05][10][45] + table[0.05][15][45]) / 2,
+                               places=12)
+        # Izvan raspona tablice koristi se rubna vrijednost
+        self.assertAlmostEqual(vektorski[4], table[0.15][30][85], places=12)
+
+
+class TestHidraulika(unittest.TestCase):
+    """Testovi faktora trenja."""
+
+    def colebrook_ostatak(self, reynolds, relative_roughness, friction):
+        """Ostatak Colebrook-White jednadžbe za zadani faktor trenja."""
+        return 1 / np.sqrt(friction) + 2 * np.log10(relative_roughness / 3.7 + 2.51 / (reynolds * np.sqrt(friction)))
+
+    def test_colebrook_metode(self):
+        """Test da obje metode zadovoljavaju Colebrook-White jednadžbu i međusobno se slažu."""
+        reynolds = np.array([4000.0, 1e4, 1e5, 1e6, 1e8])
+        relative_roughness = np.array([0.0, 1e-4, 1e-3, 0.01, 0.05])
+        serghides = colebrook_friction_factor(reynolds, relative_roughness)
+        lambert_w = colebrook_friction_factor(reynolds, relative_roughness, method="lambert_w")
+        np.testing.assert_allclose(self.colebrook_ostatak(reynolds, relative_roughness, lambert_w), 0, atol=1e-9)
+        np.testing.assert_allclose(self.colebrook_ostatak(reynolds, relative_roughness, serghides), 0, atol=1e-4)
+        np.testing.assert_allclose(serghides, lambert_w, rtol=1e-4)
+
+    def test_colebrook_skalar_i_bez_strujanja(self):
+        """Test skalarnog rezultata, nultog Reynoldsovog broja i nepoznate metode."""
+        rezultat = colebrook_friction_factor(1e5, 1e-4)
+        self.assertIsInstance(rezultat, float)
+        self.assertEqual(colebrook_friction_factor(0.0, 1e-4), 0.0)
+        self.assertEqual(colebrook_friction_factor(0.0, 1e-4, method="lambert_w"), 0.0)
+        with self.assertRaises(ValueError):
+            colebrook_friction_factor(1e5, 1e-4, method="haaland")
+
+    def test_laminarno_strujanje(self):
+        """Test prijelaza s laminarnog (64/Re) na turbulentni faktor trenja."""
+        self.assertAlmostEqual(friction_factor(1000, 1e-3), 0.064)
+        self.assertAlmostEqual(friction_factor(LAMINAR_REYNOLDS, 1e-3), 64 / LAMINAR_REYNOLDS)
+        self.assertAlmostEqual(friction_factor(LAMINAR_REYNOLDS + 1, 1e-3),
+                               colebrook_friction_factor(LAMINAR_REYNOLDS + 1, 1e-3))
+        self.assertEqual(friction_factor(0, 1e-3), 0.0)
+        np.testing.assert_allclose(
+            friction_factor(np.array([1000.0, 3000.0]), 1e-3, laminar_limit=4000), [0.064, 64 / 3000]
+        )
+
+
+class TestBalansiranje(unittest.TestCase):
+    """Testovi hidrauličkog balansiranja razdjelnika."""
+
+    def test_balansiranje_po_krugu(self):
+        """Test da se preduga petlja balansira po krugovima s jednakim dijelom protoka."""
+        data = izradi_zgradu([izradi_petlju(1, 12.0), izradi_petlju(2, 40.0, pipe_spacing=10, manifold_distance=20.0)])
+        duga = data["building"]["floors"][0]["manifolds"][0]["loops"][1]["results"]
+        self.assertGreater(duga["recommended_loops"], 1)
+
+        rezultat = balance_building(data)
+        razdjelnik = rezultat["manifolds"][0]
+        petlje = {loop["loop_id"]: loop for loop in razdjelnik["loops"]}
+        self.assertEqual(petlje[2]["circuits"], duga["recommended_loops"])
+        self.assertAlmostEqual(petlje[2]["flow_kg_h"], duga["flow_rate_kg_h"] / duga["recommended_loops"], places=9)
+        self.assertLess(petlje[2]["loop_pressure_drop"], duga["pressure_drop"])
+        ukupno = sum(loop["results"]["flow_rate_kg_h"] for loop in data["building"]["floors"][0]["manifolds"][0]["loops"])
+        self.assertAlmostEqual(razdjelnik["flow_kg_h"], ukupno, places=6)
+        self.assertLess(rezultat["pump"]["head_m"], 10)
+
+    def test_podeseni_rezultati_nakon_ponovnog_izracuna(self):
+        """Test da ponovni izračun petlje briše podešene rezultate, pa balansiranje koristi nove rezultate."""
+        data = izradi_zgradu([izradi_petlju(1, 12.0)])
+        manifold = data["building"]["floors"][0]["manifolds"][0]
+        loop = manifold["loops"][0]
+        params = izradi_parametre(manifold["flow_temperature"], manifold["delta_t"], manifold["pipe_diameter"])
+        loop["adjusted_results"] = FlowAdjuster.adjust_flow_by_percentage(loop, params, 30)
+        podeseni_protok = balance_building(data)["manifolds"][0]["flow_kg_h"]
+        self.assertAlmostEqual(podeseni_protok, loop["adjusted_results"]["flow_rate_kg_h"], places=6)
+
+        data_manager = FloorHeatingDataManager(mock.Mock())
+        # Isti rezultati (npr. ponovni izračun nakon učitavanja) zadržavaju podešavanje
+        data_manager.store_loop_results(loop, dict(loop["results"]))
+        self.assertTrue(loop["adjusted_results"])
+
+        loop["area"] = 18.0
+        data_manager.store_loop_results(loop, FloorHeatingCalculatorCore().calculate_single_loop(loop, params))
+        self.assertEqual(loop["adjusted_results"], {})
+        razdjelnik = balance_building(data)["manifolds"][0]
+        self.assertAlmostEqual(razdjelnik["flow_kg_h"], loop["results"]["flow_rate_kg_h"], places=6)
+
+    def test_preporuceni_krugovi(self):
+        """Test da se zapamćena podjela na krugove zanemaruje nakon promjene ulaznih podataka petlje."""
+        data = izradi_zgradu([izradi_petlju(1, 12.0, manifold_distance=6.0)])
+        manifold = data["building"]["floors"][0]["manifolds"][0]
+        loop = manifold["loops"][0]
+        store_circuits(loop, 2, manifold["pipe_diameter"])
+
+        _, petlje = pack_building(data)
+        self.assertEqual(petlje["circuits"].tolist(), [2])
+        # Svaki krug ima svoj dio zavojnice i oba priključka (kao u optimizaciji razmaka)
+        self.assertAlmostEqual(petlje["circuit_length"][0], 12.0 / 0.15 / 2 + 2 * 6.0, places=9)
+        self.assertAlmostEqual(petlje["flow_kg_h"][0], loop["results"]["flow_rate_kg_h"] / 2, places=9)
+
+        self.assertEqual(loop_circuits(loop, "20×2,0"), 1)
+        loop["area"] = 14.0
+        self.assertEqual(loop_circuits(loop, manifold["pipe_diameter"]), 1)
+        self.assertEqual(pack_building(data)[1]["circuits"].tolist(), [1])
+
+    def test_spojne_cijevi(self):
+        """Test zadanog promjera spojnih cijevi i greške za nepoznati promjer."""
+        data = FloorHeatingDataManager(mock.Mock()).initialize_data_structure()
+        manifold = data["building"]["floors"][0]["manifolds"][0]
+        self.assertIs(connection_pipe(manifold), CONNECTION_PIPE_DATA[manifold["supply_pipe_diameter"]])
+        manifold["supply_pipe_diameter"] = "99×9,9"
+        with self.assertRaises(ValueError):
+            connection_pipe(manifold)
+
+
+class TestTemperaturaPolaza(unittest.TestCase):
+    """Testovi minimalne temperature polaza."""
+
+    def test_minimalna_temperatura_polaza(self):
+        """Test da bisekcija pronalazi temperaturu polaza koja daje zadani toplinski tok."""
+        loop = izradi_petlju(1, 15.0)
+        ciljevi = []
+        for flow_temperature in (30, 36.5, 44):
+            results = FloorHeatingCalculatorCore().calculate_single_loop(loop, izradi_parametre(flow_temperature, 5))
+            ciljevi.append(results["heat_flux"])
+        kh = results["kh_value"]
+
+        minimum = minimum_supply_temperatures(kh, np.array(ciljevi), 5, 20)
+        np.testing.assert_allclose(minimum, [30, 36.5, 44], atol=1e-6)
+
+        # Tok koji se ne može postići ispod najviše temperature polaza
+        nedostizno = minimum_supply_temperatures(kh, np.array([ciljevi[0], 1e4]), 5, 20)
+        self.assertTrue(math.isfinite(nedostizno[0]))
+        self.assertEqual(nedostizno[1], np.inf)
+        self.assertEqual(minimum_supply_temperatures(kh, ciljevi[2], 5, 20, upper=40)[()], np.inf)
+        self.assertAlmostEqual(minimum_supply_temperatures(kh, ciljevi[2], 5, 20, upper=50)[()], 44, places=6)
+
+    def test_ogranicenje_temperature_poda(self):
+        """Test da petlja ograničena temperaturom površine poda nije izvediva."""
+        data = izradi_zgradu([izradi_petlju(1, 20.0), izradi_petlju(2, 10.0)])
+        loops = data["building"]["floors"][0]["manifolds"][0]["loops"]
+        loops[0]["required_load"] = 800
+        loops[1]["required_load"] = 3000
+
+        rezultat = solve_supply_temperatures(data)
+        petlje = {loop["loop_id"]: loop for loop in rezultat["manifolds"][0]["loops"]}
+        self.assertTrue(petlje[1]["feasible"])
+        self.assertFalse(petlje[1]["surface_limited"])
+        self.assertTrue(petlje[2]["surface_limited"])
+        self.assertFalse(petlje[2]["feasible"])
+        self.assertFalse(rezultat["building"]["all_feasible"])
+        self.assertIn(rezultat["building"]["supply_temperature"], FLOW_TEMPERATURES)
+
+
+class TestRaspodjelaKrugova(unittest.TestCase):
+    """Testovi raspodjele krugova po razdjelnicima."""
+
+    def test_kapacitet_razdjelnika(self):
+        """Test da razdjelnik ne prima više krugova od broja priključaka."""
+        distances = np.array([[2.0, 9.0], [3.0, 8.0], [4.0, 7.0], [5.0, 6.0], [6.0, 5.0], [7.0, 4.0], [8.0, 3.0]])
+        feasible = np.ones(distances.shape, dtype=bool)
+        feasible[0, 1] = False
+        feasible[6, 0] = False
+        unit_site, assign = first_fit_decreasing(distances, feasible, np.array([10.0, 10.0]), capacity=3)
+
+        self.assertTrue(np.all(assign >= 0))
+        self.assertLessEqual(np.bincount(assign).max(), 3)
+        self.assertGreaterEqual(len(unit_site), 3)
+        for loop, unit in enumerate(assign.tolist()):
+            self.assertTrue(feasible[loop, unit_site[unit]])
+
+    def test_petlje_s_vise_krugova(self):
+        """Test da petlja podijeljena na krugove zauzima po jedan priključak za svaki krug."""
+        petlje = [izradi_petlju(i, 12.0, manifold_distance=3.0 + i) for i in range(1, 11)]
+        data = izradi_zgradu(petlje)
+        floor = data["building"]["floors"][0]
+        pipe_diameter = floor["manifolds"][0]["pipe_diameter"]
+        for loop in petlje[:8]:
+            store_circuits(loop, 3, pipe_diameter)
+
+        # Najudaljenije petlje i bez zapamćene podjele prelaze najveću duljinu kruga
+        self.assertEqual(petlje[9]["results"]["recommended_loops"], 2)
+
+        rezultat = assign_floor(floor)
+        portovi = {loop["id"]: 3 if loop in petlje[:8] else loop["results"]["recommended_loops"] for loop in petlje}
+        self.assertEqual(sum(m["ports"] for m in rezultat["manifolds"]), sum(portovi.values()))
+        self.assertGreaterEqual(len(rezultat["manifolds"]), 3)
+        for manifold in rezultat["manifolds"]:
+            self.assertEqual(manifold["ports"], sum(portovi[loop["loop_id"]] for loop in manifold["loops"]))
+            self.assertEqual(manifold["ports"], sum(loop["ports"] for loop in manifold["loops"]))
+            self.assertLessEqual(manifold["ports"], MAX_PORTS)
+            self.assertGreaterEqual(MANIFOLD_TYPES[manifold["type"]]["max_loops"], manifold["ports"])
+            self.assertAlmostEqual(
+                manifold["lead_length"], sum(2 * loop["ports"] * loop["distance"] for loop in manifold["loops"])
+            )
+
+
+class TestPodesavanjeProtoka(unittest.TestCase):
+    """Testovi podešavanja protoka."""
+
+    def test_povrat_bez_promjene_protoka(self):
+        """Test da nepromijenjeni protok vraća projektnu temperaturu povrata i toplinski učinak."""
+        loop = izradi_petlju(1, 15.0)
+        params = izradi_parametre(38, 6)
+        loop["results"] = FloorHeatingCalculatorCore().calculate_single_loop(loop, params)
+        results = loop["results"]
+
+        povrat = FlowAdjuster.solve_return_temperatures(
+            np.array([38.0]), np.array([20.0]), np.array([results["kh_value"] * 15.0]),
+            np.array([results["flow_rate_kg_h"]])
+        )
+        self.assertAlmostEqual(povrat[0], 32.0, places=9)
+
+        podeseno = FlowAdjuster.adjust_flow_by_percentage(loop, params, 0)
+        self.assertAlmostEqual(podeseno["heat_load"], results["heat_load"], places=6)
+        self.assertAlmostEqual(podeseno["return_temperature"], results["return_temperature"], places=9)
+        self.assertAlmostEqual(podeseno["pressure_drop"], results["pressure_drop"], places=9)
+
+        vise = FlowAdjuster.adjust_flow_by_percentage(loop, params, 20)
+        self.assertGreater(vise["heat_load"], results["heat_load"])
+        self.assertLess(vise["heat_load"], 1.2 * results["heat_load"])
+
+    def test_nemoguc_protok(self):
+        """Test da se protok ne mijenja ako je temperatura polaza niža od temperature prostorije."""
+        loop = izradi_petlju(1, 15.0)
+        params = izradi_parametre(35, 5)
+        loop["results"] = FloorHeatingCalculatorCore().calculate_single_loop(loop, params)
+        loop["room_temperature"] = 40
+        podeseno = FlowAdjuster.adjust_flow_by_percentage(loop, params, 10)
+        self.assertIn("warning", podeseno)
+        self.assertEqual(podeseno["flow_rate_kg_h"], loop["results"]["flow_rate_kg_h"])
+
+
+class TestIndeks(unittest.TestCase):
+    """Testovi indeksa podataka podnog grijanja."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        self.data = FloorHeatingDataManager(mock.Mock()).initialize_data_structure()
+        self.index = FloorHeatingIndex(self.data)
+
+    def test_dohvat(self):
+        """Test dohvata etaže, razdjelnika, prostorije i petlje po ID-u."""
+        floor = self.data["building"]["floors"][0]
+        manifold = floor["manifolds"][0]
+        self.assertIs(self.index.floor(1), floor)
+        self.assertIs(self.index.manifold(1, 1), manifold)
+        self.assertIs(self.index.room(1, 1, 2), manifold["rooms"][1])
+        self.assertIs(self.index.loop(1, 1, 2), manifold["loops"][1])
+        self.assertIsNone(self.index.loop(1, 1, 3))
+        self.assertIsNone(self.index.manifold(2, 1))
+
+    def test_dodavanje_i_brisanje(self):
+        """Test dodavanja i brisanja elemenata kroz indeks."""
+        floor_id = self.index.new_floor_id()
+        self.index.add_floor({"id": floor_id, "name": "Kat", "screed_thickness": 45, "manifolds": []})
+        manifold_id = self.index.new_manifold_id(floor_id)
+        self.index.add_manifold(floor_id, {"id": manifold_id, "name": "R", "rooms": [], "loops": []})
+        loop_id = self.index.new_loop_id()
+        self.assertEqual(loop_id, 3)
+        self.index.add_room(floor_id, manifold_id, {"id": loop_id, "name": "Soba", "position": 1}, izradi_petlju(loop_id, 10))
+
+        self.assertEqual(self.index.loop(floor_id, manifold_id, loop_id)["area"], 10)
+        self.assertEqual(self.index.new_loop_id(), 4)
+
+        self.index.remove_room(floor_id, manifold_id, loop_id)
+        self.assertIsNone(self.index.loop(floor_id, manifold_id, loop_id))
+        self.index.remove_manifold(floor_id, manifold_id)
+        self.assertIsNone(self.index.manifold(floor_id, manifold_id))
+        self.index.remove_floor(floor_id)
+        self.assertIsNone(self.index.floor(floor_id))
+        self.assertEqual(len(self.data["building"]["floors"]), 1)
+
+    def test_promjena_mimo_indeksa(self):
+        """Test da se nakon promjene mimo indeksa i poziva invalidate() indeks ponovno gradi."""
+        manifold = self.data["building"]["floors"][0]["manifolds"][0]
+        self.assertIsNotNone(self.index.loop(1, 1, 2))
+        del manifold["loops"][1]
+        self.index.invalidate()
+        self.assertIsNone(self.index.loop(1, 1, 2))
+        self.assertIs(self.index.room(1, 1, 2), manifold["rooms"][1])
+
+        kopija = copy.deepcopy(manifold)
+        self.data["building"]["floors"][0]["manifolds"] = [kopija]
+        self.index.invalidate()
+        self.assertIs(self.index.manifold(1, 1), kopija)
+        self.assertIs(self.index.loop(1, 1, 1), kopija["loops"][0])
+
+    def test_dohvat_bez_ponovne_izgradnje(self):
+        """Test da pronađeni i nepronađeni elementi ne grade indeks ponovno do promjene strukture."""
+        self.index.floor(1)
+        with mock.patch.object(self.index, "rebuild", wraps=self.index.rebuild) as rebuild:
+            for _ in range(3):
+                self.assertIsNotNone(self.index.loop(1, 1, 1))
+                self.assertIsNone(self.index.loop(1, 1, 99))
+                self.assertIsNone(self.index.manifold(7, 1))
+            self.index.remove_room(1, 1, 2)
+            self.assertIsNone(self.index.room(1, 1, 2))
+            self.assertEqual(rebuild.call_count, 0)
+
+            self.index.invalidate()
+            self.index.loop(1, 1, 99)
+            self.assertEqual(rebuild.call_count, 1)
+
+
+class TestToplinskiGubici(unittest.TestCase):
+    """Testovi preuzimanja prostorija iz proračuna toplinskih gubitaka."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        self.handler = mock.Mock()
+        self.manager = FloorHeatingDataManager(self.handler)
+        self.data = self.manager.initialize_data_structure()
+        self.prostorije = [
+            {"id": "p1", "naziv": "Blagovaonica", "povrsina": 18.4, "temperatura": 20.0, "gubici": 950.0},
+            {"id": "p2", "naziv": "Kupaonica", "povrsina": 6.2, "temperatura": 24.0, "gubici": 420.0},
+            {"id": "p3", "naziv": "Spremište", "povrsina": 4.0, "temperatura": 15.0, "gubici": 0.0, "grijana": False},
+        ]
+
+    def test_potpis_prostorije(self):
+        """Test da se petlja mijenja samo kada se promijeni potpis prostorije."""
+        room = source_rooms(rezultati_toplinskih_gubitaka(self.prostorije))[0]
+        loop = izradi_petlju(1, None)
+        self.assertTrue(apply_room(loop, room))
+        self.assertEqual((loop["area"], loop["room_temperature"], loop["required_load"]), (18.4, 20.0, 950.0))
+        self.assertFalse(apply_room(loop, dict(room)))
+        self.assertFalse(apply_room(loop, dict(room, load=950.01)))
+        self.assertTrue(apply_room(loop, dict(room, load=980.0)))
+        self.assertEqual(loop["required_load"], 980.0)
+
+    def test_sinkronizacija(self):
+        """Test dodavanja, ažuriranja i nepronađenih prostorija pri ponovnom preuzimanju."""
+        self.assertEqual(source_rooms({"error": "Nema prostorija"}), [])
+        rezultati = rezultati_toplinskih_gubitaka(self.prostorije)
+
+        prvi = self.manager.sync_heat_loss(self.data, rezultati)
+        self.assertEqual([loop["room_name"] for _, _, loop in prvi["updated"]], ["Blagovaonica"])
+        self.assertEqual([loop["room_name"] for _, _, loop in prvi["added"]], ["Kupaonica"])
+        self.handler.mark_as_changed.assert_called()
+
+        self.handler.reset_mock()
+        drugi = self.manager.sync_heat_loss(self.data, rezultati)
+        self.assertEqual((drugi["added"], drugi["updated"], drugi["unchanged"]), ([], [], 2))
+        self.handler.mark_as_changed.assert_not_called()
+
+        rezultati["etaze"][0]["prostorije"]["p2"]["gubici"]["ukupno"] = 450.0
+        del rezultati["etaze"][0]["prostorije"]["p1"]
+        treci = self.manager.sync_heat_loss(self.data, rezultati)
+        self.assertEqual([loop["required_load"] for _, _, loop in treci["updated"]], [450.0])
+        self.assertEqual([loop["room_name"] for _, _, loop in treci["missing"]], ["Blagovaonica"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -227,54 +227,6 @@ def initialize_loop_in_manifold(loop_id=1):
         "adjusted_results": {}
     }
 
-def find_floor_by_id(data, floor_id):
-    """
-    Pronalazi etažu po ID-u.
-    
-    Args:
-        data: Struktura podataka
-        floor_id: ID etaže koju tražimo
-        
-    Returns:
-        Rječnik etaže ili None ako nije pronađena
-    """
-    for floor in data.get("floors", []):
-        if floor.get("id") == floor_id:
-            return floor
-    return None
-
-def find_manifold_by_id(floor, manifold_id):
-    """
-    Pronalazi razdjelnik po ID-u.
-    
-    Args:
-        floor: Struktura podataka etaže
-        manifold_id: ID razdjelnika koji tražimo
-        
-    Returns:
-        Rječnik razdjelnika ili None ako nije pronađen
-    """
-    for manifold in floor.get("manifolds", []):
-        if manifold.get("id") == manifold_id:
-            return manifold
-    return None
-
-def find_loop_by_id(manifold, loop_id):
-    """
-    Pronalazi petlju po ID-u.
-    
-    Args:
-        manifold: Struktura podataka razdjelnika
-        loop_id: ID petlje koju tražimo
-        
-    Returns:
-        Rječnik petlje ili None ako nije pronađena
-    """
-    for loop in manifold.get("loops", []):
-        if loop.get("id") == loop_id:
-            return loop
-    return None
-
 def generate_new_floor_id(data):
     """
     Generira novi jedinstveni ID za etažu.
@@ -6,9 +6,34 @@ Ovaj modul sadrži funkcije za izračun transmisijskih i ventilacijskih gubitaka
 from .transmisijski import izracun_transmisijskih_gubitaka
 from .ventilacijski import izracun_ventilacijskih_gubitaka
 from .temperaturni import izracunaj_temperaturu_susjednog_prostora
+from .klimatski_podaci import dohvati_klimu, dohvati_stupanj_dane, KLIMATSKI_PODACI
+from .kompilirani_model import KompiliranaZgrada, kompiliraj_zgradu
+from .analiza_nesigurnosti import izracunaj_nesigurnost_gubitaka
+from .analiza_osjetljivosti import izracunaj_osjetljivost
+from .varijante import izracunaj_varijante
+from .tablice_rezultata import TabliceRezultata
+from .validacija_modela import validiraj_model, dohvati_validaciju
+from .izvoz_rezultata import izvezi_rezultate, retci_rezultata, parquet_dostupan
+from .usporedba_modela import usporedi_stanja, usporedi_modele
 
 __all__ = [
     'izracun_transmisijskih_gubitaka',
     'izracun_ventilacijskih_gubitaka',
-    'izracunaj_temperaturu_susjednog_prostora'
+    'izracunaj_temperaturu_susjednog_prostora',
+    'dohvati_klimu',
+    'dohvati_stupanj_dane',
+    'KLIMATSKI_PODACI',
+    'KompiliranaZgrada',
+    'kompiliraj_zgradu',
+    'izracunaj_nesigurnost_gubitaka',
+    'izracunaj_osjetljivost',
+    'izracunaj_varijante',
+    'TabliceRezultata',
+    'validiraj_model',
+    'dohvati_validaciju',
+    'izvezi_rezultate',
+    'retci_rezultata',
+    'parquet_dostupan',
+    'usporedi_stanja',
+    'usporedi_modele'
 ]
@@ -0,0 +1,143 @@
+"""
+Modul za Monte Carlo analizu nesigurnosti projektnih toplinskih gubitaka.
+
+U ranoj fazi projekta U-vrijednosti, broj izmjena zraka i udio toplinskih
+mostova nisu pouzdano poznati. Umjesto jedne vrijednosti, ovdje se uzorkuju
+raspodjele tih ulaza i za sve uzorke odjednom računaju gubici nad kompiliranim
+modelom zgrade (jedno matrično množenje po svim prostorijama i uzorcima).
+"""
+
+import numpy as np
+
+from .kompilirani_model import KompiliranaZgrada
+
+# Zadane postavke analize nesigurnosti
+ZADANI_PARAMETRI_NESIGURNOSTI = {
+    "broj_uzoraka": 2000,
+    "u_vrijednost_cv": 0.10,          # koeficijent varijacije U-vrijednosti tipova iz kataloga
+    "izmjene_zraka_cv": 0.25,         # koeficijent varijacije izmjena zraka po prostoriji
+    "toplinski_mostovi_raspon": 5.0,  # ± postotnih bodova oko postavljenog postotka mostova
+}
+
+PERCENTILI = (50, 90, 95)
+
+
+def _lognormalni_faktori(rng, cv, oblik):
+    """
+    Vraća multiplikativne faktore sa srednjom vrijednošću 1 i zadanim koeficijentom varijacije.
+    Lognormalna raspodjela osigurava pozitivne U-vrijednosti i izmjene zraka.
+    """
+    if cv <= 0:
+        return np.ones(oblik)
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    return rng.lognormal(mean=-0.5 * sigma ** 2, sigma=sigma, size=oblik)
+
+
+def uzorkuj_parametre(zgrada, broj_uzoraka, u_vrijednost_cv, izmjene_zraka_cv, toplinski_mostovi_raspon, rng):
+    """
+    Uzorkuje ulazne parametre kompiliranog modela.
+
+    U-vrijednost pojedinog tipa iz kataloga uzorkuje se jednom po uzorku i vrijedi za sve
+    prostorije koje taj tip koriste (ista izvedba), dok se izmjene zraka uzorkuju neovisno
+    po prostoriji. Postotak toplinskih mostova uzorkuje se trokutastom raspodjelom oko
+    postavljene vrijednosti, a isključeni mostovi ostaju isključeni.
+
+    Returns:
+    --------
+    tuple
+        (u_vrijednosti (S, P), izmjene_zraka (S, R), postotak_mostova (S,))
+    """
+    u_vrijednosti = zgrada.parametar_u * _lognormalni_faktori(rng, u_vrijednost_cv, (broj_uzoraka, zgrada.broj_parametara))
+    izmjene_zraka = zgrada.izmjene_zraka * _lognormalni_faktori(rng, izmjene_zraka_cv, (broj_uzoraka, zgrada.broj_prostorija))
+
+    nominalno = zgrada.postotak_toplinskih_mostova
+    if nominalno > 0 and toplinski_mostovi_raspon > 0:
+        donja = max(nominalno - toplinski_mostovi_raspon, 0.0)
+        postotak_mostova = rng.triangular(donja, nominalno, nominalno + toplinski_mostovi_raspon, size=broj_uzoraka)
+    else:
+        postotak_mostova = np.full(broj_uzoraka, nominalno)
+
+    return u_vrijednosti, izmjene_zraka, postotak_mostova
+
+
+def izracunaj_nesigurnost_gubitaka(zgrada, broj_uzoraka=None, u_vrijednost_cv=None, izmjene_zraka_cv=None,
+                                   toplinski_mostovi_raspon=None, percentili=PERCENTILI, sjeme=None):
+    """
+    Izračunava raspodjelu projektnih toplinskih gubitaka Monte Carlo metodom.
+
+    Parameters:
+    -----------
+    zgrada : KompiliranaZgrada
+        Kompilirani model zgrade
+    broj_uzoraka : int, optional
+        Broj Monte Carlo uzoraka
+    u_vrijednost_cv : float, optional
+        Koeficijent varijacije U-vrijednosti
+    izmjene_zraka_cv : float, optional
+        Koeficijent varijacije izmjena zraka
+    toplinski_mostovi_raspon : float, optional
+        Raspon postotka toplinskih mostova (± postotnih bodova)
+    percentili : tuple
+        Percentili koji se izvještavaju
+    sjeme : int, optional
+        Sjeme generatora slučajnih brojeva (za ponovljivost)
+
+    Returns:
+    --------
+    dict
+        Rječnik s ključevima "prostorije" (polja po prostoriji), "zgrada" (vrijednosti
+        za cijelu zgradu) i "postavke"; percentili su pod ključevima "P50", "P90", ...
+    """
+    if not isinstance(zgrada, KompiliranaZgrada):
+        raise TypeError("Očekuje se KompiliranaZgrada")
+
+    postavke = dict(ZADANI_PARAMETRI_NESIGURNOSTI)
+    for kljuc, vrijednost in (("broj_uzoraka", broj_uzoraka), ("u_vrijednost_cv", u_vrijednost_cv),
+                              ("izmjene_zraka_cv", izmjene_zraka_cv),
+                              ("toplinski_mostovi_raspon", toplinski_mostovi_raspon)):
+        if vrijednost is not None:
+            postavke[kljuc] = vrijednost
+    postavke["broj_uzoraka"] = max(int(postavke["broj_uzoraka"]), 1)
+
+    rng = np.random.default_rng(sjeme)
+    u_vrijednosti, izmjene_zraka, postotak_mostova = uzorkuj_parametre(
+        zgrada,
+        postavke["broj_uzoraka"],
+        postavke["u_vrijednost_cv"],
+        postavke["izmjene_zraka_cv"],
+        postavke["toplinski_mostovi_raspon"],
+        rng,
+    )
+
+    uzorci = zgrada.izracunaj(u_vrijednosti, izmjene_zraka, postotak_mostova)["ukupno"]  # (S, R)
+    uzorci_zgrade = zgrada.ukupno_zgrade(uzorci)
+    nominalno = zgrada.izracunaj()["ukupno"]
+
+    prostorije = {
+        "id": list(zgrada.prostorija_ids),
+        "naziv": list(zgrada.prostorija_nazivi),
+        "nominalno": nominalno,
+        "srednja": uzorci.mean(axis=0),
+        "std": uzorci.std(axis=0),
+    }
+    zgrada_rezultat = {
+        "nominalno": float(zgrada.ukupno_zgrade(nominalno)),
+        "srednja": float(uzorci_zgrade.mean()),
+        "std": float(uzorci_zgrade.std()),
+    }
+
+    if zgrada.broj_prostorija:
+        percentili_prostorija = np.percentile(uzorci, percentili, axis=0)
+    else:
+        percentili_prostorija = np.zeros((len(percentili), 0))
+    percentili_zgrade = np.percentile(uzorci_zgrade, percentili)
+    for p, vrijednosti_prostorija, vrijednost_zgrade in zip(percentili, percentili_prostorija, percentili_zgrade):
+        prostorije[f"P{p}"] = vrijednosti_prostorija
+        zgrada_rezultat[f"P{p}"] = float(vrijednost_zgrade)
+
+    return {
+        "prostorije": prostorije,
+        "zgrada": zgrada_rezultat,
+        "postavke": postavke,
+        "percentili": list(percentili),
+    }
@@ -0,0 +1,131 @@
+"""
+Modul za analitičku analizu osjetljivosti toplinskih gubitaka.
+
+Gubici su linearni u U·A·ΔT i V·n·ΔT, pa se derivacije ukupnih gubitaka zgrade
+po U-vrijednosti svakog tipa iz kataloga, po izmjenama zraka svake prostorije i
+po vanjskoj projektnoj temperaturi dobivaju u zatvorenom obliku, u jednom
+prolazu nad kompiliranim modelom - bez ponavljanja izračuna po parametru.
+"""
+
+import numpy as np
+
+from .kompilirani_model import KompiliranaZgrada, GRANICA_VANJSKA, INFILTRACIJA_IZMJENE, RHO_ZRAKA, CP_ZRAKA
+
+NAZIVI_KATEGORIJA = {
+    "zidovi": "Tip zida",
+    "prozori": "Tip prozora",
+    "vrata": "Tip vrata",
+    "podovi": "Tip poda",
+    "stropovi": "Tip stropa",
+    "izmjene_zraka": "Izmjene zraka",
+    "infiltracija": "Infiltracija",
+    "toplinski_mostovi": "Toplinski mostovi",
+}
+
+
+def izracunaj_osjetljivost(zgrada):
+    """
+    Izračunava doprinos i graničnu osjetljivost gubitaka zgrade po parametrima.
+
+    Za svaki parametar x s nominalnom vrijednošću x0 vraća se:
+    - derivacija dQ/dx,
+    - doprinos x0 * dQ/dx (dio ukupnih gubitaka koji parametar nosi),
+    - udio doprinosa u ukupnim gubicima (ujedno elastičnost: % promjene Q za 1 % promjene x),
+    - promjena gubitaka za +10 % parametra.
+
+    Parameters:
+    -----------
+    zgrada : KompiliranaZgrada
+        Kompilirani model zgrade
+
+    Returns:
+    --------
+    dict
+        Rječnik s ključevima "ukupno" (W), "parametri" (lista rječnika sortirana po
+        doprinosu) i "vanjska_temperatura" (derivacija dQ/dTe u W/K)
+    """
+    if not isinstance(zgrada, KompiliranaZgrada):
+        raise TypeError("Očekuje se KompiliranaZgrada")
+
+    faktor_mostova = 1.0 + zgrada.postotak_toplinskih_mostova / 100.0
+    nominalno = zgrada.izracunaj()
+    ukupno = float(zgrada.ukupno_zgrade(nominalno["ukupno"]))
+    kratnost = zgrada.kratnost
+
+    # dQ/du_p = (1 + m) * sum_r k_r * M[p, r], k_r = kratnost prostorije
+    matrica = zgrada.matrica_transmisije
+    derivacije_u = faktor_mostova * (matrica @ kratnost)
+    koristeni = np.bincount(zgrada.el_parametar, minlength=zgrada.broj_parametara) > 0
+
+    # dQ/dn_r = k_r * rho*cp/3600 * V_r * (Ti_r - Te)
+    koef_zraka = zgrada.koeficijent_zraka * kratnost
+
+    parametri = []
+    for p in np.flatnonzero(koristeni):
+        kategorija, tip_id = zgrada.parametri[p]
+        parametri.append(_redak(
+            kategorija, zgrada.parametar_nazivi[p], tip_id,
+            zgrada.parametar_u[p], "W/(m²·K)", derivacije_u[p], ukupno,
+        ))
+
+    for r in range(zgrada.broj_prostorija):
+        parametri.append(_redak(
+            "izmjene_zraka", zgrada.prostorija_nazivi[r], zgrada.prostorija_ids[r],
+            zgrada.izmjene_zraka[r], "1/h", koef_zraka[r], ukupno,
+        ))
+
+    parametri.append(_redak(
+        "infiltracija", "Infiltracija (sve prostorije)", None,
+        INFILTRACIJA_IZMJENE, "1/h", koef_zraka.sum(), ukupno,
+    ))
+    if zgrada.postotak_toplinskih_mostova > 0:
+        parametri.append(_redak(
+            "toplinski_mostovi", "Postotak toplinskih mostova", None,
+            zgrada.postotak_toplinskih_mostova, "%", zgrada.ukupno_zgrade(nominalno["transmisijski"]) / 100.0, ukupno,
+        ))
+    h_psi = float(zgrada.ukupno_zgrade(zgrada.koeficijent_linijskih_mostova))
+    if h_psi > 0:
+        # Linijski mostovi kao jedan parametar ΣψL; derivacija je ΔT ponderiran s H_psi prostorija
+        delta_t = zgrada.temp_unutarnja - zgrada.temp_vanjska
+        parametri.append(_redak(
+            "toplinski_mostovi", "Linijski toplinski mostovi (ΣψL)", None,
+            h_psi, "W/K", float(zgrada.ukupno_zgrade(zgrada.koeficijent_linijskih_mostova * delta_t)) / h_psi, ukupno,
+        ))
+
+    parametri.sort(key=lambda redak: abs(redak["doprinos"]), reverse=True)
+
+    # dQ/dTe = -(1 + m) * sum_{vanjski elementi} A*U - sum ψL - rho*cp/3600 * sum V*(n + n_inf)
+    vanjski = zgrada.el_granica == GRANICA_VANJSKA
+    h_vanjski = float(np.sum(zgrada.el_povrsina[vanjski] * zgrada.parametar_u[zgrada.el_parametar[vanjski]]
+                             * kratnost[zgrada.el_prostorija[vanjski]]))
+    h_zrak = RHO_ZRAKA * CP_ZRAKA / 3600.0 * float(zgrada.ukupno_zgrade(zgrada.volumen * (zgrada.izmjene_zraka + INFILTRACIJA_IZMJENE)))
+
+    return {
+        "ukupno": ukupno,
+        "parametri": parametri,
+        "vanjska_temperatura": {
+            "vrijednost": zgrada.temp_vanjska,
+            "derivacija": -(faktor_mostova * h_vanjski + h_psi + h_zrak),
+            "transmisijski_koeficijent": faktor_mostova * h_vanjski + h_psi,
+            "ventilacijski_koeficijent": h_zrak,
+        },
+    }
+
+
+def _redak(kategorija, naziv, kljuc, vrijednost, jedinica, derivacija, ukupno):
+    """Formira jedan redak izvještaja o osjetljivosti."""
+    vrijednost = float(vrijednost)
+    derivacija = float(derivacija)
+    doprinos = vrijednost * derivacija
+    return {
+        "kategorija": kategorija,
+        "opis_kategorije": NAZIVI_KATEGORIJA.get(kategorija, kategorija),
+        "naziv": naziv,
+        "kljuc": kljuc,
+        "vrijednost": vrijednost,
+        "jedinica": jedinica,
+        "derivacija": derivacija,
+        "doprinos": doprinos,
+        "udio": doprinos / ukupno if ukupno else 0.0,
+        "promjena_10_posto": 0.1 * doprinos,
+    }
@@ -4,11 +4,39 @@ Modul koji objedinjuje izračun toplinskih gubitaka.
 
 from ..calculations.transmisijski import izracun_transmisijskih_gubitaka
 from ..calculations.ventilacijski import izracun_ventilacijskih_gubitaka, izracun_infiltracije
-from ..calculations.toplinski_most import izracun_toplinskih_mostova_po_vrsti, procjena_toplinskih_mostova_postotkom
+from ..calculations.toplinski_most import (
+    izracun_toplinskih_mostova_po_vrsti, procjena_toplinskih_mostova_postotkom,
+    izracun_toplinskih_mostova_zgrade, rezultat_mostova_prostorije,
+    dohvati_metodu_toplinskih_mostova, METODA_LINIJSKI
+)
 from ..calculations.temperaturni import izracunaj_temperature_za_model
+from ..calculations.tablice_rezultata import TabliceRezultata
+from ..models.etaza import primijeni_preinake
 import streamlit as st
 
-def izracunaj_toplinske_gubitke_prostorije(prostorija, temperature_dict, katalog=None):
+def izradi_katalog_elemenata(elements_model):
+    """
+    Pretvara model građevinskih elemenata u katalog koji koriste izračuni.
+    
+    Parameters:
+    -----------
+    elements_model : BuildingElementsModel
+        Model građevinskih elemenata
+        
+    Returns:
+    --------
+    dict or None
+        Katalog {"zidovi": {id: WallType}, "prozori": ..., "vrata": ..., "podovi": ..., "stropovi": ...}
+        ili None ako model nije zadan
+    """
+    if elements_model is None:
+        return None
+    return {
+        kategorija: {element.id: element for element in getattr(elements_model, kategorija, [])}
+        for kategorija in ("zidovi", "prozori", "vrata", "podovi", "stropovi")
+    }
+
+def izracunaj_toplinske_gubitke_prostorije(prostorija, temperature_dict, katalog=None, linijski_mostovi=None):
     """
     Izračunava ukupne toplinske gubitke za jednu prostoriju.
     
@@ -20,6 +48,9 @@ def izracunaj_toplinske_gubitke_prostorije(prostorija, temperature_dict, katalog
         Rječnik s temperaturama (vanjska, susjednih negrijanih prostora, itd.)
     katalog : dict
         Katalog s definiranim tipovima zidova, podova, stropova, prozora i vrata
+    linijski_mostovi : dict, optional
+        Unaprijed (vektorizirano) izračunati linijski toplinski mostovi prostorije;
+        koristi se samo kad je odabrana linijska metoda
         
     Returns:
     --------
@@ -51,11 +82,19 @@ def izracunaj_toplinske_gubitke_prostorije(prostorija, temperature_dict, katalog
     infiltracija = izracun_infiltracije(prostorija, temperature_dict["vanjska"])    # Izračun osnovnih transmisijskih gubitaka (bez toplinskih mostova)
     osnovni_transmisijski_gubici = transmisijski["ukupno"] - transmisijski["toplinski_mostovi"]
     
-    # Izračun toplinskih mostova kao postotak od osnovnih transmisijskih gubitaka
-    toplinski_mostovi = procjena_toplinskih_mostova_postotkom(prostorija, osnovni_transmisijski_gubici)
-    
-    # Detaljniji izračun toplinskih mostova po tipu ako je potrebno
-    # toplinski_mostovi_detalji = izracun_toplinskih_mostova_po_vrsti(prostorija, temperature_dict)
+    # Toplinski mostovi - linijski (ψ·L·ΔT po vrsti spoja) ili kao postotak osnovnih transmisijskih gubitaka
+    toplinski_mostovi_detalji = None
+    if dohvati_metodu_toplinskih_mostova() == METODA_LINIJSKI:
+        if st.session_state.get("toplinski_mostovi", True):
+            toplinski_mostovi_detalji = linijski_mostovi or izracun_toplinskih_mostova_po_vrsti(prostorija, temperature_dict, katalog=katalog)
+            toplinski_mostovi = toplinski_mostovi_detalji["ukupno"]
+        else:
+            toplinski_mostovi = 0.0
+        # Transmisijski rezultat sadrži postotni dodatak - zamjenjujemo ga linijskim
+        transmisijski["toplinski_mostovi"] = toplinski_mostovi
+        transmisijski["ukupno"] = osnovni_transmisijski_gubici + toplinski_mostovi
+    else:
+        toplinski_mostovi = procjena_toplinskih_mostova_postotkom(prostorija, osnovni_transmisijski_gubici)
     
     # Ukupni gubici = osnovni transmisijski + toplinski mostovi + ventilacijski + infiltracija
     ukupno = osnovni_transmisijski_gubici + toplinski_mostovi + ventilacijski["snaga_gubitaka"] + infiltracija["snaga_gubitaka"]
@@ -66,10 +105,11 @@ def izracunaj_toplinske_gubitke_prostorije(prostorija, temperature_dict, katalog
         "ventilacijski": ventilacijski,
         "infiltracija": infiltracija,
         "toplinski_mostovi": toplinski_mostovi,
+        "toplinski_mostovi_detalji": toplinski_mostovi_detalji,
         "ukupno": ukupno
     }
 
-def izracunaj_toplinske_gubitke_etaze(model, etaza_id, grad=None):
+def izracunaj_toplinske_gubitke_etaze(model, etaza_id, grad=None, katalog=None, preinake=None, temperature=None):
     """
     Izračunava toplinske gubitke za cijelu etažu.
     
@@ -82,6 +122,13 @@ def izracunaj_toplinske_gubitke_etaze(model, etaza_id, grad=None):
     grad : str, optional
         Grad za koji se koristi projektna vanjska temperatura. Ako nije naveden, 
         koristi se zadana vrijednost u modelu.
+    katalog : dict, optional
+        Katalog s definiranim tipovima elemenata (vidi izradi_katalog_elemenata)
+    preinake : dict, optional
+        Preinake instance tipske etaže (pod_tip, strop_tip, temperature); prostorije
+        predloška se tada računaju s preinakama, bez mijenjanja modela
+    temperature : dict, optional
+        Već izračunate temperature za model (ako nisu zadane, računaju se)
         
     Returns:
     --------
@@ -89,40 +136,58 @@ def izracunaj_toplinske_gubitke_etaze(model, etaza_id, grad=None):
         Rječnik s izračunatim gubicima po prostorijama i ukupno za etažu
     """
     # Dohvati prostorije na etaži
-    prostorije = model.dohvati_prostorije_za_etazu(etaza_id)
+    prostorije = primijeni_preinake(model.dohvati_prostorije_za_etazu(etaza_id), preinake)
     
     if not prostorije:
         return {"ukupno": 0.0, "prostorije": {}}
     
     # Izračunaj temperature za model
-    try:
-        temperature = izracunaj_temperature_za_model(model, grad)
-    except Exception as e:
-        st.error(f"Greška pri izračunu temperatura: {str(e)}")
-        # Osiguraj minimalni set temperatura za nastavak rada
-        temperature = {"vanjska": -20.0}
+    if temperature is None:
+        try:
+            temperature = izracunaj_temperature_za_model(model, grad)
+        except Exception as e:
+            st.error(f"Greška pri izračunu temperatura: {str(e)}")
+            # Osiguraj minimalni set temperatura za nastavak rada
+            temperature = {"vanjska": -20.0}
+    
+    # Temperature prostorija instance vrijede samo za njezin izračun
+    temperature_prostorija = dict(st.session_state.get("temperature_prostorija", {}))
+    if preinake and preinake.get("temperature"):
+        st.session_state["temperature_prostorija"] = {**temperature_prostorija, **preinake["temperature"]}
     
     # Inicijalizacija rezultata
     rezultati = {
         "prostorije": {},
         "ukupno": 0.0
-    }    # Izračun gubitaka za svaku prostoriju
-    for prostorija in prostorije:
-        rezultat_prostorije = izracunaj_toplinske_gubitke_prostorije(prostorija, temperature)
+    }
+    
+    # Linijski toplinski mostovi računaju se vektorizirano za sve prostorije etaže odjednom
+    metoda_mostova = dohvati_metodu_toplinskih_mostova()
+    mostovi_etaze = None
+    if metoda_mostova == METODA_LINIJSKI and st.session_state.get("toplinski_mostovi", True):
+        mostovi_etaze = izracun_toplinskih_mostova_zgrade(prostorije, temperature, katalog=katalog)
+    
+    # Izračun gubitaka za svaku prostoriju
+    for indeks, prostorija in enumerate(prostorije):
+        linijski_mostovi = rezultat_mostova_prostorije(mostovi_etaze, indeks) if mostovi_etaze else None
+        rezultat_prostorije = izracunaj_toplinske_gubitke_prostorije(prostorija, temperature, katalog, linijski_mostovi)
         
         # Dohvat thermal bridges status za prikaz u UI
         toplinski_mostovi_ukljuceni = st.session_state.get("toplinski_mostovi", True)
         postotak_toplinskih_mostova = st.session_state.get("postotak_toplinskih_mostova", 15)
           # Priprema osnovnih podataka prostorije
         prostorija_rezultat = {
+            "id": prostorija.id,
             "naziv": prostorija.naziv,
+            "broj_prostorije": prostorija.broj_prostorije,
             "tip": prostorija.tip,            
             "povrsina": prostorija.povrsina,
             "temperatura": prostorija.temp_unutarnja,
             "grijana": prostorija.grijana,
             "gubici": rezultat_prostorije,
             "toplinski_mostovi_ukljuceni": toplinski_mostovi_ukljuceni,
-            "toplinski_mostovi_postotak": postotak_toplinskih_mostova
+            "toplinski_mostovi_postotak": postotak_toplinskih_mostova,
+            "toplinski_mostovi_metoda": metoda_mostova
         }
         
         # Dodaj informacije o zidovima ako postoje
@@ -140,6 +205,9 @@ def izracunaj_toplinske_gubitke_etaze(model, etaza_id, grad=None):
         rezultati["prostorije"][prostorija.id] = prostorija_rezultat
         rezultati["ukupno"] += rezultat_prostorije["ukupno"]
     
+    if preinake:
+        st.session_state["temperature_prostorija"] = temperature_prostorija
+    
     return rezultati
 
 def izracunaj_toplinske_gubitke_zgrade(model, grad=None, elements_model=None, u_values_fallback=None, dodatni_parametri=None, temp_vanjska=None):
@@ -165,7 +233,8 @@ def izracunaj_toplinske_gubitke_zgrade(model, grad=None, elements_model=None, u_
     Returns:
     --------
     dict
-        Rječnik s izračunatim gubicima po etažama i ukupno za zgradu
+        Rječnik s izračunatim gubicima po etažama i ukupno za zgradu; pod ključem
+        "tablice" nalaze se isti rezultati kao TabliceRezultata (etaže, prostorije, elementi)
     """
     # Dohvati temperature za model
     try:
@@ -174,7 +243,9 @@ def izracunaj_toplinske_gubitke_zgrade(model, grad=None, elements_model=None, u_
         st.error(f"Greška pri izračunu temperatura za zgradu: {str(e)}")
         # Osiguraj minimalni set temperatura za nastavak rada
         temperature_dict = {"vanjska": -20.0}
-      # Inicijalizacija rezultata
+    katalog = izradi_katalog_elemenata(elements_model)
+    
+    # Inicijalizacija rezultata
     rezultati = {
         "zgrada": {
             "etaze": {},
@@ -188,32 +259,45 @@ def izracunaj_toplinske_gubitke_zgrade(model, grad=None, elements_model=None, u_
     }
       # Izračun gubitaka za svaku etažu
     for etaza in model.etaze:
-        rezultat_etaze = izracunaj_toplinske_gubitke_etaze(model, etaza.id, grad)
-          # Izračun ukupne površine prostorija na etaži
-        povrsina_etaze = sum(
-            model.dohvati_prostoriju(p_id).povrsina 
-            for p_id in rezultat_etaze["prostorije"]
-        )
-        
-        # Izračun ukupnog volumena prostorija na etaži
-        volumen_etaze = sum(
-            model.dohvati_prostoriju(p_id).povrsina * model.dohvati_prostoriju(p_id).get_actual_height(etaza)
-            for p_id in rezultat_etaze["prostorije"]
-        )
-        
-        etaza_info = {
-            "naziv": etaza.naziv,
-            "povrsina": povrsina_etaze,
-            "volumen": volumen_etaze,
-            "gubici": rezultat_etaze["ukupno"],
-            "prostorije": rezultat_etaze["prostorije"]
-        }
-        
-        rezultati["zgrada"]["etaze"][etaza.id] = etaza_info
-        rezultati["etaze"].append(etaza_info)  # Dodaj u listu za UI prikaz
-        
-        rezultati["zgrada"]["ukupno"] += rezultat_etaze["ukupno"]
-        rezultati["zgrada"]["ukupna_povrsina"] += povrsina_etaze
+        # Tipska etaža: instance s istim preinakama računaju se jednom i množe brojem instanci
+        for grupa in etaza.grupe_ponavljanja():
+            rezultat_etaze = izracunaj_toplinske_gubitke_etaze(
+                model, etaza.id, grad, katalog, preinake=grupa["preinake"], temperature=temperature_dict
+            )
+              # Izračun ukupne površine prostorija na etaži
+            povrsina_etaze = sum(
+                model.dohvati_prostoriju(p_id).povrsina 
+                for p_id in rezultat_etaze["prostorije"]
+            )
+            
+            # Izračun ukupnog volumena prostorija na etaži
+            volumen_etaze = sum(
+                model.dohvati_prostoriju(p_id).povrsina * model.dohvati_prostoriju(p_id).get_actual_height(etaza)
+                for p_id in rezultat_etaze["prostorije"]
+            )
+            
+            broj = grupa["broj"]
+            naziv = etaza.naziv if grupa["preinake"] is None else grupa["instance"][0]
+            if broj > 1:
+                naziv = f"{naziv} (×{broj})"
+            
+            etaza_info = {
+                "kljuc": grupa["id"],
+                "naziv": naziv,
+                "povrsina": povrsina_etaze,
+                "volumen": volumen_etaze,
+                "gubici": rezultat_etaze["ukupno"],
+                "prostorije": rezultat_etaze["prostorije"],
+                "broj_ponavljanja": broj,
+                "instance": grupa["instance"],
+                "gubici_ukupno": rezultat_etaze["ukupno"] * broj
+            }
+            
+            rezultati["zgrada"]["etaze"][grupa["id"]] = etaza_info
+            rezultati["etaze"].append(etaza_info)  # Dodaj u listu za UI prikaz
+            
+            rezultati["zgrada"]["ukupno"] += rezultat_etaze["ukupno"] * broj
+            rezultati["zgrada"]["ukupna_povrsina"] += povrsina_etaze * broj
     
     # Izračun prosječnih gubitaka po m²
     if rezultati["zgrada"]["ukupna_povrsina"] > 0:
@@ -222,4 +306,7 @@ def izracunaj_toplinske_gubitke_zgrade(model, grad=None, elements_model=None, u_
     # Konverzija iz W u kW za prikaz
     rezultati["zgrada"]["ukupni_gubici_kW"] = rezultati["zgrada"]["ukupno"] / 1000.0
     
+    # Stupčasti prikaz rezultata za UI, zbrajanje, filtriranje i izvoz
+    rezultati["tablice"] = TabliceRezultata.iz_rezultata(rezultati)
+    
     return rezultati
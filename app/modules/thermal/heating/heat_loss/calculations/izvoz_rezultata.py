@@ -0,0 +1,236 @@
+"""
+Modul za protočni izvoz rezultata proračuna toplinskih gubitaka.
+
+Retci prostorija i elemenata ovojnice izrađuju se generatorom izravno iz rječnika
+rezultata i zapisuju u blokovima (CSV, Parquet ili XLSX u write-only načinu), tako da
+se za velike modele nikada ne gradi cijela tablica u memoriji.
+"""
+
+import csv
+import io
+import math
+
+from .tablice_rezultata import STUPCI_PROSTORIJA, STUPCI_ELEMENATA, redak_prostorije, _retci_elemenata
+
+# Tablice koje se mogu izvesti i njihovi stupci
+TABLICE_IZVOZA = {
+    "prostorije": STUPCI_PROSTORIJA,
+    "elementi": STUPCI_ELEMENATA,
+}
+
+# Podržani formati izvoza
+FORMATI_IZVOZA = ("csv", "xlsx", "parquet")
+
+# Broj redaka koji se zapisuje odjednom
+VELICINA_BLOKA = 5000
+
+# Nazivi listova u XLSX datoteci
+LISTOVI_IZVOZA = {
+    "prostorije": "Prostorije",
+    "elementi": "Elementi",
+}
+
+
+def parquet_dostupan():
+    """Provjerava je li instalirana opcionalna biblioteka pyarrow potrebna za Parquet izvoz."""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def retci_rezultata(rezultati, tablica="prostorije"):
+    """
+    Generator redaka tablice prostorija ili elemenata izravno iz rezultata izračuna.
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+    tablica : str
+        "prostorije" ili "elementi"
+
+    Returns:
+    --------
+    generator of dict
+        Retci sa stupcima iz STUPCI_PROSTORIJA ili STUPCI_ELEMENATA
+    """
+    if tablica not in TABLICE_IZVOZA:
+        raise ValueError(f"Nepoznata tablica za izvoz: {tablica}")
+
+    for etaza_kljuc, etaza in ((rezultati or {}).get("zgrada", {}).get("etaze") or {}).items():
+        broj = int(etaza.get("broj_ponavljanja", 1))
+        for prostorija_id, p in (etaza.get("prostorije") or {}).items():
+            redak = redak_prostorije(etaza_kljuc, prostorija_id, p, broj)
+            if tablica == "prostorije":
+                yield redak
+            else:
+                yield from _retci_elemenata(etaza_kljuc, prostorija_id, p, redak["toplinski_mostovi"])
+
+
+def _blokovi(retci, velicina_bloka):
+    """Dijeli niz redaka na liste od najviše velicina_bloka redaka."""
+    blok = []
+    for redak in retci:
+        blok.append(redak)
+        if len(blok) >= velicina_bloka:
+            yield blok
+            blok = []
+    if blok:
+        yield blok
+
+
+def _vrijednost_csv(vrijednost):
+    """Oblikuje vrijednost za CSV (decimalni zarez, prazno polje za nedostajuće vrijednosti)."""
+    if vrijednost is None:
+        return ""
+    if isinstance(vrijednost, float):
+        return "" if math.isnan(vrijednost) else repr(vrijednost).replace(".", ",")
+    return vrijednost
+
+
+def _vrijednost_xlsx(vrijednost):
+    """Nedostajuće brojčane vrijednosti zapisuju se kao prazne ćelije."""
+    if isinstance(vrijednost, float) and math.isnan(vrijednost):
+        return None
+    return vrijednost
+
+
+def izvezi_csv(rezultati, tok, tablica="prostorije", velicina_bloka=VELICINA_BLOKA):
+    """
+    Zapisuje tablicu prostorija ili elemenata u CSV (separator ';', decimalni zarez).
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+    tok : binary file-like
+        Odredište zapisa (otvorena datoteka ili io.BytesIO)
+    tablica : str
+        "prostorije" ili "elementi"
+    velicina_bloka : int
+        Broj redaka koji se zapisuje odjednom
+
+    Returns:
+    --------
+    int
+        Broj zapisanih redaka
+    """
+    stupci = list(TABLICE_IZVOZA[tablica])
+    tekst = io.TextIOWrapper(tok, encoding="utf-8", newline="")
+    try:
+        pisac = csv.writer(tekst, delimiter=";")
+        pisac.writerow(stupci)
+        broj = 0
+        for blok in _blokovi(retci_rezultata(rezultati, tablica), velicina_bloka):
+            pisac.writerows([_vrijednost_csv(redak[s]) for s in stupci] for redak in blok)
+            broj += len(blok)
+        tekst.flush()
+    finally:
+        # Odvajanje omotača ostavlja odredišni tok otvorenim za pozivatelja
+        tekst.detach()
+    return broj
+
+
+def izvezi_xlsx(rezultati, tok, tablice=("prostorije", "elementi")):
+    """
+    Zapisuje tablice u XLSX radnu knjigu u write-only načinu (svaka tablica na svom listu).
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+    tok : binary file-like
+        Odredište zapisa (otvorena datoteka ili io.BytesIO)
+    tablice : tuple of str
+        Tablice koje se izvoze
+
+    Returns:
+    --------
+    dict
+        Broj zapisanih redaka po tablici
+    """
+    from openpyxl import Workbook
+
+    knjiga = Workbook(write_only=True)
+    brojevi = {}
+    for tablica in tablice:
+        stupci = list(TABLICE_IZVOZA[tablica])
+        list_ = knjiga.create_sheet(LISTOVI_IZVOZA[tablica])
+        list_.append(stupci)
+        broj = 0
+        for redak in retci_rezultata(rezultati, tablica):
+            list_.append([_vrijednost_xlsx(redak[s]) for s in stupci])
+            broj += 1
+        brojevi[tablica] = broj
+    knjiga.save(tok)
+    return brojevi
+
+
+def izvezi_parquet(rezultati, tok, tablica="prostorije", velicina_bloka=VELICINA_BLOKA):
+    """
+    Zapisuje tablicu prostorija ili elemenata u Parquet datoteku, blok po blok.
+
+    Parquet izvoz zahtijeva opcionalnu biblioteku pyarrow.
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+    tok : binary file-like
+        Odredište zapisa (otvorena datoteka ili io.BytesIO)
+    tablica : str
+        "prostorije" ili "elementi"
+    velicina_bloka : int
+        Broj redaka po grupi redaka u Parquet datoteci
+
+    Returns:
+    --------
+    int
+        Broj zapisanih redaka
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Za izvoz u Parquet potrebna je biblioteka pyarrow (pip install pyarrow).") from e
+
+    tipovi = {"object": pa.string(), "int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_()}
+    shema = pa.schema([(stupac, tipovi[tip]) for stupac, tip in TABLICE_IZVOZA[tablica].items()])
+
+    broj = 0
+    with pq.ParquetWriter(tok, shema) as pisac:
+        for blok in _blokovi(retci_rezultata(rezultati, tablica), velicina_bloka):
+            pisac.write_batch(pa.RecordBatch.from_pylist(blok, schema=shema))
+            broj += len(blok)
+    return broj
+
+
+def izvezi_rezultate(rezultati, tok, format_izvoza="csv", tablica="prostorije"):
+    """
+    Zapisuje rezultate u odabranom formatu.
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+    tok : binary file-like
+        Odredište zapisa (otvorena datoteka ili io.BytesIO)
+    format_izvoza : str
+        "csv", "xlsx" ili "parquet"
+    tablica : str
+        "prostorije" ili "elementi" (XLSX uvijek sadrži obje tablice)
+
+    Returns:
+    --------
+    int or dict
+        Broj zapisanih redaka (za XLSX po tablici)
+    """
+    if format_izvoza == "csv":
+        return izvezi_csv(rezultati, tok, tablica)
+    if format_izvoza == "xlsx":
+        return izvezi_xlsx(rezultati, tok)
+    if format_izvoza == "parquet":
+        return izvezi_parquet(rezultati, tok, tablica)
+    raise ValueError(f"Nepodržani format izvoza: {format_izvoza}")
@@ -0,0 +1,290 @@
+"""
+Modul s unaprijed izračunatim klimatskim podacima za gradove u Hrvatskoj.
+
+Za svaki grad iz REGIJE_GRADOVI_TEMP / GRADOVI_TEMP pri uvozu modula jednom se izračunaju
+projektna temperatura, srednja godišnja temperatura, mjesečni temperaturni profil,
+temperature tla po dubinama i mjesecima, stupanj-dani grijanja, sezonske temperature i
+relativna vlažnost. Podaci se čuvaju u numpy poljima (jedan redak po gradu), a
+dohvati_klimu vraća memoizirani rječnik za jedan grad koji dijele svi kalkulatori
+(toplinski gubici, energija ventilacije, podno grijanje).
+
+Formule su iste kao u modulu temperaturni; posljednji redak polja odgovara zadanoj
+projektnoj temperaturi za gradove koji nisu u popisu.
+"""
+
+import numpy as np
+
+from ..constants import GRADOVI_TEMP, STUPANJ_DANI_GRIJANJA
+
+# Projektna temperatura za nepoznati ili nenavedeni grad [°C]
+ZADANA_PROJEKTNA_TEMPERATURA = -15.0
+
+# Standardne dubine tla [m] za koje se temperature tla računaju unaprijed
+DUBINE_TLA = (0.5, 1.0, 2.0, 3.0, 5.0)
+
+# Bazna temperatura za stupanj-dane grijanja [°C]
+BAZNA_TEMPERATURA = 20.0
+
+# Odstupanje mjesečne temperature od srednje godišnje [°C] (siječanj - prosinac)
+ODSTUPANJA_MJESECI = np.array([-8.0, -6.0, -2.0, 2.0, 6.0, 9.0, 12.0, 11.0, 7.0, 3.0, -1.0, -5.0])
+
+# Broj dana u mjesecu (godina koja nije prijestupna)
+DANI_U_MJESECU = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# Sezone i pripadni mjeseci
+SEZONE = {
+    "zima": (12, 1, 2),
+    "proljeće": (3, 4, 5),
+    "ljeto": (6, 7, 8),
+    "jesen": (9, 10, 11),
+}
+
+MJESECI = tuple(range(1, 13))
+
+
+def _srednja_godisnja(projektne):
+    """Procjena srednje godišnje temperature iz projektne (zimske) temperature."""
+    return np.select(
+        [projektne < -15, projektne < -10, projektne < -5, projektne < 0],
+        [10.5, 11.5, 12.5, 14.0],
+        default=16.0,
+    )
+
+
+def _temperature_tla_po_mjesecima(profil, srednja, dubina):
+    """Temperature tla po mjesecima na zadanoj dubini (prigušena i pomaknuta vanjska temperatura)."""
+    prigusenje = max(0.1, 1.0 - (dubina * 0.4))
+    pomak = min(3, int(dubina * 2.0))
+    srednja = srednja[:, None]
+    tla = srednja + (np.roll(profil, pomak, axis=1) - srednja) * prigusenje
+    return np.clip(tla, 4.0, 20.0)
+
+
+def _temperature_tla_po_dubini(srednja, dubine):
+    """Temperature tla na zadanim dubinama za srednju godišnju temperaturu."""
+    korekcije = np.select(
+        [np.asarray(dubine) < 0.5, np.asarray(dubine) < 1.0, np.asarray(dubine) < 2.0, np.asarray(dubine) < 4.0],
+        [-2.0, -1.0, -0.5, 0.0],
+        default=0.5,
+    )
+    return np.clip(srednja[:, None] + korekcije[None, :], 4.0, 20.0)
+
+
+def _stupanj_dani(profil, bazna_temperatura):
+    """Stupanj-dani grijanja po mjesecima (bez zaokruživanja)."""
+    return np.where(profil < bazna_temperatura, (bazna_temperatura - profil) * DANI_U_MJESECU, 0.0)
+
+
+def _relativna_vlaznost(projektne):
+    """Prosječna relativna vlažnost [%] po sezonama (zima, proljeće, ljeto, jesen)."""
+    return np.select(
+        [projektne[:, None] < -15, projektne[:, None] < -5],
+        [np.array([85.0, 70.0, 65.0, 80.0]), np.array([80.0, 65.0, 60.0, 75.0])],
+        default=np.array([75.0, 70.0, 65.0, 75.0]),
+    )
+
+
+def izradi_klimatske_podatke(projektne_temperature):
+    """
+    Izračunava klimatske podatke za niz projektnih temperatura.
+
+    Parameters:
+    -----------
+    projektne_temperature : array-like
+        Projektne vanjske temperature lokacija [°C]
+
+    Returns:
+    --------
+    dict
+        Polja s jednim retkom po lokaciji: projektna_temperatura (n), srednja_godisnja (n),
+        profil (n x 12), tla_po_mjesecima (n x dubine x 12), tla_po_dubini (n x dubine),
+        stupanj_dani (n x 12), relativna_vlaznost (n x 4)
+    """
+    projektne = np.asarray(projektne_temperature, dtype=float)
+    srednja = _srednja_godisnja(projektne)
+    profil = srednja[:, None] + ODSTUPANJA_MJESECI[None, :]
+
+    podaci = {
+        "projektna_temperatura": projektne,
+        "srednja_godisnja": srednja,
+        "profil": profil,
+        "tla_po_mjesecima": np.stack(
+            [_temperature_tla_po_mjesecima(profil, srednja, dubina) for dubina in DUBINE_TLA], axis=1
+        ),
+        "tla_po_dubini": _temperature_tla_po_dubini(srednja, DUBINE_TLA),
+        "stupanj_dani": _stupanj_dani(profil, BAZNA_TEMPERATURA),
+        "relativna_vlaznost": _relativna_vlaznost(projektne),
+    }
+    for polje in podaci.values():
+        polje.setflags(write=False)
+    return podaci
+
+
+# Gradovi u redoslijedu redaka polja; zadnji redak je za nepoznati grad
+GRADOVI_KLIME = tuple(GRADOVI_TEMP)
+_INDEKS_GRADOVA = {grad: i for i, grad in enumerate(GRADOVI_KLIME)}
+_INDEKS_ZADANOG = len(GRADOVI_KLIME)
+
+KLIMATSKI_PODACI = izradi_klimatske_podatke(
+    [GRADOVI_TEMP[grad] for grad in GRADOVI_KLIME] + [ZADANA_PROJEKTNA_TEMPERATURA]
+)
+
+# Memoizirani rječnici klimatskih podataka po gradu
+_PREDMEMORIJA_KLIME = {}
+
+
+def indeks_grada(grad):
+    """Vraća redak grada u poljima KLIMATSKI_PODACI (za nepoznati grad redak zadane temperature)."""
+    return _INDEKS_GRADOVA.get(grad, _INDEKS_ZADANOG) if grad else _INDEKS_ZADANOG
+
+
+def sezonski_prosjeci(mjesecne_vrijednosti):
+    """
+    Prosjeci mjesečnih vrijednosti po sezonama, zaokruženi na jednu decimalu.
+
+    Parameters:
+    -----------
+    mjesecne_vrijednosti : sequence of float
+        12 mjesečnih vrijednosti (siječanj - prosinac)
+
+    Returns:
+    --------
+    dict
+        Prosjek za svaku sezonu
+    """
+    return {
+        sezona: round(sum(float(mjesecne_vrijednosti[m - 1]) for m in mjeseci) / len(mjeseci), 1)
+        for sezona, mjeseci in SEZONE.items()
+    }
+
+
+def stupanj_dani_po_mjesecima(mjesecni_stupanj_dani):
+    """Oblikuje mjesečne stupanj-dane u rječnik po mjesecima sa zbrojem pod ključem "ukupno"."""
+    rezultat = {m: round(float(mjesecni_stupanj_dani[m - 1]), 1) for m in MJESECI}
+    rezultat["ukupno"] = round(float(sum(float(v) for v in mjesecni_stupanj_dani)), 1)
+    return rezultat
+
+
+def _izradi_klimu(indeks, grad):
+    """Izrađuje rječnik klimatskih podataka za jedan redak polja."""
+    podaci = KLIMATSKI_PODACI
+    profil = podaci["profil"][indeks]
+    tla_po_mjesecima = podaci["tla_po_mjesecima"][indeks]
+    vlaznost = podaci["relativna_vlaznost"][indeks]
+
+    return {
+        "grad": grad if indeks != _INDEKS_ZADANOG else None,
+        "projektna_temperatura": float(podaci["projektna_temperatura"][indeks]),
+        "srednja_godisnja_temperatura": float(podaci["srednja_godisnja"][indeks]),
+        "temperaturni_profil": {m: float(profil[m - 1]) for m in MJESECI},
+        "temperature_tla_po_dubini": {
+            dubina: float(t) for dubina, t in zip(DUBINE_TLA, podaci["tla_po_dubini"][indeks])
+        },
+        "temperature_tla_po_mjesecima": {
+            dubina: {m: float(red[m - 1]) for m in MJESECI} for dubina, red in zip(DUBINE_TLA, tla_po_mjesecima)
+        },
+        "stupanj_dani_grijanja": stupanj_dani_po_mjesecima(podaci["stupanj_dani"][indeks]),
+        "stupanj_dani_tablicni": STUPANJ_DANI_GRIJANJA.get(grad),
+        "sezonske_temperature": {
+            "temperatura_zraka": sezonski_prosjeci(profil),
+            "temperatura_tla": sezonski_prosjeci(tla_po_mjesecima[0]),
+        },
+        "relativna_vlaznost": {sezona: int(v) for sezona, v in zip(SEZONE, vlaznost)},
+    }
+
+
+def dohvati_klimu(grad=None):
+    """
+    Dohvaća klimatske podatke grada (memoizirano; rječnik dijele svi pozivatelji i ne smije se mijenjati).
+
+    Parameters:
+    -----------
+    grad : str, optional
+        Ime grada; za nepoznati ili nenavedeni grad vraćaju se podaci za zadanu
+        projektnu temperaturu (-15 °C)
+
+    Returns:
+    --------
+    dict
+        projektna_temperatura, srednja_godisnja_temperatura, temperaturni_profil (po mjesecima),
+        temperature_tla_po_dubini, temperature_tla_po_mjesecima (po dubini iz DUBINE_TLA),
+        stupanj_dani_grijanja (bazna temperatura 20 °C), stupanj_dani_tablicni (ili None),
+        sezonske_temperature i relativna_vlaznost
+    """
+    indeks = indeks_grada(grad)
+    kljuc = grad if indeks != _INDEKS_ZADANOG else None
+    klima = _PREDMEMORIJA_KLIME.get(kljuc)
+    if klima is None:
+        klima = _izradi_klimu(indeks, grad)
+        _PREDMEMORIJA_KLIME[kljuc] = klima
+    return klima
+
+
+def mjesecne_temperature_tla(grad=None, dubina=0.5):
+    """
+    Temperature tla grada po mjesecima na zadanoj dubini.
+
+    Parameters:
+    -----------
+    grad : str, optional
+        Ime grada
+    dubina : float
+        Dubina tla [m]; za dubine iz DUBINE_TLA vraća se unaprijed izračunati redak
+
+    Returns:
+    --------
+    numpy.ndarray
+        12 temperatura tla [°C] (siječanj - prosinac)
+    """
+    indeks = indeks_grada(grad)
+    if dubina in DUBINE_TLA:
+        return KLIMATSKI_PODACI["tla_po_mjesecima"][indeks, DUBINE_TLA.index(dubina)]
+    return _temperature_tla_po_mjesecima(
+        KLIMATSKI_PODACI["profil"][indeks:indeks + 1], KLIMATSKI_PODACI["srednja_godisnja"][indeks:indeks + 1], dubina
+    )[0]
+
+
+def mjesecni_stupanj_dani(grad=None, bazna_temperatura=BAZNA_TEMPERATURA):
+    """
+    Stupanj-dani grijanja grada po mjesecima (bez zaokruživanja).
+
+    Parameters:
+    -----------
+    grad : str, optional
+        Ime grada
+    bazna_temperatura : float
+        Bazna temperatura [°C]; za 20 °C vraća se unaprijed izračunati redak
+
+    Returns:
+    --------
+    numpy.ndarray
+        12 mjesečnih vrijednosti [K·d]
+    """
+    indeks = indeks_grada(grad)
+    if bazna_temperatura == BAZNA_TEMPERATURA:
+        return KLIMATSKI_PODACI["stupanj_dani"][indeks]
+    return _stupanj_dani(KLIMATSKI_PODACI["profil"][indeks], bazna_temperatura)
+
+
+def dohvati_stupanj_dane(grad=None, bazna_temperatura=BAZNA_TEMPERATURA):
+    """
+    Godišnji stupanj-dani grijanja grada: tablična vrijednost ako postoji, inače izračunata.
+
+    Parameters:
+    -----------
+    grad : str, optional
+        Ime grada
+    bazna_temperatura : float
+        Bazna temperatura [°C]; tablične vrijednosti vrijede samo za 20 °C
+
+    Returns:
+    --------
+    float
+        Stupanj-dani grijanja [K·d]
+    """
+    klima = dohvati_klimu(grad)
+    if bazna_temperatura == BAZNA_TEMPERATURA:
+        if klima["stupanj_dani_tablicni"] is not None:
+            return float(klima["stupanj_dani_tablicni"])
+        return klima["stupanj_dani_grijanja"]["ukupno"]
+    return stupanj_dani_po_mjesecima(mjesecni_stupanj_dani(grad, bazna_temperatura))["ukupno"]
@@ -0,0 +1,473 @@
+"""
+Modul za kompilaciju modela zgrade u NumPy polja.
+
+Transmisijski, ventilacijski i infiltracijski gubici linearni su u U-vrijednostima
+i broju izmjena zraka, pa se cijela zgrada može svesti na nekoliko polja:
+svaki element ovojnice (zid, prozor, vrata, pod, strop) postaje jedan redak s
+efektivnom površinom, razlikom temperatura i indeksom parametra iz kataloga.
+Nad tim poljima se zatim u jednom prolazu računaju gubici za jedan ili tisuće
+skupova parametara (analiza nesigurnosti, osjetljivost, varijante).
+
+Pravila (zadane U-vrijednosti, površine otvora, temperature s druge strane
+elementa) preslikana su iz modula transmisijski.py i ventilacijski.py, tako da
+kompilirani model s nominalnim parametrima daje iste gubitke kao skalarni izračun.
+"""
+
+import hashlib
+import numpy as np
+
+from ..models.etaza import primijeni_preinake
+from .toplinski_most import (
+    izracun_toplinskih_mostova_zgrade, dohvati_metodu_toplinskih_mostova, dohvati_psi_vrijednosti,
+    VRSTE_SPOJEVA, METODA_LINIJSKI
+)
+
+# Konstante zraka - iste kao u ventilacijski.py
+RHO_ZRAKA = 1.2      # kg/m³
+CP_ZRAKA = 1005      # J/(kg·K)
+INFILTRACIJA_IZMJENE = 0.2  # h⁻¹ - osnovna infiltracija (stupanj zabrtvljenosti 1.0)
+
+# Zadane U-vrijednosti kada element nema tip iz kataloga [W/(m²·K)]
+ZADANE_U_VRIJEDNOSTI = {
+    "zidovi": 0.25,
+    "prozori": 1.4,
+    "vrata": 1.8,
+    "podovi": 0.35,
+    "stropovi": 0.20,
+}
+
+# Zadane dimenzije otvora (širina, visina) u m
+ZADANE_DIMENZIJE_OTVORA = {
+    "prozori": (1.2, 1.2),
+    "vrata": (0.9, 2.05),
+}
+
+# Vrste elemenata u kompiliranom modelu
+VRSTE_ELEMENATA = ("zid", "prozor", "vrata", "pod", "strop")
+
+# Granice elementa - što se nalazi s druge strane
+GRANICA_VANJSKA = 0
+GRANICA_NEGRIJANO = 1
+GRANICA_TLO = 2
+GRANICA_TAVAN = 3
+GRANICA_PROSTORIJA = 4
+
+_TEMPERATURE_GRANICA = {
+    GRANICA_VANJSKA: ("vanjska", -20.0),
+    GRANICA_NEGRIJANO: ("negrijanom", 10.0),
+    GRANICA_TLO: ("tlo", 10.0),
+    GRANICA_TAVAN: ("tavan", 5.0),
+}
+
+_GRANICE_ZIDA = {
+    "vanjski": GRANICA_VANJSKA,
+    "prema_negrijanom": GRANICA_NEGRIJANO,
+    "prema_tlu": GRANICA_TLO,
+    "prema_prostoriji": GRANICA_PROSTORIJA,
+}
+
+_GRANICE_PODA = {
+    "Prema tlu": GRANICA_TLO,
+    "Prema negrijanom prostoru": GRANICA_NEGRIJANO,
+    "Prema vanjskom prostoru": GRANICA_VANJSKA,
+}
+
+_GRANICE_STROPA = {
+    "Prema tavanu": GRANICA_TAVAN,
+    "Prema negrijanom prostoru": GRANICA_NEGRIJANO,
+    "Prema vanjskom prostoru": GRANICA_VANJSKA,
+    "Ravni krov": GRANICA_VANJSKA,
+}
+
+
+class KompiliranaZgrada:
+    """
+    Zgrada svedena na NumPy polja za vektorizirani izračun gubitaka.
+
+    Prostorije su indeksirane redom iz modela (0..R-1), elementi ovojnice
+    redcima (0..E-1), a parametri kataloga (tipovi zidova, prozora, vrata,
+    podova i stropova te zadane vrijednosti) stupcima (0..P-1).
+
+    Gubici prostorije r za skup parametara u, n i postotak mostova m:
+
+        Q_r = (1 + m/100) * sum_e A_e * u[p_e] * dT_e
+              + H_psi_r * (Ti_r - Te)
+              + rho*cp/3600 * V_r * (n_r + n_inf) * (Ti_r - Te)
+
+    gdje je H_psi_r = sum ψ·L linijskih toplinskih mostova (samo uz linijsku metodu,
+    kada je m = 0).
+
+    Prostorija tipske etaže pojavljuje se jednom po grupi istih instanci, s kratnošću
+    jednakom broju instanci; izracunaj() vraća gubitke jedne instance, a zbroj za
+    zgradu daje ukupno_zgrade().
+    """
+
+    def __init__(self):
+        # Prostorije
+        self.prostorija_ids = []
+        self.prostorija_nazivi = []
+        self.etaza_ids = []
+        self.prostorija_etaza = np.zeros(0, dtype=np.int64)
+        self.povrsina = np.zeros(0)
+        self.volumen = np.zeros(0)
+        self.temp_unutarnja = np.zeros(0)
+        self.izmjene_zraka = np.zeros(0)
+        self.grijana = np.zeros(0, dtype=bool)
+        self.kratnost = np.zeros(0)  # broj instanci prostorije (tipske etaže)
+
+        # Elementi ovojnice
+        self.el_prostorija = np.zeros(0, dtype=np.int64)
+        self.el_vrsta = np.zeros(0, dtype=np.int64)
+        self.el_granica = np.zeros(0, dtype=np.int64)
+        self.el_parametar = np.zeros(0, dtype=np.int64)
+        self.el_povrsina = np.zeros(0)
+        self.el_delta_t = np.zeros(0)
+        self.el_zid_id = []
+
+        # Parametri kataloga: lista (kategorija, tip_id); tip_id None = zadana vrijednost
+        self.parametri = []
+        self.parametar_nazivi = []
+        self.parametar_u = np.zeros(0)
+
+        # Globalni parametri
+        self.temp_vanjska = -20.0
+        self.postotak_toplinskih_mostova = 0.0
+        self.koeficijent_linijskih_mostova = np.zeros(0)  # H_psi po prostoriji [W/K]
+        self.potpis = ""
+
+        self._matrica_transmisije = None
+        self._indeks_prostorija = None
+
+    @property
+    def broj_prostorija(self):
+        return len(self.prostorija_ids)
+
+    @property
+    def broj_parametara(self):
+        return len(self.parametri)
+
+    def indeks_prostorije(self, prostorija_id):
+        """Vraća indeks prostorije u poljima ili None ako prostorija ne postoji."""
+        if self._indeks_prostorija is None:
+            self._indeks_prostorija = {p_id: i for i, p_id in enumerate(self.prostorija_ids)}
+        return self._indeks_prostorija.get(prostorija_id)
+
+    @property
+    def koeficijent_zraka(self):
+        """Polje rho*cp/3600 * V * (Ti - Te) po prostoriji [W·h] - množi se brojem izmjena."""
+        return RHO_ZRAKA * CP_ZRAKA / 3600.0 * self.volumen * (self.temp_unutarnja - self.temp_vanjska)
+
+    @property
+    def matrica_transmisije(self):
+        """
+        Matrica M oblika (P, R) sa M[p, r] = sum A_e * dT_e za elemente prostorije r
+        koji koriste parametar p. Osnovni transmisijski gubici su u @ M.
+        """
+        if self._matrica_transmisije is None:
+            matrica = np.zeros((self.broj_parametara, self.broj_prostorija))
+            np.add.at(matrica, (self.el_parametar, self.el_prostorija), self.el_povrsina * self.el_delta_t)
+            self._matrica_transmisije = matrica
+        return self._matrica_transmisije
+
+    def ukupno_zgrade(self, polje):
+        """
+        Zbraja gubitke po prostorijama u gubitke zgrade, uzimajući u obzir kratnost.
+
+        Parameters:
+        -----------
+        polje : numpy.ndarray
+            Gubici po prostorijama oblika (R,) ili (S, R)
+
+        Returns:
+        --------
+        float or numpy.ndarray
+            Gubici zgrade (skalar ili oblika (S,))
+        """
+        return polje @ self.kratnost
+
+    def izracunaj(self, u_vrijednosti=None, izmjene_zraka=None, postotak_mostova=None):
+        """
+        Izračunava gubitke po prostorijama za jedan ili više skupova parametara.
+
+        Parameters:
+        -----------
+        u_vrijednosti : numpy.ndarray, optional
+            U-vrijednosti parametara oblika (P,) ili (S, P). Zadano: nominalne.
+        izmjene_zraka : numpy.ndarray, optional
+            Izmjene zraka oblika (R,) ili (S, R). Zadano: iz modela.
+        postotak_mostova : float or numpy.ndarray, optional
+            Postotak toplinskih mostova, skalar ili oblika (S,). Zadano: iz postavki.
+
+        Returns:
+        --------
+        dict
+            Polja "transmisijski", "toplinski_mostovi", "ventilacijski",
+            "infiltracija" i "ukupno" oblika (R,) ili (S, R)
+        """
+        u = self.parametar_u if u_vrijednosti is None else np.asarray(u_vrijednosti, dtype=float)
+        n = self.izmjene_zraka if izmjene_zraka is None else np.asarray(izmjene_zraka, dtype=float)
+        m = self.postotak_toplinskih_mostova if postotak_mostova is None else np.asarray(postotak_mostova, dtype=float)
+
+        transmisijski = u @ self.matrica_transmisije
+        if np.ndim(m) == 1:
+            m = m[:, np.newaxis]
+        toplinski_mostovi = transmisijski * (m / 100.0)
+        if self.koeficijent_linijskih_mostova.any():
+            toplinski_mostovi = toplinski_mostovi + self.koeficijent_linijskih_mostova * (self.temp_unutarnja - self.temp_vanjska)
+
+        koef = self.koeficijent_zraka
+        ventilacijski = n * koef
+        infiltracija = np.broadcast_to(INFILTRACIJA_IZMJENE * koef, ventilacijski.shape)
+
+        return {
+            "transmisijski": transmisijski,
+            "toplinski_mostovi": toplinski_mostovi,
+            "ventilacijski": ventilacijski,
+            "infiltracija": infiltracija,
+            "ukupno": transmisijski + toplinski_mostovi + ventilacijski + infiltracija,
+        }
+
+
+def _u_iz_kataloga(katalog, kategorija, tip_id):
+    """Vraća objekt tipa iz kataloga ili None."""
+    if not katalog or tip_id is None:
+        return None
+    return katalog.get(kategorija, {}).get(tip_id)
+
+
+def _povrsina_i_tip_otvora(otvor, katalog, kategorija):
+    """
+    Određuje površinu otvora i tip iz kataloga prema pravilima iz transmisijski.py.
+
+    Returns:
+    --------
+    tuple
+        (površina u m², tip_id za U-vrijednost ili None za zadanu vrijednost)
+    """
+    zadana_sirina, zadana_visina = ZADANE_DIMENZIJE_OTVORA[kategorija]
+
+    if not otvor.get("koristiti_standardne_dimenzije", True):
+        sirina = otvor.get("sirina", 0)
+        visina = otvor.get("visina", 0)
+        sirina = zadana_sirina if sirina is None or sirina <= 0 else float(sirina)
+        visina = zadana_visina if visina is None or visina <= 0 else float(visina)
+        return sirina * visina, None
+
+    tip_id = otvor.get("tip_id")
+    tip = _u_iz_kataloga(katalog, kategorija, tip_id)
+    if tip is None:
+        return 0.0, None
+
+    u_tip = tip_id if (getattr(tip, "u_vrijednost", None) or 0) > 0 else None
+    povrsina = getattr(tip, "povrsina", None)
+    if povrsina is not None and povrsina > 0:
+        return povrsina, u_tip
+    sirina = getattr(tip, "sirina", None) or getattr(tip, "sirna", None)
+    visina = getattr(tip, "visina", None)
+    if sirina and visina and sirina > 0 and visina > 0:
+        return sirina * visina, u_tip
+    return zadana_sirina * zadana_visina, u_tip
+
+
+def _postavke_toplinskih_mostova():
+    """Dohvaća postotak toplinskih mostova iz session state-a (0 ako su isključeni)."""
+    import streamlit as st
+
+    if not st.session_state.get("toplinski_mostovi", True):
+        return 0.0
+    return float(st.session_state.get("postotak_toplinskih_mostova", 15))
+
+
+def _toplinski_mostovi_ukljuceni():
+    """Jesu li toplinski mostovi uključeni u postavkama projekta."""
+    import streamlit as st
+
+    return bool(st.session_state.get("toplinski_mostovi", True))
+
+
+def kompiliraj_zgradu(model, temperature_dict, katalog=None, postotak_toplinskih_mostova=None,
+                      metoda_toplinskih_mostova=None, psi_vrijednosti=None):
+    """
+    Kompilira MultiRoomModel u KompiliranaZgrada polja.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model s etažama i prostorijama
+    temperature_dict : dict
+        Rječnik s temperaturama (vanjska, tlo, negrijanom, tavan)
+    katalog : dict, optional
+        Katalog tipova elemenata {"zidovi": {id: WallType}, "prozori": ..., ...}
+    postotak_toplinskih_mostova : float, optional
+        Postotak toplinskih mostova; ako nije zadan, čita se iz session state-a
+    metoda_toplinskih_mostova : str, optional
+        "postotak" ili "linijski"; ako nije zadana, čita se iz session state-a
+    psi_vrijednosti : dict, optional
+        ψ vrijednosti po vrsti spoja za linijsku metodu (zadano ψ katalog projekta)
+
+    Returns:
+    --------
+    KompiliranaZgrada
+        Kompilirani model zgrade
+    """
+    zgrada = KompiliranaZgrada()
+    zgrada.temp_vanjska = float(temperature_dict.get("vanjska", -20.0))
+    if postotak_toplinskih_mostova is None:
+        postotak_toplinskih_mostova = _postavke_toplinskih_mostova()
+    zgrada.postotak_toplinskih_mostova = float(postotak_toplinskih_mostova)
+
+    temperature_granica = {
+        granica: float(temperature_dict.get(kljuc, zadano))
+        for granica, (kljuc, zadano) in _TEMPERATURE_GRANICA.items()
+    }
+
+    # Parametri kataloga - zadane vrijednosti imaju fiksne indekse 0..4
+    indeks_parametra = {}
+
+    def parametar(kategorija, tip_id):
+        tip = _u_iz_kataloga(katalog, kategorija, tip_id)
+        kljuc = (kategorija, tip_id if tip is not None else None)
+        if kljuc not in indeks_parametra:
+            indeks_parametra[kljuc] = len(zgrada.parametri)
+            zgrada.parametri.append(kljuc)
+            if tip is not None:
+                zgrada.parametar_nazivi.append(getattr(tip, "naziv", str(tip_id)))
+                parametar_u.append(float(tip.u_vrijednost))
+            else:
+                zgrada.parametar_nazivi.append(f"Zadano ({kategorija})")
+                parametar_u.append(ZADANE_U_VRIJEDNOSTI[kategorija])
+        return indeks_parametra[kljuc]
+
+    parametar_u = []
+    for kategorija in ZADANE_U_VRIJEDNOSTI:
+        parametar(kategorija, None)
+
+    etaze = {etaza.id: (i, etaza) for i, etaza in enumerate(model.etaze)}
+    zgrada.etaza_ids = [etaza.id for etaza in model.etaze]
+    temp_modela = {p.id: p.temp_unutarnja for p in model.prostorije}
+
+    # Tipske etaže: prostorije predloška vrijede za sve instance bez preinaka, a svaka
+    # grupa instanci s preinakama dodaje se jednom, s kratnošću jednakom broju instanci
+    kratnost_predloska = {etaza.id: etaza.grupe_ponavljanja()[0]["broj"] for etaza in model.etaze}
+    stavke = [(p, p.id, p.naziv, kratnost_predloska.get(p.etaza_id, 1), temp_modela) for p in model.prostorije]
+    for etaza in model.etaze:
+        for grupa in etaza.grupe_ponavljanja()[1:]:
+            temp_instance = {**temp_modela, **grupa["preinake"].get("temperature", {})}
+            for prostorija in primijeni_preinake(model.dohvati_prostorije_za_etazu(etaza.id), grupa["preinake"]):
+                naziv = f"{prostorija.naziv} - {grupa['instance'][0]}"
+                stavke.append((prostorija, f"{prostorija.id}@{grupa['id']}", naziv, grupa["broj"], temp_instance))
+
+    prostorija_etaza, povrsina, volumen, temp_unutarnja, izmjene, grijana = [], [], [], [], [], []
+    el_prostorija, el_vrsta, el_granica, el_parametar, el_povrsina, el_delta_t = [], [], [], [], [], []
+
+    def dodaj_element(r, vrsta, granica, p, a, dt, zid_id=None):
+        el_prostorija.append(r)
+        el_vrsta.append(vrsta)
+        el_granica.append(granica)
+        el_parametar.append(p)
+        el_povrsina.append(a)
+        el_delta_t.append(dt)
+        zgrada.el_zid_id.append(zid_id)
+
+    kratnost = []
+    for r, (prostorija, prostorija_id, naziv, broj, temp_prostorija) in enumerate(stavke):
+        indeks_etaze, etaza = etaze.get(prostorija.etaza_id, (-1, None))
+        ti = float(prostorija.temp_unutarnja)
+
+        zgrada.prostorija_ids.append(prostorija_id)
+        kratnost.append(float(broj))
+        zgrada.prostorija_nazivi.append(naziv if broj == 1 else f"{naziv} (×{broj})")
+        prostorija_etaza.append(indeks_etaze)
+        povrsina.append(float(prostorija.povrsina))
+        visina = prostorija.get_actual_height(etaza) if etaza else 2.8
+        volumen.append(float(prostorija.povrsina) * visina)
+        temp_unutarnja.append(ti)
+        izmjene.append(float(prostorija.izmjene_zraka))
+        grijana.append(bool(getattr(prostorija, "grijana", True)))
+
+        # Zidovi s otvorima
+        for zid in prostorija.zidovi:
+            granica = _GRANICE_ZIDA.get(zid.get("tip"))
+            if granica is None:
+                continue
+            if granica == GRANICA_PROSTORIJA:
+                t_druga = temp_prostorija.get(zid.get("povezana_prostorija_id"), 20.0)
+                if abs(ti - t_druga) < 0.1:
+                    continue
+            else:
+                t_druga = temperature_granica[granica]
+            delta_t = ti - t_druga
+            # Negativni gubici zidova i otvora ne ulaze u zbroj prostorije
+            if delta_t <= 0:
+                continue
+
+            zid_id = zid.get("id")
+            elementi = zid.get("elementi") or {}
+            povrsina_otvora = 0.0
+            for kategorija, vrsta in (("prozori", 1), ("vrata", 2)):
+                otvori = [_povrsina_i_tip_otvora(o, katalog, kategorija) for o in elementi.get(kategorija, [])]
+                if not otvori:
+                    continue
+                # Skalarni izračun množi ukupnu površinu prosječnom U-vrijednošću otvora,
+                # što je jednako površini ukupno/n po svakom otvoru
+                ukupno = sum(a for a, _ in otvori)
+                povrsina_otvora += ukupno
+                for _, tip_id in otvori:
+                    dodaj_element(r, vrsta, granica, parametar(kategorija, tip_id), ukupno / len(otvori), delta_t, zid_id)
+
+            bruto = float(zid.get("duzina") or 0.0) * float(zid.get("visina") or 0.0)
+            neto = max(bruto - povrsina_otvora, 0.0)
+            dodaj_element(r, 0, granica, parametar("zidovi", zid.get("tip_zida_id")), neto, delta_t, zid_id)
+
+        # Pod i strop
+        for kategorija, vrsta, granice, tip, tip_id in (
+            ("podovi", 3, _GRANICE_PODA, prostorija.pod_tip, getattr(prostorija, "pod_tip_id", None)),
+            ("stropovi", 4, _GRANICE_STROPA, prostorija.strop_tip, getattr(prostorija, "strop_tip_id", None)),
+        ):
+            granica = granice.get(tip)
+            if granica is None:
+                continue
+            delta_t = ti - temperature_granica[granica]
+            dodaj_element(r, vrsta, granica, parametar(kategorija, tip_id), float(prostorija.povrsina), delta_t)
+
+    zgrada.prostorija_etaza = np.asarray(prostorija_etaza, dtype=np.int64)
+    zgrada.povrsina = np.asarray(povrsina, dtype=float)
+    zgrada.volumen = np.asarray(volumen, dtype=float)
+    zgrada.temp_unutarnja = np.asarray(temp_unutarnja, dtype=float)
+    zgrada.izmjene_zraka = np.asarray(izmjene, dtype=float)
+    zgrada.grijana = np.asarray(grijana, dtype=bool)
+    zgrada.kratnost = np.asarray(kratnost, dtype=float)
+    zgrada.el_prostorija = np.asarray(el_prostorija, dtype=np.int64)
+    zgrada.el_vrsta = np.asarray(el_vrsta, dtype=np.int64)
+    zgrada.el_granica = np.asarray(el_granica, dtype=np.int64)
+    zgrada.el_parametar = np.asarray(el_parametar, dtype=np.int64)
+    zgrada.el_povrsina = np.asarray(el_povrsina, dtype=float)
+    zgrada.el_delta_t = np.asarray(el_delta_t, dtype=float)
+    zgrada.parametar_u = np.asarray(parametar_u, dtype=float)
+
+    # Linijski toplinski mostovi zamjenjuju postotni dodatak
+    zgrada.koeficijent_linijskih_mostova = np.zeros(zgrada.broj_prostorija)
+    if metoda_toplinskih_mostova is None:
+        metoda_toplinskih_mostova = dohvati_metodu_toplinskih_mostova()
+    if metoda_toplinskih_mostova == METODA_LINIJSKI and _toplinski_mostovi_ukljuceni():
+        psi = dohvati_psi_vrijednosti(psi_vrijednosti)
+        prostorije = [stavka[0] for stavka in stavke]
+        duljine = izracun_toplinskih_mostova_zgrade(prostorije, temperature_dict, psi, katalog)["duljine"]
+        zgrada.koeficijent_linijskih_mostova = duljine @ np.array([psi[vrsta] for vrsta in VRSTE_SPOJEVA])
+        zgrada.postotak_toplinskih_mostova = 0.0
+
+    zgrada.potpis = _izracunaj_potpis(zgrada)
+    return zgrada
+
+
+def _izracunaj_potpis(zgrada):
+    """Računa potpis (hash) kompiliranog modela za predmemoriranje izvedenih rezultata."""
+    h = hashlib.sha1()
+    h.update("|".join(zgrada.prostorija_ids).encode())
+    h.update(repr(zgrada.parametri).encode())
+    for polje in (zgrada.prostorija_etaza, zgrada.kratnost, zgrada.povrsina, zgrada.volumen, zgrada.temp_unutarnja,
+                  zgrada.izmjene_zraka, zgrada.el_prostorija, zgrada.el_vrsta, zgrada.el_parametar,
+                  zgrada.el_povrsina, zgrada.el_delta_t, zgrada.parametar_u, zgrada.koeficijent_linijskih_mostova):
+        h.update(np.ascontiguousarray(polje).tobytes())
+    h.update(repr((zgrada.temp_vanjska, zgrada.postotak_toplinskih_mostova)).encode())
+    return h.hexdigest()
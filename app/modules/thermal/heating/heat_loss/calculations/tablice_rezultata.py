@@ -0,0 +1,347 @@
+"""
+Modul sa stupčastim (tabličnim) modelom rezultata proračuna toplinskih gubitaka.
+
+Rezultati izračuna zgrade jednom se, nakon izračuna, prevode u tri pandas tablice:
+etaže, prostorije i elemente ovojnice. Prikaz, zbrajanje, sortiranje, filtriranje
+i izvoz rade izravno nad tim tablicama, bez ponovnog obilaska ugniježđenih rječnika
+pri svakom osvježavanju sučelja.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+# Stupci i tipovi tablica rezultata
+STUPCI_ETAZA = {
+    "etaza_kljuc": "object",
+    "naziv": "object",
+    "broj_ponavljanja": "int64",
+    "broj_prostorija": "int64",
+    "povrsina": "float64",
+    "volumen": "float64",
+    "gubici": "float64",
+    "gubici_ukupno": "float64",
+    "specificni_gubici": "float64",
+    "prosjecna_temperatura": "float64",
+}
+
+STUPCI_PROSTORIJA = {
+    "etaza_kljuc": "object",
+    "prostorija_id": "object",
+    "naziv": "object",
+    "prikaz": "object",
+    "tip": "object",
+    "broj_ponavljanja": "int64",
+    "povrsina": "float64",
+    "temperatura": "float64",
+    "grijana": "bool",
+    "transmisijski": "float64",
+    "toplinski_mostovi": "float64",
+    "ventilacijski": "float64",
+    "infiltracija": "float64",
+    "ukupno": "float64",
+    "specificni_gubici": "float64",
+}
+
+STUPCI_ELEMENATA = {
+    "etaza_kljuc": "object",
+    "prostorija_id": "object",
+    "vrsta": "object",
+    "element_id": "object",
+    "opis": "object",
+    "povrsina": "float64",
+    "u_vrijednost": "float64",
+    "gubici": "float64",
+}
+
+# Vrste elemenata u tablici elemenata
+VRSTE_ELEMENATA_REZULTATA = ("zid", "prozori", "vrata", "pod", "strop", "toplinski_mostovi")
+
+
+def _prazna_tablica(stupci):
+    """Vraća praznu tablicu sa zadanim stupcima i tipovima."""
+    return pd.DataFrame({stupac: pd.Series(dtype=tip) for stupac, tip in stupci.items()})
+
+
+def _tablica(retci, stupci):
+    """Izrađuje tablicu iz redaka (rječnika) sa zadanim redoslijedom stupaca i tipovima."""
+    if not retci:
+        return _prazna_tablica(stupci)
+    return pd.DataFrame(retci, columns=list(stupci)).astype(stupci)
+
+
+class TabliceRezultata:
+    """
+    Rezultati proračuna zgrade u obliku tablica etaža, prostorija i elemenata.
+
+    Gubici u tablicama prostorija i elemenata odnose se na jednu instancu etaže;
+    stupac broj_ponavljanja nosi broj instanci (tipska etaža), pa zbrojevi za
+    zgradu množe gubitke tim brojem.
+    """
+
+    def __init__(self, etaze=None, prostorije=None, elementi=None, temperatura_vanjska=-20.0):
+        self.etaze = etaze if etaze is not None else _prazna_tablica(STUPCI_ETAZA)
+        self.prostorije = prostorije if prostorije is not None else _prazna_tablica(STUPCI_PROSTORIJA)
+        self.elementi = elementi if elementi is not None else _prazna_tablica(STUPCI_ELEMENATA)
+        self.temperatura_vanjska = float(temperatura_vanjska)
+
+    @classmethod
+    def iz_rezultata(cls, rezultati):
+        """
+        Prevodi rezultate izračuna zgrade u tablice (jedan prolaz kroz rječnike).
+
+        Parameters:
+        -----------
+        rezultati : dict
+            Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+
+        Returns:
+        --------
+        TabliceRezultata
+            Tablice etaža, prostorija i elemenata
+        """
+        zgrada = rezultati.get("zgrada", {})
+        retci_etaza, retci_prostorija, retci_elemenata = [], [], []
+
+        for etaza_kljuc, etaza in (zgrada.get("etaze") or {}).items():
+            broj = int(etaza.get("broj_ponavljanja", 1))
+            prostorije = etaza.get("prostorije") or {}
+            povrsina = float(etaza.get("povrsina", 0.0))
+            temp_povrsina = 0.0
+
+            for prostorija_id, p in prostorije.items():
+                p_povrsina = float(p.get("povrsina", 0.0))
+                temp_povrsina += float(p.get("temperatura", 0.0)) * p_povrsina
+                redak = redak_prostorije(etaza_kljuc, prostorija_id, p, broj)
+                retci_prostorija.append(redak)
+                retci_elemenata.extend(_retci_elemenata(etaza_kljuc, prostorija_id, p, redak["toplinski_mostovi"]))
+
+            gubici_etaze = float(etaza.get("gubici", 0.0))
+            retci_etaza.append({
+                "etaza_kljuc": etaza_kljuc,
+                "naziv": etaza.get("naziv", ""),
+                "broj_ponavljanja": broj,
+                "broj_prostorija": len(prostorije),
+                "povrsina": povrsina,
+                "volumen": float(etaza.get("volumen") or 0.0),
+                "gubici": gubici_etaze,
+                "gubici_ukupno": float(etaza.get("gubici_ukupno", gubici_etaze * broj)),
+                "specificni_gubici": gubici_etaze / povrsina if povrsina > 0 else 0.0,
+                "prosjecna_temperatura": temp_povrsina / povrsina if povrsina > 0 else np.nan,
+            })
+
+        return cls(
+            _tablica(retci_etaza, STUPCI_ETAZA),
+            _tablica(retci_prostorija, STUPCI_PROSTORIJA),
+            _tablica(retci_elemenata, STUPCI_ELEMENATA),
+            zgrada.get("temperatura_vanjska", -20.0),
+        )
+
+    # === ZBROJEVI ===
+
+    @property
+    def ukupno(self):
+        """Ukupni gubici zgrade [W] (s ponavljanjima tipskih etaža)."""
+        return float(self.etaze["gubici_ukupno"].sum())
+
+    @property
+    def ukupna_povrsina(self):
+        """Ukupna površina zgrade [m²] (s ponavljanjima tipskih etaža)."""
+        return float((self.etaze["povrsina"] * self.etaze["broj_ponavljanja"]).sum())
+
+    def udio_etaza(self):
+        """Vraća udio svake etaže (sa svim instancama) u ukupnim gubicima zgrade [%]."""
+        ukupno = self.ukupno
+        if ukupno <= 0:
+            return pd.Series(0.0, index=self.etaze.index)
+        return 100.0 * self.etaze["gubici_ukupno"] / ukupno
+
+    def zbroj_po(self, stupac, tablica="prostorije", vrijednost=None):
+        """
+        Zbraja gubitke grupirane po stupcu, uzimajući u obzir ponavljanja etaža.
+
+        Parameters:
+        -----------
+        stupac : str
+            Stupac po kojem se grupira (npr. "tip" za prostorije ili "vrsta" za elemente)
+        tablica : str
+            "prostorije" ili "elementi"
+        vrijednost : str, optional
+            Stupac koji se zbraja (zadano "ukupno" za prostorije, "gubici" za elemente)
+
+        Returns:
+        --------
+        pandas.Series
+            Zbrojevi po vrijednostima stupca, silazno sortirani
+        """
+        df = self.prostorije if tablica == "prostorije" else self.elementi
+        vrijednost = vrijednost or ("ukupno" if tablica == "prostorije" else "gubici")
+        kratnost = df["etaza_kljuc"].map(self.etaze.set_index("etaza_kljuc")["broj_ponavljanja"]).fillna(1)
+        return (df[vrijednost] * kratnost).groupby(df[stupac]).sum().sort_values(ascending=False)
+
+    # === FILTRIRANJE I SORTIRANJE ===
+
+    def prostorije_etaze(self, etaza_kljuc):
+        """Vraća tablicu prostorija jedne etaže."""
+        return self.prostorije[self.prostorije["etaza_kljuc"] == etaza_kljuc]
+
+    def elementi_prostorije(self, prostorija_id, etaza_kljuc=None):
+        """Vraća tablicu elemenata jedne prostorije (po potrebi za određenu instancu etaže)."""
+        maska = self.elementi["prostorija_id"] == prostorija_id
+        if etaza_kljuc is not None:
+            maska &= self.elementi["etaza_kljuc"] == etaza_kljuc
+        return self.elementi[maska]
+
+    def filtriraj_prostorije(self, etaza_kljuc=None, grijana=None, tip=None, min_specificni=None, tekst=None):
+        """
+        Filtrira tablicu prostorija.
+
+        Parameters:
+        -----------
+        etaza_kljuc : str, optional
+            Samo prostorije etaže (instance) s ovim ključem
+        grijana : bool, optional
+            Samo grijane ili samo negrijane prostorije
+        tip : str, optional
+            Samo prostorije ovog tipa
+        min_specificni : float, optional
+            Samo prostorije sa specifičnim gubicima većim ili jednakim zadanoj vrijednosti [W/m²]
+        tekst : str, optional
+            Samo prostorije čiji naziv sadrži zadani tekst (bez obzira na velika slova)
+
+        Returns:
+        --------
+        pandas.DataFrame
+            Filtrirana tablica prostorija
+        """
+        df = self.prostorije
+        maska = pd.Series(True, index=df.index)
+        if etaza_kljuc is not None:
+            maska &= df["etaza_kljuc"] == etaza_kljuc
+        if grijana is not None:
+            maska &= df["grijana"] == bool(grijana)
+        if tip is not None:
+            maska &= df["tip"] == tip
+        if min_specificni is not None:
+            maska &= df["specificni_gubici"] >= float(min_specificni)
+        if tekst:
+            maska &= df["naziv"].str.contains(tekst, case=False, regex=False)
+        return df[maska]
+
+    def sortiraj_prostorije(self, stupac="ukupno", silazno=True, df=None):
+        """Vraća tablicu prostorija (ili zadanu tablicu) sortiranu po stupcu."""
+        df = self.prostorije if df is None else df
+        return df.sort_values(stupac, ascending=not silazno, kind="stable")
+
+    # === IZVOZ ===
+
+    def izvoz_csv(self, tablica="prostorije"):
+        """Vraća tablicu kao CSV tekst (separator ';', decimalni zarez)."""
+        return getattr(self, tablica).to_csv(index=False, sep=";", decimal=",")
+
+    def izvoz_excel(self):
+        """
+        Vraća sve tri tablice kao Excel radnu knjigu.
+
+        Returns:
+        --------
+        bytes
+            Sadržaj .xlsx datoteke s listovima Etaže, Prostorije i Elementi
+        """
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            self.etaze.to_excel(writer, sheet_name="Etaže", index=False)
+            self.prostorije.to_excel(writer, sheet_name="Prostorije", index=False)
+            self.elementi.to_excel(writer, sheet_name="Elementi", index=False)
+        return buffer.getvalue()
+
+
+def redak_prostorije(etaza_kljuc, prostorija_id, prostorija_rezultat, broj_ponavljanja=1):
+    """Izrađuje redak tablice prostorija za jednu prostoriju."""
+    p = prostorija_rezultat
+    gubici = p.get("gubici", {})
+    transmisijski = gubici.get("transmisijski", {})
+    toplinski_mostovi = float(gubici.get("toplinski_mostovi", 0.0))
+    ukupno = float(gubici.get("ukupno", 0.0))
+    p_povrsina = float(p.get("povrsina", 0.0))
+    return {
+        "etaza_kljuc": etaza_kljuc,
+        "prostorija_id": prostorija_id,
+        "naziv": p.get("naziv", ""),
+        "prikaz": f"{p['broj_prostorije']}. {p.get('naziv', '')}" if p.get("broj_prostorije") else p.get("naziv", ""),
+        "tip": p.get("tip", ""),
+        "broj_ponavljanja": int(broj_ponavljanja),
+        "povrsina": p_povrsina,
+        "temperatura": float(p.get("temperatura", 0.0)),
+        "grijana": bool(p.get("grijana", True)),
+        "transmisijski": float(transmisijski.get("ukupno", 0.0)) - float(transmisijski.get("toplinski_mostovi", 0.0)),
+        "toplinski_mostovi": toplinski_mostovi,
+        "ventilacijski": float(gubici.get("ventilacijski", {}).get("snaga_gubitaka", 0.0)),
+        "infiltracija": float(gubici.get("infiltracija", {}).get("snaga_gubitaka", 0.0)),
+        "ukupno": ukupno,
+        "specificni_gubici": ukupno / p_povrsina if p_povrsina > 0 else 0.0,
+    }
+
+
+def _retci_elemenata(etaza_kljuc, prostorija_id, prostorija_rezultat, toplinski_mostovi):
+    """Izrađuje retke tablice elemenata za jednu prostoriju."""
+    transmisijski = prostorija_rezultat.get("gubici", {}).get("transmisijski", {})
+    zidovi_info = prostorija_rezultat.get("zidovi_info") or {}
+    retci = []
+
+    def redak(vrsta, element_id, opis, povrsina, u_vrijednost, gubici):
+        retci.append({
+            "etaza_kljuc": etaza_kljuc,
+            "prostorija_id": prostorija_id,
+            "vrsta": vrsta,
+            "element_id": element_id,
+            "opis": opis,
+            "povrsina": float(povrsina or 0.0),
+            "u_vrijednost": float(u_vrijednost) if u_vrijednost is not None else np.nan,
+            "gubici": float(gubici or 0.0),
+        })
+
+    for zid_id, gubici_zida in (transmisijski.get("zidovi") or {}).items():
+        info = zidovi_info.get(zid_id, {})
+        opis = " - ".join(str(x) for x in (info.get("tip"), info.get("orijentacija")) if x)
+        redak("zid", zid_id, opis, info.get("povrsina"), info.get("u_vrijednost"), max(gubici_zida, 0.0))
+
+    for vrsta, info_kljuc in (("prozori", "prozori_info"), ("vrata", "vrata_info")):
+        info = transmisijski.get(info_kljuc) or {}
+        if transmisijski.get(vrsta) or info.get("ukupna_povrsina"):
+            redak(vrsta, None, f"{len(info.get('detalji') or [])} kom", info.get("ukupna_povrsina"),
+                  info.get("u_vrijednost"), transmisijski.get(vrsta))
+
+    povrsina = prostorija_rezultat.get("povrsina")
+    for vrsta in ("pod", "strop"):
+        if transmisijski.get(vrsta):
+            redak(vrsta, None, "", povrsina, None, transmisijski.get(vrsta))
+
+    if toplinski_mostovi:
+        redak("toplinski_mostovi", None, prostorija_rezultat.get("toplinski_mostovi_metoda") or "", None, None, toplinski_mostovi)
+    return retci
+
+
+def dohvati_tablice(rezultati):
+    """
+    Vraća tablice rezultata; za rezultate spremljene prije uvođenja tablica izrađuje ih
+    jednom i sprema u isti rječnik.
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultat funkcije izracunaj_toplinske_gubitke_zgrade
+
+    Returns:
+    --------
+    TabliceRezultata or None
+        Tablice rezultata ili None ako rezultati ne sadrže zgradu
+    """
+    if not rezultati or not rezultati.get("zgrada"):
+        return None
+    tablice = rezultati.get("tablice")
+    if not isinstance(tablice, TabliceRezultata):
+        tablice = TabliceRezultata.iz_rezultata(rezultati)
+        rezultati["tablice"] = tablice
+    return tablice
@@ -17,7 +17,10 @@ Funkcije u ovom modulu također pružaju podatke za dinamičku analizu toplinski
 svojstava zgrade tijekom cijele godine.
 """
 
-from ..models.elementi.constants import VANJSKE_TEMP_PO_GRADOVIMA
+from .klimatski_podaci import (
+    dohvati_klimu, mjesecne_temperature_tla, mjesecni_stupanj_dani, sezonski_prosjeci, stupanj_dani_po_mjesecima,
+    MJESECI
+)
 
 def dohvati_projektnu_vanjsku_temperaturu(grad=None):
     """
@@ -33,9 +36,8 @@ def dohvati_projektnu_vanjsku_temperaturu(grad=None):
     float
         Projektna vanjska temperatura u °C
     """
-    if grad and grad in VANJSKE_TEMP_PO_GRADOVIMA:
-        return VANJSKE_TEMP_PO_GRADOVIMA[grad]
-    return -15.0  # Default vrijednost ako grad nije naveden ili ne postoji u rječniku
+    # Za grad koji nije naveden ili ne postoji u popisu vraća se zadana vrijednost (-15 °C)
+    return dohvati_klimu(grad)["projektna_temperatura"]
 
 def izracunaj_temperaturne_korekcije(prostorija, temperatura_vanjska, temperatura_susjednih_negrijanih=None):
     """
@@ -156,37 +158,10 @@ def izracunaj_temperaturu_tla_po_mjesecima(grad="Zagreb", dubina=0.5):
     dict
         Rječnik s temperaturama tla za svaki mjesec
     """
-    # Dohvaćanje temperaturnog profila kroz godinu
-    temp_profil = izracunaj_temperaturni_profil_godine(grad)
-    
-    # Izračun temperatura tla po mjesecima
-    # S povećanjem dubine, varijacije temperature se smanjuju i 
-    # javlja se veći vremenski pomak u odnosu na vanjsku temperaturu
-    
-    # Parametri za modeliranje temperature tla
-    amplitude_reduction = max(0.1, 1.0 - (dubina * 0.4))  # Smanjenje amplitude s dubinom
-    time_lag_months = min(3, int(dubina * 2.0))  # Vremenski pomak u mjesecima (max 3 mjeseca)
-    
-    # Izračun srednje godišnje temperature
-    srednja_godisnja = izracunaj_srednju_godisnju_temperaturu(grad)
-    
-    temp_tla = {}
-    for mjesec in range(1, 13):
-        # Određivanje mjeseca iz kojeg uzimamo vanjsku temperaturu (s vremenskim pomakom)
-        mjesec_vani = (mjesec - time_lag_months) % 12
-        if mjesec_vani == 0:
-            mjesec_vani = 12
-        
-        # Izračun razlike od srednje temperature (uz smanjenu amplitudu)
-        razlika = (temp_profil[mjesec_vani] - srednja_godisnja) * amplitude_reduction
-        
-        # Konačna temperatura tla
-        temp_tla[mjesec] = srednja_godisnja + razlika
-        
-        # Ograničenje vrijednosti
-        temp_tla[mjesec] = max(4.0, min(temp_tla[mjesec], 20.0))
-    
-    return temp_tla
+    # Temperature tla izračunate su unaprijed za standardne dubine (klimatski_podaci);
+    # s povećanjem dubine varijacije se smanjuju i javlja se vremenski pomak
+    temp_tla = mjesecne_temperature_tla(grad, dubina)
+    return {mjesec: float(temp_tla[mjesec - 1]) for mjesec in MJESECI}
 
 def izracunaj_temperaturu_tla_po_dubini(srednja_godisnja_temp, dubine=None):
     """
@@ -518,19 +493,16 @@ def izracunaj_temperature_za_model(model, grad=None):
     dict
         Rječnik s temperaturnim podacima za cijeli model
     """
-    # Dohvat vanjske projektne temperature
-    temperatura_vanjska = dohvati_projektnu_vanjsku_temperaturu(grad)
+    # Klimatski podaci grada (projektna temperatura, profili tla, sezonske temperature,
+    # stupanj-dani) izračunati su unaprijed i dijele se između svih poziva
+    klima = dohvati_klimu(grad)
+    temperatura_vanjska = klima["projektna_temperatura"]
     
     # Izračun temperature tla
     temperatura_tla = izracunaj_temperaturu_tla(temperatura_vanjska)
     
-    # Izračun srednje godišnje temperature
-    srednja_godisnja = izracunaj_srednju_godisnju_temperaturu(grad)
-    
-    # Izračun temperatura tla po dubinama
-    temperature_tla_po_dubini = izracunaj_temperaturu_tla_po_dubini(srednja_godisnja)
-    
-    # Izračun sezonskih temperatura
+    srednja_godisnja = klima["srednja_godisnja_temperatura"]
+    temperature_tla_po_dubini = dict(klima["temperature_tla_po_dubini"])
     sezonske_temperature = izracunaj_sezonske_temperature(grad, izracunaj_vlagu=True)
       # Izračun temperatura negrijanih prostorija iterativnim postupkom
     temperature_negrijanih = izracunaj_temperature_negrijanih_prostorija_iterativno(
@@ -547,8 +519,8 @@ def izracunaj_temperature_za_model(model, grad=None):
             if prostorija.izracunata_temp_negrijane is not None:
                 prostorija.temperatura_susjednog_negrijanog = prostorija.izracunata_temp_negrijane
     
-    # Izračun stupanj-dana grijanja (za standardnu temperaturu 20°C)
-    stupanj_dani = izracunaj_stupanj_dane_grijanja(grad, 20.0)
+    # Stupanj-dani grijanja (za standardnu temperaturu 20°C)
+    stupanj_dani = dict(klima["stupanj_dani_grijanja"])
     
     # Rezultati za sve etaže i prostorije
     rezultati = {
@@ -653,24 +625,9 @@ def izracunaj_srednju_godisnju_temperaturu(grad="Zagreb"):
     float
         Srednja godišnja temperatura u °C
     """
-    # Pojednostavljena procjena srednje godišnje temperature
-    # U stvarnosti, ovo bi se trebalo temeljiti na stvarnim podacima
-    
-    # Projektna temperatura je zimska ekstremna temperatura
-    projektna_temp = dohvati_projektnu_vanjsku_temperaturu(grad)
-    
-    # Za procjenu srednje godišnje temperature koristimo korekciju
-    # Hrvatska u prosjeku ima srednju godišnju temperaturu između 10°C i 16°C
-    if projektna_temp < -15:  # Kontinentalna Hrvatska (hladnija područja)
-        return 10.5
-    elif projektna_temp < -10:  # Kontinentalna Hrvatska (umjerena područja)
-        return 11.5
-    elif projektna_temp < -5:  # Unutrašnjost Istre i Gorski kotar
-        return 12.5
-    elif projektna_temp < 0:  # Obalno područje (sjever)
-        return 14.0
-    else:  # Obalno područje (jug)
-        return 16.0
+    # Pojednostavljena procjena iz projektne temperature, izračunata unaprijed za sve gradove
+    # (Hrvatska u prosjeku ima srednju godišnju temperaturu između 10°C i 16°C)
+    return dohvati_klimu(grad)["srednja_godisnja_temperatura"]
 
 def izracunaj_temperaturni_profil_godine(grad="Zagreb"):
     """
@@ -686,30 +643,8 @@ def izracunaj_temperaturni_profil_godine(grad="Zagreb"):
     dict
         Rječnik s prosječnim temperaturama za svaki mjesec
     """
-    # Projektna temperatura (zimski ekstrem)
-    projektna_temp = dohvati_projektnu_vanjsku_temperaturu(grad)
-    
-    # Srednja godišnja temperatura
-    srednja_temp = izracunaj_srednju_godisnju_temperaturu(grad)
-    
-    # Ljetni ekstrem (procjena)
-    ljetni_ekstrem = 35.0 if projektna_temp < -10 else 32.0
-    
-    # Mjesečne temperature (okvirne vrijednosti)
-    return {
-        1: srednja_temp - 8.0,  # Siječanj
-        2: srednja_temp - 6.0,  # Veljača
-        3: srednja_temp - 2.0,  # Ožujak
-        4: srednja_temp + 2.0,  # Travanj
-        5: srednja_temp + 6.0,  # Svibanj
-        6: srednja_temp + 9.0,  # Lipanj
-        7: srednja_temp + 12.0,  # Srpanj
-        8: srednja_temp + 11.0,  # Kolovoz
-        9: srednja_temp + 7.0,  # Rujan
-        10: srednja_temp + 3.0,  # Listopad
-        11: srednja_temp - 1.0,  # Studeni
-        12: srednja_temp - 5.0   # Prosinac
-    }
+    # Mjesečne temperature (okvirne vrijednosti) izračunate su unaprijed za sve gradove
+    return dict(dohvati_klimu(grad)["temperaturni_profil"])
 
 def izracunaj_temperaturu_na_granici_slojeva(temperatura_unutarnja, temperatura_vanjska, 
                                             u_vrijednost_ukupna, r_vrijednosti_slojeva):
@@ -777,43 +712,9 @@ def izracunaj_stupanj_dane_grijanja(grad="Zagreb", bazna_temperatura=20.0):
     dict
         Rječnik s brojem stupanj-dana grijanja po mjesecima i ukupno
     """
-    # Dohvaćanje prosječnih temperatura po mjesecima
-    temp_profil = izracunaj_temperaturni_profil_godine(grad)
-    
-    # Broj dana u svakom mjesecu
-    dani_u_mjesecu = {
-        1: 31,  # Siječanj
-        2: 28,  # Veljača (nije prijestupna godina)
-        3: 31,  # Ožujak
-        4: 30,  # Travanj
-        5: 31,  # Svibanj
-        6: 30,  # Lipanj
-        7: 31,  # Srpanj
-        8: 31,  # Kolovoz
-        9: 30,  # Rujan
-        10: 31,  # Listopad
-        11: 30,  # Studeni
-        12: 31   # Prosinac
-    }
-    
-    # Izračun stupanj-dana grijanja za svaki mjesec
-    stupanj_dani = {}
-    ukupno = 0
-    
-    for mjesec, temp in temp_profil.items():
-        # Ako je prosječna temperatura mjeseca niža od bazne temperature,
-        # računamo stupanj-dane grijanja za taj mjesec
-        if temp < bazna_temperatura:
-            stupanj_dani_mjeseca = (bazna_temperatura - temp) * dani_u_mjesecu[mjesec]
-            stupanj_dani[mjesec] = round(stupanj_dani_mjeseca, 1)
-            ukupno += stupanj_dani_mjeseca
-        else:
-            stupanj_dani[mjesec] = 0.0
-    
-    # Dodavanje ukupnog broja stupanj-dana grijanja
-    stupanj_dani["ukupno"] = round(ukupno, 1)
-    
-    return stupanj_dani
+    # Stupanj-dani za baznu temperaturu 20°C izračunati su unaprijed; za ostale bazne
+    # temperature računaju se iz unaprijed izračunatog mjesečnog profila
+    return stupanj_dani_po_mjesecima(mjesecni_stupanj_dani(grad, bazna_temperatura))
 
 def izracunaj_sezonske_temperature(grad="Zagreb", dubina_tla=0.5, izracunaj_vlagu=False):
     """
@@ -833,68 +734,21 @@ def izracunaj_sezonske_temperature(grad="Zagreb", dubina_tla=0.5, izracunaj_vlag
     dict
         Rječnik s temperaturama i opcijski vlažnosti po sezonama
     """
-    # Definicija sezona (mjeseci)
-    sezone = {
-        "zima": [12, 1, 2],     # Prosinac, Siječanj, Veljača
-        "proljeće": [3, 4, 5],  # Ožujak, Travanj, Svibanj
-        "ljeto": [6, 7, 8],     # Lipanj, Srpanj, Kolovoz
-        "jesen": [9, 10, 11]    # Rujan, Listopad, Studeni
-    }
-    
-    # Dohvaćanje mjesečnih temperatura
-    temp_profil = izracunaj_temperaturni_profil_godine(grad)
-    
-    # Dohvaćanje temperatura tla po mjesecima
-    temp_tla_profil = izracunaj_temperaturu_tla_po_mjesecima(grad, dubina=dubina_tla)
+    klima = dohvati_klimu(grad)
     
-    # Prosječne relativne vlažnosti po sezonama za različite klimatske regije
-    # Ovo su aproksimacije i trebale bi se zamijeniti stvarnim podacima
-    relativna_vlaznost = {}
-    
-    if izracunaj_vlagu:
-        # Određivanje klimatske regije iz projektne temperature
-        projektna_temp = dohvati_projektnu_vanjsku_temperaturu(grad)
-        
-        if projektna_temp < -15:  # Kontinentalna Hrvatska (hladnija područja)
-            relativna_vlaznost = {
-                "zima": 85,      # Zima - visoka vlažnost
-                "proljeće": 70,  # Proljeće - umjerena vlažnost
-                "ljeto": 65,     # Ljeto - niža vlažnost
-                "jesen": 80      # Jesen - povišena vlažnost
-            }
-        elif projektna_temp < -5:  # Kontinentalna Hrvatska (umjerena područja)
-            relativna_vlaznost = {
-                "zima": 80,
-                "proljeće": 65,
-                "ljeto": 60,
-                "jesen": 75
-            }
-        else:  # Obalno područje
-            relativna_vlaznost = {
-                "zima": 75,
-                "proljeće": 70,
-                "ljeto": 65,
-                "jesen": 75
-            }
+    # Sezonski prosjeci zraka (i tla na dubini 0.5 m) izračunati su unaprijed
+    if dubina_tla == 0.5:
+        temperatura_tla = dict(klima["sezonske_temperature"]["temperatura_tla"])
+    else:
+        temperatura_tla = sezonski_prosjeci(mjesecne_temperature_tla(grad, dubina_tla))
     
-    # Izračun prosječnih temperatura po sezonama
     rezultati = {
-        "temperatura_zraka": {},
-        "temperatura_tla": {}
+        "temperatura_zraka": dict(klima["sezonske_temperature"]["temperatura_zraka"]),
+        "temperatura_tla": temperatura_tla
     }
     
+    # Prosječne relativne vlažnosti po sezonama za klimatsku regiju grada (aproksimacije)
     if izracunaj_vlagu:
-        rezultati["relativna_vlaznost"] = relativna_vlaznost
-    
-    for sezona, mjeseci in sezone.items():
-        # Izračun prosječne temperature zraka za sezonu
-        ukupno_temp = sum(temp_profil[mjesec] for mjesec in mjeseci)
-        prosjecna_temp = ukupno_temp / len(mjeseci)
-        rezultati["temperatura_zraka"][sezona] = round(prosjecna_temp, 1)
-        
-        # Izračun prosječne temperature tla za sezonu
-        ukupno_temp_tla = sum(temp_tla_profil[mjesec] for mjesec in mjeseci)
-        prosjecna_temp_tla = ukupno_temp_tla / len(mjeseci)
-        rezultati["temperatura_tla"][sezona] = round(prosjecna_temp_tla, 1)
+        rezultati["relativna_vlaznost"] = dict(klima["relativna_vlaznost"])
     
     return rezultati
@@ -1,8 +1,156 @@
 """
 Modul za izračun toplinskih gubitaka kroz toplinske mostove.
+
+Podržane su dvije metode:
+- "postotak": dodatak kao postotak osnovnih transmisijskih gubitaka,
+- "linijski": zbroj ψ·L·ΔT po vrstama spojeva (zid-zid, zid-pod, zid-strop, otvori).
+
+Duljine spojeva ovise samo o geometriji prostorije pa se predmemoriraju po prostoriji
+i računaju ponovno tek kada se geometrija promijeni.
 """
 
-def izracun_toplinskih_mostova_po_vrsti(prostorija, temperature_dict):
+import numpy as np
+
+# Vrste linijskih toplinskih mostova
+VRSTE_SPOJEVA = ("spojevi_zidova", "spojevi_zid_pod", "spojevi_zid_strop", "otvori")
+
+# Zadani linijski koeficijenti prolaska topline ψ [W/(m·K)] - pojednostavljeno
+ZADANE_PSI_VRIJEDNOSTI = {
+    "spojevi_zidova": 0.15,
+    "spojevi_zid_pod": 0.40,
+    "spojevi_zid_strop": 0.30,
+    "otvori": 0.25,
+}
+
+NAZIVI_SPOJEVA = {
+    "spojevi_zidova": "Spoj zid-zid (vanjski kut)",
+    "spojevi_zid_pod": "Spoj zid-pod",
+    "spojevi_zid_strop": "Spoj zid-strop",
+    "otvori": "Spoj zid-otvor (prozori, vrata)",
+}
+
+METODA_POSTOTAK = "postotak"
+METODA_LINIJSKI = "linijski"
+
+# Opseg otvora kada dimenzije nisu poznate [m]
+ZADANI_OPSEG_OTVORA = 6.0
+
+# Predmemorija duljina spojeva {prostorija_id: (potpis_geometrije, duljine)}
+_predmemorija_duljina = {}
+
+
+def dohvati_metodu_toplinskih_mostova():
+    """
+    Vraća odabranu metodu toplinskih mostova iz session state-a.
+    
+    Returns:
+    --------
+    str
+        METODA_POSTOTAK ili METODA_LINIJSKI
+    """
+    import streamlit as st
+    
+    return st.session_state.get("metoda_toplinskih_mostova", METODA_POSTOTAK)
+
+
+def dohvati_psi_vrijednosti(psi_katalog=None):
+    """
+    Vraća ψ vrijednosti projekta, nadopunjene zadanim vrijednostima.
+    
+    Parameters:
+    -----------
+    psi_katalog : dict, optional
+        ψ vrijednosti projekta {vrsta_spoja: ψ}; ako nije zadan, čita se iz session state-a
+        
+    Returns:
+    --------
+    dict
+        ψ vrijednosti za sve vrste spojeva
+    """
+    if psi_katalog is None:
+        import streamlit as st
+        psi_katalog = st.session_state.get("psi_katalog") or {}
+    psi = dict(ZADANE_PSI_VRIJEDNOSTI)
+    psi.update({k: float(v) for k, v in psi_katalog.items() if k in ZADANE_PSI_VRIJEDNOSTI and v is not None})
+    return psi
+
+
+def _visina_prostorije(prostorija):
+    """Vraća stvarnu visinu prostorije uzimajući visinu etaže iz modela ako je dostupan."""
+    etaza = None
+    if getattr(prostorija, "model_ref", None):
+        etaza = prostorija.model_ref.dohvati_etazu(prostorija.etaza_id)
+    return prostorija.get_actual_height(etaza)
+
+
+def _opseg_otvora(otvor, katalog_kategorije):
+    """Vraća opseg otvora iz vlastitih dimenzija, dimenzija tipa iz kataloga ili zadanu vrijednost."""
+    sirina, visina = None, None
+    if not otvor.get("koristiti_standardne_dimenzije", True):
+        sirina, visina = otvor.get("sirina"), otvor.get("visina")
+    elif katalog_kategorije and otvor.get("tip_id") in katalog_kategorije:
+        tip = katalog_kategorije[otvor.get("tip_id")]
+        sirina, visina = getattr(tip, "sirina", None), getattr(tip, "visina", None)
+    if sirina and visina and sirina > 0 and visina > 0:
+        return 2.0 * (float(sirina) + float(visina))
+    return ZADANI_OPSEG_OTVORA
+
+
+def _potpis_geometrije(prostorija, katalog):
+    """Računa potpis geometrije prostorije relevantne za duljine spojeva."""
+    zidovi = []
+    for zid in prostorija.zidovi:
+        if zid.get("tip") != "vanjski":
+            continue
+        elementi = zid.get("elementi") or {}
+        otvori = tuple(
+            _opseg_otvora(o, (katalog or {}).get(kategorija))
+            for kategorija in ("prozori", "vrata")
+            for o in elementi.get(kategorija, [])
+        )
+        zidovi.append((zid.get("duzina"), otvori))
+    return (_visina_prostorije(prostorija), tuple(zidovi))
+
+
+def izracunaj_duljine_spojeva(prostorija, katalog=None):
+    """
+    Izračunava duljine linijskih toplinskih mostova prostorije, uz predmemoriju po prostoriji.
+    
+    Duljine se računaju ponovno samo kada se promijeni geometrija prostorije
+    (vanjski zidovi, njihove duljine, otvori ili visina).
+    
+    Parameters:
+    -----------
+    prostorija : Prostorija
+        Prostorija za koju se računaju duljine
+    katalog : dict, optional
+        Katalog tipova elemenata (za dimenzije standardnih prozora i vrata)
+        
+    Returns:
+    --------
+    dict
+        Duljine u m po vrsti spoja (ključevi iz VRSTE_SPOJEVA)
+    """
+    potpis = _potpis_geometrije(prostorija, katalog)
+    spremljeno = _predmemorija_duljina.get(prostorija.id)
+    if spremljeno is not None and spremljeno[0] == potpis:
+        return spremljeno[1]
+    
+    visina, zidovi = potpis
+    duljina_zid_pod = float(sum(duzina or 0.0 for duzina, _ in zidovi))
+    duljine = {
+        # Pretpostavka: svaki vanjski zid ima dva spoja s drugim zidovima
+        "spojevi_zidova": len(zidovi) * 2 * visina,
+        "spojevi_zid_pod": duljina_zid_pod,
+        # U većini slučajeva jednako duljini spojeva zid-pod
+        "spojevi_zid_strop": duljina_zid_pod,
+        "otvori": float(sum(sum(otvori) for _, otvori in zidovi)),
+    }
+    _predmemorija_duljina[prostorija.id] = (potpis, duljine)
+    return duljine
+
+
+def izracun_toplinskih_mostova_po_vrsti(prostorija, temperature_dict, psi_vrijednosti=None, katalog=None):
     """
     Izračunava toplinske gubitke kroz toplinske mostove za prostoriju, po vrsti mosta.
     
@@ -12,55 +160,74 @@ def izracun_toplinskih_mostova_po_vrsti(prostorija, temperature_dict):
         Prostorija za koju se računaju gubici
     temperature_dict : dict
         Rječnik s temperaturama (vanjska, susjednih negrijanih prostora, itd.)
+    psi_vrijednosti : dict, optional
+        ψ vrijednosti po vrsti spoja; zadano ψ katalog projekta
+    katalog : dict, optional
+        Katalog tipova elemenata (za dimenzije standardnih prozora i vrata)
         
     Returns:
     --------
     dict
         Rječnik s izračunatim gubicima po vrsti toplinskog mosta i ukupno
     """
-    gubici = {
-        "spojevi_zidova": 0.0,
-        "spojevi_zid_pod": 0.0,
-        "spojevi_zid_strop": 0.0,
-        "otvori": 0.0,
-        "ukupno": 0.0
-    }
-    
-    # Temperatura u prostoriji
-    temp_unutarnja = prostorija.temp_unutarnja
-    
-    # Dohvati vanjsku temperaturu
-    temp_vanjska = temperature_dict.get("vanjska", -15.0)
+    psi = dohvati_psi_vrijednosti(psi_vrijednosti)
+    duljine = izracunaj_duljine_spojeva(prostorija, katalog)
     
     # Razlika temperatura
-    delta_t = temp_unutarnja - temp_vanjska
-    
-    # Duljine toplinskih mostova
-    duljina_spojeva_zidova = izracunaj_duljinu_spojeva_zidova(prostorija)
-    duljina_spojeva_zid_pod = izracunaj_duljinu_spojeva_zid_pod(prostorija)
-    duljina_spojeva_zid_strop = izracunaj_duljinu_spojeva_zid_strop(prostorija)
-    duljina_otvora = izracunaj_duljinu_otvora(prostorija)
-    
-    # Linearni koeficijenti prolaska topline (W/mK) - pojednostavljeno
-    psi_spojevi_zidova = 0.15  # W/mK
-    psi_spojevi_zid_pod = 0.40  # W/mK
-    psi_spojevi_zid_strop = 0.30  # W/mK
-    psi_otvori = 0.25  # W/mK
-    
-    # Izračun gubitaka
-    gubici["spojevi_zidova"] = duljina_spojeva_zidova * psi_spojevi_zidova * delta_t
-    gubici["spojevi_zid_pod"] = duljina_spojeva_zid_pod * psi_spojevi_zid_pod * delta_t
-    gubici["spojevi_zid_strop"] = duljina_spojeva_zid_strop * psi_spojevi_zid_strop * delta_t
-    gubici["otvori"] = duljina_otvora * psi_otvori * delta_t
-    
-    # Ukupni gubici
-    gubici["ukupno"] = (
-        gubici["spojevi_zidova"] + 
-        gubici["spojevi_zid_pod"] + 
-        gubici["spojevi_zid_strop"] + 
-        gubici["otvori"]
-    )
+    delta_t = prostorija.temp_unutarnja - temperature_dict.get("vanjska", -15.0)
     
+    gubici = {vrsta: duljine[vrsta] * psi[vrsta] * delta_t for vrsta in VRSTE_SPOJEVA}
+    gubici["ukupno"] = sum(gubici[vrsta] for vrsta in VRSTE_SPOJEVA)
+    gubici["duljine"] = dict(duljine)
+    return gubici
+
+
+def izracun_toplinskih_mostova_zgrade(prostorije, temperature_dict, psi_vrijednosti=None, katalog=None):
+    """
+    Vektorizirano izračunava linijske toplinske mostove za sve prostorije odjednom.
+    
+    Parameters:
+    -----------
+    prostorije : list[Prostorija]
+        Prostorije za koje se računaju gubici
+    temperature_dict : dict
+        Rječnik s temperaturama (vanjska, ...)
+    psi_vrijednosti : dict, optional
+        ψ vrijednosti po vrsti spoja; zadano ψ katalog projekta
+    katalog : dict, optional
+        Katalog tipova elemenata (za dimenzije standardnih prozora i vrata)
+        
+    Returns:
+    --------
+    dict
+        "prostorija_ids" (lista), "duljine" (R, 4), "gubici" (R, 4) i "ukupno" (R,);
+        stupci su poredani prema VRSTE_SPOJEVA
+    """
+    psi = dohvati_psi_vrijednosti(psi_vrijednosti)
+    psi_polje = np.array([psi[vrsta] for vrsta in VRSTE_SPOJEVA])
+    duljine = np.array(
+        [[d[vrsta] for vrsta in VRSTE_SPOJEVA]
+         for d in (izracunaj_duljine_spojeva(p, katalog) for p in prostorije)],
+        dtype=float,
+    ).reshape(len(prostorije), len(VRSTE_SPOJEVA))
+    delta_t = np.array([p.temp_unutarnja for p in prostorije], dtype=float) - temperature_dict.get("vanjska", -15.0)
+    gubici = duljine * psi_polje * delta_t[:, np.newaxis]
+    return {
+        "prostorija_ids": [p.id for p in prostorije],
+        "duljine": duljine,
+        "gubici": gubici,
+        "ukupno": gubici.sum(axis=1),
+    }
+
+
+def rezultat_mostova_prostorije(mostovi_zgrade, indeks):
+    """
+    Izdvaja rezultat jedne prostorije iz vektoriziranog izračuna u obliku
+    koji vraća izracun_toplinskih_mostova_po_vrsti.
+    """
+    gubici = {vrsta: float(mostovi_zgrade["gubici"][indeks, i]) for i, vrsta in enumerate(VRSTE_SPOJEVA)}
+    gubici["ukupno"] = float(mostovi_zgrade["ukupno"][indeks])
+    gubici["duljine"] = {vrsta: float(mostovi_zgrade["duljine"][indeks, i]) for i, vrsta in enumerate(VRSTE_SPOJEVA)}
     return gubici
 
 def procjena_toplinskih_mostova_postotkom(prostorija, osnovni_transmisijski_gubici):
@@ -106,13 +273,7 @@ def izracunaj_duljinu_spojeva_zidova(prostorija):
     float
         Ukupna duljina spojeva vanjskih zidova u m
     """
-    # Pojednostavljena implementacija
-    # Prebroji sve vanjske zidove
-    vanjski_zidovi = [z for z in prostorija.zidovi if z.get("tip") == "vanjski"]
-    
-    # Pretpostavka: svaki vanjski zid ima dva spoja s drugim zidovima
-    # U stvarnosti, ovo bi trebalo preciznije računati
-    return len(vanjski_zidovi) * 2 * prostorija.get_actual_height(None)
+    return izracunaj_duljine_spojeva(prostorija)["spojevi_zidova"]
 
 def izracunaj_duljinu_spojeva_zid_pod(prostorija):
     """
@@ -128,14 +289,7 @@ def izracunaj_duljinu_spojeva_zid_pod(prostorija):
     float
         Ukupna duljina spojeva vanjskih zidova s podom u m
     """
-    # Pojednostavljena implementacija
-    # Zbroji duljine svih vanjskih zidova
-    duljina = 0.0
-    for zid in prostorija.zidovi:
-        if zid.get("tip") == "vanjski":
-            duljina += zid.get("duzina", 0.0)
-            
-    return duljina
+    return izracunaj_duljine_spojeva(prostorija)["spojevi_zid_pod"]
 
 def izracunaj_duljinu_spojeva_zid_strop(prostorija):
     """
@@ -151,9 +305,7 @@ def izracunaj_duljinu_spojeva_zid_strop(prostorija):
     float
         Ukupna duljina spojeva vanjskih zidova sa stropom u m
     """
-    # Pojednostavljena implementacija
-    # U većini slučajeva jednako duljini spojeva zid-pod
-    return izracunaj_duljinu_spojeva_zid_pod(prostorija)
+    return izracunaj_duljine_spojeva(prostorija)["spojevi_zid_strop"]
 
 def izracunaj_duljinu_otvora(prostorija):
     """
@@ -169,21 +321,4 @@ def izracunaj_duljinu_otvora(prostorija):
     float
         Ukupna duljina spojeva otvora s vanjskim zidovima u m
     """
-    # Pojednostavljena implementacija
-    # Pretpostavke za jednostavniji izračun:
-    # - Svaki prozor ima opseg ~6m (2×1,5m prozor)
-    # - Svaka vrata imaju opseg ~6m (2×0,9m + 2×2,1m vrata)
-    
-    duljina = 0.0
-    
-    for zid in prostorija.zidovi:
-        if zid.get("tip") == "vanjski":
-            elementi = zid.get("elementi")
-            if elementi:
-                prozori_count = len(elementi.prozori) if hasattr(elementi, "prozori") else 0
-                vrata_count = len(elementi.vrata) if hasattr(elementi, "vrata") else 0
-                
-                duljina += prozori_count * 6.0
-                duljina += vrata_count * 6.0
-                
-    return duljina
+    return izracunaj_duljine_spojeva(prostorija)["otvori"]
@@ -0,0 +1,356 @@
+"""
+Modul za strukturnu usporedbu dviju revizija modela zgrade.
+
+Stanja modela (iz povijesti izmjena, spremljenih .calc proračuna ili JSON izvoza)
+indeksiraju se po ID-u
+etaža, prostorija, zidova, otvora i fizičkih zidova uz hash svakog entiteta, pa se
+usporedba obavlja u linearnom vremenu. Promjena gubitaka računa se samo za prostorije
+koje su izmijenjene (i njihove susjede), a ne za cijelu zgradu.
+"""
+
+import hashlib
+import json
+import pickle
+
+import streamlit as st
+
+from .heat_loss_calculation import izracunaj_toplinske_gubitke_prostorije
+from .temperaturni import izracunaj_temperature_za_model
+from ..models.prostorija import Prostorija
+
+# Razine entiteta u usporedbi
+RAZINE_USPOREDBE = ("etaze", "prostorije", "zidovi", "otvori", "fizicki_zidovi")
+
+# Polja koja se ne uspoređuju (izračunate vrijednosti i interni brojači)
+ZANEMARENA_POLJA = {*Prostorija.IZRACUNATA_POLJA, "_next_prozor_id", "_next_vrata_id"}
+
+
+def _hash(podaci):
+    """Hash serijaliziranih podataka entiteta."""
+    return hashlib.sha1(json.dumps(podaci, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _bez_polja(podaci, *polja):
+    """Kopija rječnika bez zadanih i zanemarenih polja."""
+    return {k: v for k, v in podaci.items() if k not in polja and k not in ZANEMARENA_POLJA}
+
+
+def indeksiraj_stanje(stanje):
+    """
+    Indeksira serijalizirano stanje modela po ID-u entiteta.
+
+    Parameters:
+    -----------
+    stanje : dict
+        Stanje modela (MultiRoomModel.stanje())
+
+    Returns:
+    --------
+    dict
+        Za svaku razinu iz RAZINE_USPOREDBE rječnik {kljuc: (hash, podaci)}; ključ zida je
+        (prostorija_id, zid_id), a otvora (prostorija_id, zid_id, vrsta, otvor_id).
+        Podaci prostorije ne sadrže zidove, a podaci zida ne sadrže otvore, pa se
+        promjena otvora ne prijavljuje i kao promjena zida i prostorije.
+    """
+    indeks = {razina: {} for razina in RAZINE_USPOREDBE}
+
+    for etaza in stanje.get("etaze", []):
+        podaci = _bez_polja(etaza)
+        indeks["etaze"][etaza.get("id")] = (_hash(podaci), podaci)
+
+    for prostorija in stanje.get("prostorije", []):
+        p_id = prostorija.get("id")
+        podaci = _bez_polja(prostorija, "zidovi")
+        indeks["prostorije"][p_id] = (_hash(podaci), podaci)
+
+        for zid in prostorija.get("zidovi", []):
+            zid_podaci = _bez_polja(zid, "elementi")
+            zid_podaci["prostorija_id"] = p_id
+            indeks["zidovi"][(p_id, zid.get("id"))] = (_hash(zid_podaci), zid_podaci)
+
+            elementi = zid.get("elementi") or {}
+            for vrsta in ("prozori", "vrata"):
+                for otvor in elementi.get(vrsta, []):
+                    otvor_podaci = _bez_polja(otvor)
+                    otvor_podaci.update({"prostorija_id": p_id, "zid_id": zid.get("id"), "vrsta": vrsta})
+                    indeks["otvori"][(p_id, zid.get("id"), vrsta, otvor.get("id"))] = (_hash(otvor_podaci), otvor_podaci)
+
+    for zid_id, zid in (stanje.get("fizicki_zidovi") or {}).items():
+        podaci = _bez_polja(zid)
+        indeks["fizicki_zidovi"][zid_id] = (_hash(podaci), podaci)
+
+    return indeks
+
+
+def _usporedi_razinu(prije, poslije):
+    """Uspoređuje dva indeksa jedne razine; izmijenjena polja traže se samo za entitete s različitim hashom."""
+    dodani = [kljuc for kljuc in poslije if kljuc not in prije]
+    uklonjeni = [kljuc for kljuc in prije if kljuc not in poslije]
+    izmijenjeni = []
+    for kljuc, (hash_poslije, podaci_poslije) in poslije.items():
+        stari = prije.get(kljuc)
+        if stari is None or stari[0] == hash_poslije:
+            continue
+        podaci_prije = stari[1]
+        polja = sorted(
+            polje for polje in set(podaci_prije) | set(podaci_poslije)
+            if podaci_prije.get(polje) != podaci_poslije.get(polje)
+        )
+        izmjene = {polje: (podaci_prije.get(polje), podaci_poslije.get(polje)) for polje in polja}
+        izmijenjeni.append((kljuc, izmjene))
+    return dodani, uklonjeni, izmijenjeni
+
+
+def _opis_entiteta(razina, kljuc, podaci):
+    """Redak izvještaja za entitet."""
+    if razina == "etaze":
+        return {"id": kljuc, "naziv": podaci.get("naziv", "")}
+    if razina == "prostorije":
+        return {"id": kljuc, "naziv": podaci.get("naziv", ""), "prostorija_id": kljuc}
+    if razina == "zidovi":
+        return {"id": kljuc[1], "naziv": podaci.get("tip", ""), "prostorija_id": kljuc[0]}
+    if razina == "otvori":
+        return {"id": kljuc[3], "naziv": podaci.get("tip_naziv") or kljuc[2], "prostorija_id": kljuc[0],
+                "zid_id": kljuc[1], "vrsta": kljuc[2]}
+    return {"id": kljuc, "naziv": podaci.get("naziv", "")}
+
+
+def usporedi_stanja(stanje_prije, stanje_poslije):
+    """
+    Strukturna usporedba dvaju serijaliziranih stanja modela.
+
+    Parameters:
+    -----------
+    stanje_prije : dict
+        Starije stanje modela (MultiRoomModel.stanje())
+    stanje_poslije : dict
+        Novije stanje modela
+
+    Returns:
+    --------
+    dict
+        Za svaku razinu iz RAZINE_USPOREDBE {"dodani": [...], "uklonjeni": [...], "izmijenjeni": [...]}
+        (izmijenjeni nose i "izmjene" {polje: (prije, poslije)}); "promijenjene_prostorije"
+        je skup ID-ova prostorija na koje utječe neka izmjena (uključujući susjedne prostorije
+        i prostorije izmijenjenih etaža); "broj_izmjena" je ukupan broj izmijenjenih entiteta
+    """
+    indeks_prije = indeksiraj_stanje(stanje_prije or {})
+    indeks_poslije = indeksiraj_stanje(stanje_poslije or {})
+    rezultat = {"broj_izmjena": 0}
+    promijenjene = set()
+    promijenjene_etaze = set()
+    promijenjeni_fizicki = set()
+
+    for razina in RAZINE_USPOREDBE:
+        prije, poslije = indeks_prije[razina], indeks_poslije[razina]
+        dodani, uklonjeni, izmijenjeni = _usporedi_razinu(prije, poslije)
+        rezultat[razina] = {
+            "dodani": [_opis_entiteta(razina, k, poslije[k][1]) for k in dodani],
+            "uklonjeni": [_opis_entiteta(razina, k, prije[k][1]) for k in uklonjeni],
+            "izmijenjeni": [
+                dict(_opis_entiteta(razina, k, poslije[k][1]), izmjene=izmjene) for k, izmjene in izmijenjeni
+            ],
+        }
+        rezultat["broj_izmjena"] += len(dodani) + len(uklonjeni) + len(izmijenjeni)
+
+        kljucevi = dodani + uklonjeni + [k for k, _ in izmijenjeni]
+        if razina == "etaze":
+            promijenjene_etaze.update(kljucevi)
+        elif razina == "prostorije":
+            promijenjene.update(kljucevi)
+        elif razina == "fizicki_zidovi":
+            promijenjeni_fizicki.update(kljucevi)
+        else:
+            promijenjene.update(k[0] for k in kljucevi)
+
+    # Prostorije izmijenjenih etaža, fizičkih zidova i susjedi izmijenjenih prostorija
+    # (temperatura susjeda ulazi u gubitke kroz unutarnje zidove)
+    izravno_promijenjene = set(promijenjene)
+    for stanje in (stanje_prije or {}, stanje_poslije or {}):
+        for prostorija in stanje.get("prostorije", []):
+            p_id = prostorija.get("id")
+            if prostorija.get("etaza_id") in promijenjene_etaze:
+                promijenjene.add(p_id)
+            for zid in prostorija.get("zidovi", []):
+                if zid.get("povezana_prostorija_id") in izravno_promijenjene or zid.get("fizicki_zid_id") in promijenjeni_fizicki:
+                    promijenjene.add(p_id)
+
+    rezultat["promijenjene_prostorije"] = promijenjene
+    return rezultat
+
+
+def _gubici_prostorija(model, prostorija_ids, grad, katalog):
+    """Ukupni gubici zadanih prostorija modela [W] (računaju se samo te prostorije)."""
+    prostorije = [p for p in (model.dohvati_prostoriju(p_id) for p_id in prostorija_ids) if p is not None]
+    if not prostorije:
+        return {}
+
+    temperature = izracunaj_temperature_za_model(model, grad)
+    # Temperature susjednih prostorija za unutarnje zidove vrijede samo za ovaj model
+    temperature_prostorija = st.session_state.get("temperature_prostorija")
+    st.session_state["temperature_prostorija"] = {p.id: p.temp_unutarnja for p in model.prostorije}
+    try:
+        return {p.id: izracunaj_toplinske_gubitke_prostorije(p, temperature, katalog)["ukupno"] for p in prostorije}
+    finally:
+        if temperature_prostorija is None:
+            st.session_state.pop("temperature_prostorija", None)
+        else:
+            st.session_state["temperature_prostorija"] = temperature_prostorija
+
+
+def usporedi_modele(model_prije, model_poslije, grad=None, katalog=None):
+    """
+    Usporedba dvaju modela zgrade s promjenom gubitaka po izmijenjenim prostorijama.
+
+    Parameters:
+    -----------
+    model_prije : MultiRoomModel
+        Starija revizija modela
+    model_poslije : MultiRoomModel
+        Novija revizija modela
+    grad : str, optional
+        Grad za projektnu vanjsku temperaturu
+    katalog : dict, optional
+        Katalog tipova elemenata (vidi izradi_katalog_elemenata)
+
+    Returns:
+    --------
+    dict
+        Rezultat usporedi_stanja uz "opterecenje" - popis {prostorija_id, naziv, prije,
+        poslije, razlika, broj_ponavljanja} za izmijenjene prostorije - i "razlika_ukupno",
+        promjenu gubitaka zgrade [W] uzimajući u obzir ponavljanja tipskih etaža
+    """
+    rezultat = usporedi_stanja(model_prije.stanje(), model_poslije.stanje())
+    promijenjene = rezultat["promijenjene_prostorije"]
+
+    gubici_prije = _gubici_prostorija(model_prije, promijenjene, grad, katalog)
+    gubici_poslije = _gubici_prostorija(model_poslije, promijenjene, grad, katalog)
+
+    opterecenje = []
+    razlika_ukupno = 0.0
+    for p_id in promijenjene:
+        if p_id not in gubici_prije and p_id not in gubici_poslije:
+            continue
+        model = model_poslije if p_id in gubici_poslije else model_prije
+        prostorija = model.dohvati_prostoriju(p_id)
+        etaza = model.dohvati_etazu(prostorija.etaza_id)
+        broj = etaza.broj_ponavljanja if etaza else 1
+        prije = gubici_prije.get(p_id, 0.0)
+        poslije = gubici_poslije.get(p_id, 0.0)
+        opterecenje.append({
+            "prostorija_id": p_id,
+            "naziv": prostorija.naziv,
+            "prije": prije,
+            "poslije": poslije,
+            "razlika": poslije - prije,
+            "broj_ponavljanja": broj,
+        })
+        razlika_ukupno += (poslije - prije) * broj
+
+    opterecenje.sort(key=lambda redak: abs(redak["razlika"]), reverse=True)
+    rezultat["opterecenje"] = opterecenje
+    rezultat["razlika_ukupno"] = razlika_ukupno
+    return rezultat
+
+
+def stanje_iz_proracuna(podaci):
+    """
+    Izdvaja stanje modela zgrade iz spremljenog stanja proračuna (korak povijesti ili .calc).
+
+    Parameters:
+    -----------
+    podaci : dict
+        Stanje proračuna (HeatLossCalc.get_state / serialize)
+
+    Returns:
+    --------
+    dict or None
+        Stanje modela ili None ako ga spremljeno stanje ne sadrži
+    """
+    if not isinstance(podaci, dict):
+        return None
+    if isinstance(podaci.get("model_zgrade"), dict):
+        return podaci["model_zgrade"]
+    # Starije datoteke sadrže samo instancu modela
+    model = podaci.get("multi_room_model")
+    if model is not None and hasattr(model, "stanje"):
+        return model.stanje()
+    return None
+
+
+def stanje_iz_calc_datoteke(putanja):
+    """
+    Učitava stanje modela zgrade iz .calc datoteke spremljene na poslužitelju.
+
+    .calc datoteke spremaju se kao pickle (vidi FileManager), pa se ovdje smiju otvarati
+    samo datoteke s lokacija FileManager.calculation_locations(), nikad datoteke
+    učitane iz preglednika (za njih vidi stanje_iz_json).
+
+    Parameters:
+    -----------
+    putanja : str
+        Putanja do .calc datoteke na poslužitelju
+
+    Returns:
+    --------
+    dict or None
+        Stanje modela ili None ako datoteka ne sadrži proračun toplinskih gubitaka
+    """
+    with open(putanja, "rb") as f:
+        podaci = pickle.load(f)
+    return stanje_iz_proracuna(podaci.get("data") if isinstance(podaci, dict) else None)
+
+
+def stanje_u_json(stanje):
+    """
+    Serijalizira stanje modela zgrade (MultiRoomModel.stanje()) u JSON za preuzimanje.
+
+    Returns:
+    --------
+    bytes
+        JSON zapis stanja u UTF-8
+    """
+    return json.dumps(stanje, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def stanje_iz_json(datoteka):
+    """
+    Učitava stanje modela zgrade iz JSON izvoza (vidi stanje_u_json).
+
+    Parameters:
+    -----------
+    datoteka : bytes, str or binary file-like
+        Sadržaj ili otvorena datoteka (npr. iz st.file_uploader)
+
+    Returns:
+    --------
+    dict or None
+        Stanje modela ili None ako sadržaj nije JSON stanje modela zgrade
+    """
+    sadrzaj = datoteka.read() if hasattr(datoteka, "read") else datoteka
+    try:
+        stanje = json.loads(sadrzaj)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(stanje, dict):
+        return None
+    if not isinstance(stanje.get("etaze"), list) or not isinstance(stanje.get("prostorije"), list):
+        return None
+    return stanje
+
+
+def stanja_iz_povijesti():
+    """
+    Vraća stanja modela zgrade spremljena u povijesti izmjena (od najstarijeg).
+
+    Returns:
+    --------
+    list of tuple
+        (opis koraka, stanje modela) za korake koji sadrže model
+    """
+    stanja = []
+    for korak in st.session_state.get("undo_stack", []):
+        stanje = stanje_iz_proracuna(korak.get("data"))
+        if stanje is not None:
+            stanja.append((korak.get("description", ""), stanje))
+    return stanja
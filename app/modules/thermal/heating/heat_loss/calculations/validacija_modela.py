@@ -0,0 +1,262 @@
+"""
+Modul za provjeru cijelog modela zgrade u jednom prolazu.
+
+Model se jednom prolazom svodi na NumPy polja po prostorijama i zidovima
+(kao kompilirani model za izračun, ali uz sve zidove i veze koje izračun
+preskače), a sve provjere su vektorizirane maske nad tim poljima. Izvještaj
+se predmemorira u session state-u po reviziji modela i kataloga, pa
+ponovljeni prikazi nepromijenjenog modela ne ponavljaju provjeru.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import streamlit as st
+
+from .kompilirani_model import _povrsina_i_tip_otvora
+
+RAZINA_GRESKA = "greška"
+RAZINA_UPOZORENJE = "upozorenje"
+
+# Kodovi tipova zidova u poljima provjere
+_TIPOVI_ZIDA = {"vanjski": 0, "prema_prostoriji": 1, "prema_negrijanom": 2, "pregradni": 3}
+_TIP_PREMA_PROSTORIJI = _TIPOVI_ZIDA["prema_prostoriji"]
+_TIP_VANJSKI = _TIPOVI_ZIDA["vanjski"]
+
+# Tolerancija usporedbe površina otvora i zida [m²]
+_TOLERANCIJA_POVRSINE = 1e-6
+
+
+def _kljuc_validacije(session_key):
+    """Vraća ključ session state-a pod kojim se čuva izvještaj provjere modela."""
+    return f"{session_key}_validacija"
+
+
+def _u_katalogu(katalog, kategorija, tip_id):
+    """Je li tip_id prisutan u zadanoj kategoriji kataloga."""
+    return bool(katalog) and tip_id in katalog.get(kategorija, {})
+
+
+def _kompiliraj_za_provjeru(model, katalog):
+    """
+    Svodi model na polja po prostorijama i zidovima u jednom prolazu.
+
+    Returns:
+    --------
+    dict
+        Polja prostorija (p_*) i zidova (z_*) te popisi ID-ova i naziva
+    """
+    etaze = {etaza.id: etaza for etaza in model.etaze}
+    prostorija_ids = [p.id for p in model.prostorije]
+    indeks_prostorije = {p_id: i for i, p_id in enumerate(prostorija_ids)}
+
+    p_povrsina, p_visina, p_etaza_postoji, p_broj_zidova = [], [], [], []
+    p_pod_nepoznat, p_strop_nepoznat = [], []
+    z_prostorija, z_tip, z_duzina, z_visina, z_otvori, z_orijentacija = [], [], [], [], [], []
+    z_povezana_prostorija, z_povezani_zid, z_tip_zida_id, z_tip_zida_nepoznat = [], [], [], []
+    z_otvori_nepoznati, z_otvori_bez_dimenzija = [], []
+    zid_ids = []
+
+    for r, prostorija in enumerate(model.prostorije):
+        etaza = etaze.get(prostorija.etaza_id)
+        p_etaza_postoji.append(etaza is not None)
+        p_povrsina.append(float(prostorija.povrsina or 0.0))
+        p_visina.append(float(prostorija.get_actual_height(etaza)) if etaza is not None else 0.0)
+        p_broj_zidova.append(len(prostorija.zidovi))
+        for tip_id, kategorija, popis in ((prostorija.pod_tip_id, "podovi", p_pod_nepoznat),
+                                          (prostorija.strop_tip_id, "stropovi", p_strop_nepoznat)):
+            popis.append(tip_id is not None and katalog is not None and not _u_katalogu(katalog, kategorija, tip_id))
+
+        for zid in prostorija.zidovi:
+            zid_ids.append(zid.get("id"))
+            z_prostorija.append(r)
+            z_tip.append(_TIPOVI_ZIDA.get(zid.get("tip"), -1))
+            z_duzina.append(float(zid.get("duzina") or 0.0))
+            z_visina.append(float(zid.get("visina") or 0.0))
+            z_orijentacija.append(bool(zid.get("orijentacija")))
+            z_povezana_prostorija.append(indeks_prostorije.get(zid.get("povezana_prostorija_id"), -1))
+            z_povezani_zid.append(zid.get("povezani_zid_id"))
+            tip_zida_id = zid.get("tip_zida_id")
+            z_tip_zida_id.append(tip_zida_id is not None)
+            z_tip_zida_nepoznat.append(
+                tip_zida_id is not None and katalog is not None and not _u_katalogu(katalog, "zidovi", tip_zida_id)
+            )
+
+            elementi = zid.get("elementi") or {}
+            povrsina_otvora, nepoznati, bez_dimenzija = 0.0, 0, 0
+            for kategorija in ("prozori", "vrata"):
+                for otvor in elementi.get(kategorija, []):
+                    povrsina, _ = _povrsina_i_tip_otvora(otvor, katalog, kategorija)
+                    povrsina_otvora += povrsina
+                    tip_id = otvor.get("tip_id")
+                    if tip_id is not None and katalog is not None and not _u_katalogu(katalog, kategorija, tip_id):
+                        nepoznati += 1
+                    elif povrsina <= 0 and (katalog is not None or tip_id is None):
+                        bez_dimenzija += 1
+            z_otvori.append(povrsina_otvora)
+            z_otvori_nepoznati.append(nepoznati)
+            z_otvori_bez_dimenzija.append(bez_dimenzija)
+
+    # Indeks povezanog zida (-1 ako ne postoji) - jedan rječnik za cijeli model
+    indeks_zida = {zid_id: i for i, zid_id in enumerate(zid_ids)}
+    z_partner = [indeks_zida.get(povezani, -1) for povezani in z_povezani_zid]
+
+    return {
+        "prostorija_ids": prostorija_ids,
+        "prostorija_nazivi": [p.naziv for p in model.prostorije],
+        "zid_ids": zid_ids,
+        "p_povrsina": np.asarray(p_povrsina, dtype=float),
+        "p_visina": np.asarray(p_visina, dtype=float),
+        "p_etaza_postoji": np.asarray(p_etaza_postoji, dtype=bool),
+        "p_broj_zidova": np.asarray(p_broj_zidova, dtype=np.int64),
+        "p_pod_nepoznat": np.asarray(p_pod_nepoznat, dtype=bool),
+        "p_strop_nepoznat": np.asarray(p_strop_nepoznat, dtype=bool),
+        "z_prostorija": np.asarray(z_prostorija, dtype=np.int64),
+        "z_tip": np.asarray(z_tip, dtype=np.int64),
+        "z_duzina": np.asarray(z_duzina, dtype=float),
+        "z_visina": np.asarray(z_visina, dtype=float),
+        "z_otvori": np.asarray(z_otvori, dtype=float),
+        "z_orijentacija": np.asarray(z_orijentacija, dtype=bool),
+        "z_povezana_prostorija": np.asarray(z_povezana_prostorija, dtype=np.int64),
+        "z_partner": np.asarray(z_partner, dtype=np.int64),
+        "z_tip_zida_id": np.asarray(z_tip_zida_id, dtype=bool),
+        "z_tip_zida_nepoznat": np.asarray(z_tip_zida_nepoznat, dtype=bool),
+        "z_otvori_nepoznati": np.asarray(z_otvori_nepoznati, dtype=np.int64),
+        "z_otvori_bez_dimenzija": np.asarray(z_otvori_bez_dimenzija, dtype=np.int64),
+    }
+
+
+def validiraj_model(model, katalog=None):
+    """
+    Provjerava cijeli model i vraća sve uočene probleme u jednom izvještaju.
+
+    Provjere: prostorije bez etaže, s površinom ili visinom nula te bez zidova;
+    zidovi s duljinom ili visinom nula, vanjski zidovi bez orijentacije, zidovi
+    prema prostoriji bez ispravnog para u susjednoj prostoriji, otvori veći od
+    zida te tipovi zidova, otvora, podova i stropova kojih nema u katalogu.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model koji se provjerava
+    katalog : dict, optional
+        Katalog {"zidovi": {id: WallType}, ...}; bez kataloga se ne provjeravaju ID-ovi tipova
+
+    Returns:
+    --------
+    dict
+        {"problemi": [{"razina", "kod", "poruka", "prostorija_id", "prostorija", "zid_id"}, ...],
+         "broj_gresaka": int, "broj_upozorenja": int}
+    """
+    polja = _kompiliraj_za_provjeru(model, katalog)
+    prostorija_ids = polja["prostorija_ids"]
+    nazivi = polja["prostorija_nazivi"]
+    zid_ids = polja["zid_ids"]
+    problemi = []
+
+    def prijavi_prostorije(maska, razina, kod, poruka):
+        for r in np.flatnonzero(maska):
+            problemi.append({
+                "razina": razina, "kod": kod, "poruka": poruka,
+                "prostorija_id": prostorija_ids[r], "prostorija": nazivi[r], "zid_id": None,
+            })
+
+    def prijavi_zidove(maska, razina, kod, poruka):
+        for z in np.flatnonzero(maska):
+            r = polja["z_prostorija"][z]
+            problemi.append({
+                "razina": razina, "kod": kod, "poruka": poruka,
+                "prostorija_id": prostorija_ids[r], "prostorija": nazivi[r], "zid_id": zid_ids[z],
+            })
+
+    # Prostorije
+    prijavi_prostorije(~polja["p_etaza_postoji"], RAZINA_GRESKA, "bez_etaze", "Prostorija nije na postojećoj etaži")
+    prijavi_prostorije(polja["p_povrsina"] <= 0, RAZINA_GRESKA, "povrsina_nula", "Površina prostorije je nula")
+    prijavi_prostorije(polja["p_etaza_postoji"] & (polja["p_visina"] <= 0), RAZINA_GRESKA, "visina_prostorije_nula",
+                       "Visina prostorije je nula")
+    prijavi_prostorije(polja["p_broj_zidova"] == 0, RAZINA_UPOZORENJE, "bez_zidova", "Prostorija nema zidova")
+    prijavi_prostorije(polja["p_pod_nepoznat"], RAZINA_GRESKA, "nepoznat_tip_poda", "Tip poda nije u katalogu")
+    prijavi_prostorije(polja["p_strop_nepoznat"], RAZINA_GRESKA, "nepoznat_tip_stropa", "Tip stropa nije u katalogu")
+
+    # Zidovi
+    if len(zid_ids):
+        tip = polja["z_tip"]
+        partner = polja["z_partner"]
+        indeksi = np.arange(len(zid_ids))
+        ima_partnera = partner >= 0
+        partner_sigurno = np.where(ima_partnera, partner, 0)
+        # Par je ispravan ako povezani zid postoji u povezanoj prostoriji i pokazuje natrag na ovaj zid
+        ispravan_par = (
+            ima_partnera
+            & (polja["z_povezana_prostorija"] >= 0)
+            & (polja["z_prostorija"][partner_sigurno] == polja["z_povezana_prostorija"])
+            & (partner[partner_sigurno] == indeksi)
+        )
+        bruto = polja["z_duzina"] * polja["z_visina"]
+
+        prijavi_zidove(tip < 0, RAZINA_GRESKA, "nepoznat_tip_zida", "Nepoznata vrsta zida")
+        prijavi_zidove((tip == _TIP_PREMA_PROSTORIJI) & ~ispravan_par, RAZINA_GRESKA, "nepovezan_zid",
+                       "Zid prema prostoriji nije povezan sa zidom susjedne prostorije")
+        prijavi_zidove(polja["z_duzina"] <= 0, RAZINA_GRESKA, "duljina_zida_nula", "Duljina zida je nula")
+        prijavi_zidove(polja["z_visina"] <= 0, RAZINA_GRESKA, "visina_zida_nula", "Visina zida je nula")
+        prijavi_zidove((bruto > 0) & (polja["z_otvori"] > bruto + _TOLERANCIJA_POVRSINE), RAZINA_GRESKA,
+                       "otvori_veci_od_zida", "Površina otvora veća je od površine zida")
+        prijavi_zidove((tip == _TIP_VANJSKI) & ~polja["z_orijentacija"], RAZINA_UPOZORENJE, "bez_orijentacije",
+                       "Vanjski zid nema orijentaciju")
+        prijavi_zidove(polja["z_tip_zida_nepoznat"], RAZINA_GRESKA, "tip_zida_nije_u_katalogu",
+                       "Tip konstrukcije zida nije u katalogu")
+        if katalog is not None:
+            prijavi_zidove(~polja["z_tip_zida_id"], RAZINA_UPOZORENJE, "bez_tipa_zida",
+                           "Zid nema tip konstrukcije - koristi se zadana U-vrijednost")
+        prijavi_zidove(polja["z_otvori_nepoznati"] > 0, RAZINA_GRESKA, "tip_otvora_nije_u_katalogu",
+                       "Tip prozora ili vrata nije u katalogu")
+        prijavi_zidove(polja["z_otvori_bez_dimenzija"] > 0, RAZINA_UPOZORENJE, "otvor_bez_dimenzija",
+                       "Prozor ili vrata bez tipa i dimenzija ne ulaze u proračun")
+
+    broj_gresaka = sum(1 for p in problemi if p["razina"] == RAZINA_GRESKA)
+    return {
+        "problemi": problemi,
+        "broj_gresaka": broj_gresaka,
+        "broj_upozorenja": len(problemi) - broj_gresaka,
+    }
+
+
+def _revizija_kataloga(katalog):
+    """Vraća potpis kataloga (ID-ovi i dimenzije tipova) za predmemoriranje provjere."""
+    if not katalog:
+        return None
+    sazetak = {
+        kategorija: sorted(
+            (str(tip_id), getattr(tip, "sirina", None), getattr(tip, "visina", None), getattr(tip, "povrsina", None))
+            for tip_id, tip in tipovi.items()
+        )
+        for kategorija, tipovi in katalog.items()
+    }
+    return hashlib.sha1(json.dumps(sazetak, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def dohvati_validaciju(model, katalog=None):
+    """
+    Vraća izvještaj provjere modela, predmemoriran po reviziji modela i kataloga.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model koji se provjerava
+    katalog : dict, optional
+        Katalog građevinskih elemenata
+
+    Returns:
+    --------
+    dict
+        Izvještaj iz validiraj_model
+    """
+    revizija = (model.revizija(), _revizija_kataloga(katalog))
+    kljuc = _kljuc_validacije(model.session_key)
+    spremljeno = st.session_state.get(kljuc)
+    if spremljeno and spremljeno.get("revizija") == revizija:
+        return spremljeno["izvjestaj"]
+    izvjestaj = validiraj_model(model, katalog)
+    st.session_state[kljuc] = {"revizija": revizija, "izvjestaj": izvjestaj}
+    return izvjestaj
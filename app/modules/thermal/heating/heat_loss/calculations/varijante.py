@@ -0,0 +1,139 @@
+"""
+Modul za izračun varijanti projekta ("kako je projektirano", "troslojno ostakljenje",
+"dodatna izolacija", ...).
+
+Varijanta ne kopira model: sadrži samo preinake u odnosu na osnovni model
+(U-vrijednosti tipova, zamjene tipova, izmjene zraka, postotak toplinskih mostova).
+Preinake se prevode u retke parametara kompiliranog modela, pa se sve varijante
+računaju jednim vektoriziranim prolazom nad zajedničkom geometrijom.
+"""
+
+import numpy as np
+
+from .kompilirani_model import KompiliranaZgrada
+
+# Ključ za zadanu vrijednost kategorije (element bez tipa iz kataloga)
+ZADANI_TIP = "zadano"
+
+
+def _u_tipa(katalog, kategorija, tip_id):
+    """Vraća U-vrijednost tipa iz kataloga ili None ako tip ne postoji."""
+    tip = ((katalog or {}).get(kategorija) or {}).get(tip_id)
+    if tip is None:
+        return None
+    try:
+        return float(tip.u_vrijednost)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def parametri_varijante(zgrada, varijanta, katalog=None):
+    """
+    Prevodi preinake varijante u parametre kompiliranog modela.
+
+    Zamjena tipa (npr. dvoslojni prozor -> troslojni) preslikava se na U-vrijednost
+    novog tipa uz zadržane površine osnovnog modela.
+
+    Parameters:
+    -----------
+    zgrada : KompiliranaZgrada
+        Kompilirani osnovni model
+    varijanta : dict
+        Varijanta s ključevima "u_vrijednosti", "zamjene_tipova", "izmjene_zraka"
+        i "postotak_toplinskih_mostova" (svi neobavezni)
+    katalog : dict, optional
+        Katalog tipova elemenata (potreban za zamjene tipova)
+
+    Returns:
+    --------
+    tuple
+        (u_vrijednosti (P,), izmjene_zraka (R,), postotak_mostova)
+    """
+    u = zgrada.parametar_u.copy()
+    indeks = {kljuc: p for p, kljuc in enumerate(zgrada.parametri)}
+
+    for kategorija, zamjene in (varijanta.get("zamjene_tipova") or {}).items():
+        for tip_id, novi_tip_id in zamjene.items():
+            p = indeks.get((kategorija, None if tip_id == ZADANI_TIP else tip_id))
+            novi_u = _u_tipa(katalog, kategorija, novi_tip_id)
+            if p is not None and novi_u is not None:
+                u[p] = novi_u
+
+    for kategorija, vrijednosti in (varijanta.get("u_vrijednosti") or {}).items():
+        for tip_id, vrijednost in vrijednosti.items():
+            p = indeks.get((kategorija, None if tip_id == ZADANI_TIP else tip_id))
+            if p is not None and vrijednost is not None:
+                u[p] = float(vrijednost)
+
+    n = zgrada.izmjene_zraka.copy()
+    izmjene = varijanta.get("izmjene_zraka") or {}
+    if izmjene:
+        # Prostorije tipskih etaža imaju ID oblika "prostorija_id@instanca"
+        for r, prostorija_id in enumerate(zgrada.prostorija_ids):
+            vrijednost = izmjene.get(prostorija_id.split("@")[0])
+            if vrijednost is not None:
+                n[r] = float(vrijednost)
+
+    m = varijanta.get("postotak_toplinskih_mostova")
+    if m is None or zgrada.koeficijent_linijskih_mostova.any():
+        m = zgrada.postotak_toplinskih_mostova
+    return u, n, float(m)
+
+
+def izracunaj_varijante(zgrada, varijante, katalog=None):
+    """
+    Izračunava gubitke osnovnog modela i svih varijanti u jednom prolazu.
+
+    Parameters:
+    -----------
+    zgrada : KompiliranaZgrada
+        Kompilirani osnovni model
+    varijante : list[dict]
+        Varijante s preinakama (vidi parametri_varijante)
+    katalog : dict, optional
+        Katalog tipova elemenata
+
+    Returns:
+    --------
+    dict
+        Rječnik s ključevima "varijante" (nazivi i ID-ovi), "prostorije" (gubici
+        osnove (R,) i varijanti (S, R)), "zgrada" (gubici, razlike i postotne razlike
+        po varijanti) i "zastarjele" (varijante izrađene nad drugom revizijom osnove)
+    """
+    if not isinstance(zgrada, KompiliranaZgrada):
+        raise TypeError("Očekuje se KompiliranaZgrada")
+
+    osnova = zgrada.izracunaj()["ukupno"]
+    osnova_zgrade = float(zgrada.ukupno_zgrade(osnova))
+
+    if varijante:
+        parametri = [parametri_varijante(zgrada, v, katalog) for v in varijante]
+        u = np.array([p[0] for p in parametri])
+        n = np.array([p[1] for p in parametri])
+        m = np.array([p[2] for p in parametri])
+        gubici = zgrada.izracunaj(u, n, m)["ukupno"]
+    else:
+        gubici = np.zeros((0, zgrada.broj_prostorija))
+
+    gubici_zgrade = zgrada.ukupno_zgrade(gubici) if len(gubici) else np.zeros(0)
+    razlika = gubici_zgrade - osnova_zgrade
+
+    return {
+        "varijante": [{"id": v.get("id"), "naziv": v.get("naziv", "")} for v in varijante],
+        "prostorije": {
+            "id": list(zgrada.prostorija_ids),
+            "naziv": list(zgrada.prostorija_nazivi),
+            "osnova": osnova,
+            "varijante": gubici,
+        },
+        "zgrada": {
+            "osnova": osnova_zgrade,
+            "varijante": gubici_zgrade,
+            "razlika": razlika,
+            "razlika_posto": 100.0 * razlika / osnova_zgrade if osnova_zgrade else np.zeros_like(razlika),
+        },
+        "zastarjele": [
+            bool(v.get("osnovna_revizija")) and v.get("osnovna_revizija") != zgrada.potpis
+            for v in varijante
+        ],
+    }
@@ -16,6 +16,17 @@ class EtazaController:
         """
         self.model = model
     
+    def batch(self, opis="Skupna izmjena etaža"):
+        """
+        Vraća transakciju modela za skupne izmjene (vidi MultiRoomModel.batch).
+        
+        Parameters:
+        -----------
+        opis : str
+            Opis izmjene za povijest poništavanja
+        """
+        return self.model.batch(opis)
+    
     def dodaj_etazu(self, naziv, redni_broj, visina_etaze):
         """
         Dodaje novu etažu u model.
@@ -113,3 +124,50 @@ class EtazaController:
         self.model.ukloni_etazu(etaza_id)
         
         return True
+    
+    def dodaj_ponavljanje(self, etaza_id, naziv=None, pod_tip=None, strop_tip=None, temperature=None):
+        """
+        Dodaje instancu tipske etaže (ponavljanje bez kopiranja prostorija).
+        
+        Parameters:
+        -----------
+        etaza_id : str
+            ID etaže koja je predložak
+        naziv : str, optional
+            Naziv instance
+        pod_tip : str, optional
+            Tip poda prostorija instance (None = kao predložak)
+        strop_tip : str, optional
+            Tip stropa prostorija instance (None = kao predložak)
+        temperature : dict, optional
+            Unutarnje temperature {prostorija_id: temp} koje se razlikuju od predloška
+            
+        Returns:
+        --------
+        dict or None
+            Dodano ponavljanje ili None ako etaža ne postoji
+        """
+        return self.model.dodaj_ponavljanje_etaze(
+            etaza_id, naziv=naziv, pod_tip=pod_tip, strop_tip=strop_tip, temperature=temperature
+        )
+    
+    def ukloni_ponavljanje(self, etaza_id, ponavljanje_id):
+        """
+        Uklanja instancu tipske etaže.
+        
+        Parameters:
+        -----------
+        etaza_id : str
+            ID etaže koja je predložak
+        ponavljanje_id : str
+            ID instance koja se uklanja
+            
+        Returns:
+        --------
+        bool
+            True ako je etaža pronađena, False inače
+        """
+        if not self.model.dohvati_etazu(etaza_id):
+            return False
+        self.model.ukloni_ponavljanje_etaze(etaza_id, ponavljanje_id)
+        return True
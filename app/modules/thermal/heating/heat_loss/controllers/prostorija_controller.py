@@ -18,6 +18,17 @@ class ProstorijaController:
         """
         self.model = model
     
+    def batch(self, opis="Skupna izmjena prostorija"):
+        """
+        Vraća transakciju modela za skupne izmjene (vidi MultiRoomModel.batch).
+        
+        Parameters:
+        -----------
+        opis : str
+            Opis izmjene za povijest poništavanja
+        """
+        return self.model.batch(opis)
+    
     def dodaj_prostoriju(self, etaza_id, naziv, tip, povrsina, visina=None, koristi_zadanu_visinu=True):
         """
         Dodaje novu prostoriju u model.
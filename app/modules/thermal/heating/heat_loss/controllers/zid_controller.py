@@ -18,6 +18,17 @@ class ZidController:
         """
         self.model = model
     
+    def batch(self, opis="Skupna izmjena zidova"):
+        """
+        Vraća transakciju modela za skupne izmjene (vidi MultiRoomModel.batch).
+        
+        Parameters:
+        -----------
+        opis : str
+            Opis izmjene za povijest poništavanja
+        """
+        return self.model.batch(opis)
+    
     def dodaj_zid(self, prostorija_id, tip_zida, duzina, visina_zida=None, 
                  orijentacija=None, povezana_prostorija_id=None, 
                  je_segmentiran=False, tip_zida_id=None):
@@ -88,13 +99,8 @@ class ZidController:
         bool
             True ako je zid uspješno uređen, False inače
         """
-        # Dohvaćanje prostorije
-        prostorija = self.model.dohvati_prostoriju(prostorija_id)
-        if not prostorija:
-            return False
-        
-        # Dohvaćanje zida
-        zid = prostorija.dohvati_zid(zid_id)
+        # Dohvaćanje zida (unutar transakcije iz indeksa modela)
+        zid = self.model.dohvati_zid(prostorija_id, zid_id)
         if not zid:
             return False
         
@@ -156,13 +162,8 @@ class ZidController:
         dict or None
             Dodani prozor ili None ako dodavanje nije uspjelo
         """
-        # Dohvaćanje prostorije
-        prostorija = self.model.dohvati_prostoriju(prostorija_id)
-        if not prostorija:
-            return None
-        
-        # Dohvaćanje zida
-        zid = prostorija.dohvati_zid(zid_id)
+        # Dohvaćanje zida (unutar transakcije iz indeksa modela)
+        zid = self.model.dohvati_zid(prostorija_id, zid_id)
         if not zid:
             return None
         
@@ -213,13 +214,8 @@ class ZidController:
         dict or None
             Dodana vrata ili None ako dodavanje nije uspjelo
         """
-        # Dohvaćanje prostorije
-        prostorija = self.model.dohvati_prostoriju(prostorija_id)
-        if not prostorija:
-            return None
-        
-        # Dohvaćanje zida
-        zid = prostorija.dohvati_zid(zid_id)
+        # Dohvaćanje zida (unutar transakcije iz indeksa modela)
+        zid = self.model.dohvati_zid(prostorija_id, zid_id)
         if not zid:
             return None
         
@@ -267,13 +263,8 @@ class ZidController:
         bool
             True ako je prozor uspješno uklonjen, False inače
         """
-        # Dohvaćanje prostorije
-        prostorija = self.model.dohvati_prostoriju(prostorija_id)
-        if not prostorija:
-            return False
-        
-        # Dohvaćanje zida
-        zid = prostorija.dohvati_zid(zid_id)
+        # Dohvaćanje zida (unutar transakcije iz indeksa modela)
+        zid = self.model.dohvati_zid(prostorija_id, zid_id)
         if not zid:
             return False
         
@@ -308,13 +299,8 @@ class ZidController:
         bool
             True ako su vrata uspješno uklonjena, False inače
         """
-        # Dohvaćanje prostorije
-        prostorija = self.model.dohvati_prostoriju(prostorija_id)
-        if not prostorija:
-            return False
-        
-        # Dohvaćanje zida
-        zid = prostorija.dohvati_zid(zid_id)
+        # Dohvaćanje zida (unutar transakcije iz indeksa modela)
+        zid = self.model.dohvati_zid(prostorija_id, zid_id)
         if not zid:
             return False
         
@@ -330,3 +316,48 @@ class ZidController:
         self.model._spremi_u_session_state()
         
         return True
+
+    def zamijeni_tip_otvora(self, vrsta, tip_id, tip_naziv, orijentacija=None, stari_tip_id=None):
+        """
+        Zamjenjuje tip svih prozora ili vrata koji odgovaraju filtru u jednoj transakciji.
+        
+        Primjer: svi prozori na sjevernim zidovima dobivaju tip X. Svaki skup
+        elemenata zida obrađuje se jednom (i kad ga dijele dva povezana zida),
+        pa je trajanje linearno u broju zidova i otvora.
+        
+        Parameters:
+        -----------
+        vrsta : str
+            "prozor" ili "vrata"
+        tip_id : str
+            ID novog tipa iz kataloga
+        tip_naziv : str
+            Naziv novog tipa
+        orijentacija : str, optional
+            Samo otvori na vanjskim zidovima ove orijentacije
+        stari_tip_id : str, optional
+            Samo otvori koji su trenutno ovog tipa
+            
+        Returns:
+        --------
+        int
+            Broj izmijenjenih otvora
+        """
+        kljuc = "prozori" if vrsta == "prozor" else "vrata"
+        obradeni = set()
+        broj = 0
+        with self.model.batch(f"Zamjena tipa ({kljuc})"):
+            for _, zid in self.model.svi_zidovi():
+                if orijentacija is not None and zid.get("orijentacija") != orijentacija:
+                    continue
+                elementi = zid.get("elementi")
+                if not elementi or id(elementi) in obradeni:
+                    continue
+                obradeni.add(id(elementi))
+                for otvor in getattr(elementi, kljuc, []):
+                    if stari_tip_id is not None and otvor.get("tip_id") != stari_tip_id:
+                        continue
+                    otvor["tip_id"] = tip_id
+                    otvor["tip_naziv"] = tip_naziv
+                    broj += 1
+        return broj
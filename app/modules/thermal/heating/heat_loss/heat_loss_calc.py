@@ -2,6 +2,10 @@
 Proračun toplinskih gubitaka prema EN 12831
 """
 
+import copy
+import hashlib
+import json
+
 import streamlit as st
 import pandas as pd
 from modules.base import BaseCalculation
@@ -9,18 +13,28 @@ from modules.base import BaseCalculation
 # Importi iz modulariziranih komponenti
 from .models.elementi.constants import TIPOVI_PROSTORIJA, TEMP_FAKTORI, DEFAULT_U_VALUES as ORIGINAL_U_VALUES
 from .constants import GRADOVI_TEMP, REGIJE_GRADOVI_TEMP, ORIJENTACIJE, CSS_STYLES
-from .calculations.heat_loss_calculation import izracunaj_toplinske_gubitke_zgrade, izracunaj_toplinske_gubitke_etaze, izracunaj_toplinske_gubitke_prostorije
+from .calculations.heat_loss_calculation import (
+    izracunaj_toplinske_gubitke_zgrade, izracunaj_toplinske_gubitke_etaze, izracunaj_toplinske_gubitke_prostorije,
+    izradi_katalog_elemenata
+)
 from .calculations.transmisijski import izracun_transmisijskih_gubitaka
+from .calculations.tablice_rezultata import dohvati_tablice
+from .calculations.toplinski_most import (
+    METODA_POSTOTAK, METODA_LINIJSKI, ZADANE_PSI_VRIJEDNOSTI, VRSTE_SPOJEVA, NAZIVI_SPOJEVA, dohvati_psi_vrijednosti
+)
 from .models.model import MultiRoomModel
-from .utils.session_manager import is_valid_session_data, initialize_session_data
+from .utils.session_manager import is_valid_session_data, initialize_session_data, kljuc_zastarjelih_rezultata
 from .utils.validators import prikazuje_upozorenje_o_povrsinama
 
 # UI komponente
-from .ui.etaza_ui import prikazi_manager_etaza, prikazi_postavke_etaze
+from .ui.etaza_ui import prikazi_manager_etaza, prikazi_postavke_etaze, prikaz_provjere_modela
 from .ui.prostorija_ui import prikazi_manager_prostorija, prikazi_osnovne_podatke_prostorije, prikazi_dimenzije_prostorije, prikazi_pod_i_strop_prostorije
 from .ui.zid_ui import prikazi_zidove_prostorije
-from .ui.results_ui import prikaz_rezultata_zgrade, prikaz_rezultata_etaze, prikaz_rezultata_prostorije
+from .ui.results_ui import (
+    prikaz_rezultata_zgrade, prikaz_rezultata_etaze, prikaz_rezultata_prostorije, tablica_etaza_za_prikaz, prikaz_izvoza_tablica
+)
 from .ui.gradevinski_elementi_ui import prikazi_manager_gradevinski_elementi
+from .ui.analiza_ui import prikaz_analize_nesigurnosti, prikaz_analize_osjetljivosti, prikaz_varijanti, prikaz_usporedbe_modela
 
 # Kontroleri
 from .controllers.etaza_controller import EtazaController
@@ -32,6 +46,14 @@ from .controllers.elementi_controller import ElementiController
 from .models.elementi.wall_elements import WallElements
 from .models.elementi.building_elements_model import inicijaliziraj_elemente, BuildingElementsModel
 
+# Ključ odabira aktivne kartice i ključevi widgeta općih postavki koji se čuvaju
+# dok kartica postavki nije prikazana
+KLJUC_AKTIVNOG_PRIKAZA = "heat_loss_aktivni_prikaz"
+KLJUCEVI_POSTAVKI = (
+    "opce_regija_selector", "opce_grad_selector", "faktor_sigurnosti_slider",
+    "toplinski_mostovi_checkbox", "postotak_toplinskih_mostova_slider", "metoda_toplinskih_mostova_radio",
+)
+
 
 class HeatLossCalc(BaseCalculation):
     """
@@ -54,6 +76,8 @@ class HeatLossCalc(BaseCalculation):
         # Initialize thermal bridges parameters with clean defaults
         self.toplinski_mostovi = False
         self.postotak_toplinskih_mostova = 0
+        self.metoda_toplinskih_mostova = METODA_POSTOTAK
+        self.psi_katalog = dict(ZADANE_PSI_VRIJEDNOSTI)
         
         # Initialize faktor_sigurnosti
         if 'faktor_sigurnosti_slider' not in st.session_state:
@@ -91,6 +115,25 @@ class HeatLossCalc(BaseCalculation):
             self.zid_controller = ZidController(model)
             self.elementi_controller = ElementiController(elements_model)
         
+    def get_state(self):
+        """
+        Vraća trenutno stanje proračuna za undo/redo.
+
+        Model zgrade se pri svakom prikazu ponovno gradi iz session state-a,
+        pa se uz atribute proračuna sprema i serijalizirano stanje modela.
+        """
+        stanje = super().get_state()
+        stanje["model_zgrade"] = copy.deepcopy(st.session_state.get(self.session_key))
+        return stanje
+
+    def restore_state(self, state):
+        """Vraća stanje proračuna i modela zgrade iz snimljenog stanja."""
+        state = dict(state)
+        model_zgrade = state.pop("model_zgrade", None)
+        super().restore_state(state)
+        if model_zgrade is not None:
+            st.session_state[self.session_key] = copy.deepcopy(model_zgrade)
+
     def render(self):
         """
         Prikazuje sučelje proračuna
@@ -126,153 +169,157 @@ class HeatLossCalc(BaseCalculation):
         if self.results_session_key in st.session_state:
             self.rezultati = st.session_state[self.results_session_key]
         else:
-            self.rezultati = {}        # Definiramo tabove
-        tab_names = ["Opće postavke", "Postavke zgrade", "Rezultati po prostorijama", "Rezultati po etažama"]
-        tab1, tab2, tab3, tab4 = st.tabs(tab_names)
+            self.rezultati = {}
+        
+        # 7. Prikaz samo aktivne kartice - ostale se ne izvršavaju pri osvježavanju
+        prikazi = {
+            "Opće postavke": lambda: self._prikazi_opce_postavke(elements_model),
+            "Postavke zgrade": lambda: self._prikazi_postavke_zgrade(elements_model),
+            "Rezultati po prostorijama": lambda: self._prikazi_rezultate_po_prostorijama(elements_model),
+            "Rezultati po etažama": lambda: self._prikazi_rezultate_po_etazama(elements_model),
+        }
+        aktivni_prikaz = st.radio(
+            "Prikaz", list(prikazi.keys()), horizontal=True, key=KLJUC_AKTIVNOG_PRIKAZA, label_visibility="collapsed"
+        )
+        if aktivni_prikaz != "Opće postavke":
+            self._sacuvaj_stanje_postavki()
+        prikazi[aktivni_prikaz]()
+
+    def _sacuvaj_stanje_postavki(self):
+        """
+        Čuva vrijednosti widgeta općih postavki dok kartica postavki nije prikazana.
+        
+        Streamlit briše stanje widgeta koji nisu prikazani u izvođenju skripte;
+        ponovnim upisom ključa vrijednost postaje obično stanje sesije i ostaje
+        sačuvana do povratka na karticu.
+        """
+        for kljuc in KLJUCEVI_POSTAVKI:
+            if kljuc in st.session_state:
+                st.session_state[kljuc] = st.session_state[kljuc]
 
-        with tab1:  # Opće postavke
-            self._prikazi_opce_postavke(elements_model)
+    def _prikazi_postavke_zgrade(self, elements_model):
+        """Prikazuje karticu s etažama i prostorijama zgrade."""
+        st.header("Postavke zgrade")
+        
+        # Pass prostorija_controller and zid_controller to prikazi_manager_etaza
+        if self.multi_room_model and self.etaza_controller and self.prostorija_controller and self.zid_controller:
+            # Make sure we have the latest model data
+            self.multi_room_model._ucitaj_iz_session_state()
+            
+            # Provjera cijelog modela - predmemorirana po reviziji, pa se ne ponavlja bez izmjena
+            prikaz_provjere_modela(self.multi_room_model, izradi_katalog_elemenata(elements_model))
+            
+            # Osiguravamo da se prikaže uputa korisniku ako nije odabrana etaža za upravljanje
+            if 'selected_etaza_for_rooms' not in st.session_state:
+                st.info("Da biste upravljali prostorijama na etaži, kliknite na 'Upravljaj prostorijama' pokraj željene etaže.")
+            # Display the floor and room management UI
+            prikazi_manager_etaza(self.multi_room_model, self.etaza_controller, self.prostorija_controller, self.zid_controller)
+        else:
+            st.error("Model zgrade ili potrebni kontroleri nisu pravilno inicijalizirani.")
 
-        with tab2:  # Postavke zgrade
-            st.header("Postavke zgrade")
+    def _prikazi_rezultate_po_prostorijama(self, elements_model):
+        """Prikazuje karticu s rezultatima po prostorijama."""
+        # Automatski pokreni izračun ako se model promijenio od zadnjeg izračuna
+        self._osiguraj_rezultate(elements_model)
             
-            # Pass prostorija_controller and zid_controller to prikazi_manager_etaza
-            if self.multi_room_model and self.etaza_controller and self.prostorija_controller and self.zid_controller:
-                # Make sure we have the latest model data
-                self.multi_room_model._ucitaj_iz_session_state()
-                
-                # Osiguravamo da se prikaže uputa korisniku ako nije odabrana etaža za upravljanje
-                if 'selected_etaza_for_rooms' not in st.session_state:
-                    st.info("Da biste upravljali prostorijama na etaži, kliknite na 'Upravljaj prostorijama' pokraj željene etaže.")
-                  # Display the floor and room management UI
-                prikazi_manager_etaza(self.multi_room_model, self.etaza_controller, self.prostorija_controller, self.zid_controller)
+        if self.rezultati and self.rezultati.get("etaze"):
+            if isinstance(self.rezultati["etaze"], list) and len(self.rezultati["etaze"]) > 0:
+                # Get the external temperature from the results
+                temperatura_vanjska = self.rezultati.get("zgrada", {}).get("temperatura_vanjska", -20.0)
+                tablice = dohvati_tablice(self.rezultati)
+                # Prikazujemo prostorije grupirane po etažama u kontejnerima
+                for etaza_rezultat in self.rezultati["etaze"]:
+                    # Koristi container s border=True za vizualno odvajanje etaža
+                    with st.container(border=True):
+                        # Funkcija prikaz_rezultata_etaze već sadrži kompletan prikaz (metriku, tablicu prostorija i detalje)
+                        prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska, tablice, prefiks_kljuca="prostorije")
             else:
-                st.error("Model zgrade ili potrebni kontroleri nisu pravilno inicijalizirani.")
+                st.info("Nema dostupnih rezultata za prostorije ili format nije ispravan.")
+        else:
+            st.info("Nema dostupnih rezultata za prostorije. Provjerite postavke zgrade i pokušajte ponovno.")
+
+    def _prikazi_rezultate_po_etazama(self, elements_model):
+        """Prikazuje karticu s rezultatima po etažama i analizama zgrade."""
+        st.header("Rezultati proračuna - Po etažama")
+        # Automatski pokreni izračun ako se model promijenio od zadnjeg izračuna
+        self._osiguraj_rezultate(elements_model)
         
-        with tab3:  # Rezultati po prostorijama
-            # Automatski pokreni izračun ako već nije pokrenut
-            self._pokreni_izracun(elements_model)
+        if self.rezultati and self.rezultati.get("zgrada"):
+            # Rezultati po etažama bez detaljnog prikaza prostorija
+            if self.rezultati.get("etaze") and isinstance(self.rezultati["etaze"], list) and len(self.rezultati["etaze"]) > 0:
+                st.subheader("Pregled po etažama")
+                temperatura_vanjska = self.rezultati.get("zgrada", {}).get("temperatura_vanjska", -20.0)
                 
-            if self.rezultati and self.rezultati.get("etaze"):
-                if isinstance(self.rezultati["etaze"], list) and len(self.rezultati["etaze"]) > 0:                    # Get the external temperature from the results
-                    temperatura_vanjska = self.rezultati.get("zgrada", {}).get("temperatura_vanjska", -20.0)
-                      # Prikazujemo prostorije grupirane po etažama u kontejnerima
-                    for etaza_rezultat in self.rezultati["etaze"]:
-                        # Koristi container s border=True za vizualno odvajanje etaža
-                        with st.container(border=True):                            # Koristimo funkciju iz results_ui.py za konzistentan prikaz
-                            # Funkcija prikaz_rezultata_etaze već sadrži kompletan prikaz (metriku, tablicu prostorija i expandere)
-                            prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska)
-                else:
-                    st.info("Nema dostupnih rezultata za prostorije ili format nije ispravan.")
-            else:
-                st.info("Nema dostupnih rezultata za prostorije. Provjerite postavke zgrade i pokušajte ponovno.")
-        
-        with tab4:  # Rezultati po etažama
-            st.header("Rezultati proračuna - Po etažama")
-            # Automatski pokreni izračun kada se otvori tab s rezultatima
-            self._pokreni_izracun(elements_model)
-            
-            if self.rezultati and self.rezultati.get("zgrada"):# Import the format_power function for use in this scope
-                from .ui.results_ui import format_power
-            if self.rezultati and self.rezultati.get("zgrada"):
-                # Prvo prikazujemo rezultate za cijelu zgradu
+                tablice = dohvati_tablice(self.rezultati)
+                st.dataframe(tablica_etaza_za_prikaz(tablice), hide_index=True)
+                prikaz_izvoza_tablica(tablice, self.rezultati, st.session_state.get(f"{self.results_session_key}_revizija"))
                 
-                # Zatim prikazujemo rezultate po etažama bez detaljnog prikaza prostorija
-                if self.rezultati.get("etaze") and isinstance(self.rezultati["etaze"], list) and len(self.rezultati["etaze"]) > 0:
-                    st.subheader("Pregled po etažama")
-                    temperatura_vanjska = self.rezultati.get("zgrada", {}).get("temperatura_vanjska", -20.0)
-                    
-                    # Create a list to hold all floors data
-                    etaze_data = []
-                    
-                    # Iterate through floors and collect basic data
-                    for etaza_rezultat in self.rezultati["etaze"]:
-                        # Get total room count
-                        broj_prostorija = 0
-                        if isinstance(etaza_rezultat.get('prostorije'), dict):
-                            broj_prostorija = len(etaza_rezultat['prostorije'])
-                        elif isinstance(etaza_rezultat.get('prostorije'), list):
-                            broj_prostorija = len(etaza_rezultat['prostorije'])
-                            
-                        # Compute average temperature if available
-                        prosjecna_temp = None
-                        ukupna_povrsina = 0
-                        
-                        if isinstance(etaza_rezultat.get('prostorije'), dict):
-                            temp_sum = 0
-                            for p_id, p_result in etaza_rezultat['prostorije'].items():
-                                temp_sum += p_result['temperatura'] * p_result['povrsina']
-                                ukupna_povrsina += p_result['povrsina']
-                            if ukupna_povrsina > 0:
-                                prosjecna_temp = temp_sum / ukupna_povrsina
-                          # Create the row data
-                        specific_loss = etaza_rezultat['gubici'] / etaza_rezultat['povrsina'] if etaza_rezultat['povrsina'] > 0 else 0
-                        
-                        # Add data to the list
-                        etaze_data.append({
-                            "Etaža": etaza_rezultat['naziv'],
-                            "Ukupna površina": f"{etaza_rezultat['povrsina']:.2f} m²",
-                            "Ukupni volumen": f"{etaza_rezultat.get('volumen', 0):.2f} m³",
-                            "Broj prostorija": f"{broj_prostorija}",
-                            "Ukupni toplinski gubici [W]": f"{etaza_rezultat['gubici']:.0f}",
-                            "Ukupni specifični toplinski gubici": f"{specific_loss:.1f} W/m²",
-                            "Prosječna temp. [°C]": f"{prosjecna_temp:.1f}" if prosjecna_temp is not None else "N/A"
-                        })
-                    
-                    # Display the table
-                    etaze_df = pd.DataFrame(etaze_data)
-                    st.dataframe(etaze_df, hide_index=True)
-                      # Display expanded floor data with room listing but without detailed room information
-                    for etaza_rezultat in self.rezultati["etaze"]:
-                        with st.container(border=True):
-                            # Koristimo funkciju iz results_ui.py za konzistentan prikaz
-                            prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska)
-                            
-                            # Table of rooms in the floor
-                            if etaza_rezultat['prostorije']:
-                                # Create table data
-                                prostorije_data = []
-                                
-                                # Check if 'prostorije' is a dictionary or a list
-                                if isinstance(etaza_rezultat['prostorije'], dict):
-                                    # If it's a dictionary, iterate through its key-value pairs
-                                    for p_id, p_result in etaza_rezultat['prostorije'].items():
-                                        gubici_ukupno = p_result['gubici']['ukupno']
-                                        prostorije_data.append({
-                                            "Prostorija": p_result['naziv'],
-                                            "Površina [m²]": f"{p_result['povrsina']:.2f}",
-                                            "Temperatura [°C]": f"{p_result['temperatura']:.1f}",
-                                            "Toplinski gubici [W]": f"{gubici_ukupno:.0f}",
-                                            "Specifični toplinski gubici": f"{gubici_ukupno/p_result['povrsina']:.1f} W/m²" if p_result['povrsina'] > 0 else "N/A"
-                                        })
-                                elif isinstance(etaza_rezultat['prostorije'], list):
-                                    # If it's a list, iterate through the list
-                                    for p_result in etaza_rezultat['prostorije']:
-                                        gubici_ukupno = p_result['gubici']['ukupno']
-                                        prostorije_data.append({
-                                            "Prostorija": p_result['naziv'],
-                                            "Površina [m²]": f"{p_result['povrsina']:.2f}",
-                                            "Temperatura [°C]": f"{p_result['temperatura']:.1f}",
-                                            "Toplinski gubici [W]": f"{gubici_ukupno:.0f}",
-                                            "Specifični toplinski gubici": f"{gubici_ukupno/p_result['povrsina']:.1f} W/m²" if p_result['povrsina'] > 0 else "N/A"
-                                        })
-                                
-                                prostorije_df = pd.DataFrame(prostorije_data)
-                                st.dataframe(prostorije_df, hide_index=True)
-                            else:
-                                st.warning("Nema podataka o prostorijama na ovoj etaži.")
-            else:
-                st.info("Nema dostupnih rezultata za zgradu. Provjerite postavke zgrade i pokušajte ponovno.")
-          
+                # Analiza nesigurnosti projektnih gubitaka (P50/P90/P95)
+                prikaz_analize_nesigurnosti(self.multi_room_model, elements_model, self._odabrani_grad())
+                prikaz_analize_osjetljivosti(self.multi_room_model, elements_model, self._odabrani_grad())
+                prikaz_varijanti(self.multi_room_model, elements_model, self._odabrani_grad())
+                prikaz_usporedbe_modela(self.multi_room_model, elements_model, self._odabrani_grad())
+                for etaza_rezultat in self.rezultati["etaze"]:
+                    with st.container(border=True):
+                        # Koristimo funkciju iz results_ui.py za konzistentan prikaz
+                        prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska, tablice, prefiks_kljuca="etaze")
+        else:
+            st.info("Nema dostupnih rezultata za zgradu. Provjerite postavke zgrade i pokušajte ponovno.")
 
-    def _pokreni_izracun(self, elements_model):
-        # Ensure instance variables are synced with the latest session state before calculation
+    def _odabrani_grad(self):
+        """Vraća grad koji odgovara odabranoj vanjskoj projektnoj temperaturi."""
+        return next((grad for grad, temp in GRADOVI_TEMP.items() if temp == self.temp_vanjska), "Osijek")
+
+    def _uskladi_postavke(self):
+        """Usklađuje parametre proračuna s najnovijim stanjem sesije."""
         if 'toplinski_mostovi_checkbox' in st.session_state:
             self.toplinski_mostovi = st.session_state.toplinski_mostovi_checkbox
         if 'postotak_toplinskih_mostova_slider' in st.session_state:
             self.postotak_toplinskih_mostova = st.session_state.postotak_toplinskih_mostova_slider
         if 'faktor_sigurnosti_slider' in st.session_state:
             self.faktor_sigurnosti = st.session_state.faktor_sigurnosti_slider
+        st.session_state['toplinski_mostovi'] = self.toplinski_mostovi
+        st.session_state['postotak_toplinskih_mostova'] = self.postotak_toplinskih_mostova if self.toplinski_mostovi else 0
+        st.session_state['metoda_toplinskih_mostova'] = getattr(self, 'metoda_toplinskih_mostova', METODA_POSTOTAK)
+        st.session_state['psi_katalog'] = dohvati_psi_vrijednosti(getattr(self, 'psi_katalog', None) or {})
+
+    def _revizija_izracuna(self):
+        """
+        Vraća potpis svih ulaza izračuna: revizija modela, katalog građevinskih
+        elemenata, temperature prostorija i parametri proračuna.
+        """
+        ulazi = {
+            "model": self.multi_room_model.revizija() if self.multi_room_model else None,
+            "elementi": st.session_state.get(BuildingElementsModel.SESSION_KEY),
+            "temperature_prostorija": st.session_state.get("temperature_prostorija"),
+            "parametri": [
+                self.temp_vanjska, self.toplinski_mostovi, self.postotak_toplinskih_mostova, self.faktor_sigurnosti,
+                st.session_state.get('metoda_toplinskih_mostova'), st.session_state.get('psi_katalog'), self.u_values
+            ],
+        }
+        return hashlib.sha1(json.dumps(ulazi, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _osiguraj_rezultate(self, elements_model):
+        """
+        Pokreće izračun samo ako se ulazi promijenili od zadnjeg izračuna.
+        
+        Rezultati se vežu uz reviziju ulaza, pa prebacivanje između kartica
+        rezultata ili osvježavanje sučelja ne ponavlja izračun zgrade.
+        """
+        self._uskladi_postavke()
+        revizija = self._revizija_izracuna()
+        kljuc_revizije = f"{self.results_session_key}_revizija"
+        # Uređivači (fragmenti) označavaju rezultate zastarjelima nakon izmjene modela
+        zastarjeli = st.session_state.pop(kljuc_zastarjelih_rezultata(self.session_key), False)
+        if (not zastarjeli and self.rezultati and "error" not in self.rezultati
+                and st.session_state.get(kljuc_revizije) == revizija):
+            return
+        self._pokreni_izracun(elements_model)
+        st.session_state[kljuc_revizije] = revizija
+
+    def _pokreni_izracun(self, elements_model):
+        """Pokreće izračun toplinskih gubitaka zgrade i sprema rezultate u session state."""
+        self._uskladi_postavke()
 
         try:
             if not self.multi_room_model or not self.multi_room_model.etaze:
@@ -286,9 +333,8 @@ class HeatLossCalc(BaseCalculation):
                 "postotak_toplinskih_mostova": self.postotak_toplinskih_mostova if self.toplinski_mostovi else 0,
                 "faktor_sigurnosti": self.faktor_sigurnosti,
             }
-            st.write(f"DEBUG: `dodatni_parametri` u _pokreni_izracun: {dodatni_parametri}") # DEBUG
             # Pronađi grad koji odgovara odabranoj temperaturi
-            odabrani_grad = next((grad for grad, temp in GRADOVI_TEMP.items() if temp == self.temp_vanjska), "Osijek")
+            odabrani_grad = self._odabrani_grad()
             
             # Pozovi funkciju s ažuriranim setom parametara
             self.rezultati = self.izracunaj_toplinske_gubitke_zgrade(
@@ -579,14 +625,32 @@ class HeatLossCalc(BaseCalculation):
         thermal_bridges_enabled = st.checkbox(
             "Uračunaj dodatak za toplinske mostove",
             value=False,  # Default to False
-            help="Dodaje postotak na transmisijske gubitke zbog toplinskih mostova."
+            help="Dodaje postotak na transmisijske gubitke zbog toplinskih mostova.",
+            key="toplinski_mostovi_checkbox"
         )
         
         # Set instance variables and session state
         self.toplinski_mostovi = thermal_bridges_enabled
         st.session_state['toplinski_mostovi'] = thermal_bridges_enabled
-          # Only show slider if thermal bridges are enabled
+        
+        # Metoda: postotni dodatak ili linijski ψ·L·ΔT s ψ katalogom projekta
+        metode = {METODA_POSTOTAK: "Postotak transmisijskih gubitaka", METODA_LINIJSKI: "Linijski (ψ·L·ΔT)"}
         if thermal_bridges_enabled:
+            self.metoda_toplinskih_mostova = st.radio(
+                "Metoda toplinskih mostova:",
+                list(metode.keys()),
+                index=list(metode.keys()).index(self.metoda_toplinskih_mostova),
+                format_func=metode.get,
+                horizontal=True,
+                key="metoda_toplinskih_mostova_radio"
+            )
+        st.session_state['metoda_toplinskih_mostova'] = self.metoda_toplinskih_mostova
+        st.session_state['psi_katalog'] = self.psi_katalog
+        
+        if thermal_bridges_enabled and self.metoda_toplinskih_mostova == METODA_LINIJSKI:
+            self._render_psi_katalog_ui()
+          # Only show slider if thermal bridges are enabled
+        elif thermal_bridges_enabled:
             # Use regular numeric slider with 5% increments
             thermal_bridges_percentage = st.slider(
                 "Postotak za toplinske mostove:",
@@ -594,7 +658,8 @@ class HeatLossCalc(BaseCalculation):
                 max_value=25,
                 value=15,  # Default value
                 step=5,
-                format="%d%%"  # Format as percentage with % sign
+                format="%d%%",  # Format as percentage with % sign
+                key="postotak_toplinskih_mostova_slider"
             )            # Show reference values in a blue info box
             st.info("""
 **Referentne vrijednosti:**
@@ -617,3 +682,28 @@ class HeatLossCalc(BaseCalculation):
             # When disabled, set percentage to 0
             self.postotak_toplinskih_mostova = 0
             st.session_state['postotak_toplinskih_mostova'] = 0
+
+    def _render_psi_katalog_ui(self):
+        """Prikazuje uređivač ψ kataloga projekta za linijsku metodu toplinskih mostova."""
+        psi = dohvati_psi_vrijednosti(self.psi_katalog)
+        df = pd.DataFrame({
+            "Spoj": [NAZIVI_SPOJEVA[vrsta] for vrsta in VRSTE_SPOJEVA],
+            "ψ [W/(m·K)]": [psi[vrsta] for vrsta in VRSTE_SPOJEVA],
+        })
+        uredeno = st.data_editor(
+            df,
+            hide_index=True,
+            disabled=["Spoj"],
+            column_config={"ψ [W/(m·K)]": st.column_config.NumberColumn(min_value=0.0, max_value=2.0, step=0.01, format="%.2f")},
+            key="psi_katalog_editor"
+        )
+        self.psi_katalog = {
+            vrsta: float(vrijednost)
+            for vrsta, vrijednost in zip(VRSTE_SPOJEVA, uredeno["ψ [W/(m·K)]"])
+        }
+        st.session_state['psi_katalog'] = self.psi_katalog
+        # Postotni dodatak se ne koristi uz linijsku metodu
+        self.postotak_toplinskih_mostova = 0
+        st.session_state['postotak_toplinskih_mostova'] = 0
+        st.caption("Duljine spojeva izvode se iz geometrije prostorija (vanjski zidovi, visina, opseg otvora). "
+                   "ψ katalog sprema se s projektom.")
@@ -6,5 +6,9 @@ Ovaj modul sadrži klase i funkcije za rad s modelima prostorija, etaža i eleme
 from .etaza import Etaza
 from .prostorija import Prostorija
 from .model import MultiRoomModel
+from .uvoz_geometrije import uvezi_geometriju, uvezi_zapise, uvezi_gbxml, predlozak_csv
 
-__all__ = ['Etaza', 'Prostorija', 'MultiRoomModel']
+__all__ = [
+    'Etaza', 'Prostorija', 'MultiRoomModel',
+    'uvezi_geometriju', 'uvezi_zapise', 'uvezi_gbxml', 'predlozak_csv'
+]
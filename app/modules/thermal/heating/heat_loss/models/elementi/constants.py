@@ -139,3 +139,7 @@ TIPOVI_ELEMENATA = {
     "pod": "Pod",
     "strop": "Strop"
 }
+
+# Granice poda i stropa prostorije (što se nalazi ispod/iznad)
+TIPOVI_PODA = ["Prema tlu", "Prema negrijanom prostoru", "Prema vanjskom prostoru", "Prema grijanom prostoru"]
+TIPOVI_STROPA = ["Prema tavanu", "Prema negrijanom prostoru", "Prema vanjskom prostoru", "Prema grijanom prostoru", "Ravni krov"]
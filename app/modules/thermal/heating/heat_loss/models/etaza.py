@@ -2,18 +2,94 @@
 Modul koji sadrži klasu Etaza za rad s etažama u proračunu toplinskih gubitaka.
 """
 
+import copy
 import uuid
 
+# Svojstva prostorija koja ponavljanje tipske etaže smije promijeniti
+PREINAKE_PONAVLJANJA = ("pod_tip", "strop_tip", "temperature")
+
+
 class Etaza:
-    """Klasa koja predstavlja jednu etažu u proračunu."""    
-    def __init__(self, id=None, naziv="Nova etaža", redni_broj=1, visina_etaze=2.5, prostorije=None, broj_etaze=None):
+    """Klasa koja predstavlja jednu etažu u proračunu."""
+    def __init__(self, id=None, naziv="Nova etaža", redni_broj=1, visina_etaze=2.5, prostorije=None, broj_etaze=None,
+                 ponavljanja=None):
         self.id = id if id is not None else uuid.uuid4().hex
         self.naziv = naziv
         self.redni_broj = int(redni_broj)
         self.broj_etaze = broj_etaze if broj_etaze is not None else redni_broj  # Broj etaže za numeraciju prostorija
-        self.visina_etaze = float(visina_etaze)        
+        self.visina_etaze = float(visina_etaze)
         self.prostorije = prostorije if prostorije is not None else []
-        
+        # Tipska etaža: dodatne instance iste etaže (predložak je sama etaža) s preinakama
+        self.ponavljanja = [dict(p) for p in ponavljanja] if ponavljanja else []
+
+    @property
+    def broj_ponavljanja(self):
+        """Ukupan broj instanci etaže (predložak + ponavljanja)."""
+        return 1 + len(self.ponavljanja)
+
+    def dodaj_ponavljanje(self, naziv=None, broj_etaze=None, pod_tip=None, strop_tip=None, temperature=None):
+        """
+        Dodaje instancu tipske etaže bez kopiranja prostorija.
+
+        Parameters:
+        -----------
+        naziv : str, optional
+            Naziv instance (zadano: naziv etaže s rednim brojem ponavljanja)
+        broj_etaze : int, optional
+            Broj etaže instance za prikaz
+        pod_tip : str, optional
+            Tip poda svih prostorija instance (None = kao predložak)
+        strop_tip : str, optional
+            Tip stropa svih prostorija instance (None = kao predložak)
+        temperature : dict, optional
+            Unutarnje temperature {prostorija_id: temp} koje se razlikuju od predloška
+
+        Returns:
+        --------
+        dict
+            Dodano ponavljanje
+        """
+        ponavljanje = {
+            "id": uuid.uuid4().hex,
+            "naziv": naziv or f"{self.naziv} ({self.broj_ponavljanja + 1})",
+            "broj_etaze": broj_etaze,
+            "pod_tip": pod_tip,
+            "strop_tip": strop_tip,
+            "temperature": dict(temperature) if temperature else {},
+        }
+        self.ponavljanja.append(ponavljanje)
+        return ponavljanje
+
+    def ukloni_ponavljanje(self, ponavljanje_id):
+        """Uklanja instancu tipske etaže po ID-u."""
+        self.ponavljanja = [p for p in self.ponavljanja if p.get("id") != ponavljanje_id]
+
+    def grupe_ponavljanja(self):
+        """
+        Grupira instance etaže (predložak i ponavljanja) po istim preinakama.
+
+        Instance s istim preinakama daju iste gubitke, pa se za svaku grupu
+        izračun provodi samo jednom i množi brojem instanci u grupi.
+
+        Returns:
+        --------
+        list[dict]
+            Grupe s ključevima "id", "preinake" (dict ili None za predložak),
+            "instance" (lista naziva) i "broj"; predložak je uvijek u prvoj grupi
+        """
+        grupe = {(): {"id": self.id, "preinake": None, "instance": [self.naziv], "broj": 1}}
+        for ponavljanje in self.ponavljanja:
+            preinake = _normaliziraj_preinake(ponavljanje)
+            kljuc = _kljuc_preinaka(preinake)
+            grupa = grupe.get(kljuc)
+            if grupa is None:
+                grupe[kljuc] = {"id": ponavljanje.get("id"), "preinake": preinake,
+                                "instance": [ponavljanje.get("naziv")], "broj": 1}
+            else:
+                grupa["instance"].append(ponavljanje.get("naziv"))
+                grupa["broj"] += 1
+        return list(grupe.values())
+
     def to_dict(self):
         """Pretvara objekt Etaza u rječnik za spremanje."""
         return {
@@ -21,18 +97,74 @@ class Etaza:
             "naziv": self.naziv,
             "redni_broj": self.redni_broj,            "broj_etaze": self.broj_etaze,
             "visina_etaze": self.visina_etaze,
-            "prostorije": [p.id if hasattr(p, 'id') else p for p in self.prostorije] if self.prostorije else []
+            "prostorije": [p.id if hasattr(p, 'id') else p for p in self.prostorije] if self.prostorije else [],
+            "ponavljanja": [dict(p) for p in self.ponavljanja]
         }
 
     @classmethod
     def from_dict(cls, data):
-        """Stvara objekt Etaza iz rječnika."""        
+        """Stvara objekt Etaza iz rječnika."""
         etaza = cls(
             id=data.get("id"),
             naziv=data.get("naziv", "Nova etaža"),
             redni_broj=int(data.get("redni_broj", 1)),
             broj_etaze=data.get("broj_etaze"),
             visina_etaze=float(data.get("visina_etaze", 2.5)),
-            prostorije=data.get("prostorije", [])
+            prostorije=data.get("prostorije", []),
+            ponavljanja=data.get("ponavljanja", [])
         )
         return etaza
+
+
+def _normaliziraj_preinake(ponavljanje):
+    """Vraća samo preinake koje se stvarno razlikuju od predloška."""
+    preinake = {}
+    for kljuc in PREINAKE_PONAVLJANJA:
+        vrijednost = ponavljanje.get(kljuc)
+        if vrijednost:
+            preinake[kljuc] = dict(vrijednost) if isinstance(vrijednost, dict) else vrijednost
+    return preinake
+
+
+def _kljuc_preinaka(preinake):
+    """Hashabilni ključ preinaka za grupiranje istih instanci."""
+    return tuple(
+        (kljuc, tuple(sorted(vrijednost.items())) if isinstance(vrijednost, dict) else vrijednost)
+        for kljuc, vrijednost in sorted(preinake.items())
+    )
+
+
+def primijeni_preinake(prostorije, preinake):
+    """
+    Vraća prostorije instance tipske etaže s primijenjenim preinakama.
+
+    Prostorije se plitko kopiraju samo ako postoje preinake; zidovi i elementi
+    ostaju zajednički s predloškom, pa instanca ne zauzima dodatnu memoriju
+    za geometriju.
+
+    Parameters:
+    -----------
+    prostorije : list[Prostorija]
+        Prostorije predloška
+    preinake : dict or None
+        Preinake instance (pod_tip, strop_tip, temperature)
+
+    Returns:
+    --------
+    list[Prostorija]
+        Prostorije predloška ili njihove plitke kopije s preinakama
+    """
+    if not preinake:
+        return prostorije
+    temperature = preinake.get("temperature") or {}
+    rezultat = []
+    for prostorija in prostorije:
+        kopija = copy.copy(prostorija)
+        if preinake.get("pod_tip"):
+            kopija.pod_tip = preinake["pod_tip"]
+        if preinake.get("strop_tip"):
+            kopija.strop_tip = preinake["strop_tip"]
+        if prostorija.id in temperature:
+            kopija.temp_unutarnja = float(temperature[prostorija.id])
+        rezultat.append(kopija)
+    return rezultat
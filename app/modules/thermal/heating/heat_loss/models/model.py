@@ -2,13 +2,18 @@
 Modul koji sadrži glavnu klasu modela za proračun toplinskih gubitaka.
 """
 
+import copy
+import hashlib
+import json
 import streamlit as st
 import uuid
+from contextlib import contextmanager
 from .etaza import Etaza
 from .prostorija import Prostorija
 
 from .elementi.wall_elements import WallElements
 from .elementi.fizicki_zid import FizickiZid
+from ..utils.session_manager import zabiljezi_korak_povijesti
 
 class MultiRoomModel:
     """
@@ -24,6 +29,12 @@ class MultiRoomModel:
         self.prostorije = []
         self.fizicki_zidovi = {}  # Rječnik fizičkih zidova {id: FizickiZid}
         self._fizicki_elementi = {}  # Rječnik s fizičkim elementima za proračun
+        self.varijante = []  # Varijante projekta - samo preinake u odnosu na osnovni model
+        # Stanje transakcije (skupne izmjene) - indeksi postoje samo unutar transakcije
+        self._dubina_transakcije = 0
+        self._indeks_prostorija = None
+        self._indeks_zidova = None
+        self._uklonjene_prostorije = set()
         self._ucitaj_iz_session_state()
         
     def _ucitaj_iz_session_state(self):
@@ -37,7 +48,8 @@ class MultiRoomModel:
                 converted_dict = {
                     "etaze": [e.to_dict() for e in current_data_in_state.etaze],
                     "prostorije": [p.to_dict() for p in current_data_in_state.prostorije],
-                    "fizicki_zidovi": {zid_id: zid.to_dict() for zid_id, zid in current_data_in_state.fizicki_zidovi.items()}
+                    "fizicki_zidovi": {zid_id: zid.to_dict() for zid_id, zid in current_data_in_state.fizicki_zidovi.items()},
+                    "varijante": [dict(v) for v in getattr(current_data_in_state, "varijante", [])]
                 }
                 st.session_state[self.session_key] = converted_dict
                 current_data_in_state = st.session_state[self.session_key]  # Sada bi trebao biti rječnik
@@ -75,7 +87,8 @@ class MultiRoomModel:
                 except Exception:
                     # Možete dodati st.warning za neuspjelo učitavanje etaže, za debugiranje
                     # npr. st.warning(f"Greška pri učitavanju etaže: {e}")
-                    pass  # Preskoči etažu koja se ne može učitati            self.etaze = loaded_etaze_temp
+                    pass  # Preskoči etažu koja se ne može učitati
+            self.etaze = loaded_etaze_temp
             
             # Load prostorije
             prostorije_data = saved_state.get("prostorije", [])
@@ -90,6 +103,9 @@ class MultiRoomModel:
                     pass  # Preskoči prostoriju koja se ne može učitati
               # Assign loaded prostorije to the model
             self.prostorije = loaded_prostorije_temp
+            
+            # Load varijante
+            self.varijante = [dict(v) for v in saved_state.get("varijante", []) if isinstance(v, dict)]
         else:
             self._inicijaliziraj_zadano_stanje()
             
@@ -106,14 +122,264 @@ class MultiRoomModel:
     
     # === METODE ZA UPRAVLJANJE ETAŽAMA ===
     
-    def _spremi_u_session_state(self):
-        """Sprema model u Streamlit session state."""
-        stanje = {
+    def stanje(self):
+        """Vraća serijalizirano stanje modela (oblik koji se sprema u session state)."""
+        return {
             "etaze": [e.to_dict() for e in self.etaze],
             "prostorije": [p.to_dict() for p in self.prostorije],
-            "fizicki_zidovi": {zid_id: zid.to_dict() for zid_id, zid in self.fizicki_zidovi.items()}
+            "fizicki_zidovi": {zid_id: zid.to_dict() for zid_id, zid in self.fizicki_zidovi.items()},
+            "varijante": [dict(v) for v in self.varijante]
         }
-        st.session_state[self.session_key] = stanje
+
+    def revizija(self):
+        """
+        Vraća reviziju modela - hash serijaliziranog stanja.
+        
+        Revizija se mijenja pri svakoj promjeni etaža, prostorija, zidova ili varijanti,
+        pa služi kao ključ za ponovnu upotrebu rezultata izračuna. Polja koja postavlja
+        sam izračun (temperature negrijanih prostorija) ne ulaze u reviziju, inače bi
+        izračun promijenio reviziju pod kojom su spremljeni njegovi rezultati.
+        
+        Returns:
+        --------
+        str
+            Heksadecimalni SHA-1 hash stanja modela
+        """
+        stanje = self.stanje()
+        stanje["prostorije"] = [Prostorija.ulazni_podaci(prostorija) for prostorija in stanje["prostorije"]]
+        sadrzaj = json.dumps(stanje, sort_keys=True, default=str)
+        return hashlib.sha1(sadrzaj.encode()).hexdigest()
+
+    @classmethod
+    def iz_stanja(cls, stanje, session_key):
+        """
+        Izrađuje model iz serijaliziranog stanja (npr. iz povijesti ili .calc datoteke)
+        bez trajne izmjene session state-a.
+
+        Parameters:
+        -----------
+        stanje : dict
+            Stanje modela (oblik koji vraća stanje())
+        session_key : str
+            Privremeni ključ pod kojim se model učitava; prethodna vrijednost ključa se vraća
+
+        Returns:
+        --------
+        MultiRoomModel
+            Model učitan iz stanja
+        """
+        nedostaje = object()
+        prethodno = st.session_state.get(session_key, nedostaje)
+        st.session_state[session_key] = copy.deepcopy(stanje)
+        try:
+            return cls(session_key)
+        finally:
+            if prethodno is nedostaje:
+                st.session_state.pop(session_key, None)
+            else:
+                st.session_state[session_key] = prethodno
+
+    def _spremi_u_session_state(self):
+        """Sprema model u Streamlit session state (unutar transakcije spremanje se odgađa do potvrde)."""
+        if self._dubina_transakcije:
+            return
+        st.session_state[self.session_key] = self.stanje()
+
+    # === TRANSAKCIJE (SKUPNE IZMJENE) ===
+
+    @contextmanager
+    def batch(self, opis="Skupna izmjena modela"):
+        """
+        Transakcija za skupne izmjene modela.
+        
+        Unutar bloka `with model.batch():` izmjene se primjenjuju na model u
+        memoriji uz indekse prostorija i zidova po ID-u, a pozivi spremanja
+        (i kroz kontrolere) se odgađaju. Pri potvrdi se jednom obnavljaju
+        reference i provjeravaju veze zidova, bilježi se jedan korak povijesti
+        (poništavanja) i model se jednom sprema. Ako blok završi iznimkom, model
+        se vraća u stanje prije transakcije. Ugniježđene transakcije pripadaju
+        vanjskoj.
+        
+        Parameters:
+        -----------
+        opis : str
+            Opis izmjene za povijest poništavanja
+            
+        Yields:
+        -------
+        MultiRoomModel
+            Ovaj model
+        """
+        if self._dubina_transakcije:
+            self._dubina_transakcije += 1
+            try:
+                yield self
+            finally:
+                self._dubina_transakcije -= 1
+            return
+
+        self._dubina_transakcije = 1
+        self._indeks_prostorija = {p.id: p for p in self.prostorije}
+        self._indeks_zidova = {zid.get("id"): zid for p in self.prostorije for zid in p.zidovi}
+        self._uklonjene_prostorije = set()
+        try:
+            yield self
+        except BaseException:
+            self._zatvori_transakciju()
+            # Session state još sadrži stanje prije transakcije
+            self.fizicki_zidovi = {}
+            self._ucitaj_iz_session_state()
+            raise
+        uklonjene = self._uklonjene_prostorije
+        self._zatvori_transakciju()
+        self._potvrdi_transakciju(opis, uklonjene)
+
+    def _zatvori_transakciju(self):
+        """Izlazi iz transakcije i odbacuje indekse."""
+        self._dubina_transakcije = 0
+        self._indeks_prostorija = None
+        self._indeks_zidova = None
+        self._uklonjene_prostorije = set()
+
+    def _potvrdi_transakciju(self, opis, uklonjene_prostorije):
+        """Provjerava veze, bilježi korak povijesti i jednom sprema model."""
+        if uklonjene_prostorije:
+            # Zidovi prema uklonjenim prostorijama uklanjaju se kao i par zida pri brisanju zida
+            for prostorija in self.prostorije:
+                prostorija.zidovi = [
+                    z for z in prostorija.zidovi if z.get("povezana_prostorija_id") not in uklonjene_prostorije
+                ]
+        self.restore_shared_elements_references()
+
+        novo_stanje = self.stanje()
+        if novo_stanje == st.session_state.get(self.session_key):
+            return
+        # Korak povijesti bilježi se prije spremanja, dok session state još sadrži prethodno stanje
+        zabiljezi_korak_povijesti(opis)
+        st.session_state[self.session_key] = novo_stanje
+
+    def svi_zidovi(self):
+        """
+        Prolazi kroz sve zidove svih prostorija.
+        
+        Yields:
+        -------
+        tuple
+            (prostorija, zid) za svaki zid u modelu
+        """
+        for prostorija in self.prostorije:
+            for zid in prostorija.zidovi:
+                yield prostorija, zid
+
+    def dohvati_zid(self, prostorija_id, zid_id):
+        """
+        Dohvaća zid prostorije po ID-u (unutar transakcije iz indeksa).
+        
+        Parameters:
+        -----------
+        prostorija_id : str
+            ID prostorije u kojoj se nalazi zid
+        zid_id : str
+            ID zida
+            
+        Returns:
+        --------
+        dict or None
+            Zid ili None ako prostorija ili zid ne postoje
+        """
+        prostorija = self.dohvati_prostoriju(prostorija_id)
+        if not prostorija:
+            return None
+        if self._indeks_zidova is None:
+            return prostorija.dohvati_zid(zid_id)
+        zid = self._indeks_zidova.get(zid_id)
+        if zid is None:
+            zid = prostorija.dohvati_zid(zid_id)
+            if zid is not None:
+                self._indeks_zidova[zid_id] = zid
+        return zid
+
+    def add_wall_to_room(self, prostorija_id, tip_zida, duzina, visina_zida=None, orijentacija=None,
+                         povezana_ciljna_prostorija_id=None, je_segmentiran=False, tip_zida_id=None, spremi=True):
+        """
+        Dodaje zid u prostoriju; zid prema prostoriji stvara i par u povezanoj prostoriji.
+        
+        Parameters:
+        -----------
+        prostorija_id : str
+            ID prostorije u koju se dodaje zid
+        tip_zida : str
+            Tip zida ("vanjski", "prema_prostoriji", "prema_negrijanom")
+        duzina : float
+            Duljina zida u m
+        visina_zida : float, optional
+            Visina zida u m (None = visina prostorije odnosno etaže)
+        orijentacija : str, optional
+            Orijentacija vanjskog zida
+        povezana_ciljna_prostorija_id : str, optional
+            ID povezane prostorije za zid prema prostoriji
+        je_segmentiran : bool
+            Određuje je li zid segmentiran
+        tip_zida_id : str, optional
+            ID tipa zida iz kataloga
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+            
+        Returns:
+        --------
+        str or None
+            ID novog zida ili None ako dodavanje nije uspjelo
+        """
+        prostorija = self.dohvati_prostoriju(prostorija_id)
+        if not prostorija:
+            return None
+        povezana = self.dohvati_prostoriju(povezana_ciljna_prostorija_id) if povezana_ciljna_prostorija_id else None
+
+        zid = prostorija.dodaj_zid(
+            tip_zida, orijentacija, duzina, visina_zida=visina_zida, povezana_prostorija_obj=povezana,
+            model_ref=self, je_segmentiran_val=je_segmentiran, tip_zida_id=tip_zida_id
+        )
+        if zid is None:
+            return None
+        if self._indeks_zidova is not None:
+            self._indeks_zidova[zid["id"]] = zid
+            if povezana is not None and zid.get("povezani_zid_id"):
+                self._indeks_zidova[zid["povezani_zid_id"]] = povezana.zidovi[-1]
+
+        if spremi:
+            self._spremi_u_session_state()
+        return zid["id"]
+
+    def obrisi_zid_iz_prostorije(self, prostorija_id, zid_id, spremi=True):
+        """
+        Uklanja zid iz prostorije zajedno s povezanim zidom u susjednoj prostoriji.
+        
+        Parameters:
+        -----------
+        prostorija_id : str
+            ID prostorije iz koje se uklanja zid
+        zid_id : str
+            ID zida koji se uklanja
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+            
+        Returns:
+        --------
+        bool
+            True ako je zid uklonjen, False inače
+        """
+        prostorija = self.dohvati_prostoriju(prostorija_id)
+        zid = self.dohvati_zid(prostorija_id, zid_id)
+        if not zid:
+            return False
+        prostorija.ukloni_zid(zid_id, model_ref=self)
+        if self._indeks_zidova is not None:
+            self._indeks_zidova.pop(zid_id, None)
+            self._indeks_zidova.pop(zid.get("povezani_zid_id"), None)
+
+        if spremi:
+            self._spremi_u_session_state()
+        return True
 
     def restore_shared_elements_references(self):
         """
@@ -204,6 +470,10 @@ class MultiRoomModel:
         prostorije_na_uklonjenoj_etazi_ids = {p.id for p in self.dohvati_prostorije_za_etazu(etaza_id)}
         self.prostorije = [p for p in self.prostorije if p.etaza_id != etaza_id]
         self.etaze = [e for e in self.etaze if e.id != etaza_id]
+        if self._indeks_prostorija is not None:
+            for prostorija_id in prostorije_na_uklonjenoj_etazi_ids:
+                self._indeks_prostorija.pop(prostorija_id, None)
+            self._uklonjene_prostorije |= prostorije_na_uklonjenoj_etazi_ids
         
         if spremi:
             self._spremi_u_session_state()
@@ -227,6 +497,57 @@ class MultiRoomModel:
                 return e
         return None
 
+    def dodaj_ponavljanje_etaze(self, etaza_id, naziv=None, pod_tip=None, strop_tip=None, temperature=None, spremi=True):
+        """
+        Dodaje instancu tipske etaže - etaža se ponavlja bez kopiranja prostorija i zidova.
+
+        Parameters:
+        -----------
+        etaza_id : str
+            ID etaže koja je predložak
+        naziv : str, optional
+            Naziv instance
+        pod_tip : str, optional
+            Tip poda prostorija instance (None = kao predložak)
+        strop_tip : str, optional
+            Tip stropa prostorija instance (None = kao predložak)
+        temperature : dict, optional
+            Unutarnje temperature {prostorija_id: temp} koje se razlikuju od predloška
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+
+        Returns:
+        --------
+        dict or None
+            Dodano ponavljanje ili None ako etaža ne postoji
+        """
+        etaza = self.dohvati_etazu(etaza_id)
+        if not etaza:
+            return None
+        ponavljanje = etaza.dodaj_ponavljanje(naziv, pod_tip=pod_tip, strop_tip=strop_tip, temperature=temperature)
+        if spremi:
+            self._spremi_u_session_state()
+        return ponavljanje
+
+    def ukloni_ponavljanje_etaze(self, etaza_id, ponavljanje_id, spremi=True):
+        """
+        Uklanja instancu tipske etaže.
+
+        Parameters:
+        -----------
+        etaza_id : str
+            ID etaže koja je predložak
+        ponavljanje_id : str
+            ID instance koja se uklanja
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+        """
+        etaza = self.dohvati_etazu(etaza_id)
+        if etaza:
+            etaza.ukloni_ponavljanje(ponavljanje_id)
+            if spremi:
+                self._spremi_u_session_state()
+
     def dohvati_prostorije_za_etazu(self, etaza_id):
         """
         Dohvaća sve prostorije koje pripadaju određenoj etaži.
@@ -277,6 +598,8 @@ class MultiRoomModel:
         )
         
         self.prostorije.append(prostorija)
+        if self._indeks_prostorija is not None:
+            self._indeks_prostorija[prostorija.id] = prostorija
         
         if spremi:
             self._spremi_u_session_state()
@@ -297,6 +620,9 @@ class MultiRoomModel:
         if not prostorija_za_uklanjanje:
             return        # Ukloni prostoriju iz modela
         self.prostorije = [p for p in self.prostorije if p.id != prostorija_id]
+        if self._indeks_prostorija is not None:
+            self._indeks_prostorija.pop(prostorija_id, None)
+            self._uklonjene_prostorije.add(prostorija_id)
         
         if spremi:
             self._spremi_u_session_state()
@@ -315,8 +641,12 @@ class MultiRoomModel:
         Prostorija or None
             Prostorija s navedenim ID-om ili None ako ne postoji
         """
+        if self._indeks_prostorija is not None and prostorija_id in self._indeks_prostorija:
+            return self._indeks_prostorija[prostorija_id]
         for p in self.prostorije:
             if p.id == prostorija_id:
+                if self._indeks_prostorija is not None:
+                    self._indeks_prostorija[prostorija_id] = p
                 return p
         return None
 
@@ -392,11 +722,118 @@ class MultiRoomModel:
         nova_prostorija.zidovi = [zid.copy() for zid in originalna.zidovi]
         
         self.prostorije.append(nova_prostorija)
+        if self._indeks_prostorija is not None:
+            self._indeks_prostorija[nova_prostorija.id] = nova_prostorija
         
         if spremi:
             self._spremi_u_session_state()
         return nova_prostorija
 
+    # === METODE ZA UPRAVLJANJE VARIJANTAMA ===
+    
+    def dodaj_varijantu(self, naziv, u_vrijednosti=None, zamjene_tipova=None, izmjene_zraka=None,
+                        postotak_toplinskih_mostova=None, osnovna_revizija=None, spremi=True):
+        """
+        Dodaje varijantu projekta koja sadrži samo preinake u odnosu na osnovni model.
+        
+        Parameters:
+        -----------
+        naziv : str
+            Naziv varijante (npr. "Troslojno ostakljenje")
+        u_vrijednosti : dict, optional
+            Nove U-vrijednosti {kategorija: {tip_id ili "zadano": U}}
+        zamjene_tipova : dict, optional
+            Zamjene tipova {kategorija: {tip_id ili "zadano": novi_tip_id}}
+        izmjene_zraka : dict, optional
+            Izmjene zraka {prostorija_id: n}
+        postotak_toplinskih_mostova : float, optional
+            Postotak toplinskih mostova (None = kao osnovni model)
+        osnovna_revizija : str, optional
+            Potpis kompiliranog osnovnog modela nad kojim je varijanta izrađena
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+            
+        Returns:
+        --------
+        dict
+            Nova varijanta
+        """
+        varijanta = {
+            "id": uuid.uuid4().hex,
+            "naziv": naziv,
+            "u_vrijednosti": {k: dict(v) for k, v in (u_vrijednosti or {}).items()},
+            "zamjene_tipova": {k: dict(v) for k, v in (zamjene_tipova or {}).items()},
+            "izmjene_zraka": dict(izmjene_zraka or {}),
+            "postotak_toplinskih_mostova": postotak_toplinskih_mostova,
+            "osnovna_revizija": osnovna_revizija,
+        }
+        self.varijante.append(varijanta)
+        if spremi:
+            self._spremi_u_session_state()
+        return varijanta
+    
+    def dohvati_varijantu(self, varijanta_id):
+        """
+        Dohvaća varijantu po ID-u.
+        
+        Parameters:
+        -----------
+        varijanta_id : str
+            ID varijante
+            
+        Returns:
+        --------
+        dict or None
+            Varijanta ili None ako ne postoji
+        """
+        for varijanta in self.varijante:
+            if varijanta.get("id") == varijanta_id:
+                return varijanta
+        return None
+    
+    def uredi_varijantu(self, varijanta_id, spremi=True, **preinake):
+        """
+        Mijenja naziv ili preinake varijante.
+        
+        Parameters:
+        -----------
+        varijanta_id : str
+            ID varijante
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+        **preinake
+            Ključevi kao u dodaj_varijantu (naziv, u_vrijednosti, zamjene_tipova, ...)
+            
+        Returns:
+        --------
+        dict or None
+            Izmijenjena varijanta ili None ako ne postoji
+        """
+        varijanta = self.dohvati_varijantu(varijanta_id)
+        if varijanta is None:
+            return None
+        for kljuc, vrijednost in preinake.items():
+            if kljuc in varijanta and kljuc != "id":
+                varijanta[kljuc] = vrijednost
+        if spremi:
+            self._spremi_u_session_state()
+        return varijanta
+    
+    def ukloni_varijantu(self, varijanta_id, spremi=True):
+        """
+        Uklanja varijantu.
+        
+        Parameters:
+        -----------
+        varijanta_id : str
+            ID varijante
+        spremi : bool
+            Određuje hoće li se promjene spremiti u session state
+        """
+        self.varijante = [v for v in self.varijante if v.get("id") != varijanta_id]
+        if spremi:
+            self._spremi_u_session_state()
+
     def izracunaj_ukupne_gubitke(self):
         """
         Izračunava ukupne gubitke topline za sve prostorije u modelu.
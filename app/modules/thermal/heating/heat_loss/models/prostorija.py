@@ -11,6 +11,20 @@ from .elementi.fizicki_zid import FizickiZid # Added import
 
 class Prostorija:
     """Klasa koja predstavlja jednu prostoriju u proračunu."""
+
+    # Polja koja postavlja izračun (nisu ulazni podaci prostorije)
+    IZRACUNATA_POLJA = ("izracunata_temp_negrijane",)
+    # Polja koja izračun prepisuje u negrijanim prostorijama
+    IZRACUNATA_POLJA_NEGRIJANE = ("temperatura_susjednog_negrijanog",)
+
+    @classmethod
+    def ulazni_podaci(cls, podaci):
+        """Vraća serijalizirane podatke prostorije bez polja koja postavlja izračun."""
+        izracunata = cls.IZRACUNATA_POLJA
+        if not podaci.get("grijana", True):
+            izracunata += cls.IZRACUNATA_POLJA_NEGRIJANE
+        return {kljuc: vrijednost for kljuc, vrijednost in podaci.items() if kljuc not in izracunata}
+
     def __init__(self, id=None, naziv="Nova prostorija", tip="Dnevni boravak", 
                  etaza_id=None, povrsina=20.0, model_ref=None, broj_prostorije=None):        
         self.id = id if id is not None else uuid.uuid4().hex
@@ -440,8 +454,9 @@ class Prostorija:
                                 zid_dict["povezana_prostorija_id"] = povezana_prostorija_id
                             break  # Found the corresponding FizickiZid
             
-            zidovi_dict_list.append(zid_dict)        
-            return {
+            zidovi_dict_list.append(zid_dict)
+
+        return {
             "id": self.id,
             "naziv": self.naziv,
             "broj_prostorije": self.broj_prostorije, # Broj prostorije na etaži
@@ -459,7 +474,10 @@ class Prostorija:
             "ventilacija_gubitci": getattr(self, 'ventilacija_gubitci', 0.0), # Ensure exists or default
             "dodatni_gubici": getattr(self, 'dodatni_gubici', 0.0), # Ensure exists or default
             "grijana": getattr(self, 'grijana', True), # Dodano svojstvo grijana
-            "izracunata_temp_negrijane": getattr(self, 'izracunata_temp_negrijane', None) # Dodana izračunata temp
+            "izracunata_temp_negrijane": getattr(self, 'izracunata_temp_negrijane', None), # Dodana izračunata temp
+            "izmjene_zraka": self.izmjene_zraka,
+            "koristi_zadanu_visinu": getattr(self, 'koristi_zadanu_visinu', True),
+            "temperatura_susjednog_negrijanog": getattr(self, 'temperatura_susjednog_negrijanog', 10.0)
         }
         
     @classmethod
@@ -0,0 +1,697 @@
+"""
+Modul za skupni uvoz geometrije zgrade iz CSV/XLSX predloška ili gbXML datoteke.
+
+Zapisi se čitaju kao tok (redak po redak, odnosno element po element) i
+izravno se pretvaraju u etaže, prostorije, zidove i otvore modela. Sve se
+izmjene izvode bez spremanja (spremi=False) uz indekse po ključu koji se grade
+samo jednom, a model se u session state sprema jednom, na kraju uvoza.
+"""
+
+import csv
+import io
+import math
+import os
+import xml.etree.ElementTree as ET
+
+from ..constants import ORIJENTACIJE
+from .elementi.constants import TIPOVI_PROSTORIJA, TIPOVI_ZIDOVA, TIPOVI_PODA, TIPOVI_STROPA
+
+# Stupci predloška; stupac 'zapis' određuje vrstu retka (etaza, prostorija, zid, otvor)
+STUPCI_PREDLOSKA = [
+    "zapis", "kljuc", "etaza", "naziv", "tip", "povrsina", "visina", "temperatura", "izmjene_zraka",
+    "pod_tip", "strop_tip", "prostorija", "orijentacija", "duzina", "susjedna_prostorija", "tip_zida",
+    "zid", "element", "sirina", "kolicina",
+]
+
+# Nazivi listova XLSX predloška bez stupca 'zapis'
+LISTOVI_PREDLOSKA = {
+    "etaže": "etaza", "etaze": "etaza",
+    "prostorije": "prostorija",
+    "zidovi": "zid",
+    "otvori": "otvor",
+}
+
+# Pretvorba jedinica duljine gbXML datoteke u metre
+JEDINICE_DULJINE = {
+    "meters": 1.0, "centimeters": 0.01, "millimeters": 0.001, "kilometers": 1000.0,
+    "feet": 0.3048, "inches": 0.0254, "miles": 1609.344, "yards": 0.9144,
+}
+
+# Površine gbXML datoteke koje se uvoze kao pod ili strop prostorije
+POD_IZ_GBXML = {
+    "SlabOnGrade": "Prema tlu",
+    "UndergroundSlab": "Prema tlu",
+    "RaisedFloor": "Prema vanjskom prostoru",
+    "ExposedFloor": "Prema vanjskom prostoru",
+}
+STROP_IZ_GBXML = {
+    "Roof": "Ravni krov",
+}
+
+_PRIMJER_PREDLOSKA = [
+    {"zapis": "etaza", "naziv": "Prizemlje", "visina": "2,8"},
+    {"zapis": "prostorija", "kljuc": "P1", "etaza": "Prizemlje", "naziv": "Dnevni boravak",
+     "tip": "Dnevni boravak", "povrsina": "24,5", "pod_tip": "Prema tlu", "strop_tip": "Prema grijanom prostoru"},
+    {"zapis": "prostorija", "kljuc": "P2", "etaza": "Prizemlje", "naziv": "Kupaonica",
+     "tip": "Kupaonica", "povrsina": "6", "temperatura": "24"},
+    {"zapis": "zid", "kljuc": "Z1", "prostorija": "P1", "tip": "vanjski", "orijentacija": "Jug", "duzina": "5,2"},
+    {"zapis": "zid", "kljuc": "Z2", "prostorija": "P1", "tip": "prema_prostoriji", "duzina": "2,4",
+     "susjedna_prostorija": "P2"},
+    {"zapis": "otvor", "zid": "Z1", "tip": "prozor", "sirina": "1,2", "visina": "1,4", "kolicina": "2"},
+    {"zapis": "otvor", "zid": "Z2", "tip": "vrata", "sirina": "0,8", "visina": "2"},
+]
+
+
+def predlozak_csv():
+    """
+    Vraća CSV predložak za uvoz geometrije s primjerom svake vrste zapisa.
+
+    Returns:
+    --------
+    str
+        CSV tekst (separator ';', decimalni zarez)
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=STUPCI_PREDLOSKA, delimiter=";", lineterminator="\n")
+    writer.writeheader()
+    for redak in _PRIMJER_PREDLOSKA:
+        writer.writerow(redak)
+    return buffer.getvalue()
+
+
+def uvezi_geometriju(model, datoteka, naziv_datoteke, katalog=None, spremi=True):
+    """
+    Uvozi geometriju iz datoteke; format se određuje prema nastavku naziva.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model u koji se uvozi geometrija
+    datoteka : file-like or str
+        Binarni tok ili putanja do datoteke
+    naziv_datoteke : str
+        Naziv datoteke (.csv, .xlsx, .xml ili .gbxml)
+    katalog : BuildingElementsModel, optional
+        Katalog građevinskih elemenata za prepoznavanje tipova zidova i otvora
+    spremi : bool
+        Određuje hoće li se model na kraju spremiti u session state
+
+    Returns:
+    --------
+    dict
+        Sažetak uvoza (broj etaža, prostorija, zidova, prozora i vrata te upozorenja)
+    """
+    nastavak = os.path.splitext(naziv_datoteke or "")[1].lower()
+    if nastavak == ".csv":
+        return uvezi_zapise(model, citaj_csv(datoteka), katalog, spremi)
+    if nastavak in (".xlsx", ".xlsm"):
+        return uvezi_zapise(model, citaj_xlsx(datoteka), katalog, spremi)
+    if nastavak in (".xml", ".gbxml"):
+        return uvezi_gbxml(model, datoteka, katalog, spremi)
+    raise ValueError(f"Nepodržani format datoteke: '{nastavak or naziv_datoteke}'")
+
+
+def citaj_csv(datoteka):
+    """
+    Čita CSV predložak redak po redak.
+
+    Separator (';', ',' ili tabulator) prepoznaje se iz zaglavlja.
+
+    Parameters:
+    -----------
+    datoteka : file-like or str
+        Binarni ili tekstualni tok, odnosno putanja do datoteke
+
+    Yields:
+    -------
+    dict
+        Redak predloška s nazivima stupaca malim slovima
+    """
+    if isinstance(datoteka, (str, os.PathLike)):
+        with open(datoteka, "r", encoding="utf-8-sig", newline="") as tok:
+            yield from citaj_csv(tok)
+        return
+
+    if not isinstance(datoteka.read(0), bytes):
+        yield from _citaj_csv_tok(datoteka)
+        return
+    tok = io.TextIOWrapper(datoteka, encoding="utf-8-sig", newline="")
+    try:
+        yield from _citaj_csv_tok(tok)
+    finally:
+        # Odvajanje sprječava da omotač zatvori tok koji pripada pozivatelju
+        tok.detach()
+
+
+def _citaj_csv_tok(tok):
+    """Čita retke tekstualnog CSV toka; separator se prepoznaje iz zaglavlja."""
+    zaglavlje = tok.readline()
+    if not zaglavlje.strip():
+        return
+    separator = max(";,\t", key=zaglavlje.count)
+    stupci = [s.strip().lower() for s in next(csv.reader([zaglavlje], delimiter=separator))]
+    for redak in csv.reader(tok, delimiter=separator):
+        if any(vrijednost.strip() for vrijednost in redak):
+            yield dict(zip(stupci, redak))
+
+
+def citaj_xlsx(datoteka):
+    """
+    Čita XLSX predložak redak po redak (openpyxl u načinu samo za čitanje).
+
+    List sa stupcem 'zapis' može sadržavati sve vrste zapisa; listovi bez tog
+    stupca prepoznaju se po nazivu (Etaže, Prostorije, Zidovi, Otvori).
+
+    Parameters:
+    -----------
+    datoteka : file-like or str
+        Binarni tok ili putanja do datoteke
+
+    Yields:
+    -------
+    dict
+        Redak predloška s nazivima stupaca malim slovima
+    """
+    from openpyxl import load_workbook
+
+    knjiga = load_workbook(datoteka, read_only=True, data_only=True)
+    try:
+        # Listovi se obrađuju redom etaže → prostorije → zidovi → otvori kako bi reference bile poznate
+        redoslijed = ["etaza", "prostorija", "zid", "otvor"]
+        listovi = sorted(
+            knjiga.worksheets,
+            key=lambda lst: redoslijed.index(LISTOVI_PREDLOSKA[lst.title.strip().lower()])
+            if lst.title.strip().lower() in LISTOVI_PREDLOSKA else -1
+        )
+        for list_ in listovi:
+            retci = list_.iter_rows(values_only=True)
+            zaglavlje = next(retci, None)
+            if not zaglavlje:
+                continue
+            stupci = [str(s).strip().lower() if s is not None else "" for s in zaglavlje]
+            zapis_lista = LISTOVI_PREDLOSKA.get(list_.title.strip().lower())
+            if "zapis" not in stupci and not zapis_lista:
+                continue
+            for redak in retci:
+                if not any(v not in (None, "") for v in redak):
+                    continue
+                zapis = {s: ("" if v is None else v) for s, v in zip(stupci, redak) if s}
+                if zapis_lista and not zapis.get("zapis"):
+                    zapis["zapis"] = zapis_lista
+                yield zapis
+    finally:
+        knjiga.close()
+
+
+def uvezi_zapise(model, zapisi, katalog=None, spremi=True):
+    """
+    Uvozi zapise predloška (etaže, prostorije, zidove i otvore) u model.
+
+    Zid prema drugoj prostoriji navodi se samo jednom (u jednoj od dviju
+    prostorija); odgovarajući zid u susjednoj prostoriji nastaje automatski.
+    Zapisi koji se pozivaju na prostoriju ili zid navedene kasnije u datoteci
+    obrađuju se nakon čitanja cijele datoteke.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model u koji se uvozi geometrija
+    zapisi : iterable of dict
+        Retci predloška (npr. iz citaj_csv ili citaj_xlsx)
+    katalog : BuildingElementsModel, optional
+        Katalog građevinskih elemenata za prepoznavanje tipova zidova i otvora
+    spremi : bool
+        Određuje hoće li se model na kraju spremiti u session state
+
+    Returns:
+    --------
+    dict
+        Sažetak uvoza
+    """
+    uvoznik = _Uvoznik(model, katalog)
+    odgodeni = []
+    for broj_retka, zapis in enumerate(zapisi, start=2):
+        if not uvoznik.obradi_zapis(zapis, broj_retka, odgodi=True):
+            odgodeni.append((broj_retka, zapis))
+    for broj_retka, zapis in odgodeni:
+        uvoznik.obradi_zapis(zapis, broj_retka, odgodi=False)
+    return uvoznik.zavrsi(spremi)
+
+
+def uvezi_gbxml(model, datoteka, katalog=None, spremi=True):
+    """
+    Uvozi geometriju iz gbXML datoteke izvezene iz CAD/BIM alata.
+
+    Datoteka se čita kao tok (iterparse) i obrađeni elementi se odmah
+    oslobađaju. BuildingStorey postaje etaža, Space prostorija, a Surface zid:
+    ExteriorWall vanjski zid (orijentacija prema azimutu), InteriorWall između
+    dva prostora zid prema prostoriji, a InteriorWall uz jedan prostor ili
+    UndergroundWall zid prema negrijanom. Ploče na tlu, izloženi podovi i
+    krovovi postavljaju tip poda odnosno stropa prostorije. Otvori (Opening)
+    uvoze se kao prozori ili vrata.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model u koji se uvozi geometrija
+    datoteka : file-like or str
+        Binarni tok ili putanja do gbXML datoteke
+    katalog : BuildingElementsModel, optional
+        Katalog građevinskih elemenata za zadane tipove prozora i vrata
+    spremi : bool
+        Određuje hoće li se model na kraju spremiti u session state
+
+    Returns:
+    --------
+    dict
+        Sažetak uvoza
+    """
+    uvoznik = _Uvoznik(model, katalog)
+    faktor = 1.0
+    etaze_gbxml = {}
+    odgodene_povrsine = []
+
+    try:
+        for dogadaj, element in ET.iterparse(datoteka, events=("start", "end")):
+            oznaka = _oznaka(element)
+            if dogadaj == "start":
+                if oznaka == "gbXML":
+                    jedinica = (element.get("lengthUnit") or "Meters").lower()
+                    faktor = JEDINICE_DULJINE.get(jedinica, 1.0)
+                continue
+
+            if oznaka == "BuildingStorey":
+                etaze_gbxml[element.get("id")] = _tekst(element, "Name") or element.get("id")
+                element.clear()
+            elif oznaka == "Space":
+                _prostor_iz_gbxml(uvoznik, element, etaze_gbxml, faktor)
+                element.clear()
+            elif oznaka == "Surface":
+                povrsina = _povrsina_iz_gbxml(element, faktor)
+                element.clear()
+                if not _povrsina_u_model(uvoznik, povrsina, odgodi=True):
+                    odgodene_povrsine.append(povrsina)
+    except ET.ParseError as e:
+        raise ValueError(f"Neispravna gbXML datoteka: {e}") from e
+
+    for povrsina in odgodene_povrsine:
+        _povrsina_u_model(uvoznik, povrsina, odgodi=False)
+    return uvoznik.zavrsi(spremi)
+
+
+class _Uvoznik:
+    """Gradi model iz uvezenih zapisa uz indekse koji se izrađuju jednom."""
+
+    def __init__(self, model, katalog=None):
+        self.model = model
+        self.etaze = {e.naziv.strip().lower(): e for e in model.etaze}
+        self.prostorije = {}
+        self.zidovi = {}
+        self.katalog = {
+            vrsta: _indeks_kataloga(getattr(katalog, vrsta, None) or [])
+            for vrsta in ("zidovi", "prozori", "vrata")
+        }
+        self.zadani_tipovi = {
+            vrsta: (getattr(katalog, vrsta, None) or [None])[0] for vrsta in ("prozori", "vrata")
+        }
+        self.brojevi_prostorija = {}
+        for prostorija in model.prostorije:
+            broj = _broj(prostorija.broj_prostorije)
+            if broj:
+                self.brojevi_prostorija[prostorija.etaza_id] = max(
+                    self.brojevi_prostorija.get(prostorija.etaza_id, 0), int(broj)
+                )
+        self.brojaci = {"etaze": 0, "prostorije": 0, "zidovi": 0, "prozori": 0, "vrata": 0}
+        self.upozorenja = []
+
+    def upozori(self, poruka):
+        """Bilježi upozorenje uvoza."""
+        self.upozorenja.append(poruka)
+
+    def obradi_zapis(self, zapis, broj_retka, odgodi):
+        """
+        Obrađuje jedan redak predloška.
+
+        Returns:
+        --------
+        bool
+            False ako se redak poziva na prostoriju ili zid koji još nisu uvezeni
+            i obradu treba odgoditi, inače True
+        """
+        vrsta = str(zapis.get("zapis", "")).strip().lower()
+        if vrsta in ("etaza", "etaža"):
+            self.etaza(_vrijednost(zapis, "naziv"), _broj(zapis.get("visina")))
+        elif vrsta == "prostorija":
+            self.prostorija(
+                _vrijednost(zapis, "kljuc") or _vrijednost(zapis, "naziv"),
+                _vrijednost(zapis, "etaza"),
+                _vrijednost(zapis, "naziv"),
+                tip=_vrijednost(zapis, "tip"),
+                povrsina=_broj(zapis.get("povrsina")),
+                visina=_broj(zapis.get("visina")),
+                temperatura=_broj(zapis.get("temperatura")),
+                izmjene_zraka=_broj(zapis.get("izmjene_zraka")),
+                pod_tip=_vrijednost(zapis, "pod_tip"),
+                strop_tip=_vrijednost(zapis, "strop_tip"),
+            )
+        elif vrsta == "zid":
+            kljuc_prostorije = _vrijednost(zapis, "prostorija")
+            susjedna = _vrijednost(zapis, "susjedna_prostorija")
+            if odgodi and (kljuc_prostorije not in self.prostorije or (susjedna and susjedna not in self.prostorije)):
+                return False
+            self.zid(
+                _vrijednost(zapis, "kljuc"),
+                kljuc_prostorije,
+                tip=_vrijednost(zapis, "tip") or "vanjski",
+                orijentacija=_vrijednost(zapis, "orijentacija"),
+                duzina=_broj(zapis.get("duzina")),
+                visina=_broj(zapis.get("visina")),
+                susjedna_prostorija=susjedna,
+                tip_zida=_vrijednost(zapis, "tip_zida"),
+                oznaka_retka=f"Redak {broj_retka}",
+            )
+        elif vrsta == "otvor":
+            kljuc_zida = _vrijednost(zapis, "zid")
+            if odgodi and kljuc_zida not in self.zidovi:
+                return False
+            kolicina = _broj(zapis.get("kolicina"))
+            self.otvor(
+                kljuc_zida,
+                _vrijednost(zapis, "tip") or "prozor",
+                element=_vrijednost(zapis, "element"),
+                sirina=_broj(zapis.get("sirina")),
+                visina=_broj(zapis.get("visina")),
+                kolicina=int(kolicina) if kolicina else 1,
+                oznaka_retka=f"Redak {broj_retka}",
+            )
+        elif vrsta:
+            self.upozori(f"Redak {broj_retka}: nepoznata vrsta zapisa '{vrsta}'.")
+        return True
+
+    def etaza(self, naziv, visina=None):
+        """Vraća etažu zadanog naziva i stvara je ako ne postoji."""
+        naziv = naziv or "Etaža 1"
+        kljuc = naziv.strip().lower()
+        etaza = self.etaze.get(kljuc)
+        if etaza is None:
+            etaza = self.model.dodaj_etazu(naziv=naziv, visina_etaze=visina or 2.5, spremi=False)
+            self.etaze[kljuc] = etaza
+            self.brojaci["etaze"] += 1
+        elif visina:
+            etaza.visina_etaze = visina
+        return etaza
+
+    def prostorija(self, kljuc, naziv_etaze, naziv, tip=None, povrsina=None, visina=None, temperatura=None,
+                   izmjene_zraka=None, pod_tip=None, strop_tip=None):
+        """Stvara prostoriju i upisuje je u indeks pod zadanim ključem."""
+        if not kljuc:
+            self.upozori("Prostorija bez ključa i naziva je preskočena.")
+            return None
+        if kljuc in self.prostorije:
+            self.upozori(f"Prostorija '{kljuc}' je navedena više puta; uvezena je samo prva.")
+            return self.prostorije[kljuc]
+        if tip not in TIPOVI_PROSTORIJA:
+            if tip:
+                self.upozori(f"Prostorija '{kljuc}': nepoznat tip '{tip}', koristi se 'Dnevni boravak'.")
+            tip = "Dnevni boravak"
+
+        etaza = self.etaza(naziv_etaze)
+        prostorija = self.model.dodaj_prostoriju(etaza.id, naziv or kljuc, tip, povrsina or 0.0, spremi=False)
+        broj = self.brojevi_prostorija.get(etaza.id, 0) + 1
+        self.brojevi_prostorija[etaza.id] = broj
+        prostorija.broj_prostorije = broj
+        if visina:
+            prostorija.visina = visina
+            prostorija.koristi_zadanu_visinu = False
+        if temperatura is not None:
+            prostorija.temp_unutarnja = temperatura
+        if izmjene_zraka is not None:
+            prostorija.izmjene_zraka = izmjene_zraka
+        if pod_tip:
+            if pod_tip in TIPOVI_PODA:
+                prostorija.pod_tip = pod_tip
+            else:
+                self.upozori(f"Prostorija '{kljuc}': nepoznat tip poda '{pod_tip}'.")
+        if strop_tip:
+            if strop_tip in TIPOVI_STROPA:
+                prostorija.strop_tip = strop_tip
+            else:
+                self.upozori(f"Prostorija '{kljuc}': nepoznat tip stropa '{strop_tip}'.")
+
+        self.prostorije[kljuc] = prostorija
+        self.brojaci["prostorije"] += 1
+        return prostorija
+
+    def zid(self, kljuc, kljuc_prostorije, tip="vanjski", orijentacija=None, duzina=None, visina=None,
+            susjedna_prostorija=None, tip_zida=None, oznaka_retka=""):
+        """Dodaje zid prostoriji; zid prema prostoriji stvara i par u susjednoj prostoriji."""
+        opis = oznaka_retka or f"Zid '{kljuc}'"
+        prostorija = self.prostorije.get(kljuc_prostorije)
+        if prostorija is None:
+            self.upozori(f"{opis}: prostorija '{kljuc_prostorije}' ne postoji.")
+            return None
+        if tip not in TIPOVI_ZIDOVA:
+            self.upozori(f"{opis}: nepoznat tip zida '{tip}'.")
+            return None
+        if not duzina or duzina <= 0:
+            self.upozori(f"{opis}: duljina zida mora biti veća od nule.")
+            return None
+
+        povezana = None
+        if tip == "prema_prostoriji":
+            povezana = self.prostorije.get(susjedna_prostorija)
+            if povezana is None or povezana is prostorija:
+                self.upozori(
+                    f"{opis}: susjedna prostorija '{susjedna_prostorija}' ne postoji; "
+                    "zid je uvezen kao zid prema negrijanom."
+                )
+                tip = "prema_negrijanom"
+        if tip == "vanjski" and orijentacija not in ORIJENTACIJE:
+            if orijentacija:
+                self.upozori(f"{opis}: nepoznata orijentacija '{orijentacija}', koristi se 'Sjever'.")
+            orijentacija = "Sjever"
+
+        tip_zida_id = None
+        if tip_zida:
+            tip_zida_obj = self.katalog["zidovi"].get(tip_zida.strip().lower())
+            if tip_zida_obj is not None:
+                tip_zida_id = tip_zida_obj.id
+            else:
+                self.upozori(f"{opis}: tip zida '{tip_zida}' nije u katalogu.")
+
+        zid = prostorija.dodaj_zid(
+            tip, orijentacija, duzina, visina_zida=visina, povezana_prostorija_obj=povezana,
+            model_ref=self.model, tip_zida_id=tip_zida_id
+        )
+        if zid is None:
+            return None
+        if kljuc:
+            if kljuc in self.zidovi:
+                self.upozori(f"Zid '{kljuc}' je naveden više puta; otvori se dodaju zadnjem.")
+            self.zidovi[kljuc] = zid
+        self.brojaci["zidovi"] += 1
+        return zid
+
+    def otvor(self, kljuc_zida, vrsta, element=None, sirina=None, visina=None, kolicina=1, oznaka_retka=""):
+        """Dodaje prozor ili vrata na zid."""
+        opis = oznaka_retka or f"Otvor na zidu '{kljuc_zida}'"
+        zid = self.zidovi.get(kljuc_zida)
+        if zid is None:
+            self.upozori(f"{opis}: zid '{kljuc_zida}' ne postoji.")
+            return
+        vrsta = vrsta.strip().lower()
+        if vrsta not in ("prozor", "vrata"):
+            self.upozori(f"{opis}: nepoznata vrsta otvora '{vrsta}'.")
+            return
+
+        kljuc_kataloga = "prozori" if vrsta == "prozor" else "vrata"
+        tip_obj = self.zadani_tipovi[kljuc_kataloga]
+        if element:
+            tip_obj = self.katalog[kljuc_kataloga].get(element.strip().lower())
+            if tip_obj is None:
+                self.upozori(f"{opis}: tip '{element}' nije u katalogu.")
+        tip_id = tip_obj.id if tip_obj is not None else None
+        tip_naziv = tip_obj.naziv if tip_obj is not None else (element or vrsta.capitalize())
+        if not (sirina and visina):
+            sirina, visina = None, None
+
+        dodaj = zid["elementi"].dodaj_prozor if vrsta == "prozor" else zid["elementi"].dodaj_vrata
+        for _ in range(max(kolicina, 1)):
+            dodaj(tip_id, tip_naziv, sirina, visina)
+        self.brojaci[kljuc_kataloga] += max(kolicina, 1)
+
+    def zavrsi(self, spremi):
+        """Jednom sprema model i vraća sažetak uvoza."""
+        if spremi:
+            self.model._spremi_u_session_state()
+        return {**self.brojaci, "upozorenja": self.upozorenja}
+
+
+def _indeks_kataloga(elementi):
+    """Indeksira elemente kataloga po ID-u i nazivu (malim slovima)."""
+    indeks = {}
+    for element in elementi:
+        indeks.setdefault(str(element.naziv).strip().lower(), element)
+        indeks[str(element.id).strip().lower()] = element
+    return indeks
+
+
+def _vrijednost(zapis, stupac):
+    """Vraća tekstualnu vrijednost stupca bez razmaka ili None."""
+    vrijednost = zapis.get(stupac)
+    if vrijednost is None:
+        return None
+    if isinstance(vrijednost, float) and vrijednost.is_integer():
+        vrijednost = int(vrijednost)
+    vrijednost = str(vrijednost).strip()
+    return vrijednost or None
+
+
+def _broj(vrijednost):
+    """Pretvara vrijednost u broj (prihvaća decimalni zarez); prazna ili neispravna vrijednost daje None."""
+    if vrijednost is None or vrijednost == "":
+        return None
+    if isinstance(vrijednost, (int, float)):
+        return None if isinstance(vrijednost, float) and math.isnan(vrijednost) else float(vrijednost)
+    try:
+        return float(str(vrijednost).strip().replace(" ", "").replace(",", "."))
+    except ValueError:
+        return None
+
+
+# === gbXML ===
+
+def _oznaka(element):
+    """Vraća naziv XML elementa bez prostora imena."""
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _dijete(element, naziv):
+    """Vraća prvo dijete zadanog naziva (bez obzira na prostor imena)."""
+    for dijete in element:
+        if _oznaka(dijete) == naziv:
+            return dijete
+    return None
+
+
+def _tekst(element, naziv):
+    """Vraća tekst prvog djeteta zadanog naziva."""
+    dijete = _dijete(element, naziv)
+    return dijete.text.strip() if dijete is not None and dijete.text else None
+
+
+def _dimenzije(element, faktor):
+    """
+    Vraća (širina, visina, azimut) površine ili otvora.
+
+    Koristi RectangularGeometry ako postoji, inače dimenzije računa iz
+    vrhova PlanarGeometry (najveći vodoravni razmak i visinski raspon).
+    """
+    pravokutnik = _dijete(element, "RectangularGeometry")
+    if pravokutnik is not None:
+        sirina = _broj(_tekst(pravokutnik, "Width"))
+        visina = _broj(_tekst(pravokutnik, "Height"))
+        azimut = _broj(_tekst(pravokutnik, "Azimuth"))
+        if sirina and visina:
+            return sirina * faktor, visina * faktor, azimut
+
+    tocke = []
+    for tocka in element.iter():
+        if _oznaka(tocka) == "CartesianPoint":
+            koordinate = [_broj(k.text) for k in tocka if _oznaka(k) == "Coordinate"]
+            if len(koordinate) == 3 and None not in koordinate:
+                tocke.append(koordinate)
+    if len(tocke) < 3:
+        return None, None, None
+    visina = max(t[2] for t in tocke) - min(t[2] for t in tocke)
+    sirina = max(
+        math.hypot(a[0] - b[0], a[1] - b[1]) for i, a in enumerate(tocke) for b in tocke[i + 1:]
+    )
+    return sirina * faktor, visina * faktor, None
+
+
+def _orijentacija_iz_azimuta(azimut):
+    """Pretvara azimut (0° = sjever, u smjeru kazaljke na satu) u orijentaciju."""
+    if azimut is None:
+        return None
+    return ORIJENTACIJE[int(((azimut % 360.0) + 22.5) // 45.0) % len(ORIJENTACIJE)]
+
+
+def _prostor_iz_gbxml(uvoznik, element, etaze_gbxml, faktor):
+    """Stvara prostoriju iz gbXML elementa Space."""
+    kljuc = element.get("id")
+    povrsina = _broj(_tekst(element, "Area"))
+    volumen = _broj(_tekst(element, "Volume"))
+    povrsina = povrsina * faktor ** 2 if povrsina else None
+    volumen = volumen * faktor ** 3 if volumen else None
+    visina = volumen / povrsina if povrsina and volumen else None
+    naziv_etaze = etaze_gbxml.get(element.get("buildingStoreyIdRef")) if element.get("buildingStoreyIdRef") else None
+    uvoznik.prostorija(kljuc, naziv_etaze, _tekst(element, "Name") or kljuc, povrsina=povrsina, visina=visina)
+
+
+def _povrsina_iz_gbxml(element, faktor):
+    """Izdvaja podatke gbXML elementa Surface potrebne za uvoz."""
+    sirina, visina, azimut = _dimenzije(element, faktor)
+    otvori = []
+    for otvor in element:
+        if _oznaka(otvor) == "Opening":
+            sirina_otvora, visina_otvora, _ = _dimenzije(otvor, faktor)
+            otvori.append((otvor.get("openingType") or "", sirina_otvora, visina_otvora))
+    return {
+        "id": element.get("id"),
+        "tip": element.get("surfaceType") or "",
+        "prostori": [d.get("spaceIdRef") for d in element if _oznaka(d) == "AdjacentSpaceId"],
+        "sirina": sirina,
+        "visina": visina,
+        "azimut": azimut,
+        "otvori": otvori,
+    }
+
+
+def _povrsina_u_model(uvoznik, povrsina, odgodi):
+    """
+    Prenosi gbXML površinu u model.
+
+    Returns:
+    --------
+    bool
+        False ako se površina poziva na prostor koji još nije uvezen
+    """
+    prostori = [p for p in povrsina["prostori"] if p]
+    if odgodi and any(p not in uvoznik.prostorije for p in prostori):
+        return False
+    if not prostori:
+        return True
+    tip = povrsina["tip"]
+
+    if tip in POD_IZ_GBXML or tip in STROP_IZ_GBXML:
+        prostorija = uvoznik.prostorije.get(prostori[0])
+        if prostorija is not None:
+            if tip in POD_IZ_GBXML:
+                prostorija.pod_tip = POD_IZ_GBXML[tip]
+            else:
+                prostorija.strop_tip = STROP_IZ_GBXML[tip]
+        return True
+
+    if tip == "ExteriorWall":
+        tip_zida, orijentacija, susjedna = "vanjski", _orijentacija_iz_azimuta(povrsina["azimut"]), None
+    elif tip == "InteriorWall" and len(prostori) >= 2:
+        tip_zida, orijentacija, susjedna = "prema_prostoriji", None, prostori[1]
+    elif tip in ("InteriorWall", "UndergroundWall"):
+        tip_zida, orijentacija, susjedna = "prema_negrijanom", None, None
+    else:
+        return True
+
+    kljuc = povrsina["id"]
+    zid = uvoznik.zid(
+        kljuc, prostori[0], tip=tip_zida, orijentacija=orijentacija, duzina=povrsina["sirina"],
+        visina=povrsina["visina"], susjedna_prostorija=susjedna, oznaka_retka=f"Površina '{kljuc}'"
+    )
+    if zid is None:
+        return True
+    for vrsta_otvora, sirina, visina in povrsina["otvori"]:
+        if "Skylight" in vrsta_otvora or vrsta_otvora == "Air":
+            continue
+        vrsta = "vrata" if "Door" in vrsta_otvora else "prozor"
+        uvoznik.otvor(kljuc, vrsta, sirina=sirina, visina=visina, oznaka_retka=f"Otvor na površini '{kljuc}'")
+    return True
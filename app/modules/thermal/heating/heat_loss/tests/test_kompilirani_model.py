@@ -0,0 +1,515 @@
+"""
+Modul koji sadrži testove za kompilirani model zgrade i analize nad njim.
+"""
+
+import copy
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ..models.model import MultiRoomModel
+from ..models.elementi.building_elements_model import WallType, WindowType
+from ..calculations.heat_loss_calculation import (
+    izracunaj_toplinske_gubitke_prostorije, izracunaj_toplinske_gubitke_etaze, izracunaj_toplinske_gubitke_zgrade
+)
+from ..calculations.kompilirani_model import kompiliraj_zgradu
+from ..calculations.analiza_nesigurnosti import izracunaj_nesigurnost_gubitaka
+from ..calculations.analiza_osjetljivosti import izracunaj_osjetljivost
+from ..calculations.varijante import izracunaj_varijante
+from ..calculations.tablice_rezultata import TabliceRezultata, dohvati_tablice
+from ..calculations.izvoz_rezultata import izvezi_rezultate, parquet_dostupan
+from ..calculations.klimatski_podaci import dohvati_klimu, dohvati_stupanj_dane, KLIMATSKI_PODACI, GRADOVI_KLIME
+from ..calculations.temperaturni import izracunaj_stupanj_dane_grijanja, izracunaj_temperaturu_tla_po_mjesecima
+from ..calculations.usporedba_modela import (
+    usporedi_modele, stanje_iz_calc_datoteke, stanje_iz_json, stanje_u_json
+)
+from ..calculations import validacija_modela
+from ..calculations.validacija_modela import validiraj_model, dohvati_validaciju, RAZINA_GRESKA
+from ..calculations.toplinski_most import (
+    izracun_toplinskih_mostova_po_vrsti, izracun_toplinskih_mostova_zgrade, METODA_LINIJSKI, METODA_POSTOTAK
+)
+
+
+def izradi_testni_model(session_key="test_kompilirani_model"):
+    """Izrađuje mali model s dvije prostorije, vanjskim i unutarnjim zidom te otvorima."""
+    st.session_state.pop(session_key, None)
+    model = MultiRoomModel(session_key)
+    etaza = model.etaze[0]
+    katalog = {
+        "zidovi": {"zid-a": WallType("zid-a", "Vanjski zid", 0.30)},
+        "prozori": {"prozor-a": WindowType("prozor-a", "Prozor", 1.1, 1.2, 1.4)},
+        "vrata": {},
+        "podovi": {},
+        "stropovi": {},
+    }
+
+    dnevni = model.dodaj_prostoriju(etaza.id, "Dnevni boravak", "Dnevni boravak", 20.0, spremi=False)
+    kupaonica = model.dodaj_prostoriju(etaza.id, "Kupaonica", "Kupaonica", 8.0, spremi=False)
+    kupaonica.strop_tip = "Ravni krov"
+
+    zid = dnevni.dodaj_zid("vanjski", "Sjever", 5.0, model_ref=model, tip_zida_id="zid-a")
+    zid["elementi"].dodaj_prozor("prozor-a", "Prozor")
+    zid["elementi"].dodaj_vrata(None, "Vrata", 1.0, 2.0)
+    dnevni.dodaj_zid("prema_prostoriji", None, 3.0, povezana_prostorija_obj=kupaonica, model_ref=model)
+    kupaonica.dodaj_zid("vanjski", "Istok", 2.5, model_ref=model)
+    return model, katalog
+
+
+class TestKompiliraniModel(unittest.TestCase):
+    """Testovi za kompilaciju zgrade i vektorizirani izračun."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        st.session_state["toplinski_mostovi"] = True
+        st.session_state["postotak_toplinskih_mostova"] = 10
+        st.session_state["metoda_toplinskih_mostova"] = METODA_POSTOTAK
+        self.model, self.katalog = izradi_testni_model()
+        self.temperature = {"vanjska": -15.0}
+        st.session_state["temperature_prostorija"] = {p.id: p.temp_unutarnja for p in self.model.prostorije}
+
+    def test_jednako_skalarnom_izracunu(self):
+        """Test da kompilirani model daje iste gubitke kao skalarni izračun."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        vektorski = zgrada.izracunaj()["ukupno"]
+        for i, prostorija in enumerate(self.model.prostorije):
+            skalarni = izracunaj_toplinske_gubitke_prostorije(prostorija, dict(self.temperature), self.katalog)
+            self.assertAlmostEqual(vektorski[i], skalarni["ukupno"], places=6)
+
+    def test_batch_oblik(self):
+        """Test izračuna za više skupova parametara odjednom."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        u = np.tile(zgrada.parametar_u, (4, 1))
+        rezultat = zgrada.izracunaj(u, postotak_mostova=np.full(4, 10.0))["ukupno"]
+        self.assertEqual(rezultat.shape, (4, zgrada.broj_prostorija))
+        np.testing.assert_allclose(rezultat[0], zgrada.izracunaj()["ukupno"])
+
+    def test_potpis_se_mijenja(self):
+        """Test da se potpis mijenja s promjenom modela."""
+        prvi = kompiliraj_zgradu(self.model, self.temperature, self.katalog).potpis
+        self.assertEqual(prvi, kompiliraj_zgradu(self.model, self.temperature, self.katalog).potpis)
+        self.model.prostorije[0].izmjene_zraka += 0.5
+        self.assertNotEqual(prvi, kompiliraj_zgradu(self.model, self.temperature, self.katalog).potpis)
+
+    def test_revizija_ne_ovisi_o_izracunu(self):
+        """Test da izračun temperature negrijane prostorije ne mijenja reviziju modela."""
+        etaza = self.model.etaze[0]
+        ostava = self.model.dodaj_prostoriju(etaza.id, "Ostava", "Ostava", 4.0, spremi=False)
+        ostava.dodaj_zid("prema_prostoriji", None, 2.0, povezana_prostorija_obj=self.model.prostorije[0],
+                         model_ref=self.model)
+        revizija = self.model.revizija()
+        izracunaj_toplinske_gubitke_zgrade(self.model, elements_model=None)
+        self.assertIsNotNone(ostava.izracunata_temp_negrijane)
+        self.assertEqual(ostava.temperatura_susjednog_negrijanog, ostava.izracunata_temp_negrijane)
+        self.assertEqual(self.model.revizija(), revizija)
+        ostava.temp_unutarnja = 12
+        self.assertNotEqual(self.model.revizija(), revizija)
+
+    def test_analiza_nesigurnosti(self):
+        """Test Monte Carlo analize nesigurnosti."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        rezultat = izracunaj_nesigurnost_gubitaka(zgrada, broj_uzoraka=4000, sjeme=42)
+        prostorije = rezultat["prostorije"]
+        self.assertTrue(np.all(prostorije["P50"] <= prostorije["P90"]))
+        self.assertTrue(np.all(prostorije["P90"] <= prostorije["P95"]))
+        self.assertLess(rezultat["zgrada"]["P95"], prostorije["P95"].sum() + 1e-9)
+        # Srednja vrijednost uzoraka mora biti blizu nominalne
+        self.assertAlmostEqual(rezultat["zgrada"]["srednja"] / rezultat["zgrada"]["nominalno"], 1.0, delta=0.02)
+
+    def test_bez_nesigurnosti(self):
+        """Test da analiza bez raspršenja vraća nominalne vrijednosti."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        rezultat = izracunaj_nesigurnost_gubitaka(zgrada, broj_uzoraka=10, u_vrijednost_cv=0,
+                                                  izmjene_zraka_cv=0, toplinski_mostovi_raspon=0)
+        np.testing.assert_allclose(rezultat["prostorije"]["P95"], rezultat["prostorije"]["nominalno"])
+
+    def test_osjetljivost_prema_konacnim_razlikama(self):
+        """Test analitičkih derivacija usporedbom s konačnim razlikama."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        rezultat = izracunaj_osjetljivost(zgrada)
+        ukupno = zgrada.izracunaj()["ukupno"].sum()
+        for redak in rezultat["parametri"]:
+            if redak["kategorija"] == "zidovi" and redak["kljuc"] == "zid-a":
+                p = zgrada.parametri.index(("zidovi", "zid-a"))
+                u = zgrada.parametar_u.copy()
+                u[p] += 0.01
+                razlika = (zgrada.izracunaj(u)["ukupno"].sum() - ukupno) / 0.01
+                self.assertAlmostEqual(redak["derivacija"], razlika, places=4)
+        # Doprinosi U-vrijednosti, izmjena zraka i infiltracije zbrajaju se u ukupne gubitke
+        zbroj = sum(r["doprinos"] for r in rezultat["parametri"] if r["kategorija"] != "toplinski_mostovi")
+        self.assertAlmostEqual(zbroj, rezultat["ukupno"], places=6)
+
+    def test_osjetljivost_vanjske_temperature(self):
+        """Test derivacije po vanjskoj temperaturi."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        derivacija = izracunaj_osjetljivost(zgrada)["vanjska_temperatura"]["derivacija"]
+        toplija = kompiliraj_zgradu(self.model, {"vanjska": -14.0}, self.katalog)
+        razlika = toplija.izracunaj()["ukupno"].sum() - zgrada.izracunaj()["ukupno"].sum()
+        self.assertAlmostEqual(derivacija, razlika, places=6)
+
+
+class TestLinijskiToplinskiMostovi(unittest.TestCase):
+    """Testovi za linijsku (ψ·L·ΔT) metodu toplinskih mostova."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        st.session_state["toplinski_mostovi"] = True
+        st.session_state["metoda_toplinskih_mostova"] = METODA_LINIJSKI
+        st.session_state.pop("psi_katalog", None)
+        self.model, self.katalog = izradi_testni_model("test_linijski_mostovi")
+        self.temperature = {"vanjska": -15.0}
+        st.session_state["temperature_prostorija"] = {p.id: p.temp_unutarnja for p in self.model.prostorije}
+
+    def tearDown(self):
+        st.session_state["metoda_toplinskih_mostova"] = METODA_POSTOTAK
+
+    def test_vektorizirano_jednako_skalarnom(self):
+        """Test da izračun za cijelu etažu daje iste mostove kao izračun po prostoriji."""
+        zgrada = izracun_toplinskih_mostova_zgrade(self.model.prostorije, self.temperature, katalog=self.katalog)
+        for i, prostorija in enumerate(self.model.prostorije):
+            skalarni = izracun_toplinskih_mostova_po_vrsti(prostorija, self.temperature, katalog=self.katalog)
+            self.assertAlmostEqual(zgrada["ukupno"][i], skalarni["ukupno"], places=6)
+        self.assertGreater(zgrada["ukupno"].sum(), 0.0)
+
+    def test_kompilirani_model_linijski(self):
+        """Test da kompilirani model s linijskim mostovima daje iste gubitke kao skalarni izračun."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        self.assertEqual(zgrada.postotak_toplinskih_mostova, 0.0)
+        vektorski = zgrada.izracunaj()["ukupno"]
+        for i, prostorija in enumerate(self.model.prostorije):
+            skalarni = izracunaj_toplinske_gubitke_prostorije(prostorija, dict(self.temperature), self.katalog)
+            self.assertIsNotNone(skalarni["toplinski_mostovi_detalji"])
+            self.assertAlmostEqual(vektorski[i], skalarni["ukupno"], places=6)
+
+    def test_osjetljivost_vanjske_temperature_linijski(self):
+        """Test derivacije po vanjskoj temperaturi uz linijske mostove."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        derivacija = izracunaj_osjetljivost(zgrada)["vanjska_temperatura"]["derivacija"]
+        toplija = kompiliraj_zgradu(self.model, {"vanjska": -14.0}, self.katalog)
+        razlika = toplija.izracunaj()["ukupno"].sum() - zgrada.izracunaj()["ukupno"].sum()
+        self.assertAlmostEqual(derivacija, razlika, places=6)
+
+
+class TestTipskaEtaza(unittest.TestCase):
+    """Testovi za tipsku etažu koja se ponavlja bez kopiranja prostorija."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        st.session_state["toplinski_mostovi"] = True
+        st.session_state["postotak_toplinskih_mostova"] = 10
+        st.session_state["metoda_toplinskih_mostova"] = METODA_POSTOTAK
+        self.model, self.katalog = izradi_testni_model("test_tipska_etaza")
+        self.etaza = self.model.etaze[0]
+        st.session_state["temperature_prostorija"] = {p.id: p.temp_unutarnja for p in self.model.prostorije}
+
+    def test_ponavljanja_bez_preinaka(self):
+        """Test da se instance bez preinaka računaju jednom i množe brojem etaža."""
+        jedna = izracunaj_toplinske_gubitke_zgrade(self.model)["zgrada"]["ukupno"]
+        for _ in range(4):
+            self.model.dodaj_ponavljanje_etaze(self.etaza.id)
+        rezultat = izracunaj_toplinske_gubitke_zgrade(self.model)
+        self.assertEqual(len(rezultat["etaze"]), 1)
+        self.assertEqual(rezultat["etaze"][0]["broj_ponavljanja"], 5)
+        self.assertEqual(len(self.model.prostorije), 2)
+        self.assertAlmostEqual(rezultat["zgrada"]["ukupno"], 5 * jedna, places=6)
+
+    def test_preinake_jednake_kopiji(self):
+        """Test da instanca s preinakama daje iste gubitke kao izmijenjena etaža."""
+        dnevni = self.model.prostorije[0]
+        self.model.dodaj_ponavljanje_etaze(self.etaza.id, strop_tip="Ravni krov", temperature={dnevni.id: 22.0})
+        grupe = self.etaza.grupe_ponavljanja()
+        self.assertEqual(len(grupe), 2)
+        temperature = {"vanjska": -15.0}
+        instanca = izracunaj_toplinske_gubitke_etaze(self.model, self.etaza.id, katalog=self.katalog,
+                                                     preinake=grupe[1]["preinake"], temperature=temperature)
+        # Predložak ostaje nepromijenjen
+        self.assertEqual(dnevni.strop_tip, "Prema negrijanom prostoru")
+        self.assertEqual(dnevni.temp_unutarnja, 20)
+
+        for prostorija in self.model.prostorije:
+            prostorija.strop_tip = "Ravni krov"
+        dnevni.temp_unutarnja = 22.0
+        st.session_state["temperature_prostorija"][dnevni.id] = 22.0
+        kopija = izracunaj_toplinske_gubitke_etaze(self.model, self.etaza.id, katalog=self.katalog,
+                                                   temperature=temperature)
+        self.assertAlmostEqual(instanca["ukupno"], kopija["ukupno"], places=6)
+
+    def test_kompilirani_model_s_ponavljanjima(self):
+        """Test da kompilirani model zbraja instance tipske etaže kao skalarni izračun zgrade."""
+        self.model.dodaj_ponavljanje_etaze(self.etaza.id)
+        self.model.dodaj_ponavljanje_etaze(self.etaza.id)
+        self.model.dodaj_ponavljanje_etaze(self.etaza.id, strop_tip="Ravni krov")
+        skalarni = izracunaj_toplinske_gubitke_zgrade(self.model)
+        zgrada = kompiliraj_zgradu(self.model, {"vanjska": skalarni["zgrada"]["temperatura_vanjska"]})
+        self.assertEqual(zgrada.broj_prostorija, 4)
+        self.assertAlmostEqual(zgrada.ukupno_zgrade(zgrada.izracunaj()["ukupno"]), skalarni["zgrada"]["ukupno"], places=6)
+
+    def test_spremanje_ponavljanja(self):
+        """Test da se ponavljanja spremaju i učitavaju s modelom."""
+        self.model.dodaj_ponavljanje_etaze(self.etaza.id, pod_tip="Prema grijanom prostoru")
+        ucitani = MultiRoomModel("test_tipska_etaza")
+        etaza = ucitani.dohvati_etazu(self.etaza.id)
+        self.assertIsNotNone(etaza)
+        self.assertEqual(etaza.broj_ponavljanja, 2)
+        self.assertEqual(etaza.ponavljanja[0]["pod_tip"], "Prema grijanom prostoru")
+
+
+class TestVarijante(unittest.TestCase):
+    """Testovi za varijante projekta spremljene kao preinake osnovnog modela."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        st.session_state["toplinski_mostovi"] = True
+        st.session_state["postotak_toplinskih_mostova"] = 10
+        st.session_state["metoda_toplinskih_mostova"] = METODA_POSTOTAK
+        self.model, self.katalog = izradi_testni_model("test_varijante")
+        self.katalog["zidovi"]["zid-b"] = WallType("zid-b", "Zid s dodatnom izolacijom", 0.18)
+        self.temperature = {"vanjska": -15.0}
+        st.session_state["temperature_prostorija"] = {p.id: p.temp_unutarnja for p in self.model.prostorije}
+
+    def test_zamjena_tipa_jednaka_izmijenjenom_modelu(self):
+        """Test da varijanta sa zamjenom tipa daje iste gubitke kao izmijenjeni model."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        kupaonica = self.model.prostorije[1]
+        varijanta = self.model.dodaj_varijantu(
+            "Dodatna izolacija",
+            zamjene_tipova={"zidovi": {"zid-a": "zid-b"}},
+            izmjene_zraka={kupaonica.id: 1.0},
+            postotak_toplinskih_mostova=5,
+            osnovna_revizija=zgrada.potpis,
+        )
+        rezultat = izracunaj_varijante(zgrada, [varijanta], self.katalog)
+        self.assertEqual(rezultat["zastarjele"], [False])
+
+        self.model.prostorije[0].zidovi[0]["tip_zida_id"] = "zid-b"
+        kupaonica.izmjene_zraka = 1.0
+        izmijenjena = kompiliraj_zgradu(self.model, self.temperature, self.katalog, postotak_toplinskih_mostova=5)
+        np.testing.assert_allclose(rezultat["prostorije"]["varijante"][0], izmijenjena.izracunaj()["ukupno"])
+        self.assertLess(rezultat["zgrada"]["razlika"][0], 0.0)
+
+    def test_vise_varijanti_u_jednom_prolazu(self):
+        """Test izračuna više varijanti i varijante bez preinaka."""
+        zgrada = kompiliraj_zgradu(self.model, self.temperature, self.katalog)
+        varijante = [
+            self.model.dodaj_varijantu("Bez preinaka", spremi=False),
+            self.model.dodaj_varijantu("Prozori U=0.8", u_vrijednosti={"prozori": {"prozor-a": 0.8}}, spremi=False),
+            self.model.dodaj_varijantu("Zadana vrata", u_vrijednosti={"vrata": {"zadano": 1.0}}, spremi=False),
+        ]
+        rezultat = izracunaj_varijante(zgrada, varijante, self.katalog)
+        self.assertEqual(rezultat["prostorije"]["varijante"].shape, (3, zgrada.broj_prostorija))
+        self.assertAlmostEqual(rezultat["zgrada"]["razlika"][0], 0.0, places=9)
+        self.assertTrue(np.all(rezultat["zgrada"]["razlika"][1:] < 0.0))
+
+    def test_spremanje_varijanti(self):
+        """Test da se varijante spremaju i učitavaju s modelom."""
+        varijanta = self.model.dodaj_varijantu("Troslojno", u_vrijednosti={"prozori": {"prozor-a": 0.7}})
+        ucitani = MultiRoomModel("test_varijante")
+        self.assertEqual(ucitani.dohvati_varijantu(varijanta["id"])["u_vrijednosti"], {"prozori": {"prozor-a": 0.7}})
+        ucitani.ukloni_varijantu(varijanta["id"])
+        self.assertEqual(MultiRoomModel("test_varijante").varijante, [])
+
+
+class TestTabliceRezultata(unittest.TestCase):
+    """Testovi za tablični model rezultata (etaže, prostorije, elementi)."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        st.session_state["toplinski_mostovi"] = True
+        st.session_state["postotak_toplinskih_mostova"] = 10
+        st.session_state["metoda_toplinskih_mostova"] = METODA_POSTOTAK
+        self.model, self.katalog = izradi_testni_model("test_tablice_rezultata")
+        self.etaza = self.model.etaze[0]
+        st.session_state["temperature_prostorija"] = {p.id: p.temp_unutarnja for p in self.model.prostorije}
+        self.model.dodaj_ponavljanje_etaze(self.etaza.id)
+        self.rezultati = izracunaj_toplinske_gubitke_zgrade(self.model)
+        self.tablice = self.rezultati["tablice"]
+
+    def test_zbrojevi_jednaki_rjecnicima(self):
+        """Test da zbrojevi tablica odgovaraju ugniježđenim rezultatima."""
+        self.assertAlmostEqual(self.tablice.ukupno, self.rezultati["zgrada"]["ukupno"], places=6)
+        self.assertEqual(len(self.tablice.prostorije), 2)
+        for _, redak in self.tablice.prostorije.iterrows():
+            elementi = self.tablice.elementi_prostorije(redak["prostorija_id"], redak["etaza_kljuc"])
+            self.assertAlmostEqual(
+                elementi["gubici"].sum(), redak["ukupno"] - redak["ventilacijski"] - redak["infiltracija"], places=6
+            )
+        zbroj = self.tablice.zbroj_po("tip")
+        self.assertAlmostEqual(zbroj.sum(), self.rezultati["zgrada"]["ukupno"], places=6)
+
+    def test_filtriranje_i_sortiranje(self):
+        """Test filtriranja i sortiranja prostorija."""
+        kupaonice = self.tablice.filtriraj_prostorije(tekst="kupa")
+        self.assertEqual(list(kupaonice["naziv"]), ["Kupaonica"])
+        sortirane = self.tablice.sortiraj_prostorije("ukupno", silazno=True)
+        self.assertTrue(sortirane["ukupno"].is_monotonic_decreasing)
+        self.assertTrue(self.tablice.filtriraj_prostorije(min_specificni=1e9).empty)
+
+    def test_izvoz_i_naknadna_izrada(self):
+        """Test izvoza i izrade tablica za rezultate bez tablica."""
+        self.assertTrue(self.tablice.izvoz_excel().startswith(b"PK"))
+        self.assertIn("Kupaonica", self.tablice.izvoz_csv("prostorije"))
+        stari = dict(self.rezultati)
+        del stari["tablice"]
+        tablice = dohvati_tablice(stari)
+        self.assertIsInstance(tablice, TabliceRezultata)
+        self.assertIs(dohvati_tablice(stari), tablice)
+        self.assertAlmostEqual(tablice.ukupno, self.tablice.ukupno, places=6)
+
+    def test_protocni_izvoz(self):
+        """Test da protočni izvoz daje iste retke kao tablice."""
+        tok = io.BytesIO()
+        self.assertEqual(izvezi_rezultate(self.rezultati, tok, "csv", "elementi"), len(self.tablice.elementi))
+        ocekivano = pd.read_csv(io.StringIO(self.tablice.izvoz_csv("elementi")), sep=";", decimal=",")
+        izvezeno = pd.read_csv(io.BytesIO(tok.getvalue()), sep=";", decimal=",")
+        pd.testing.assert_frame_equal(izvezeno, ocekivano)
+
+        tok = io.BytesIO()
+        brojevi = izvezi_rezultate(self.rezultati, tok, "xlsx")
+        self.assertEqual(brojevi, {"prostorije": 2, "elementi": len(self.tablice.elementi)})
+        prostorije = pd.read_excel(io.BytesIO(tok.getvalue()), sheet_name="Prostorije")
+        self.assertAlmostEqual(prostorije["ukupno"].sum(), self.tablice.prostorije["ukupno"].sum(), places=6)
+
+        if parquet_dostupan():
+            tok = io.BytesIO()
+            izvezi_rezultate(self.rezultati, tok, "parquet", "prostorije")
+            izvezeno = pd.read_parquet(io.BytesIO(tok.getvalue()))
+            pd.testing.assert_frame_equal(izvezeno, self.tablice.prostorije.reset_index(drop=True), check_dtype=False)
+
+
+class TestKlimatskiPodaci(unittest.TestCase):
+    """Testovi za unaprijed izračunate klimatske podatke gradova."""
+
+    def test_polja_i_memoizacija(self):
+        """Test da polja pokrivaju sve gradove i da se rječnik grada izrađuje jednom."""
+        self.assertEqual(KLIMATSKI_PODACI["profil"].shape, (len(GRADOVI_KLIME) + 1, 12))
+        self.assertFalse(KLIMATSKI_PODACI["profil"].flags.writeable)
+        klima = dohvati_klimu("Zagreb")
+        self.assertIs(dohvati_klimu("Zagreb"), klima)
+        self.assertEqual(klima["projektna_temperatura"], -12.8)
+        self.assertEqual(klima["srednja_godisnja_temperatura"], 11.5)
+        self.assertEqual(dohvati_klimu("Nepoznati grad")["projektna_temperatura"], -15.0)
+
+    def test_funkcije_temperaturnog_modula(self):
+        """Test da funkcije modula temperaturni koriste iste podatke i za nestandardne parametre."""
+        stupanj_dani = izracunaj_stupanj_dane_grijanja("Split")
+        self.assertEqual(stupanj_dani, dohvati_klimu("Split")["stupanj_dani_grijanja"])
+        self.assertEqual(stupanj_dani[1], round((20.0 - (14.0 - 8.0)) * 31, 1))
+        self.assertLess(izracunaj_stupanj_dane_grijanja("Split", 18.0)["ukupno"], stupanj_dani["ukupno"])
+        # Dubina 0.7 m: pomak od jednog mjeseca i prigušenje 0.72
+        tla = izracunaj_temperaturu_tla_po_mjesecima("Osijek", 0.7)
+        self.assertAlmostEqual(tla[2], 10.5 + (10.5 - 8.0 - 10.5) * 0.72)
+        self.assertEqual(dohvati_stupanj_dane("Zagreb"), 2500.0)
+
+
+class TestUsporedbaModela(unittest.TestCase):
+    """Testovi za strukturnu usporedbu dviju revizija modela."""
+
+    def setUp(self):
+        """Priprema modela s prostorijom koja nije povezana s ostalima."""
+        st.session_state["toplinski_mostovi"] = False
+        self.model, self.katalog = izradi_testni_model("test_usporedba_modela")
+        etaza = self.model.etaze[0]
+        self.ostava = self.model.dodaj_prostoriju(etaza.id, "Ostava", "Ostava", 4.0, spremi=False)
+        self.ostava.dodaj_zid("vanjski", "Zapad", 2.0, model_ref=self.model, tip_zida_id="zid-a")
+        # Stanje dijeli liste otvora s modelom, pa se za usporedbu kopira (kao u povijesti izmjena)
+        self.stanje_prije = copy.deepcopy(self.model.stanje())
+
+    def test_izmjene_i_promjena_gubitaka(self):
+        """Test prijave izmjena i promjene gubitaka samo za izmijenjene prostorije i susjede."""
+        dnevni, kupaonica = self.model.prostorije[0], self.model.prostorije[1]
+        kupaonica.temp_unutarnja = 22
+        dnevni.zidovi[0]["elementi"].dodaj_prozor("prozor-a", "Prozor")
+        novi = self.model.dodaj_prostoriju(self.model.etaze[0].id, "Hodnik", "Hodnik", 6.0, spremi=False)
+
+        model_prije = MultiRoomModel.iz_stanja(self.stanje_prije, "test_usporedba_prije")
+        self.assertNotIn("test_usporedba_prije", st.session_state)
+        rezultat = usporedi_modele(model_prije, self.model, katalog=self.katalog)
+
+        self.assertEqual([p["id"] for p in rezultat["prostorije"]["dodani"]], [novi.id])
+        self.assertEqual(rezultat["prostorije"]["izmijenjeni"][0]["izmjene"]["temp_unutarnja"], (24, 22))
+        self.assertEqual(len(rezultat["otvori"]["dodani"]), 1)
+        self.assertEqual(rezultat["zidovi"]["izmijenjeni"], [])
+        self.assertEqual(rezultat["promijenjene_prostorije"], {dnevni.id, kupaonica.id, novi.id})
+
+        # Promjena gubitaka jednaka je razlici punih izračuna obaju modela
+        puni_prije = izracunaj_toplinske_gubitke_zgrade(model_prije, elements_model=None)
+        puni_poslije = izracunaj_toplinske_gubitke_zgrade(self.model, elements_model=None)
+        razlika = puni_poslije["zgrada"]["ukupno"] - puni_prije["zgrada"]["ukupno"]
+        rezultat = usporedi_modele(model_prije, self.model)
+        self.assertAlmostEqual(rezultat["razlika_ukupno"], razlika, places=6)
+        self.assertNotIn(self.ostava.id, [r["prostorija_id"] for r in rezultat["opterecenje"]])
+
+    def test_calc_datoteka(self):
+        """Test čitanja modela iz .calc datoteke spremljene na poslužitelju (pickle)."""
+        with tempfile.TemporaryDirectory() as mapa:
+            putanja = os.path.join(mapa, "proracun.calc")
+            with open(putanja, "wb") as f:
+                pickle.dump({"type": "x", "data": {"model_zgrade": self.stanje_prije}}, f)
+            self.assertEqual(stanje_iz_calc_datoteke(putanja), self.stanje_prije)
+        model_prije = MultiRoomModel.iz_stanja(self.stanje_prije, "test_usporedba_prije")
+        self.assertEqual(usporedi_modele(model_prije, self.model)["broj_izmjena"], 0)
+
+    def test_json_stanje(self):
+        """Test izvoza i učitavanja stanja modela kao JSON (put za datoteke iz preglednika)."""
+        stanje = stanje_iz_json(io.BytesIO(stanje_u_json(self.stanje_prije)))
+        model_prije = MultiRoomModel.iz_stanja(stanje, "test_usporedba_prije")
+        self.assertEqual(usporedi_modele(model_prije, self.model)["broj_izmjena"], 0)
+        # Sadržaj koji nije JSON stanje modela ne učitava se
+        self.assertIsNone(stanje_iz_json(pickle.dumps({"etaze": [], "prostorije": []})))
+        self.assertIsNone(stanje_iz_json(b'{"etaze": []}'))
+        self.assertIsNone(stanje_iz_json(b"[]"))
+
+
+class TestValidacijaModela(unittest.TestCase):
+    """Testovi za provjeru cijelog modela u jednom prolazu."""
+
+    def setUp(self):
+        """Priprema za testove."""
+        self.model, self.katalog = izradi_testni_model("test_validacija_modela")
+        self.dnevni, self.kupaonica = self.model.prostorije
+
+    def kodovi(self, izvjestaj):
+        return {(p["kod"], p["zid_id"] or p["prostorija_id"]) for p in izvjestaj["problemi"]}
+
+    def test_ispravan_model(self):
+        """Test da ispravan model nema grešaka (samo upozorenja o zidovima bez tipa)."""
+        izvjestaj = validiraj_model(self.model, self.katalog)
+        self.assertEqual(izvjestaj["broj_gresaka"], 0)
+        self.assertEqual({p["kod"] for p in izvjestaj["problemi"]}, {"bez_tipa_zida"})
+
+    def test_svi_problemi_u_jednom_izvjestaju(self):
+        """Test da se nepovezani zidovi, preveliki otvori, visina nula i nepoznati tipovi prijavljuju zajedno."""
+        vanjski, unutarnji = self.dnevni.zidovi
+        self.dnevni.zidovi.remove(unutarnji)
+        vanjski["visina"] = 0.5
+        self.kupaonica.zidovi[1]["tip_zida_id"] = "nepostojeci"
+        self.kupaonica.koristi_zadanu_visinu = False
+        self.kupaonica.visina = 0.0
+
+        izvjestaj = validiraj_model(self.model, self.katalog)
+        kodovi = self.kodovi(izvjestaj)
+        self.assertIn(("nepovezan_zid", self.kupaonica.zidovi[0]["id"]), kodovi)
+        self.assertIn(("otvori_veci_od_zida", vanjski["id"]), kodovi)
+        self.assertIn(("tip_zida_nije_u_katalogu", self.kupaonica.zidovi[1]["id"]), kodovi)
+        self.assertIn(("visina_prostorije_nula", self.kupaonica.id), kodovi)
+        self.assertEqual(izvjestaj["broj_gresaka"], sum(p["razina"] == RAZINA_GRESKA for p in izvjestaj["problemi"]))
+        self.assertEqual(izvjestaj["broj_gresaka"], 4)
+
+    def test_predmemoriranje_po_reviziji(self):
+        """Test da se provjera ponavlja samo nakon izmjene modela."""
+        with mock.patch.object(validacija_modela, "validiraj_model", wraps=validiraj_model) as provjera:
+            prvi = dohvati_validaciju(self.model, self.katalog)
+            self.assertIs(dohvati_validaciju(self.model, self.katalog), prvi)
+            self.assertEqual(provjera.call_count, 1)
+            self.dnevni.zidovi[0]["visina"] = 0.0
+            self.assertGreater(dohvati_validaciju(self.model, self.katalog)["broj_gresaka"], 0)
+            self.assertEqual(provjera.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
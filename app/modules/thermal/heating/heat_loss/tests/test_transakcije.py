@@ -0,0 +1,64 @@
+"""
+Modul koji sadrži testove za transakcije (skupne izmjene) modela.
+"""
+
+import unittest
+from unittest import mock
+import streamlit as st
+
+from ..models import model as model_modul
+from ..models.model import MultiRoomModel
+from ..controllers.zid_controller import ZidController
+
+
+class TestTransakcije(unittest.TestCase):
+    """Testovi za skupne izmjene modela kroz model.batch()."""
+
+    def setUp(self):
+        """Priprema modela s dvije prostorije."""
+        st.session_state.pop("test_transakcije", None)
+        self.model = MultiRoomModel("test_transakcije")
+        etaza = self.model.etaze[0]
+        self.prva = self.model.dodaj_prostoriju(etaza.id, "Soba 1")
+        self.druga = self.model.dodaj_prostoriju(etaza.id, "Soba 2")
+        self.controller = ZidController(self.model)
+
+    def test_jedno_spremanje_i_korak_povijesti(self):
+        with mock.patch.object(MultiRoomModel, "stanje", autospec=True, side_effect=MultiRoomModel.stanje) as stanje, \
+                mock.patch.object(model_modul, "zabiljezi_korak_povijesti") as povijest:
+            with self.controller.batch():
+                for i in range(50):
+                    zid_id = self.controller.dodaj_zid(self.prva.id, "vanjski", 4.0, orijentacija="Sjever")
+                    self.controller.dodaj_prozor_na_zid(self.prva.id, zid_id, None, "Prozor", {"sirina": 1.0, "visina": 1.0})
+                self.controller.dodaj_zid(self.prva.id, "prema_prostoriji", 3.0, povezana_prostorija_id=self.druga.id)
+            self.assertEqual(stanje.call_count, 1)
+            povijest.assert_called_once()
+
+        spremljeno = st.session_state["test_transakcije"]
+        prva = next(p for p in spremljeno["prostorije"] if p["id"] == self.prva.id)
+        self.assertEqual(len(prva["zidovi"]), 51)
+        self.assertIs(self.druga.zidovi[0]["elementi"], self.prva.zidovi[-1]["elementi"])
+
+    def test_povrat_pri_gresci(self):
+        with self.assertRaises(RuntimeError):
+            with self.model.batch():
+                self.controller.dodaj_zid(self.prva.id, "vanjski", 4.0, orijentacija="Jug")
+                self.model.ukloni_prostoriju(self.druga.id)
+                raise RuntimeError("prekid")
+        self.assertEqual(len(self.model.prostorije), 2)
+        self.assertEqual(self.model.dohvati_prostoriju(self.prva.id).zidovi, [])
+
+    def test_zamjena_tipa_prozora(self):
+        with self.model.batch():
+            for orijentacija in ("Sjever", "Jug", "Sjever"):
+                zid_id = self.controller.dodaj_zid(self.prva.id, "vanjski", 4.0, orijentacija=orijentacija)
+                self.controller.dodaj_prozor_na_zid(self.prva.id, zid_id, "stari", "Stari prozor")
+        broj = self.controller.zamijeni_tip_otvora("prozor", "novi", "Novi prozor", orijentacija="Sjever")
+
+        self.assertEqual(broj, 2)
+        tipovi = [z["elementi"].prozori[0]["tip_id"] for z in self.model.dohvati_prostoriju(self.prva.id).zidovi]
+        self.assertEqual(tipovi, ["novi", "stari", "novi"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Modul koji sadrži testove za skupni uvoz geometrije.
+"""
+
+import io
+import time
+import unittest
+import streamlit as st
+
+from ..models.model import MultiRoomModel
+from ..models.uvoz_geometrije import uvezi_geometriju, uvezi_zapise, predlozak_csv
+
+GBXML = """<?xml version="1.0" encoding="UTF-8"?>
+<gbXML xmlns="http://www.gbxml.org/schema" lengthUnit="Meters" areaUnit="SquareMeters" volumeUnit="CubicMeters">
+  <Campus id="kampus">
+    <Building id="zgrada" buildingType="SingleFamily">
+      <BuildingStorey id="kat-1"><Name>Prizemlje</Name><Level>0</Level></BuildingStorey>
+      <Space id="sp-1" buildingStoreyIdRef="kat-1"><Name>Dnevni boravak</Name><Area>20</Area><Volume>56</Volume></Space>
+      <Space id="sp-2" buildingStoreyIdRef="kat-1"><Name>Kuhinja</Name><Area>10</Area><Volume>28</Volume></Space>
+    </Building>
+    <Surface id="s-1" surfaceType="ExteriorWall">
+      <AdjacentSpaceId spaceIdRef="sp-1"/>
+      <RectangularGeometry><Azimuth>180</Azimuth><Height>2.8</Height><Width>5</Width></RectangularGeometry>
+      <Opening id="o-1" openingType="OperableWindow">
+        <RectangularGeometry><Height>1.4</Height><Width>1.2</Width></RectangularGeometry>
+      </Opening>
+    </Surface>
+    <Surface id="s-2" surfaceType="InteriorWall">
+      <AdjacentSpaceId spaceIdRef="sp-1"/><AdjacentSpaceId spaceIdRef="sp-2"/>
+      <PlanarGeometry><PolyLoop>
+        <CartesianPoint><Coordinate>0</Coordinate><Coordinate>0</Coordinate><Coordinate>0</Coordinate></CartesianPoint>
+        <CartesianPoint><Coordinate>4</Coordinate><Coordinate>0</Coordinate><Coordinate>0</Coordinate></CartesianPoint>
+        <CartesianPoint><Coordinate>4</Coordinate><Coordinate>0</Coordinate><Coordinate>2.8</Coordinate></CartesianPoint>
+        <CartesianPoint><Coordinate>0</Coordinate><Coordinate>0</Coordinate><Coordinate>2.8</Coordinate></CartesianPoint>
+      </PolyLoop></PlanarGeometry>
+      <Opening id="o-2" openingType="NonSlidingDoor">
+        <RectangularGeometry><Height>2.0</Height><Width>0.9</Width></RectangularGeometry>
+      </Opening>
+    </Surface>
+    <Surface id="s-3" surfaceType="SlabOnGrade"><AdjacentSpaceId spaceIdRef="sp-2"/></Surface>
+  </Campus>
+</gbXML>
+"""
+
+
+class TestUvozGeometrije(unittest.TestCase):
+    """Testovi za uvoz geometrije iz predloška i gbXML datoteke."""
+
+    def setUp(self):
+        """Priprema praznog modela."""
+        st.session_state.pop("test_uvoz_geometrije", None)
+        self.model = MultiRoomModel("test_uvoz_geometrije")
+
+    def test_csv_predlozak(self):
+        datoteka = io.BytesIO(predlozak_csv().encode("utf-8"))
+        sazetak = uvezi_geometriju(self.model, datoteka, "geometrija.csv")
+
+        self.assertEqual(sazetak["upozorenja"], [])
+        self.assertEqual((sazetak["prostorije"], sazetak["zidovi"], sazetak["prozori"], sazetak["vrata"]), (2, 2, 2, 1))
+        dnevni, kupaonica = [p for p in self.model.prostorije if p.naziv in ("Dnevni boravak", "Kupaonica")]
+        self.assertAlmostEqual(dnevni.povrsina, 24.5)
+        self.assertEqual(kupaonica.temp_unutarnja, 24.0)
+        # Zid prema prostoriji navodi se jednom, a par u susjednoj prostoriji dijeli elemente
+        self.assertEqual(len(kupaonica.zidovi), 1)
+        self.assertIs(kupaonica.zidovi[0]["elementi"], dnevni.zidovi[1]["elementi"])
+        self.assertIn("test_uvoz_geometrije", st.session_state)
+
+    def test_gbxml(self):
+        sazetak = uvezi_geometriju(self.model, io.BytesIO(GBXML.encode("utf-8")), "zgrada.xml")
+
+        self.assertEqual(sazetak["upozorenja"], [])
+        dnevni = next(p for p in self.model.prostorije if p.naziv == "Dnevni boravak")
+        kuhinja = next(p for p in self.model.prostorije if p.naziv == "Kuhinja")
+        self.assertAlmostEqual(dnevni.visina, 2.8)
+        self.assertEqual(dnevni.zidovi[0]["orijentacija"], "Jug")
+        self.assertEqual(len(dnevni.zidovi[0]["elementi"].prozori), 1)
+        self.assertAlmostEqual(dnevni.zidovi[1]["duzina"], 4.0)
+        self.assertEqual(kuhinja.zidovi[0]["povezana_prostorija_id"], dnevni.id)
+        self.assertEqual(len(kuhinja.zidovi[0]["elementi"].vrata), 1)
+        self.assertEqual(kuhinja.pod_tip, "Prema tlu")
+
+    def test_velika_datoteka(self):
+        zapisi = []
+        for i in range(2000):
+            zapisi.append({"zapis": "prostorija", "kljuc": f"P{i}", "etaza": f"Etaža {i // 100}", "povrsina": "15"})
+            zapisi.append({"zapis": "zid", "kljuc": f"Z{i}", "prostorija": f"P{i}", "tip": "vanjski",
+                           "orijentacija": "Sjever", "duzina": "4", "visina": "2,7"})
+            zapisi.append({"zapis": "otvor", "zid": f"Z{i}", "tip": "prozor", "sirina": "1", "visina": "1"})
+            if i:
+                zapisi.append({"zapis": "zid", "prostorija": f"P{i}", "tip": "prema_prostoriji", "duzina": "3",
+                               "visina": "2,7", "susjedna_prostorija": f"P{i - 1}"})
+        # Otvor naveden prije svog zida obrađuje se nakon čitanja datoteke
+        zapisi.insert(0, {"zapis": "otvor", "zid": "Z1999", "tip": "vrata"})
+
+        pocetak = time.perf_counter()
+        sazetak = uvezi_zapise(self.model, zapisi)
+        trajanje = time.perf_counter() - pocetak
+
+        self.assertEqual(sazetak["upozorenja"], [])
+        self.assertEqual(sazetak["prostorije"], 2000)
+        self.assertEqual(sazetak["zidovi"], 3999)
+        self.assertEqual(sazetak["vrata"], 1)
+        self.assertLess(trajanje, 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,14 +3,24 @@ Inicijalizacija modula za korisničko sučelje proračuna toplinskih gubitaka.
 Ovaj modul sadrži komponente korisničkog sučelja za rad s prostorijama, etažama i elementima.
 """
 
-from .etaza_ui import prikaz_etaza_izbornika, forma_za_dodavanje_etaze, forma_za_uredivanje_etaze
+from .etaza_ui import (
+    prikaz_etaza_izbornika, forma_za_dodavanje_etaze, forma_za_uredivanje_etaze, forma_za_uvoz_geometrije,
+    prikaz_provjere_modela
+)
 from .prostorija_ui import prikazi_osnovne_podatke_prostorije, prikazi_dimenzije_prostorije, prikazi_pod_i_strop_prostorije
 from .zid_ui import prikazi_zidove_prostorije
-from .results_ui import prikaz_rezultata_prostorije, prikaz_rezultata_etaze, prikaz_rezultata_zgrade
+from .results_ui import (
+    prikaz_rezultata_prostorije, prikaz_rezultata_etaze, prikaz_rezultata_zgrade,
+    tablica_etaza_za_prikaz, prikaz_izvoza_tablica
+)
+from .analiza_ui import prikaz_analize_nesigurnosti, prikaz_analize_osjetljivosti, prikaz_varijanti, prikaz_usporedbe_modela
 
 __all__ = [
-    'prikaz_etaza_izbornika', 'forma_za_dodavanje_etaze', 'forma_za_uredivanje_etaze',
+    'prikaz_etaza_izbornika', 'forma_za_dodavanje_etaze', 'forma_za_uredivanje_etaze', 'forma_za_uvoz_geometrije',
+    'prikaz_provjere_modela',
     'prikazi_osnovne_podatke_prostorije', 'prikazi_dimenzije_prostorije', 'prikazi_pod_i_strop_prostorije',
     'prikazi_zidove_prostorije',
-    'prikaz_rezultata_prostorije', 'prikaz_rezultata_etaze', 'prikaz_rezultata_zgrade'
+    'prikaz_rezultata_prostorije', 'prikaz_rezultata_etaze', 'prikaz_rezultata_zgrade',
+    'tablica_etaza_za_prikaz', 'prikaz_izvoza_tablica',
+    'prikaz_analize_nesigurnosti', 'prikaz_analize_osjetljivosti', 'prikaz_varijanti', 'prikaz_usporedbe_modela'
 ]
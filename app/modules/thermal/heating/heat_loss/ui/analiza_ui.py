@@ -0,0 +1,470 @@
+"""
+Modul za prikaz dodatnih analiza proračuna toplinskih gubitaka
+(analiza nesigurnosti, analiza osjetljivosti, varijante projekta, usporedba revizija) u UI-u.
+"""
+
+import os
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from core.file_manager import FileManager
+
+from ..calculations.heat_loss_calculation import izradi_katalog_elemenata
+from ..calculations.temperaturni import izracunaj_temperature_za_model
+from ..calculations.kompilirani_model import kompiliraj_zgradu
+from ..calculations.analiza_nesigurnosti import izracunaj_nesigurnost_gubitaka, ZADANI_PARAMETRI_NESIGURNOSTI
+from ..calculations.analiza_osjetljivosti import izracunaj_osjetljivost, NAZIVI_KATEGORIJA
+from ..calculations.varijante import izracunaj_varijante, ZADANI_TIP
+from ..calculations.usporedba_modela import (
+    usporedi_modele, stanje_iz_calc_datoteke, stanje_iz_json, stanje_u_json, stanja_iz_povijesti,
+    RAZINE_USPOREDBE
+)
+from ..models.model import MultiRoomModel
+from .results_ui import format_power
+
+
+def dohvati_kompiliranu_zgradu(model, elements_model, grad):
+    """
+    Kompilira model zgrade za vektorizirane analize.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model s etažama i prostorijama
+    elements_model : BuildingElementsModel
+        Model građevinskih elemenata (katalog)
+    grad : str
+        Grad za projektnu vanjsku temperaturu
+
+    Returns:
+    --------
+    KompiliranaZgrada
+        Kompilirani model zgrade
+    """
+    temperature = izracunaj_temperature_za_model(model, grad)
+    return kompiliraj_zgradu(model, temperature, izradi_katalog_elemenata(elements_model))
+
+
+def prikaz_analize_nesigurnosti(model, elements_model, grad):
+    """
+    Prikazuje Monte Carlo analizu nesigurnosti projektnih gubitaka (P50/P90/P95).
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model s etažama i prostorijama
+    elements_model : BuildingElementsModel
+        Model građevinskih elemenata (katalog)
+    grad : str
+        Grad za projektnu vanjsku temperaturu
+    """
+    with st.expander("Analiza nesigurnosti (Monte Carlo)", expanded=False):
+        st.caption(
+            "U-vrijednosti tipova iz kataloga, izmjene zraka i postotak toplinskih mostova "
+            "uzorkuju se iz raspodjela oko unesenih vrijednosti, a gubici se računaju za sve uzorke odjednom."
+        )
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            broj_uzoraka = st.number_input(
+                "Broj uzoraka", min_value=100, max_value=50000, step=500,
+                value=ZADANI_PARAMETRI_NESIGURNOSTI["broj_uzoraka"], key="nesigurnost_broj_uzoraka"
+            )
+        with col2:
+            u_cv = st.number_input(
+                "Nesigurnost U [%]", min_value=0, max_value=50, step=1,
+                value=int(ZADANI_PARAMETRI_NESIGURNOSTI["u_vrijednost_cv"] * 100), key="nesigurnost_u_cv"
+            )
+        with col3:
+            n_cv = st.number_input(
+                "Nesigurnost izmjena zraka [%]", min_value=0, max_value=100, step=5,
+                value=int(ZADANI_PARAMETRI_NESIGURNOSTI["izmjene_zraka_cv"] * 100), key="nesigurnost_n_cv"
+            )
+        with col4:
+            raspon_mostova = st.number_input(
+                "Raspon toplinskih mostova [± %]", min_value=0.0, max_value=15.0, step=1.0,
+                value=ZADANI_PARAMETRI_NESIGURNOSTI["toplinski_mostovi_raspon"], key="nesigurnost_raspon_mostova"
+            )
+
+        if not st.button("Pokreni analizu nesigurnosti", key="nesigurnost_pokreni"):
+            rezultat = st.session_state.get("nesigurnost_rezultat")
+        else:
+            zgrada = dohvati_kompiliranu_zgradu(model, elements_model, grad)
+            if zgrada.broj_prostorija == 0:
+                st.info("Nema prostorija za analizu.")
+                return
+            rezultat = izracunaj_nesigurnost_gubitaka(
+                zgrada,
+                broj_uzoraka=broj_uzoraka,
+                u_vrijednost_cv=u_cv / 100.0,
+                izmjene_zraka_cv=n_cv / 100.0,
+                toplinski_mostovi_raspon=raspon_mostova,
+            )
+            st.session_state["nesigurnost_rezultat"] = rezultat
+
+        if not rezultat:
+            return
+
+        zgrada_rez = rezultat["zgrada"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Nominalno", format_power(zgrada_rez["nominalno"]))
+        for col, p in zip((col2, col3, col4), rezultat["percentili"]):
+            col.metric(f"P{p}", format_power(zgrada_rez[f"P{p}"]))
+
+        prostorije = rezultat["prostorije"]
+        tablica = {
+            "Prostorija": prostorije["naziv"],
+            "Nominalno [W]": prostorije["nominalno"].round(0),
+        }
+        for p in rezultat["percentili"]:
+            tablica[f"P{p} [W]"] = prostorije[f"P{p}"].round(0)
+        tablica["Std [W]"] = prostorije["std"].round(0)
+        st.dataframe(pd.DataFrame(tablica), hide_index=True)
+        st.caption(
+            f"Broj uzoraka: {rezultat['postavke']['broj_uzoraka']}. Percentili zgrade računaju se iz zbroja "
+            "uzoraka pa nisu jednaki zbroju percentila prostorija."
+        )
+
+
+def prikaz_analize_osjetljivosti(model, elements_model, grad):
+    """
+    Prikazuje analitičku analizu osjetljivosti: koji tipovi elemenata i parametri
+    ventilacije nose najveći dio gubitaka i koliko ih mijenja promjena parametra.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model s etažama i prostorijama
+    elements_model : BuildingElementsModel
+        Model građevinskih elemenata (katalog)
+    grad : str
+        Grad za projektnu vanjsku temperaturu
+    """
+    with st.expander("Analiza osjetljivosti", expanded=False):
+        st.caption(
+            "Doprinos je dio ukupnih gubitaka koji nosi parametar (vrijednost × dQ/dx), "
+            "a udio je ujedno postotna promjena gubitaka zgrade za 1 % promjene parametra."
+        )
+        if st.button("Izračunaj osjetljivost", key="osjetljivost_pokreni"):
+            zgrada = dohvati_kompiliranu_zgradu(model, elements_model, grad)
+            st.session_state["osjetljivost_rezultat"] = izracunaj_osjetljivost(zgrada)
+        rezultat = st.session_state.get("osjetljivost_rezultat")
+        if not rezultat:
+            return
+
+        te = rezultat["vanjska_temperatura"]
+        col1, col2 = st.columns(2)
+        col1.metric("Ukupni gubici", format_power(rezultat["ukupno"]))
+        col2.metric("dQ/dTe", f"{te['derivacija']:.1f} W/K",
+                    help="Promjena gubitaka zgrade za porast vanjske projektne temperature od 1 K.")
+
+        prikazi_ventilaciju_po_prostoriji = st.checkbox(
+            "Prikaži izmjene zraka po prostorijama", value=False, key="osjetljivost_po_prostorijama"
+        )
+        retci = [
+            r for r in rezultat["parametri"]
+            if prikazi_ventilaciju_po_prostoriji or r["kategorija"] != "izmjene_zraka"
+        ]
+        if not prikazi_ventilaciju_po_prostoriji:
+            izmjene = [r for r in rezultat["parametri"] if r["kategorija"] == "izmjene_zraka"]
+            if izmjene:
+                doprinos = sum(r["doprinos"] for r in izmjene)
+                retci.append({
+                    "opis_kategorije": "Izmjene zraka", "naziv": "Sve prostorije",
+                    "vrijednost": None, "jedinica": "1/h", "derivacija": None,
+                    "doprinos": doprinos, "udio": doprinos / rezultat["ukupno"] if rezultat["ukupno"] else 0.0,
+                    "promjena_10_posto": 0.1 * doprinos,
+                })
+                retci.sort(key=lambda r: abs(r["doprinos"]), reverse=True)
+
+        df = pd.DataFrame({
+            "Kategorija": [r["opis_kategorije"] for r in retci],
+            "Parametar": [r["naziv"] for r in retci],
+            "Vrijednost": [f"{r['vrijednost']:.2f} {r['jedinica']}" if r["vrijednost"] is not None else "-" for r in retci],
+            "dQ/dx": [f"{r['derivacija']:.1f}" if r["derivacija"] is not None else "-" for r in retci],
+            "Doprinos [W]": [round(r["doprinos"]) for r in retci],
+            "Udio [%]": [round(100 * r["udio"], 1) for r in retci],
+            "+10 % [W]": [round(r["promjena_10_posto"]) for r in retci],
+        })
+        st.dataframe(df, hide_index=True)
+
+
+def prikaz_varijanti(model, elements_model, grad):
+    """
+    Prikazuje upravljanje varijantama projekta i usporedbu njihovih gubitaka s osnovnim modelom.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model s etažama, prostorijama i varijantama
+    elements_model : BuildingElementsModel
+        Model građevinskih elemenata (katalog)
+    grad : str
+        Grad za projektnu vanjsku temperaturu
+    """
+    with st.expander("Varijante projekta", expanded=False):
+        st.caption(
+            "Varijanta sprema samo preinake u odnosu na osnovni model (zamjene tipova, U-vrijednosti, "
+            "toplinske mostove); sve varijante računaju se odjednom nad istom geometrijom."
+        )
+        katalog = izradi_katalog_elemenata(elements_model)
+        zgrada = dohvati_kompiliranu_zgradu(model, elements_model, grad)
+
+        for varijanta in list(model.varijante):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.markdown(f"**{varijanta['naziv']}** - {_opis_varijante(varijanta, katalog)}")
+            with col2:
+                if st.button("Ukloni", key=f"ukloni_varijantu_{varijanta['id']}"):
+                    model.ukloni_varijantu(varijanta["id"])
+                    st.rerun()
+
+        _forma_za_dodavanje_varijante(model, zgrada, katalog)
+
+        if not model.varijante:
+            return
+
+        rezultat = izracunaj_varijante(zgrada, model.varijante, katalog)
+        zgrada_rez = rezultat["zgrada"]
+        if any(rezultat["zastarjele"]):
+            st.info("Osnovni model promijenjen je nakon izrade nekih varijanti; njihove preinake primijenjene su na trenutni model.")
+
+        st.dataframe(pd.DataFrame({
+            "Varijanta": ["Osnovni model"] + [v["naziv"] for v in rezultat["varijante"]],
+            "Gubici [W]": [round(zgrada_rez["osnova"])] + [round(x) for x in zgrada_rez["varijante"]],
+            "Razlika [W]": [0] + [round(x) for x in zgrada_rez["razlika"]],
+            "Razlika [%]": [0.0] + [round(x, 1) for x in zgrada_rez["razlika_posto"]],
+        }), hide_index=True)
+
+        if st.checkbox("Prikaži razlike po prostorijama", value=False, key="varijante_po_prostorijama"):
+            prostorije = rezultat["prostorije"]
+            tablica = {"Prostorija": prostorije["naziv"], "Osnovni model [W]": prostorije["osnova"].round(0)}
+            for v, gubici in zip(rezultat["varijante"], prostorije["varijante"]):
+                tablica[f"Δ {v['naziv']} [W]"] = (gubici - prostorije["osnova"]).round(0)
+            st.dataframe(pd.DataFrame(tablica), hide_index=True)
+
+
+def _opis_varijante(varijanta, katalog):
+    """Kratki tekstualni opis preinaka varijante."""
+    def naziv_tipa(kategorija, tip_id):
+        if tip_id == ZADANI_TIP:
+            return "zadano"
+        tip = ((katalog or {}).get(kategorija) or {}).get(tip_id)
+        return getattr(tip, "naziv", str(tip_id))
+
+    opisi = []
+    for kategorija, zamjene in varijanta.get("zamjene_tipova", {}).items():
+        for tip_id, novi_tip_id in zamjene.items():
+            opisi.append(f"{naziv_tipa(kategorija, tip_id)} → {naziv_tipa(kategorija, novi_tip_id)}")
+    for kategorija, vrijednosti in varijanta.get("u_vrijednosti", {}).items():
+        for tip_id, u in vrijednosti.items():
+            opisi.append(f"U({naziv_tipa(kategorija, tip_id)}) = {u:.2f}")
+    if varijanta.get("izmjene_zraka"):
+        opisi.append(f"izmjene zraka: {len(varijanta['izmjene_zraka'])} prostorija")
+    if varijanta.get("postotak_toplinskih_mostova") is not None:
+        opisi.append(f"toplinski mostovi {varijanta['postotak_toplinskih_mostova']:.0f} %")
+    return ", ".join(opisi) or "bez preinaka"
+
+
+def _forma_za_dodavanje_varijante(model, zgrada, katalog):
+    """Forma za dodavanje varijante s jednom preinakom tipa elementa."""
+    st.markdown("**Nova varijanta**")
+    kategorije = list(NAZIVI_KATEGORIJA)[:5]
+    col1, col2 = st.columns(2)
+    with col1:
+        naziv = st.text_input("Naziv varijante", value=f"Varijanta {len(model.varijante) + 1}", key="varijanta_naziv")
+    with col2:
+        kategorija = st.selectbox("Kategorija", kategorije, format_func=NAZIVI_KATEGORIJA.get, key="varijanta_kategorija")
+
+    koristeni = [tip_id for kat, tip_id in (zgrada.parametri[p] for p in np.unique(zgrada.el_parametar)) if kat == kategorija]
+    if not koristeni:
+        st.caption("Zgrada nema elemenata ove kategorije.")
+        return
+    tipovi = (katalog or {}).get(kategorija) or {}
+
+    def naziv_tipa(tip_id):
+        return "Zadano" if tip_id is None else getattr(tipovi.get(tip_id), "naziv", str(tip_id))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        stari_tip = st.selectbox("Postojeći tip", koristeni, format_func=naziv_tipa, key="varijanta_stari_tip")
+    with col2:
+        novi_tip = st.selectbox("Zamijeni tipom", [None] + list(tipovi), format_func=lambda t: "-" if t is None else naziv_tipa(t),
+                                key="varijanta_novi_tip")
+    with col3:
+        nova_u = st.number_input("ili nova U [W/(m²·K)]", min_value=0.0, value=0.0, step=0.05, key="varijanta_nova_u",
+                                 help="0 = bez promjene U-vrijednosti")
+
+    if st.button("Dodaj varijantu", key="varijanta_dodaj"):
+        kljuc = ZADANI_TIP if stari_tip is None else stari_tip
+        model.dodaj_varijantu(
+            naziv,
+            u_vrijednosti={kategorija: {kljuc: nova_u}} if nova_u > 0 else None,
+            zamjene_tipova={kategorija: {kljuc: novi_tip}} if novi_tip is not None else None,
+            osnovna_revizija=zgrada.potpis,
+        )
+        st.rerun()
+
+
+# Nazivi razina i promjena u prikazu usporedbe modela
+NAZIVI_RAZINA = {
+    "etaze": "Etaža", "prostorije": "Prostorija", "zidovi": "Zid", "otvori": "Otvor", "fizicki_zidovi": "Fizički zid",
+}
+NAZIVI_PROMJENA = {"dodani": "Dodano", "uklonjeni": "Uklonjeno", "izmijenjeni": "Izmijenjeno"}
+
+
+def prikaz_usporedbe_modela(model, elements_model, grad):
+    """
+    Prikazuje usporedbu trenutnog modela s korakom povijesti izmjena, spremljenim
+    proračunom ili JSON izvozom stanja modela.
+
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Trenutni model zgrade
+    elements_model : BuildingElementsModel
+        Model građevinskih elemenata (katalog)
+    grad : str
+        Grad za projektnu vanjsku temperaturu
+    """
+    with st.expander("Usporedba revizija modela", expanded=False):
+        st.caption(
+            "Prikazuje dodane, uklonjene i izmijenjene etaže, prostorije, zidove i otvore te promjenu "
+            "gubitaka; gubici se ponovno računaju samo za izmijenjene prostorije i njihove susjede."
+        )
+        izvor = st.radio(
+            "Usporedi", ["Povijest izmjena", "Spremljeni proračuni", "Stanje modela (JSON)"],
+            horizontal=True, key="usporedba_izvor"
+        )
+
+        stanje_prije, stanje_poslije = None, model.stanje()
+        if izvor == "Povijest izmjena":
+            povijest = stanja_iz_povijesti()
+            if not povijest:
+                st.info("Povijest izmjena još ne sadrži spremljena stanja modela.")
+                return
+            indeks = st.selectbox(
+                "Stanje prije izmjene", range(len(povijest)), index=len(povijest) - 1,
+                format_func=lambda i: f"{i + 1}. {povijest[i][0]}", key="usporedba_korak",
+                help="Odabrano stanje uspoređuje se s trenutnim modelom."
+            )
+            stanje_prije = povijest[indeks][1]
+        elif izvor == "Spremljeni proračuni":
+            stanja = _odabir_spremljenih_proracuna(stanje_poslije)
+            if stanja is None:
+                return
+            stanje_prije, stanje_poslije = stanja
+        else:
+            stanja = _odabir_json_stanja(stanje_poslije)
+            if stanja is None:
+                return
+            stanje_prije, stanje_poslije = stanja
+
+        if not st.button("Usporedi", key="usporedba_pokreni"):
+            return
+
+        model_prije = MultiRoomModel.iz_stanja(stanje_prije, f"{model.session_key}_usporedba_prije")
+        model_poslije = MultiRoomModel.iz_stanja(stanje_poslije, f"{model.session_key}_usporedba_poslije")
+        rezultat = usporedi_modele(model_prije, model_poslije, grad, izradi_katalog_elemenata(elements_model))
+        _prikaz_rezultata_usporedbe(rezultat)
+
+
+def _odabir_spremljenih_proracuna(trenutno_stanje):
+    """
+    Odabir dvaju proračuna spremljenih na poslužitelju (lokacije FileManagera).
+
+    Returns:
+    --------
+    tuple or None
+        (stanje_prije, stanje_poslije) ili None ako usporedba nije moguća
+    """
+    lokacije = FileManager.calculation_locations()
+    naziv_lokacije = st.selectbox("Lokacija", list(lokacije.keys()), key="usporedba_lokacija")
+    putanja_lokacije = lokacije[naziv_lokacije]
+    datoteke = FileManager.list_calculations(putanja_lokacije)
+    if not datoteke:
+        st.info(f"Nema spremljenih proračuna u {naziv_lokacije}")
+        return None
+
+    col1, col2 = st.columns(2)
+    with col1:
+        datoteka_prije = st.selectbox("Stariji proračun", datoteke, key="usporedba_datoteka_prije")
+    with col2:
+        datoteka_poslije = st.selectbox(
+            "Noviji proračun", ["Trenutni model"] + datoteke, key="usporedba_datoteka_poslije"
+        )
+    try:
+        stanje_prije = stanje_iz_calc_datoteke(os.path.join(putanja_lokacije, datoteka_prije))
+        stanje_poslije = trenutno_stanje
+        if datoteka_poslije != "Trenutni model":
+            stanje_poslije = stanje_iz_calc_datoteke(os.path.join(putanja_lokacije, datoteka_poslije))
+    except Exception as e:
+        st.error(f"Proračun nije moguće učitati: {e}")
+        return None
+    if stanje_prije is None or stanje_poslije is None:
+        st.warning("Proračun ne sadrži model proračuna toplinskih gubitaka.")
+        return None
+    return stanje_prije, stanje_poslije
+
+
+def _odabir_json_stanja(trenutno_stanje):
+    """
+    Odabir JSON izvoza stanja modela učitanih iz preglednika, uz preuzimanje trenutnog stanja.
+
+    Returns:
+    --------
+    tuple or None
+        (stanje_prije, stanje_poslije) ili None ako usporedba nije moguća
+    """
+    st.download_button(
+        "Preuzmi trenutno stanje modela (JSON)", stanje_u_json(trenutno_stanje),
+        file_name="stanje_modela.json", mime="application/json", key="usporedba_preuzmi_stanje"
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        datoteka_prije = st.file_uploader("Starije stanje", type=["json"], key="usporedba_json_prije")
+    with col2:
+        datoteka_poslije = st.file_uploader(
+            "Novije stanje (prazno = trenutni model)", type=["json"], key="usporedba_json_poslije"
+        )
+    if datoteka_prije is None:
+        return None
+    stanje_prije = stanje_iz_json(datoteka_prije)
+    stanje_poslije = trenutno_stanje if datoteka_poslije is None else stanje_iz_json(datoteka_poslije)
+    if stanje_prije is None or stanje_poslije is None:
+        st.warning("Datoteka ne sadrži JSON stanje modela zgrade.")
+        return None
+    return stanje_prije, stanje_poslije
+
+
+def _prikaz_rezultata_usporedbe(rezultat):
+    """Prikazuje popis izmjena i promjenu gubitaka po prostorijama."""
+    if not rezultat["broj_izmjena"]:
+        st.success("Modeli su jednaki.")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Broj izmjena", rezultat["broj_izmjena"])
+    col2.metric("Promjena gubitaka zgrade", format_power(rezultat["razlika_ukupno"]))
+
+    retci = []
+    for razina in RAZINE_USPOREDBE:
+        for promjena, naziv_promjene in NAZIVI_PROMJENA.items():
+            for entitet in rezultat[razina][promjena]:
+                retci.append({
+                    "Promjena": naziv_promjene,
+                    "Vrsta": NAZIVI_RAZINA[razina],
+                    "Naziv": str(entitet.get("naziv", "")),
+                    "Izmijenjena polja": ", ".join(entitet.get("izmjene", {})),
+                })
+    st.dataframe(pd.DataFrame(retci), hide_index=True)
+
+    if rezultat["opterecenje"]:
+        st.markdown("**Promjena gubitaka po prostorijama**")
+        st.dataframe(pd.DataFrame({
+            "Prostorija": [r["naziv"] for r in rezultat["opterecenje"]],
+            "Prije [W]": [round(r["prije"]) for r in rezultat["opterecenje"]],
+            "Poslije [W]": [round(r["poslije"]) for r in rezultat["opterecenje"]],
+            "Razlika [W]": [round(r["razlika"]) for r in rezultat["opterecenje"]],
+        }), hide_index=True)
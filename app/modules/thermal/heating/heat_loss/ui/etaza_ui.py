@@ -3,6 +3,11 @@ Modul koji sadrži funkcije za prikaz i upravljanje etažama u UI-u.
 """
 
 import streamlit as st
+from ..models.elementi.constants import TIPOVI_PODA, TIPOVI_STROPA
+from ..models.elementi.building_elements_model import BuildingElementsModel
+from ..models.uvoz_geometrije import uvezi_geometriju, predlozak_csv
+from ..calculations.validacija_modela import dohvati_validaciju, RAZINA_GRESKA
+from ..utils.session_manager import oznaci_rezultate_zastarjelima
 # Umjesto direktnog uvoza bolje je koristiti odgođeni uvoz (lazy import)
 # funkciju prikazi_manager_prostorija ćemo uvesti unutar funkcije
 
@@ -77,6 +82,74 @@ def forma_za_dodavanje_etaze(model, callback_nakon_dodavanja=None):
                 return nova_etaza
     return None
 
+def forma_za_uvoz_geometrije(model):
+    """
+    Prikazuje formu za skupni uvoz etaža, prostorija, zidova i otvora iz
+    CSV/XLSX predloška ili gbXML datoteke.
+    
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model u koji se uvozi geometrija
+    """
+    st.download_button(
+        "Preuzmi CSV predložak", data=predlozak_csv(), file_name="predlozak_geometrije.csv",
+        mime="text/csv", key="preuzmi_predlozak_geometrije"
+    )
+    with st.form(key="uvoz_geometrije_form", clear_on_submit=True):
+        datoteka = st.file_uploader(
+            "Datoteka geometrije:", type=["csv", "xlsx", "xml", "gbxml"],
+            help="CSV/XLSX prema predlošku ili gbXML datoteka izvezena iz CAD/BIM alata"
+        )
+        submitted = st.form_submit_button("Uvezi geometriju")
+    if not submitted or datoteka is None:
+        return None
+
+    try:
+        # Uvoz je jedna transakcija: jedno spremanje, jedan korak poništavanja i povrat modela pri grešci
+        with model.batch("Uvoz geometrije"):
+            sazetak = uvezi_geometriju(model, datoteka, datoteka.name, katalog=BuildingElementsModel())
+    except ValueError as e:
+        st.error(str(e))
+        return None
+    oznaci_rezultate_zastarjelima(model)
+    st.success(
+        f"Uvezeno: {sazetak['etaze']} etaža, {sazetak['prostorije']} prostorija, {sazetak['zidovi']} zidova, "
+        f"{sazetak['prozori']} prozora i {sazetak['vrata']} vrata."
+    )
+    if sazetak["upozorenja"]:
+        with st.expander(f"Upozorenja uvoza ({len(sazetak['upozorenja'])})"):
+            st.text("\n".join(sazetak["upozorenja"]))
+    return sazetak
+
+def prikaz_provjere_modela(model, katalog=None):
+    """
+    Prikazuje sažetak provjere cijelog modela s popisom problema po prostorijama i zidovima.
+    
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model koji se provjerava
+    katalog : dict, optional
+        Katalog građevinskih elemenata
+    """
+    izvjestaj = dohvati_validaciju(model, katalog)
+    if not izvjestaj["problemi"]:
+        st.caption("Provjera modela: nema uočenih problema.")
+        return izvjestaj
+
+    naslov = f"Provjera modela: {izvjestaj['broj_gresaka']} grešaka, {izvjestaj['broj_upozorenja']} upozorenja"
+    with st.expander(naslov, expanded=izvjestaj["broj_gresaka"] > 0):
+        retci = sorted(izvjestaj["problemi"], key=lambda p: (p["razina"] != RAZINA_GRESKA, p["prostorija"] or ""))
+        st.dataframe(
+            [
+                {"Razina": p["razina"], "Prostorija": p["prostorija"], "Problem": p["poruka"], "Zid": p["zid_id"] or ""}
+                for p in retci
+            ],
+            hide_index=True, use_container_width=True
+        )
+    return izvjestaj
+
 def forma_za_uredivanje_etaze(etaza, model, callback_nakon_uredivanja=None):
     """
     Prikazuje formu za uređivanje postojeće etaže.
@@ -150,6 +223,10 @@ def prikazi_manager_etaza(model, controller, prostorija_controller, zid_controll
     # Dodavanje nove etaže
     with st.expander("Dodaj novu etažu", expanded=False):
         forma_za_dodavanje_etaze(model)
+    
+    # Skupni uvoz geometrije iz predloška ili gbXML datoteke
+    with st.expander("Uvoz geometrije", expanded=False):
+        forma_za_uvoz_geometrije(model)
       # Prikaz postojećih etaža
     if not model.etaze:
         st.info("Nema definiranih etaža. Dodajte novu etažu.")
@@ -178,6 +255,8 @@ def prikazi_manager_etaza(model, controller, prostorija_controller, zid_controll
             with col1:
                 st.markdown(f"### Etaža {etaza.redni_broj}: {etaza.naziv}")
                 st.markdown(f"Visina etaže: **{etaza.visina_etaze:.2f} m**")
+                if etaza.ponavljanja:
+                    st.markdown(f"Tipska etaža: **×{etaza.broj_ponavljanja}**")
             
             with col2:
                 if st.button("Uredi", key=f"edit_etaza_{etaza.id}", 
@@ -238,6 +317,7 @@ def prikazi_manager_etaza(model, controller, prostorija_controller, zid_controll
                         st.rerun()
                         
                     st.markdown("---")
+            prikazi_ponavljanja_etaze(etaza, model, controller)
               # Display room manager if this etaza is selected for room management
             if st.session_state.get('selected_etaza_for_rooms') == etaza.id:
                 with st.container():
@@ -292,3 +372,71 @@ def prikazi_postavke_etaze(etaza, controller):
                 st.rerun()
             else:
                 st.error("Greška prilikom promjene visine etaže.")
+
+
+def prikazi_ponavljanja_etaze(etaza, model, controller):
+    """
+    Prikazuje i uređuje ponavljanja tipske etaže.
+    
+    Etaža je predložak; svako ponavljanje dijeli njezine prostorije i zidove, a može
+    promijeniti tip poda/stropa (npr. prva i zadnja etaža nebodera) i temperature prostorija.
+    
+    Parameters:
+    -----------
+    etaza : Etaza
+        Etaža koja je predložak
+    model : MultiRoomModel
+        Model s etažama i prostorijama
+    controller : EtazaController
+        Kontroler za upravljanje etažama
+    """
+    with st.expander(f"Tipska etaža - ponavljanja ({len(etaza.ponavljanja)})", expanded=False):
+        st.caption(
+            "Ponavljanja ne kopiraju prostorije: gubici se računaju jednom po skupu istih preinaka "
+            "i množe brojem etaža."
+        )
+        for ponavljanje in list(etaza.ponavljanja):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                preinake = [
+                    f"pod: {ponavljanje['pod_tip']}" if ponavljanje.get("pod_tip") else None,
+                    f"strop: {ponavljanje['strop_tip']}" if ponavljanje.get("strop_tip") else None,
+                    f"temperature: {len(ponavljanje['temperature'])} prostorija" if ponavljanje.get("temperature") else None,
+                ]
+                opis = ", ".join(p for p in preinake if p) or "kao predložak"
+                st.markdown(f"**{ponavljanje['naziv']}** - {opis}")
+            with col2:
+                if st.button("Ukloni", key=f"ukloni_ponavljanje_{ponavljanje['id']}"):
+                    controller.ukloni_ponavljanje(etaza.id, ponavljanje["id"])
+                    st.rerun()
+        
+        st.markdown("**Dodaj ponavljanja**")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            broj = st.number_input("Broj etaža", min_value=1, max_value=100, value=1, step=1,
+                                   key=f"ponavljanja_broj_{etaza.id}")
+        with col2:
+            pod_tip = st.selectbox("Tip poda", ["Kao predložak"] + TIPOVI_PODA, key=f"ponavljanja_pod_{etaza.id}")
+        with col3:
+            strop_tip = st.selectbox("Tip stropa", ["Kao predložak"] + TIPOVI_STROPA, key=f"ponavljanja_strop_{etaza.id}")
+        
+        temperature = {}
+        prostorije = model.dohvati_prostorije_za_etazu(etaza.id)
+        if prostorije and st.checkbox("Promijeni temperature prostorija", key=f"ponavljanja_temp_{etaza.id}"):
+            for prostorija in prostorije:
+                temp = st.number_input(
+                    f"{prostorija.naziv} [°C]", value=float(prostorija.temp_unutarnja), step=0.5,
+                    key=f"ponavljanja_temp_{etaza.id}_{prostorija.id}"
+                )
+                if temp != prostorija.temp_unutarnja:
+                    temperature[prostorija.id] = temp
+        
+        if st.button("Dodaj", key=f"ponavljanja_dodaj_{etaza.id}"):
+            for _ in range(int(broj)):
+                controller.dodaj_ponavljanje(
+                    etaza.id,
+                    pod_tip=None if pod_tip == "Kao predložak" else pod_tip,
+                    strop_tip=None if strop_tip == "Kao predložak" else strop_tip,
+                    temperature=temperature or None,
+                )
+            st.rerun()
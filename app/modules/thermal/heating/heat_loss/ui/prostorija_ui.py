@@ -5,6 +5,7 @@ Modul koji sadrži funkcije za prikaz i upravljanje prostorijama u UI-u.
 import streamlit as st
 from ..models.elementi.constants import TIPOVI_PROSTORIJA
 from ..utils.validators import validate_number
+from ..utils.session_manager import fragment, osvjezi_fragment, oznaci_rezultate_zastarjelima
 # Direktni uvoz zamijenjen odgođenim - koristit ćemo ga unutar funkcije gdje je potreban
 
 def prikaz_prostorija_izbornika(model, etaza, on_prostorija_selected=None):
@@ -182,6 +183,7 @@ def forma_za_dodavanje_prostorije(model, etaza, callback_nakon_dodavanja=None):
                         
                         # Spremanje promjena u model
                         model._spremi_u_session_state()
+                        oznaci_rezultate_zastarjelima(model)
                         st.success(f"Prostorija '{naziv}' je uspješno dodana!")
                         st.session_state.odabrani_tip_prostorije = None  # Resetiramo odabir tipa
                         
@@ -329,6 +331,7 @@ def forma_za_uredivanje_prostorije(prostorija, model, callback_nakon_uredivanja=
                 
                 # Spremanje promjena u model
                 model._spremi_u_session_state()
+                oznaci_rezultate_zastarjelima(model)
                 
                 st.success(f"Prostorija '{naziv}' je uspješno ažurirana!")
                 
@@ -340,6 +343,7 @@ def forma_za_uredivanje_prostorije(prostorija, model, callback_nakon_uredivanja=
         if delete_button:
                 # Brisanje prostorije
                 model.ukloni_prostoriju(prostorija.id)
+                oznaci_rezultate_zastarjelima(model)
                 st.success(f"Prostorija '{prostorija.naziv}' je uspješno obrisana!")
                 
                 if callback_nakon_uredivanja:
@@ -459,106 +463,134 @@ def prikazi_manager_prostorija(model, etaza_id, prostorija_controller, zid_contr
     </style>
     """, unsafe_allow_html=True)
     
-    # Display each room in a clean, card-like format
-    for i, prostorija in enumerate(prostorije):
-        with st.container():
-            st.markdown(f"<div class='room-card'>", unsafe_allow_html=True)
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                room_title = f"{prostorija.get_formatted_broj_prostorije()}. {prostorija.naziv}" if prostorija.broj_prostorije else prostorija.naziv
-                st.markdown(f"<div class='room-title'>{room_title}</div>", unsafe_allow_html=True)
-                  # Basic room info
-                room_info = f"Tip: **{prostorija.tip}** | Površina: **{prostorija.povrsina:.1f} m²**"
-                
-                st.markdown(room_info)
-            
-            with col2:
-                # Toggle details
-                show_details_key = f"show_details_prostorija_{prostorija.id}"
-                if st.button("Detalji", key=f"details_btn_{prostorija.id}", 
-                            help="Prikaži detaljne informacije o prostoriji"):
-                    st.session_state[show_details_key] = not st.session_state.get(show_details_key, False)
-                    st.rerun()
-            
-            with col3:
-                # Toggle edit form
-                edit_key = f"edit_prostorija_open_{prostorija.id}"
-                if st.button("Uredi", key=f"edit_btn_{prostorija.id}", 
-                            help="Uredi podatke prostorije"):
-                    st.session_state[edit_key] = not st.session_state.get(edit_key, False)
-                    st.rerun()
-            
-            # Management buttons in a nicer layout
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("Upravljaj zidovima", key=f"walls_btn_{prostorija.id}", 
-                           help="Definiraj zidove, prozore i vrata"):
-                    st.session_state["selected_room_for_walls"] = prostorija.id
-                    st.rerun()
-            
-            with col2:
-                # Empty column for spacing
-                pass
-            
-            with col3:
-                delete_btn = st.button("Obriši prostoriju", key=f"delete_btn_{prostorija.id}", 
-                                     help="Trajno ukloni prostoriju")
-                if delete_btn:
-                    # Confirmation dialog with better styling
-                    st.warning(f"⚠️ Jeste li sigurni da želite obrisati prostoriju '{prostorija.naziv}'?")
-                    confirm_col1, confirm_col2 = st.columns(2)
-                    with confirm_col1:
-                        confirm_delete = st.button("Da, obriši", key=f"confirm_delete_{prostorija.id}")
-                        if confirm_delete:
-                            if prostorija_controller.ukloni_prostoriju(prostorija.id):
-                                st.success(f"Prostorija '{prostorija.naziv}' uspješno uklonjena!")
-                                st.rerun()
-                            else:
-                                st.error("Greška prilikom brisanja prostorije.")
-                    with confirm_col2:
-                        if st.button("Odustani", key=f"cancel_delete_{prostorija.id}"):
-                            st.rerun()
-            
-            st.markdown("</div>", unsafe_allow_html=True)  # Close the room-card div
+    # Display each room in a clean, card-like format - svaka kartica je zaseban fragment,
+    # pa interakcija s jednom prostorijom ne izvršava ponovno cijelu zgradu
+    for prostorija in prostorije:
+        _uredivac_prostorije(prostorija.id, model, prostorija_controller, zid_controller)
+        
+        # Separator između prostorija
+        st.markdown("---")
 
-        # Prikaži detalje ako je otvoreno
-        if st.session_state.get(f"show_details_prostorija_{prostorija.id}", False):
-            with st.container():
-                st.markdown("---")
-                prikaz_detalja_prostorije(prostorija, model)
-                if st.button("Sakrij detalje", key=f"hide_details_{prostorija.id}"):
-                    st.session_state[f"show_details_prostorija_{prostorija.id}"] = False
-                    st.rerun()
-                st.markdown("---")
+@fragment
+def _uredivac_prostorije(prostorija_id, model, prostorija_controller, zid_controller):
+    """
+    Prikazuje karticu jedne prostorije s detaljima, uređivanjem i zidovima.
+    
+    Kartica je Streamlit fragment: promjene unutar nje ponovno izvršavaju samo
+    karticu, a izmjene modela označavaju rezultate zastarjelima.
+    
+    Parameters:
+    -----------
+    prostorija_id : str
+        ID prostorije
+    model : MultiRoomModel
+        Model s prostorijama
+    prostorija_controller : ProstorijaController
+        Kontroler za upravljanje prostorijama
+    zid_controller : ZidController
+        Kontroler za upravljanje zidovima
+    """
+    prostorija = model.dohvati_prostoriju(prostorija_id)
+    if not prostorija:
+        return
+    
+    with st.container():
+        st.markdown(f"<div class='room-card'>", unsafe_allow_html=True)
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            room_title = f"{prostorija.get_formatted_broj_prostorije()}. {prostorija.naziv}" if prostorija.broj_prostorije else prostorija.naziv
+            st.markdown(f"<div class='room-title'>{room_title}</div>", unsafe_allow_html=True)
+              # Basic room info
+            room_info = f"Tip: **{prostorija.tip}** | Površina: **{prostorija.povrsina:.1f} m²**"
+            
+            st.markdown(room_info)
         
-        # Prikaži formu za uređivanje ako je otvorena
-        if st.session_state.get(f"edit_prostorija_open_{prostorija.id}", False):
-            with st.container():
-                st.markdown("---")
-                if forma_za_uredivanje_prostorije(prostorija, model):
-                    st.session_state[f"edit_prostorija_open_{prostorija.id}"] = False
-                    st.rerun()
-                if st.button("Odustani", key=f"cancel_edit_prostorija_{prostorija.id}"):
-                    st.session_state[f"edit_prostorija_open_{prostorija.id}"] = False
-                    st.rerun()
-                st.markdown("---")
+        with col2:
+            # Toggle details
+            show_details_key = f"show_details_prostorija_{prostorija.id}"
+            if st.button("Detalji", key=f"details_btn_{prostorija.id}", 
+                        help="Prikaži detaljne informacije o prostoriji"):
+                st.session_state[show_details_key] = not st.session_state.get(show_details_key, False)
+                osvjezi_fragment()
         
-        # Display wall UI if selected
-        if st.session_state.get("selected_room_for_walls") == prostorija.id:
-            with st.container():
-                st.markdown("---")
-                # Odgođeno učitavanje zid_ui modula kako bismo izbjegli cirkularni uvoz
-                import importlib
-                zid_ui_module = importlib.import_module("..ui.zid_ui", package="modules.thermal.heating.heat_loss.ui")
-                prikazi_zidove_prostorije = zid_ui_module.prikazi_zidove_prostorije
-                prikazi_zidove_prostorije(prostorija, model, zid_controller)
-                if st.button("Zatvori upravljanje zidovima", key=f"close_walls_{prostorija.id}"):
-                    del st.session_state["selected_room_for_walls"]
-                    st.rerun()
-                st.markdown("---")
+        with col3:
+            # Toggle edit form
+            edit_key = f"edit_prostorija_open_{prostorija.id}"
+            if st.button("Uredi", key=f"edit_btn_{prostorija.id}", 
+                        help="Uredi podatke prostorije"):
+                st.session_state[edit_key] = not st.session_state.get(edit_key, False)
+                osvjezi_fragment()
         
-        # Separator između prostorija
-        st.markdown("---")
+        # Management buttons in a nicer layout
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("Upravljaj zidovima", key=f"walls_btn_{prostorija.id}", 
+                       help="Definiraj zidove, prozore i vrata"):
+                # Mijenja se i kartica prostorije čiji su zidovi bili otvoreni - cijela skripta
+                st.session_state["selected_room_for_walls"] = prostorija.id
+                st.rerun()
+        
+        with col2:
+            # Empty column for spacing
+            pass
+        
+        with col3:
+            delete_btn = st.button("Obriši prostoriju", key=f"delete_btn_{prostorija.id}", 
+                                 help="Trajno ukloni prostoriju")
+            if delete_btn:
+                # Confirmation dialog with better styling
+                st.warning(f"⚠️ Jeste li sigurni da želite obrisati prostoriju '{prostorija.naziv}'?")
+                confirm_col1, confirm_col2 = st.columns(2)
+                with confirm_col1:
+                    confirm_delete = st.button("Da, obriši", key=f"confirm_delete_{prostorija.id}")
+                    if confirm_delete:
+                        if prostorija_controller.ukloni_prostoriju(prostorija.id):
+                            st.success(f"Prostorija '{prostorija.naziv}' uspješno uklonjena!")
+                            oznaci_rezultate_zastarjelima(model)
+                            st.rerun()
+                        else:
+                            st.error("Greška prilikom brisanja prostorije.")
+                with confirm_col2:
+                    if st.button("Odustani", key=f"cancel_delete_{prostorija.id}"):
+                        osvjezi_fragment()
+        
+        st.markdown("</div>", unsafe_allow_html=True)  # Close the room-card div
+
+    # Prikaži detalje ako je otvoreno
+    if st.session_state.get(f"show_details_prostorija_{prostorija.id}", False):
+        with st.container():
+            st.markdown("---")
+            prikaz_detalja_prostorije(prostorija, model)
+            if st.button("Sakrij detalje", key=f"hide_details_{prostorija.id}"):
+                st.session_state[f"show_details_prostorija_{prostorija.id}"] = False
+                osvjezi_fragment()
+            st.markdown("---")
+    
+    # Prikaži formu za uređivanje ako je otvorena
+    if st.session_state.get(f"edit_prostorija_open_{prostorija.id}", False):
+        with st.container():
+            st.markdown("---")
+            if forma_za_uredivanje_prostorije(prostorija, model):
+                st.session_state[f"edit_prostorija_open_{prostorija.id}"] = False
+                osvjezi_fragment()
+            if st.button("Odustani", key=f"cancel_edit_prostorija_{prostorija.id}"):
+                st.session_state[f"edit_prostorija_open_{prostorija.id}"] = False
+                osvjezi_fragment()
+            st.markdown("---")
+    
+    # Display wall UI if selected
+    if st.session_state.get("selected_room_for_walls") == prostorija.id:
+        with st.container():
+            st.markdown("---")
+            # Odgođeno učitavanje zid_ui modula kako bismo izbjegli cirkularni uvoz
+            import importlib
+            zid_ui_module = importlib.import_module("..ui.zid_ui", package="modules.thermal.heating.heat_loss.ui")
+            prikazi_zidove_prostorije = zid_ui_module.prikazi_zidove_prostorije
+            prikazi_zidove_prostorije(prostorija, model, zid_controller)
+            if st.button("Zatvori upravljanje zidovima", key=f"close_walls_{prostorija.id}"):
+                del st.session_state["selected_room_for_walls"]
+                osvjezi_fragment()
+            st.markdown("---")
 
 # Helper functions for displaying different aspects of a room
 def prikazi_osnovne_podatke_prostorije(prostorija, model):
@@ -2,11 +2,26 @@
 Modul za prikaz rezultata proračuna toplinskih gubitaka u UI-u.
 """
 
+import hashlib
+import io
+import json
+import math
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 
+from ..calculations.toplinski_most import VRSTE_SPOJEVA, NAZIVI_SPOJEVA
+from ..calculations.tablice_rezultata import TabliceRezultata
+from ..calculations.izvoz_rezultata import izvezi_rezultate, parquet_dostupan
+
+# Broj prostorija po stranici detaljnog prikaza rezultata etaže
+VELICINA_STRANICE_PROSTORIJA = 20
+
+# Predmemorija tablica/grafikona prikaza prostorija (ključ: hash rezultata prostorije)
+KLJUC_PREDMEMORIJE_PRIKAZA = "predmemorija_prikaza_prostorija"
+MAKS_PREDMEMORIJA_PRIKAZA = 2000
+
 def format_power(power_w, precision=0):
     """Formatira snagu iz W u kW i prikazuje s određenom preciznošću."""
     if abs(power_w) >= 1000:
@@ -125,87 +140,13 @@ def prikaz_rezultata_prostorije(prostorija_rezultat, temperatura_vanjska):
         # Podjela gubitaka
         gubici = prostorija_rezultat['gubici']
         
-        # Priprema podataka za grafikon
-        # Transmisijski su samo osnovni transmisijski gubici bez toplinskih mostova
-        transmisijski = gubici['transmisijski']['ukupno'] - gubici['toplinski_mostovi']
-        ventilacijski = gubici['ventilacijski']['snaga_gubitaka']
-        infiltracija = gubici['infiltracija']['snaga_gubitaka']
-        toplinski_mostovi = gubici['toplinski_mostovi']
-        # Get transmisijski data for window and door losses
         trans_gubici = gubici['transmisijski']
         
-        # Get window and door losses values
-        prozori_gubici = trans_gubici.get('prozori', 0)
-        vrata_gubici = trans_gubici.get('vrata', 0)
-        
-        # Ensure we have numeric values for window and door losses
-        # Handle case when prozori_gubici or vrata_gubici might be dictionaries
-        if isinstance(prozori_gubici, dict):
-            if 'ukupno' in prozori_gubici:
-                prozori_gubici = prozori_gubici['ukupno']
-            else:
-                prozori_gubici = 0
-                
-        if isinstance(vrata_gubici, dict):
-            if 'ukupno' in vrata_gubici:
-                vrata_gubici = vrata_gubici['ukupno']
-            else:
-                vrata_gubici = 0
-                  # Ensure we have numeric values        prozori_gubici = float(prozori_gubici) if prozori_gubici is not None else 0
-        vrata_gubici = float(vrata_gubici) if vrata_gubici is not None else 0
-        
         # Pregled toplinskih gubitaka
         st.markdown("### Pregled toplinskih gubitaka")
         
-        # Tabela s gubicima
-        gubici_df = pd.DataFrame({
-            "Vrsta gubitaka": [
-                "Transmisijski", 
-                "Prozori",
-                "Vrata",
-                "Ventilacijski", 
-                "Infiltracija", 
-                "Toplinski mostovi", 
-                "Ukupno"
-            ],
-            "Snaga": [
-                format_power(transmisijski),
-                format_power(prozori_gubici),
-                format_power(vrata_gubici),
-                format_power(ventilacijski),
-                format_power(infiltracija),
-                format_power(toplinski_mostovi),
-                format_power(gubici['ukupno'])
-            ],
-            "Udio [%]": [
-                f"{transmisijski/gubici['ukupno']*100:.1f}%",
-                f"{prozori_gubici/gubici['ukupno']*100:.1f}%",
-                f"{vrata_gubici/gubici['ukupno']*100:.1f}%",
-                f"{ventilacijski/gubici['ukupno']*100:.1f}%",
-                f"{infiltracija/gubici['ukupno']*100:.1f}%",
-                f"{toplinski_mostovi/gubici['ukupno']*100:.1f}%",
-                "100.0%"
-            ],
-            "Po površini [W/m²]": [
-                f"{transmisijski/prostorija_rezultat['povrsina']:.1f}",
-                f"{prozori_gubici/prostorija_rezultat['povrsina']:.1f}",
-                f"{vrata_gubici/prostorija_rezultat['povrsina']:.1f}",
-                f"{ventilacijski/prostorija_rezultat['povrsina']:.1f}",
-                f"{infiltracija/prostorija_rezultat['povrsina']:.1f}",
-                f"{toplinski_mostovi/prostorija_rezultat['povrsina']:.1f}",
-                f"{gubici['ukupno']/prostorija_rezultat['povrsina']:.1f}"
-            ],
-            "Vrsta izmjene": [
-                "Toplinski gubitak 🔴" if transmisijski > 0 else "Toplinski dobitak 🟢" if transmisijski < 0 else "Nema izmjene 🔵",
-                "Toplinski gubitak 🔴" if prozori_gubici > 0 else "Toplinski dobitak 🟢" if prozori_gubici < 0 else "Nema izmjene 🔵",
-                "Toplinski gubitak 🔴" if vrata_gubici > 0 else "Toplinski dobitak 🟢" if vrata_gubici < 0 else "Nema izmjene 🔵",
-                "Toplinski gubitak 🔴" if ventilacijski > 0 else "Toplinski dobitak 🟢" if ventilacijski < 0 else "Nema izmjene 🔵",
-                "Toplinski gubitak 🔴" if infiltracija > 0 else "Toplinski dobitak 🟢" if infiltracija < 0 else "Nema izmjene 🔵",
-                "Toplinski gubitak 🔴" if toplinski_mostovi > 0 else "Toplinski dobitak 🟢" if toplinski_mostovi < 0 else "Nema izmjene 🔵",
-                "Toplinski gubitak 🔴" if gubici['ukupno'] > 0 else "Toplinski dobitak 🟢" if gubici['ukupno'] < 0 else "Nema izmjene 🔵"
-            ]
-        })
-        
+        # Tablica s gubicima (predmemorirana po sadržaju rezultata prostorije)
+        gubici_df = _predmemorirano(prostorija_rezultat, "gubici", _tablica_gubitaka_prostorije)
         st.dataframe(gubici_df, hide_index=True)
     # Detailed transmission losses section
     with st.container(border=True):
@@ -845,19 +786,174 @@ def prikaz_rezultata_prostorije(prostorija_rezultat, temperatura_vanjska):
                     if prostorija_rezultat['povrsina'] > 0:
                         tm_info["Specifični toplinski gubici"] = f"{toplinski_mostovi/prostorija_rezultat['povrsina']:.1f} W/m²"
                     # Get the percentage used for thermal bridges calculation
-                    if prostorija_rezultat.get('toplinski_mostovi_postotak'):
+                    tm_detalji = gubici.get('toplinski_mostovi_detalji')
+                    if tm_detalji:
+                        tm_info["Metoda"] = "ψ·L·ΔT"
+                    elif prostorija_rezultat.get('toplinski_mostovi_postotak'):
                         tm_info["Postotak"] = f"{prostorija_rezultat.get('toplinski_mostovi_postotak', 0):.0f}%"
                     
                     # Display as metrics
                     cols = st.columns(len(tm_info))
                     for i, (key, value) in enumerate(tm_info.items()):
                         cols[i].metric(key, value)
+                    
+                    # Linijska metoda - prikaz po vrsti spoja
+                    if tm_detalji:
+                        st.dataframe(
+                            _predmemorirano(prostorija_rezultat, "toplinski_mostovi", _tablica_toplinskih_mostova),
+                            hide_index=True
+                        )
                 else:
                     # Show message only when thermal bridges are explicitly disabled in the UI
                     st.info("Toplinski mostovi nisu uzeti u obzir u proračunu.")
                 # Ne prikazujemo detaljne podatke o toplinskim mostovima
 
-def prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska):
+def _tablica_gubitaka_prostorije(prostorija_rezultat):
+    """
+    Izrađuje tablicu pregleda toplinskih gubitaka prostorije po vrsti gubitaka.
+    
+    Parameters:
+    -----------
+    prostorija_rezultat : dict
+        Rječnik s rezultatima za prostoriju
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        Tablica sa snagom, udjelom i specifičnim gubicima po vrsti
+    """
+    gubici = prostorija_rezultat['gubici']
+    # Priprema podataka za grafikon
+    # Transmisijski su samo osnovni transmisijski gubici bez toplinskih mostova
+    transmisijski = gubici['transmisijski']['ukupno'] - gubici['toplinski_mostovi']
+    ventilacijski = gubici['ventilacijski']['snaga_gubitaka']
+    infiltracija = gubici['infiltracija']['snaga_gubitaka']
+    toplinski_mostovi = gubici['toplinski_mostovi']
+    # Get transmisijski data for window and door losses
+    trans_gubici = gubici['transmisijski']
+    
+    # Get window and door losses values
+    prozori_gubici = trans_gubici.get('prozori', 0)
+    vrata_gubici = trans_gubici.get('vrata', 0)
+    
+    # Ensure we have numeric values for window and door losses
+    # Handle case when prozori_gubici or vrata_gubici might be dictionaries
+    if isinstance(prozori_gubici, dict):
+        if 'ukupno' in prozori_gubici:
+            prozori_gubici = prozori_gubici['ukupno']
+        else:
+            prozori_gubici = 0
+            
+    if isinstance(vrata_gubici, dict):
+        if 'ukupno' in vrata_gubici:
+            vrata_gubici = vrata_gubici['ukupno']
+        else:
+            vrata_gubici = 0
+    # Ensure we have numeric values
+    prozori_gubici = float(prozori_gubici) if prozori_gubici is not None else 0
+    vrata_gubici = float(vrata_gubici) if vrata_gubici is not None else 0
+    
+    # Tabela s gubicima
+    return pd.DataFrame({
+        "Vrsta gubitaka": [
+            "Transmisijski", 
+            "Prozori",
+            "Vrata",
+            "Ventilacijski", 
+            "Infiltracija", 
+            "Toplinski mostovi", 
+            "Ukupno"
+        ],
+        "Snaga": [
+            format_power(transmisijski),
+            format_power(prozori_gubici),
+            format_power(vrata_gubici),
+            format_power(ventilacijski),
+            format_power(infiltracija),
+            format_power(toplinski_mostovi),
+            format_power(gubici['ukupno'])
+        ],
+        "Udio [%]": [
+            f"{transmisijski/gubici['ukupno']*100:.1f}%",
+            f"{prozori_gubici/gubici['ukupno']*100:.1f}%",
+            f"{vrata_gubici/gubici['ukupno']*100:.1f}%",
+            f"{ventilacijski/gubici['ukupno']*100:.1f}%",
+            f"{infiltracija/gubici['ukupno']*100:.1f}%",
+            f"{toplinski_mostovi/gubici['ukupno']*100:.1f}%",
+            "100.0%"
+        ],
+        "Po površini [W/m²]": [
+            f"{transmisijski/prostorija_rezultat['povrsina']:.1f}",
+            f"{prozori_gubici/prostorija_rezultat['povrsina']:.1f}",
+            f"{vrata_gubici/prostorija_rezultat['povrsina']:.1f}",
+            f"{ventilacijski/prostorija_rezultat['povrsina']:.1f}",
+            f"{infiltracija/prostorija_rezultat['povrsina']:.1f}",
+            f"{toplinski_mostovi/prostorija_rezultat['povrsina']:.1f}",
+            f"{gubici['ukupno']/prostorija_rezultat['povrsina']:.1f}"
+        ],
+        "Vrsta izmjene": [
+            "Toplinski gubitak 🔴" if transmisijski > 0 else "Toplinski dobitak 🟢" if transmisijski < 0 else "Nema izmjene 🔵",
+            "Toplinski gubitak 🔴" if prozori_gubici > 0 else "Toplinski dobitak 🟢" if prozori_gubici < 0 else "Nema izmjene 🔵",
+            "Toplinski gubitak 🔴" if vrata_gubici > 0 else "Toplinski dobitak 🟢" if vrata_gubici < 0 else "Nema izmjene 🔵",
+            "Toplinski gubitak 🔴" if ventilacijski > 0 else "Toplinski dobitak 🟢" if ventilacijski < 0 else "Nema izmjene 🔵",
+            "Toplinski gubitak 🔴" if infiltracija > 0 else "Toplinski dobitak 🟢" if infiltracija < 0 else "Nema izmjene 🔵",
+            "Toplinski gubitak 🔴" if toplinski_mostovi > 0 else "Toplinski dobitak 🟢" if toplinski_mostovi < 0 else "Nema izmjene 🔵",
+            "Toplinski gubitak 🔴" if gubici['ukupno'] > 0 else "Toplinski dobitak 🟢" if gubici['ukupno'] < 0 else "Nema izmjene 🔵"
+        ]
+    })
+
+
+def _tablica_toplinskih_mostova(prostorija_rezultat):
+    """Izrađuje tablicu linijskih toplinskih mostova prostorije po vrsti spoja."""
+    tm_detalji = prostorija_rezultat['gubici']['toplinski_mostovi_detalji']
+    return pd.DataFrame([
+        {
+            "Spoj": NAZIVI_SPOJEVA[vrsta],
+            "Duljina [m]": f"{tm_detalji['duljine'][vrsta]:.2f}",
+            "Gubici [W]": f"{tm_detalji[vrsta]:.0f}",
+        }
+        for vrsta in VRSTE_SPOJEVA
+    ])
+
+
+def _hash_rezultata_prostorije(prostorija_rezultat):
+    """Računa hash sadržaja rezultata prostorije (ključ predmemorije prikaza)."""
+    sadrzaj = json.dumps(prostorija_rezultat, sort_keys=True, default=str)
+    return hashlib.sha1(sadrzaj.encode()).hexdigest()
+
+
+def _predmemorirano(prostorija_rezultat, naziv, izradi):
+    """
+    Vraća objekt prikaza (tablicu, grafikon) prostorije iz predmemorije ili ga izrađuje.
+    
+    Predmemorija je u session_state i ključana hashem rezultata prostorije, pa se
+    nakon novog izračuna ponovno izrađuju samo prikazi prostorija čiji su se
+    rezultati promijenili.
+    
+    Parameters:
+    -----------
+    prostorija_rezultat : dict
+        Rječnik s rezultatima za prostoriju
+    naziv : str
+        Naziv objekta prikaza (npr. "gubici")
+    izradi : callable
+        Funkcija koja iz rezultata prostorije izrađuje objekt prikaza
+        
+    Returns:
+    --------
+    object
+        Predmemorirani ili novoizrađeni objekt prikaza
+    """
+    predmemorija = st.session_state.setdefault(KLJUC_PREDMEMORIJE_PRIKAZA, {})
+    kljuc = (_hash_rezultata_prostorije(prostorija_rezultat), naziv)
+    if kljuc not in predmemorija:
+        if len(predmemorija) >= MAKS_PREDMEMORIJA_PRIKAZA:
+            predmemorija.clear()
+        predmemorija[kljuc] = izradi(prostorija_rezultat)
+    return predmemorija[kljuc]
+
+
+def prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska, tablice=None, prefiks_kljuca="rezultati"):
     """
     Prikazuje rezultate za jednu etažu.
     
@@ -867,6 +963,10 @@ def prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska):
         Rječnik s rezultatima za etažu
     temperatura_vanjska : float
         Vanjska projektna temperatura
+    tablice : TabliceRezultata, optional
+        Tablice rezultata; ako su zadane, pregled prostorija čita se iz njih
+    prefiks_kljuca : str
+        Prefiks ključeva widgeta (isti prikaz etaže može se pojaviti na više kartica)
     """      # Osnovni podaci o etaži
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
@@ -895,54 +995,72 @@ def prikaz_rezultata_etaze(etaza_rezultat, temperatura_vanjska):
     if etaza_rezultat['prostorije']:
         st.subheader("Pregled prostorija")
         
-        prostorije_data = []
-          # Provjera je li 'prostorije' rječnik (dict) ili lista (list)
-        if isinstance(etaza_rezultat['prostorije'], dict):        # Ako je rječnik, iterirajmo kroz njegove parove ključ-vrijednost
-            for p_result in etaza_rezultat['prostorije'].values():                
-                gubici_ukupno = p_result['gubici']['ukupno']
-                room_display = get_formatted_room_display(p_result)
-                prostorije_data.append({
-                    "Prostorija": room_display,
-                    "Površina": f"{p_result['povrsina']:.2f} m²",
-                    "Temperatura [°C]": f"{p_result['temperatura']:.1f}",
-                    "Toplinski gubici [W]": f"{gubici_ukupno:.0f}",
-                    "Specifični toplinski gubici": f"{gubici_ukupno/p_result['povrsina']:.1f} W/m²"
-                })
-        elif isinstance(etaza_rezultat['prostorije'], list):
-            # Ako je lista, iterirajmo kroz listu
-            for p_result in etaza_rezultat['prostorije']:
-                gubici_ukupno = p_result['gubici']['ukupno']
-                room_display = get_formatted_room_display(p_result)
-                
-                prostorije_data.append({
-                    "Prostorija": room_display,
-                    "Površina": f"{p_result['povrsina']:.2f} m²",
-                    "Temperatura [°C]": f"{p_result['temperatura']:.1f}",
-                    "Toplinski gubici [W]": f"{gubici_ukupno:.0f}",
-                    "Specifični toplinski gubici": f"{gubici_ukupno/p_result['povrsina']:.1f} W/m²"
-                })
-        
-        prostorije_df = pd.DataFrame(prostorije_data)
+        if tablice is not None and etaza_rezultat.get('kljuc') is not None:
+            prostorije_df = tablica_prostorija_za_prikaz(tablice.prostorije_etaze(etaza_rezultat['kljuc']))
+        else:
+            prostorije_df = tablica_prostorija_za_prikaz(_tablica_prostorija_iz_rezultata(etaza_rezultat['prostorije']))
         st.dataframe(prostorije_df, hide_index=True) # Osigurano da je hide_index=True
-          # Detaljni prikaz za svaku prostoriju
+        # Detaljni prikaz prostorija - po stranicama, a detalji prostorije izrađuju se
+        # samo kad je prostorija otvorena
         st.subheader("Detaljni prikaz prostorija")
-          # Slično kao prije, prilagođavamo se formatu podataka (rječnik ili lista)
-        if isinstance(etaza_rezultat['prostorije'], dict):
-            for p_id, p_result in etaza_rezultat['prostorije'].items():
-                room_title = get_formatted_room_display(p_result)
-                with st.expander(room_title):
-                    prikaz_rezultata_prostorije(p_result, temperatura_vanjska)
-        elif isinstance(etaza_rezultat['prostorije'], list):
-            for p_result in etaza_rezultat['prostorije']:
-                room_title = get_formatted_room_display(p_result)
-                with st.expander(room_title):
-                    prikaz_rezultata_prostorije(p_result, temperatura_vanjska)
+        prikaz_detalja_prostorija(
+            etaza_rezultat['prostorije'], temperatura_vanjska,
+            kljuc=f"{prefiks_kljuca}_{etaza_rezultat.get('kljuc', etaza_rezultat.get('naziv', ''))}"
+        )
         
         # Graphs were removed as per user request
     else:
         st.warning("Nema podataka o prostorijama na ovoj etaži.")
 
-def prikaz_rezultata_zgrade(zgrada_rezultat):
+def prikaz_detalja_prostorija(prostorije, temperatura_vanjska, kljuc):
+    """
+    Prikazuje detaljne rezultate prostorija po stranicama.
+    
+    Na stranici je najviše VELICINA_STRANICE_PROSTORIJA prostorija; za svaku se
+    prikazuje samo naslov, a detaljni prikaz izrađuje se tek kad korisnik otvori
+    prostoriju. Time se pri svakom osvježavanju ne izrađuju svi spremnici, tablice
+    i metrike za sve prostorije etaže.
+    
+    Parameters:
+    -----------
+    prostorije : dict or list
+        Rezultati prostorija etaže (rječnik po ID-u ili lista)
+    temperatura_vanjska : float
+        Vanjska projektna temperatura
+    kljuc : str
+        Jedinstveni prefiks ključeva widgeta
+    """
+    if isinstance(prostorije, dict):
+        stavke = list(prostorije.items())
+    else:
+        stavke = list(enumerate(prostorije))
+    
+    if len(stavke) > VELICINA_STRANICE_PROSTORIJA:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            tekst = st.text_input("Traži prostoriju", key=f"{kljuc}_trazi_prostoriju")
+        if tekst:
+            stavke = [(p_id, p) for p_id, p in stavke if tekst.lower() in str(p.get('naziv', '')).lower()]
+        broj_stranica = max(1, math.ceil(len(stavke) / VELICINA_STRANICE_PROSTORIJA))
+        with col2:
+            stranica = st.number_input(
+                f"Stranica (od {broj_stranica})", min_value=1, max_value=broj_stranica, value=1, step=1,
+                key=f"{kljuc}_stranica_prostorija"
+            )
+        pocetak = (int(stranica) - 1) * VELICINA_STRANICE_PROSTORIJA
+        stavke = stavke[pocetak:pocetak + VELICINA_STRANICE_PROSTORIJA]
+    
+    for p_id, p_result in stavke:
+        with st.container(border=True):
+            otvorena = st.toggle(
+                f"{get_formatted_room_display(p_result)} — {format_power(p_result['gubici']['ukupno'])}",
+                key=f"{kljuc}_detalji_{p_id}"
+            )
+            if otvorena:
+                prikaz_rezultata_prostorije(p_result, temperatura_vanjska)
+
+
+def prikaz_rezultata_zgrade(zgrada_rezultat, tablice=None):
     """
     Prikazuje rezultate za cijelu zgradu.
     
@@ -950,6 +1068,8 @@ def prikaz_rezultata_zgrade(zgrada_rezultat):
     -----------
     zgrada_rezultat : dict
         Rječnik s rezultatima za zgradu
+    tablice : TabliceRezultata, optional
+        Tablice rezultata (ako nisu zadane, izrađuju se iz rječnika)
     """
     st.title("Rezultati proračuna toplinskih gubitaka")
     
@@ -1015,19 +1135,157 @@ def prikaz_rezultata_zgrade(zgrada_rezultat):
     
     # Etaže
     if zgrada_rezultat['etaze']:        # Prikaz etaža u tablici
-        etaze_data = []
-        for e_id, e_result in zgrada_rezultat['etaze'].items():
-            udio_postotak = f"{(e_result['gubici']/zgrada_rezultat['ukupno']*100):.1f}%" if zgrada_rezultat['ukupno'] > 0 else "0.0%"
-            etaze_data.append({
-                "Etaža": e_result['naziv'],
-                "Ukupna površina": f"{e_result['povrsina']:.2f} m²",
-                "Ukupni volumen": f"{e_result.get('volumen', 0):.2f} m³",
-                "Toplinski gubici [W]": f"{e_result['gubici']:.0f}",
-                "Udio [%]": udio_postotak,
-                "Ukupni specifični toplinski gubici": f"{e_result['gubici']/e_result['povrsina']:.1f} W/m²" if e_result['povrsina'] > 0 else "N/A"
-            })
+        if tablice is None:
+            tablice = TabliceRezultata.iz_rezultata({"zgrada": zgrada_rezultat})
+        st.dataframe(tablica_etaza_za_prikaz(tablice, s_udjelom=True), hide_index=True)
+    else:
+        st.warning("Nema podataka o etažama u ovoj zgradi.")
+
+
+def tablica_etaza_za_prikaz(tablice, s_udjelom=False):
+    """
+    Formatira tablicu etaža za prikaz u UI-u.
+    
+    Parameters:
+    -----------
+    tablice : TabliceRezultata
+        Tablice rezultata
+    s_udjelom : bool
+        Dodaje stupac s udjelom etaže u ukupnim gubicima zgrade
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        Tablica etaža s nazivima stupaca i jedinicama
+    """
+    df = tablice.etaze
+    prikaz = pd.DataFrame({
+        "Etaža": df["naziv"],
+        "Broj etaža": df["broj_ponavljanja"],
+        "Ukupna površina": df["povrsina"].map("{:.2f} m²".format),
+        "Ukupni volumen": df["volumen"].map("{:.2f} m³".format),
+        "Broj prostorija": df["broj_prostorija"],
+        "Ukupni toplinski gubici [W]": df["gubici"].round(0),
+        "Ukupni specifični toplinski gubici": df["specificni_gubici"].map("{:.1f} W/m²".format),
+        "Prosječna temp. [°C]": df["prosjecna_temperatura"].map(lambda t: "N/A" if pd.isna(t) else f"{t:.1f}"),
+    })
+    if s_udjelom:
+        prikaz.insert(6, "Udio [%]", tablice.udio_etaza().round(1))
+    return prikaz
+
+
+def tablica_prostorija_za_prikaz(df):
+    """
+    Formatira tablicu prostorija (ili njezin dio) za prikaz u UI-u.
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Tablica prostorija (stupci kao TabliceRezultata.prostorije)
         
-        etaze_df = pd.DataFrame(etaze_data)
-        st.dataframe(etaze_df, hide_index=True)
+    Returns:
+    --------
+    pandas.DataFrame
+        Tablica s nazivima stupaca i jedinicama
+    """
+    return pd.DataFrame({
+        "Prostorija": df["prikaz"],
+        "Površina": df["povrsina"].map("{:.2f} m²".format),
+        "Temperatura [°C]": df["temperatura"].map("{:.1f}".format),
+        "Toplinski gubici [W]": df["ukupno"].round(0),
+        "Specifični toplinski gubici": df["specificni_gubici"].map("{:.1f} W/m²".format),
+    })
+
+
+def _tablica_prostorija_iz_rezultata(prostorije):
+    """Izrađuje tablicu prostorija iz rječnika/liste rezultata (za rezultate bez tablica)."""
+    if isinstance(prostorije, dict):
+        prostorije = {"": {"prostorije": prostorije}}
     else:
-        st.warning("Nema podataka o etažama u ovoj zgradi.")
\ No newline at end of file
+        prostorije = {"": {"prostorije": {i: p for i, p in enumerate(prostorije)}}}
+    return TabliceRezultata.iz_rezultata({"zgrada": {"etaze": prostorije}}).prostorije
+
+
+def prikaz_izvoza_tablica(tablice, rezultati=None, revizija=None):
+    """
+    Prikazuje gumbe za izvoz tablica rezultata (Excel s tri lista i CSV prostorija).
+    
+    Parameters:
+    -----------
+    tablice : TabliceRezultata
+        Tablice rezultata
+    rezultati : dict, optional
+        Rezultati izračuna zgrade; ako su zadani, nudi se i protočni izvoz prostorija i elemenata
+    revizija : str, optional
+        Revizija ulaza izračuna kojim su dobiveni rezultati (ključ pripremljene datoteke)
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Izvoz rezultata (Excel)", data=tablice.izvoz_excel(), file_name="toplinski_gubici.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", key="izvoz_tablica_excel"
+        )
+    with col2:
+        st.download_button(
+            "Izvoz prostorija (CSV)", data=tablice.izvoz_csv("prostorije"), file_name="toplinski_gubici_prostorije.csv",
+            mime="text/csv", key="izvoz_tablica_csv"
+        )
+    if rezultati is not None:
+        prikaz_protocnog_izvoza(rezultati, revizija)
+
+
+# Vrste datoteka protočnog izvoza: format -> (naziv, nastavak, MIME tip)
+FORMATI_PROTOCNOG_IZVOZA = {
+    "xlsx": ("Excel (XLSX)", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV", "csv", "text/csv"),
+    "parquet": ("Parquet", "parquet", "application/octet-stream"),
+}
+
+
+def prikaz_protocnog_izvoza(rezultati, revizija):
+    """
+    Prikazuje protočni izvoz prostorija i elemenata (CSV, XLSX ili Parquet) za velike modele.
+
+    Datoteka se izrađuje tek na zahtjev korisnika i čuva se u session_state dok se
+    revizija izračuna ili odabir formata ne promijene.
+
+    Parameters:
+    -----------
+    rezultati : dict
+        Rezultati izračuna zgrade
+    revizija : str
+        Revizija ulaza izračuna kojim su dobiveni rezultati
+    """
+    with st.expander("Izvoz prostorija i elemenata (veliki modeli)"):
+        formati = [f for f in FORMATI_PROTOCNOG_IZVOZA if f != "parquet" or parquet_dostupan()]
+        col1, col2 = st.columns(2)
+        with col1:
+            format_izvoza = st.selectbox(
+                "Format", formati, format_func=lambda f: FORMATI_PROTOCNOG_IZVOZA[f][0], key="protocni_izvoz_format"
+            )
+        with col2:
+            tablica = st.radio(
+                "Tablica", ["prostorije", "elementi"], format_func=str.capitalize, horizontal=True,
+                key="protocni_izvoz_tablica", disabled=format_izvoza == "xlsx",
+                help="Excel datoteka sadrži obje tablice na zasebnim listovima."
+            )
+        if "parquet" not in formati:
+            st.caption("Parquet izvoz zahtijeva biblioteku pyarrow.")
+
+        kljuc = (revizija, format_izvoza, "obje" if format_izvoza == "xlsx" else tablica)
+        pripremljeno = st.session_state.get("protocni_izvoz_datoteka")
+        if pripremljeno is None or pripremljeno[0] != kljuc:
+            if st.button("Pripremi datoteku", key="protocni_izvoz_pripremi"):
+                tok = io.BytesIO()
+                izvezi_rezultate(rezultati, tok, format_izvoza, tablica)
+                pripremljeno = (kljuc, tok.getvalue())
+                st.session_state["protocni_izvoz_datoteka"] = pripremljeno
+            else:
+                return
+
+        naziv, nastavak, mime = FORMATI_PROTOCNOG_IZVOZA[format_izvoza]
+        sufiks = "" if format_izvoza == "xlsx" else f"_{tablica}"
+        st.download_button(
+            f"Preuzmi {naziv}", data=pripremljeno[1], file_name=f"toplinski_gubici{sufiks}.{nastavak}",
+            mime=mime, key="protocni_izvoz_preuzmi"
+        )
@@ -5,6 +5,7 @@ Modul koji sadrži funkcije za prikaz i upravljanje zidovima u UI-u.
 import streamlit as st
 from ..constants import ORIJENTACIJE
 from ..utils.validators import validate_number
+from ..utils.session_manager import fragment, osvjezi_fragment, oznaci_rezultate_zastarjelima
 from ..models.elementi.building_elements_model import BuildingElementsModel, inicijaliziraj_elemente # Added import
 
 def prikaz_zidova(prostorija, model, on_zid_selected=None):
@@ -262,13 +263,14 @@ def forma_za_dodavanje_zida(prostorija, model, callback_nakon_dodavanja=None):
             )
             if zid_id:
                 st.success("Zid je uspješno dodan!")
+                oznaci_rezultate_zastarjelima(model)
                 
                 if callback_nakon_dodavanja:
                     novi_zid = prostorija.dohvati_zid(zid_id)
                     callback_nakon_dodavanja(novi_zid)
                 
-                # Add st.rerun() to refresh the UI after successfully adding a wall
-                st.rerun()
+                # Osvježavamo samo uređivač prostorije (fragment) nakon dodavanja zida
+                osvjezi_fragment()
                 return True
             else:
                 st.error("Greška prilikom dodavanja zida!")
@@ -290,7 +292,7 @@ def forma_za_uredivanje_zida(zid, prostorija, model, callback_nakon_uredivanja=N
     callback_nakon_uredivanja : function
         Funkcija koja se poziva nakon uređivanja zida
     """
-    with st.form("forma_uredi_zid"):
+    with st.form(f"forma_uredi_zid_{zid.get('id')}"):
             # Tip zida se ne može mijenjati nakon stvaranja
             tip_zida = zid.get("tip", "vanjski")
             st.text(f"Tip zida: {tip_zida}")
@@ -333,13 +335,14 @@ def forma_za_uredivanje_zida(zid, prostorija, model, callback_nakon_uredivanja=N
                 
                 # Spremanje promjena u model
                 model._spremi_u_session_state()
+                oznaci_rezultate_zastarjelima(model)
                 
                 st.success("Zid je uspješno ažuriran!")
                 if callback_nakon_uredivanja:
                     callback_nakon_uredivanja(zid)
                 
-                # Add st.rerun() to refresh the UI after successfully updating a wall
-                st.rerun()
+                # Osvježavamo samo uređivač zida (fragment)
+                osvjezi_fragment()
                 return zid
             
             if delete_button:
@@ -348,6 +351,7 @@ def forma_za_uredivanje_zida(zid, prostorija, model, callback_nakon_uredivanja=N
                 
                 if success:
                     st.success("Zid je uspješno obrisan!")
+                    oznaci_rezultate_zastarjelima(model)
                     if callback_nakon_uredivanja:
                         callback_nakon_uredivanja(None)
                     
@@ -357,7 +361,7 @@ def forma_za_uredivanje_zida(zid, prostorija, model, callback_nakon_uredivanja=N
                 else:
                     st.error("Greška prilikom brisanja zida!")
     
-    return zid
+    return None
 
 def prikaz_elemenata_zida(zid, prostorija, model, zid_controller, elements_catalog=None): # Modified signature
     """
@@ -530,7 +534,8 @@ def prikaz_elemenata_zida(zid, prostorija, model, zid_controller, elements_catal
                                 )
                                 if result:
                                     st.success(f"Prozor '{selected_window_type.naziv}' dodan na zid.")
-                                    st.rerun()
+                                    oznaci_rezultate_zastarjelima(model)
+                                    osvjezi_fragment()
                                 else:
                                     st.error("Nije moguće dodati prozor. Provjerite konzolu za greške.")
                             except Exception as e:
@@ -628,7 +633,8 @@ def prikaz_elemenata_zida(zid, prostorija, model, zid_controller, elements_catal
                                 )
                                 if result:
                                     st.success(f"Vrata '{selected_door_type.naziv}' dodana na zid.")
-                                    st.rerun()
+                                    oznaci_rezultate_zastarjelima(model)
+                                    osvjezi_fragment()
                                 else:
                                     st.error("Nije moguće dodati vrata. Provjerite konzolu za greške.")
                             except Exception as e:
@@ -713,84 +719,114 @@ def _prikazi_listu_zidova(zidovi, prostorija, model, zid_controller, elements_ca
         Katalog građevinskih elemenata
     """
     for i, zid in enumerate(zidovi):
-        # Koristimo kontejner za svaki zid
-        with st.container():
-            # Definicija tipova zida i generiranje opisa
-            tip_zida_naziv = zid.get("tip", "Nepoznat tip")
-            zid_id_display = zid.get('id', 'N/A')
-            
-            # Standardizirana priprema naziva za prikaz
-            if tip_zida_naziv == "vanjski":
-                orijentacija = zid.get("orijentacija", "")
-                naziv_za_prikaz = f"Vanjski zid | {orijentacija}"
-            elif tip_zida_naziv == "prema_prostoriji":
-                povezana_prostorija_id = zid.get("povezana_prostorija_id")
-                fizicki_zid_id = zid.get("fizicki_zid_id")
-                povezana_prostorija = model.dohvati_prostoriju(povezana_prostorija_id) if povezana_prostorija_id else None
-                povezana_naziv = povezana_prostorija.naziv if povezana_prostorija else "Nije povezan"
-                
-                # Pojednostavljeni prikaz povezanog zida
-                naziv_za_prikaz = f"Prema prostoriji | {povezana_naziv}"
-                if fizicki_zid_id:
-                    naziv_za_prikaz += f" | Fiz.ID: {fizicki_zid_id}"
-            elif tip_zida_naziv == "prema_negrijanom":
-                naziv_za_prikaz = "Prema negrijanom prostoru"
-            else:
-                naziv_za_prikaz = tip_zida_naziv
-              # Struktura za prikaz zida i gumba za akcije
-            col1, col2, col3, col4 = st.columns([4, 1, 1, 1])
-            with col1:
-                # Konzistentan prikaz dimenzija
-                dimenzije = f"{zid.get('duzina', 0.0):.1f} × {zid.get('visina', 0.0):.1f} m"                # Prilagođeni prikaz ID-a ovisno o tipu zida u istom redu (plavi ili zeleni caption za ID)
-                # Koristimo različite HTML stilove za različite tipove zidova
-                
-                if tip_zida_naziv == "prema_prostoriji" and zid.get("fizicki_zid_id"):
-                    # Plavi stil za fizičke zidove i prikaz običnog i fizičkog ID-a
-                    fizicki_id = zid.get("fizicki_zid_id")
-                    # Prikazujemo i normalni ID i fizički ID za zidove prema prostoriji
-                    st.markdown(f"**{naziv_za_prikaz}** ({dimenzije}) <span style='background-color:#d1e7dd; padding:2px 5px; border-radius:3px; color:#0a3622;'>ID: {zid_id_display}</span> <span style='background-color:#cce5ff; padding:2px 5px; border-radius:3px; color:#004085;'>Fizički ID: {fizicki_id}</span>", unsafe_allow_html=True)
-                else:
-                    # Zeleni zadani stil (kao caption) za ostale zidove
-                    st.markdown(f"**{naziv_za_prikaz}** ({dimenzije}) <span style='background-color:#d1e7dd; padding:2px 5px; border-radius:3px; color:#0a3622;'>ID: {zid_id_display}</span>", unsafe_allow_html=True)
-            
-            with col2:
-                if st.button("Detalji", key=f"details_zid_{zid.get('id')}"):
-                    st.session_state[f"show_details_zid_{zid.get('id')}"] = not st.session_state.get(f"show_details_zid_{zid.get('id')}", False)
+        _uredivac_zida(prostorija.id, zid.get('id'), model, zid_controller, elements_catalog)
+        
+        # Separator između zidova - koristi Streamlit divider
+        if i < len(zidovi) - 1:
+            st.divider()
+
+@fragment
+def _uredivac_zida(prostorija_id, zid_id, model, zid_controller, elements_catalog):
+    """
+    Prikazuje uređivač jednog zida s elementima (prozori, vrata).
+    
+    Uređivač je Streamlit fragment: uređivanje zida ili dodavanje elemenata ponovno
+    izvršava samo ovaj uređivač, a izmjene modela označavaju rezultate zastarjelima.
+    
+    Parameters:
+    -----------
+    prostorija_id : str
+        ID prostorije kojoj zid pripada
+    zid_id : str
+        ID zida
+    model : MultiRoomModel
+        Model s zidovima
+    zid_controller : ZidController
+        Kontroler za upravljanje zidovima
+    elements_catalog : BuildingElementsModel
+        Katalog građevinskih elemenata
+    """
+    prostorija = model.dohvati_prostoriju(prostorija_id)
+    zid = prostorija.dohvati_zid(zid_id) if prostorija else None
+    if not zid:
+        return
+    
+    # Koristimo kontejner za svaki zid
+    with st.container():
+        # Definicija tipova zida i generiranje opisa
+        tip_zida_naziv = zid.get("tip", "Nepoznat tip")
+        zid_id_display = zid.get('id', 'N/A')
+        
+        # Standardizirana priprema naziva za prikaz
+        if tip_zida_naziv == "vanjski":
+            orijentacija = zid.get("orijentacija", "")
+            naziv_za_prikaz = f"Vanjski zid | {orijentacija}"
+        elif tip_zida_naziv == "prema_prostoriji":
+            povezana_prostorija_id = zid.get("povezana_prostorija_id")
+            fizicki_zid_id = zid.get("fizicki_zid_id")
+            povezana_prostorija = model.dohvati_prostoriju(povezana_prostorija_id) if povezana_prostorija_id else None
+            povezana_naziv = povezana_prostorija.naziv if povezana_prostorija else "Nije povezan"
             
-            with col3:
-                if st.button("Uredi", key=f"edit_zid_{zid.get('id')}"):
-                    st.session_state[f"edit_zid_open_{zid.get('id')}"] = True
+            # Pojednostavljeni prikaz povezanog zida
+            naziv_za_prikaz = f"Prema prostoriji | {povezana_naziv}"
+            if fizicki_zid_id:
+                naziv_za_prikaz += f" | Fiz.ID: {fizicki_zid_id}"
+        elif tip_zida_naziv == "prema_negrijanom":
+            naziv_za_prikaz = "Prema negrijanom prostoru"
+        else:
+            naziv_za_prikaz = tip_zida_naziv
+          # Struktura za prikaz zida i gumba za akcije
+        col1, col2, col3, col4 = st.columns([4, 1, 1, 1])
+        with col1:
+            # Konzistentan prikaz dimenzija
+            dimenzije = f"{zid.get('duzina', 0.0):.1f} × {zid.get('visina', 0.0):.1f} m"                # Prilagođeni prikaz ID-a ovisno o tipu zida u istom redu (plavi ili zeleni caption za ID)
+            # Koristimo različite HTML stilove za različite tipove zidova
             
-            with col4:
-                if st.button("Obriši", key=f"delete_zid_{zid.get('id')}"):
-                    if zid_controller.ukloni_zid(prostorija.id, zid.get('id')):
-                        st.success(f"Zid uspješno uklonjen!")
-                        st.rerun()
-                    else:
-                        st.error("Greška prilikom brisanja zida.")
+            if tip_zida_naziv == "prema_prostoriji" and zid.get("fizicki_zid_id"):
+                # Plavi stil za fizičke zidove i prikaz običnog i fizičkog ID-a
+                fizicki_id = zid.get("fizicki_zid_id")
+                # Prikazujemo i normalni ID i fizički ID za zidove prema prostoriji
+                st.markdown(f"**{naziv_za_prikaz}** ({dimenzije}) <span style='background-color:#d1e7dd; padding:2px 5px; border-radius:3px; color:#0a3622;'>ID: {zid_id_display}</span> <span style='background-color:#cce5ff; padding:2px 5px; border-radius:3px; color:#004085;'>Fizički ID: {fizicki_id}</span>", unsafe_allow_html=True)
+            else:
+                # Zeleni zadani stil (kao caption) za ostale zidove
+                st.markdown(f"**{naziv_za_prikaz}** ({dimenzije}) <span style='background-color:#d1e7dd; padding:2px 5px; border-radius:3px; color:#0a3622;'>ID: {zid_id_display}</span>", unsafe_allow_html=True)
         
-        # Prikaži detalje ako je otvoreno
-        if st.session_state.get(f"show_details_zid_{zid.get('id')}", False):
-            with st.container():
-                st.divider()  # Koristimo Streamlit divider umjesto HTML separatora
-                prikaz_elemenata_zida(zid, prostorija, model, zid_controller, elements_catalog) # Pass controller and catalog
-                if st.button("Sakrij detalje", key=f"hide_details_zid_{zid.get('id')}"):
-                    st.session_state[f"show_details_zid_{zid.get('id')}"] = False
-                    st.rerun()
-                st.divider()
+        with col2:
+            if st.button("Detalji", key=f"details_zid_{zid.get('id')}"):
+                st.session_state[f"show_details_zid_{zid.get('id')}"] = not st.session_state.get(f"show_details_zid_{zid.get('id')}", False)
         
-        # Prikaži formu za uređivanje ako je otvorena
-        if st.session_state.get(f"edit_zid_open_{zid.get('id')}", False):
-            with st.container():
-                st.divider()
-                if forma_za_uredivanje_zida(zid, prostorija, model):
-                    st.session_state[f"edit_zid_open_{zid.get('id')}"] = False
-                    st.rerun()
-                if st.button("Odustani", key=f"cancel_edit_zid_{zid.get('id')}"):
-                    st.session_state[f"edit_zid_open_{zid.get('id')}"] = False
-                    st.rerun()
-                st.divider()
+        with col3:
+            if st.button("Uredi", key=f"edit_zid_{zid.get('id')}"):
+                st.session_state[f"edit_zid_open_{zid.get('id')}"] = True
         
-        # Separator između zidova - koristi Streamlit divider
-        if i < len(prostorija.zidovi) - 1:
+        with col4:
+            if st.button("Obriši", key=f"delete_zid_{zid.get('id')}"):
+                if zid_controller.ukloni_zid(prostorija.id, zid.get('id')):
+                    st.success(f"Zid uspješno uklonjen!")
+                    oznaci_rezultate_zastarjelima(model)
+                    # Mijenja se popis zidova prostorije - ponovno izvršavanje cijele skripte
+                    st.rerun()
+                else:
+                    st.error("Greška prilikom brisanja zida.")
+    
+    # Prikaži detalje ako je otvoreno
+    if st.session_state.get(f"show_details_zid_{zid.get('id')}", False):
+        with st.container():
+            st.divider()  # Koristimo Streamlit divider umjesto HTML separatora
+            prikaz_elemenata_zida(zid, prostorija, model, zid_controller, elements_catalog) # Pass controller and catalog
+            if st.button("Sakrij detalje", key=f"hide_details_zid_{zid.get('id')}"):
+                st.session_state[f"show_details_zid_{zid.get('id')}"] = False
+                osvjezi_fragment()
+            st.divider()
+    
+    # Prikaži formu za uređivanje ako je otvorena
+    if st.session_state.get(f"edit_zid_open_{zid.get('id')}", False):
+        with st.container():
+            st.divider()
+            if forma_za_uredivanje_zida(zid, prostorija, model):
+                st.session_state[f"edit_zid_open_{zid.get('id')}"] = False
+                osvjezi_fragment()
+            if st.button("Odustani", key=f"cancel_edit_zid_{zid.get('id')}"):
+                st.session_state[f"edit_zid_open_{zid.get('id')}"] = False
+                osvjezi_fragment()
             st.divider()
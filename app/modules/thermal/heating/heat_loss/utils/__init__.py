@@ -3,7 +3,10 @@ Inicijalizacija modula za pomoćne funkcije proračuna toplinskih gubitaka.
 Ovaj modul sadrži pomoćne funkcije za rad sa sesijom, validaciju i slično.
 """
 
-from .session_manager import spremi_u_session_state, ucitaj_iz_session_state, is_valid_session_data, initialize_session_data
+from .session_manager import (
+    spremi_u_session_state, ucitaj_iz_session_state, is_valid_session_data, initialize_session_data,
+    fragment, osvjezi_fragment, oznaci_rezultate_zastarjelima, zabiljezi_korak_povijesti
+)
 from .validators import validate_number, prikazuje_upozorenje_o_povrsinama
 
 # Export session management functions
@@ -12,6 +15,10 @@ __all__ = [
     'ucitaj_iz_session_state', 
     'is_valid_session_data',
     'initialize_session_data',
+    'fragment',
+    'osvjezi_fragment',
+    'oznaci_rezultate_zastarjelima',
+    'zabiljezi_korak_povijesti',
     'validate_number', 
     'prikazuje_upozorenje_o_povrsinama'
 ]
@@ -5,6 +5,7 @@ Modul s pomoćnim funkcijama za rad sa Streamlit session state.
 import streamlit as st
 import json
 import base64
+from streamlit.errors import StreamlitAPIException
 
 def spremi_u_session_state(session_key, data):
     """
@@ -186,3 +187,75 @@ def upload_session_data(session_key, uploaded_file):
     except Exception as e:
         st.error(f"Greška prilikom učitavanja podataka: {e}")
         return False
+
+def fragment(funkcija):
+    """
+    Dekorator koji funkciju sučelja izvršava kao Streamlit fragment.
+    
+    Interakcija s widgetima unutar fragmenta ponovno izvršava samo taj fragment,
+    a ne cijelu skriptu. Na verzijama Streamlita bez fragmenata funkcija se
+    izvršava normalno.
+    
+    Parameters:
+    -----------
+    funkcija : callable
+        Funkcija koja prikazuje dio sučelja
+        
+    Returns:
+    --------
+    callable
+        Funkcija omotana u fragment (ili nepromijenjena funkcija)
+    """
+    dekorator = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return dekorator(funkcija) if dekorator else funkcija
+
+def osvjezi_fragment():
+    """
+    Ponovno izvršava trenutni fragment; izvan fragmenta (ili na starijim verzijama
+    Streamlita) ponovno izvršava cijelu skriptu.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except (TypeError, StreamlitAPIException):
+        st.rerun()
+
+def kljuc_zastarjelih_rezultata(session_key):
+    """Vraća ključ session state-a kojim se označava da su rezultati modela zastarjeli."""
+    return f"{session_key}_rezultati_zastarjeli"
+
+def oznaci_rezultate_zastarjelima(model):
+    """
+    Označava da rezultati proračuna više ne odgovaraju modelu.
+    
+    Uređivači prostorija, zidova i elemenata pozivaju ovu funkciju nakon izmjene
+    umjesto ponovnog izračuna; rezultati se ponovno računaju tek pri prikazu.
+    
+    Parameters:
+    -----------
+    model : MultiRoomModel
+        Model koji je izmijenjen
+    """
+    st.session_state[kljuc_zastarjelih_rezultata(model.session_key)] = True
+
+def zabiljezi_korak_povijesti(opis):
+    """
+    Bilježi trenutno stanje aktivnog proračuna kao jedan korak povijesti (poništavanja).
+    
+    Parameters:
+    -----------
+    opis : str
+        Opis izmjene
+        
+    Returns:
+    --------
+    bool
+        True ako je korak zabilježen, False ako povijest nije dostupna
+    """
+    state_manager = st.session_state.get("state_manager")
+    if not state_manager or not st.session_state.get("history_manager"):
+        return False
+    proracun = state_manager.get_current_calculation()
+    if proracun is None or not hasattr(proracun, "record_state"):
+        return False
+    proracun.record_state(opis)
+    return True
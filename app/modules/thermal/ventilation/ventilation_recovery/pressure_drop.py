@@ -8,6 +8,7 @@ from modules.thermal.ventilation.ventilation_recovery.utils import (
     calculate_dynamic_pressure
 )
 from modules.thermal.ventilation.ventilation_recovery.local_elements import sum_local_pressure_drops
+from utils import hydraulics
 
 def calculate_friction_factor(reynolds, roughness=0.15, hydraulic_diameter=0.2):
     """
@@ -27,18 +28,8 @@ def calculate_friction_factor(reynolds, roughness=0.15, hydraulic_diameter=0.2):
     # Relativna hrapavost
     relative_roughness = roughness_m / hydraulic_diameter
     
-    # Colebrook-White formula za turbulentan tok (pojednostavljena)
-    if reynolds > 4000:
-        # Za standardne ventilacijske kanale možemo koristiti pojednostavljeni pristup
-        if relative_roughness < 0.001:
-            # Glatke cijevi
-            return 0.0196 * (reynolds ** -0.2)
-        else:
-            # Hrapave cijevi
-            return max(0.018, 0.11 * (relative_roughness ** 0.25))
-    else:
-        # Laminarni tok
-        return 64 / reynolds if reynolds > 0 else 0
+    # Laminarni tok (64/Re) do Re = 4000, iznad Colebrook-White formula za turbulentan tok
+    return hydraulics.friction_factor(reynolds, relative_roughness, laminar_limit=4000)
 
 def calculate_linear_pressure_drop(length, hydraulic_diameter, velocity, roughness=0.15):
     """
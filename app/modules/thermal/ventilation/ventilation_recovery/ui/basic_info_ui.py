@@ -47,6 +47,7 @@ def render_basic_info_tab(calculator):
     
     # Automatsko postavljanje lokacije prema odabranom gradu
     data["location"] = f"{grad}, {regija}"
+    data["city"] = grad
     
     # Osiguraj da postoji rječnik za temperature
     if "temperatures" not in data:
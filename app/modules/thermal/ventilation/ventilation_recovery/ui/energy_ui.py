@@ -11,6 +11,7 @@ from modules.thermal.ventilation.ventilation_recovery.energy_analysis import (
 from modules.thermal.ventilation.ventilation_recovery.heat_recovery import (
     calculate_annual_energy_savings
 )
+from modules.thermal.heating.heat_loss.calculations.klimatski_podaci import dohvati_stupanj_dane, GRADOVI_KLIME
 
 def render_energy_tab(calculator):
     """Prikazuje tab za energetsku analizu."""
@@ -125,7 +126,12 @@ def render_energy_tab(calculator):
             
             # Izračun potrošnje grijača
             if heater_data.get("standard_power", 0) > 0:
-                location_degree_days = 2800 if data["location_type"] == "continental" else 1500
+                # Stupanj-dani odabranog grada iz zajedničkih klimatskih podataka, inače procjena po regiji
+                grad = basic_info.get("city")
+                if grad in GRADOVI_KLIME:
+                    location_degree_days = dohvati_stupanj_dane(grad)
+                else:
+                    location_degree_days = 2800 if data["location_type"] == "continental" else 1500
                 heater_consumption = calculate_heater_consumption(
                     heater_data["standard_power"], 
                     basic_info["temperatures"].get("outdoor", -15),
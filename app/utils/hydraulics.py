@@ -0,0 +1,165 @@
+"""
+Zajednička hidraulička jezgra za proračune strujanja u cijevima i kanalima
+
+Sve funkcije prihvaćaju skalare ili NumPy nizove (uz uobičajeno NumPy proširivanje
+oblika), a za skalarne ulaze vraćaju float. Faktor trenja računa se eksplicitnim
+aproksimacijama Colebrook-White jednadžbe (Serghides ili točno rješenje preko
+Lambertove W funkcije), pa nije potrebna iteracija po pojedinoj dionici.
+"""
+
+import math
+import numpy as np
+
+# Granica laminarnog strujanja
+LAMINAR_REYNOLDS = 2300
+
+# Konstanta iz 1/√λ = -2·log10(...) izražena prirodnim logaritmom
+_COLEBROOK_C = 2 / math.log(10)
+
+# Podržane metode izračuna faktora trenja
+FRICTION_METHODS = ("serghides", "lambert_w")
+
+
+def _result(value):
+    """Vraća float za skalarni rezultat, inače NumPy niz."""
+    return float(value) if np.ndim(value) == 0 else value
+
+
+def reynolds_number(density, velocity, diameter, dynamic_viscosity):
+    """
+    Izračunava Reynoldsov broj Re = ρ·v·D/μ
+
+    Args:
+        density: Gustoća fluida [kg/m³]
+        velocity: Brzina strujanja [m/s]
+        diameter: (Hidraulički) promjer [m]
+        dynamic_viscosity: Dinamička viskoznost [Pa·s]
+
+    Returns:
+        Reynoldsov broj [-] (0 gdje viskoznost nije pozitivna)
+    """
+    density, velocity, diameter, dynamic_viscosity = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (density, velocity, diameter, dynamic_viscosity))
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reynolds = np.where(dynamic_viscosity > 0, density * velocity * diameter / dynamic_viscosity, 0.0)
+    return _result(reynolds)
+
+
+def _serghides(reynolds, relative_roughness):
+    """Serghidesova eksplicitna aproksimacija Colebrook-White jednadžbe (Steffensenovo ubrzanje)."""
+    rr = relative_roughness / 3.7
+    a = -2 * np.log10(rr + 12 / reynolds)
+    b = -2 * np.log10(rr + 2.51 * a / reynolds)
+    c = -2 * np.log10(rr + 2.51 * b / reynolds)
+    denominator = c - 2 * b + a
+    # Kada su a, b i c već jednaki nazivnik je 0 i rješenje je c
+    x = np.where(denominator != 0, a - (b - a) ** 2 / np.where(denominator != 0, denominator, 1.0), c)
+    return 1 / x ** 2
+
+
+def _wright_omega(y):
+    """Wrightova omega funkcija ω(y) = W(e^y), rješenje ω + ln ω = y (Newtonove iteracije)."""
+    # Početna procjena: asimptotski razvoj za velike y, eksponencijalna za male
+    w = np.where(y > 1, y - np.log(np.maximum(y, 1.0)), np.exp(np.minimum(y, 1.0)) / 2)
+    for _ in range(6):
+        w = w - (w + np.log(w) - y) * w / (1 + w)
+    return w
+
+
+def _lambert_w(reynolds, relative_roughness):
+    """Točno rješenje Colebrook-White jednadžbe preko Lambertove W funkcije."""
+    a = 2.51 / reynolds
+    b = relative_roughness / 3.7
+    ac = a * _COLEBROOK_C
+    # 1/√λ = (u - b)/a, gdje je u = ac·W(e^(b/ac)/ac) = ac·ω(b/ac - ln ac)
+    u = ac * _wright_omega(b / ac - np.log(ac))
+    return (a / (u - b)) ** 2
+
+
+def colebrook_friction_factor(reynolds, relative_roughness, method="serghides"):
+    """
+    Darcyjev faktor trenja prema Colebrook-White jednadžbi
+
+    Args:
+        reynolds: Reynoldsov broj [-]
+        relative_roughness: Relativna hrapavost k/D [-]
+        method: "serghides" (eksplicitna aproksimacija) ili "lambert_w" (točno rješenje)
+
+    Returns:
+        Faktor trenja λ [-] (0 gdje Reynoldsov broj nije pozitivan)
+    """
+    if method not in FRICTION_METHODS:
+        raise ValueError(f"Nepoznata metoda faktora trenja: {method}")
+
+    reynolds, relative_roughness = np.broadcast_arrays(
+        np.asarray(reynolds, dtype=float), np.asarray(relative_roughness, dtype=float)
+    )
+    flowing = reynolds > 0
+    safe_reynolds = np.where(flowing, reynolds, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if method == "serghides":
+            friction = _serghides(safe_reynolds, relative_roughness)
+        else:
+            friction = _lambert_w(safe_reynolds, relative_roughness)
+    return _result(np.where(flowing, friction, 0.0))
+
+
+def friction_factor(reynolds, relative_roughness, laminar_limit=LAMINAR_REYNOLDS, method="serghides"):
+    """
+    Darcyjev faktor trenja za laminarno (64/Re) i turbulentno (Colebrook-White) strujanje
+
+    Args:
+        reynolds: Reynoldsov broj [-]
+        relative_roughness: Relativna hrapavost k/D [-]
+        laminar_limit: Reynoldsov broj do kojeg se strujanje smatra laminarnim
+        method: Metoda za turbulentno područje (vidi colebrook_friction_factor)
+
+    Returns:
+        Faktor trenja λ [-] (0 gdje Reynoldsov broj nije pozitivan)
+    """
+    reynolds = np.asarray(reynolds, dtype=float)
+    turbulent = np.asarray(colebrook_friction_factor(reynolds, relative_roughness, method))
+    with np.errstate(divide="ignore"):
+        laminar = np.where(reynolds > 0, 64 / np.where(reynolds > 0, reynolds, 1.0), 0.0)
+    return _result(np.where(reynolds > laminar_limit, turbulent, laminar))
+
+
+def darcy_weisbach_pressure_drop(friction, length, diameter, density, velocity):
+    """
+    Linijski pad tlaka prema Darcy-Weisbachu Δp = λ·(L/D)·ρ·v²/2
+
+    Args:
+        friction: Faktor trenja λ [-]
+        length: Duljina [m]
+        diameter: (Hidraulički) promjer [m]
+        density: Gustoća fluida [kg/m³]
+        velocity: Brzina strujanja [m/s]
+
+    Returns:
+        Pad tlaka [Pa]
+    """
+    friction, length, diameter, density, velocity = (
+        np.asarray(x, dtype=float) for x in (friction, length, diameter, density, velocity)
+    )
+    return _result(friction * (length / diameter) * density * velocity ** 2 / 2)
+
+
+def darcy_weisbach_head_loss(friction, length, diameter, velocity, gravity=9.81):
+    """
+    Linijski gubitak visine prema Darcy-Weisbachu h = λ·(L/D)·v²/(2g)
+
+    Args:
+        friction: Faktor trenja λ [-]
+        length: Duljina [m]
+        diameter: Unutarnji promjer [m]
+        velocity: Brzina strujanja [m/s]
+        gravity: Ubrzanje sile teže [m/s²]
+
+    Returns:
+        Gubitak visine [m stupca fluida]
+    """
+    friction, length, diameter, velocity = (
+        np.asarray(x, dtype=float) for x in (friction, length, diameter, velocity)
+    )
+    return _result(friction * (length / diameter) * velocity ** 2 / (2 * gravity))